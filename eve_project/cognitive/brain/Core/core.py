@@ -18,8 +18,11 @@ optional_dependencies: [requests, transformers, torch, sentence-transformers, fa
 """
 
 import logging
+import os
 import re
 import sys
+import threading
+import time
 import sqlite3 # Import direct pour type hinting de Connection si KnowledgeBase y fait référence
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
@@ -636,16 +639,52 @@ class KnowledgeLinker:
             self.logger.info(f"Modèle SBERT non chargé pour KnowledgeLinker. Raisons: {', '.join(reasons_sbert_disabled) or 'dépendance/configuration manquante'}")
 
         # Initialisation FAISS (si SBERT, FAISS, et Numpy sont disponibles)
-        self.faiss_index: Optional[Any] = None # Sera de type faiss.Index
-        self.doc_id_to_faiss_idx: Dict[int, int] = {} # Mapping file_id (KB) -> index FAISS (0 à N-1)
-        self.faiss_idx_to_doc_id: List[int] = []      # Mapping index FAISS (0 à N-1) -> file_id (KB)
+        self.faiss_index: Optional[Any] = None # Sera de type faiss.IndexIDMap2 (les ids FAISS sont les file_id de la KB)
+        self.faiss_embedding_dim: int = 0
+        # Manifeste file_id (KB) -> checksum du fichier dont le vecteur est actuellement dans l'index.
+        # Il est persisté à côté de l'index pour ne resynchroniser que les lignes modifiées au démarrage.
+        self.faiss_indexed_checksums: Dict[int, str] = {}
+        self.faiss_max_file_id: int = 0
+        self.faiss_index_dirty = False # True si l'index en mémoire diffère de la version sur disque
+        # Les workers ajoutent des vecteurs pendant que d'autres cherchent : FAISS n'est pas thread-safe en écriture.
+        self.faiss_lock = threading.RLock()
+
+        faiss_index_path_cfg = self.config.get("faiss_index_path")
+        self.faiss_index_path: Optional[Path] = Path(faiss_index_path_cfg) if faiss_index_path_cfg else None
+        self.faiss_index_persist = bool(self.config.get("faiss_index_persist", True)) and self.faiss_index_path is not None
+        self.faiss_populate_batch_size = max(1, int(self.config.get("faiss_populate_batch_size", 2048)))
+
+        # Tier ANN (IVF-Flat, IVF-PQ, HNSW) : l'index plat reste la référence exacte et persistée,
+        # l'index ANN est reconstruit en tâche de fond à partir d'un instantané de l'index plat.
+        # Les documents modifiés depuis l'instantané ("stale") sont exclus des résultats ANN
+        # et comparés exactement via self.faiss_ann_delta_vectors.
+        self.faiss_ann_index_type_cfg = str(self.config.get("faiss_ann_index_type", "auto")).lower()
+        self.faiss_ann_min_vectors = int(self.config.get("faiss_ann_min_vectors", 50000))
+        self.faiss_ann_memory_fraction = float(self.config.get("faiss_ann_memory_fraction", 0.25))
+        self.faiss_ann_rebuild_stale_ratio = float(self.config.get("faiss_ann_rebuild_stale_ratio", 0.10))
+        # False (mode benchmark) : aucune construction en tâche de fond ne concurrence les mesures
+        self.faiss_ann_background_build = bool(self.config.get("faiss_ann_background_build", True))
+        self.faiss_ivf_nprobe = int(self.config.get("faiss_ivf_nprobe", 16))
+        self.faiss_hnsw_m = int(self.config.get("faiss_hnsw_m", 32))
+        self.faiss_hnsw_ef_construction = int(self.config.get("faiss_hnsw_ef_construction", 80))
+        self.faiss_hnsw_ef_search = int(self.config.get("faiss_hnsw_ef_search", 64))
+        self.faiss_ann_index: Optional[Any] = None
+        self.faiss_ann_type: str = "flat" # Type de l'index ANN actif ("flat" = recherche exacte)
+        self.faiss_ann_stale_ids: set = set()
+        self.faiss_ann_delta_vectors: Dict[int, Any] = {}
+        self.faiss_ann_pending_stale_ids: Optional[set] = None # Non-None pendant une reconstruction
+        self.faiss_ann_build_thread: Optional[threading.Thread] = None
+        # (type, ntotal) du dernier échec de construction : pas de nouvel essai avant que le corpus double
+        self.faiss_ann_failed_build: Optional[Tuple[str, int]] = None
+        self.system_resources: Dict[str, Any] = {}
 
         if self.sbert_model and FAISS_AVAILABLE and faiss and NUMPY_AVAILABLE and np: # Vérifier les alias
             try:
                 embedding_dim = self.sbert_model.get_sentence_embedding_dimension()
                 if embedding_dim and isinstance(embedding_dim, int) and embedding_dim > 0:
-                    self.faiss_index = faiss.IndexFlatIP(embedding_dim) # IP pour Inner Product
-                    self.logger.info(f"Index FAISS (dim: {embedding_dim}, type: IndexFlatIP) initialisé et prêt à être peuplé.")
+                    self.faiss_embedding_dim = embedding_dim
+                    self.faiss_index = self._create_empty_faiss_index()
+                    self.logger.info(f"Index FAISS (dim: {embedding_dim}, type: IndexIDMap2(IndexFlatIP)) initialisé et prêt à être peuplé.")
                 else:
                     self.logger.error(f"Dimension d'embedding SBERT invalide ou nulle ({embedding_dim}). Index FAISS non créé.")
                     self.faiss_index = None
@@ -669,10 +708,477 @@ class KnowledgeLinker:
         self.num_semantic_links_to_propose = int(self.config.get("num_semantic_links_to_propose", 5))
         self.logger.info(f"KnowledgeLinker finalisé. Seuil similarité: {self.min_similarity_for_link}, Nb liens à proposer: {self.num_semantic_links_to_propose}")
 
+    def _create_empty_faiss_index(self) -> Any:
+        """Crée un index vide adressé par file_id (add_with_ids / remove_ids)."""
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.faiss_embedding_dim)) # type: ignore
+
+    def _faiss_meta_path(self) -> Optional[Path]:
+        if not self.faiss_index_path:
+            return None
+        return self.faiss_index_path.with_name(self.faiss_index_path.name + ".meta.json")
+
+    def _load_faiss_index_from_disk(self) -> bool:
+        """
+        Charge l'index persistant (mmap si possible) et son manifeste.
+        Retourne False si aucun index réutilisable n'existe (absent, corrompu, modèle ou dimension différents).
+        """
+        meta_path = self._faiss_meta_path()
+        if not (self.faiss_index_persist and self.faiss_index_path and meta_path):
+            return False
+        if not (self.faiss_index_path.exists() and meta_path.exists()):
+            self.logger.info(f"POPULATE_FAISS: Aucun index persistant trouvé ({self.faiss_index_path}). Reconstruction complète.")
+            return False
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f_meta:
+                meta = json.load(f_meta)
+        except (OSError, json.JSONDecodeError) as e_meta:
+            self.logger.warning(f"POPULATE_FAISS: Manifeste de l'index illisible ({meta_path}): {e_meta}. Reconstruction complète.")
+            return False
+
+        if meta.get("embedding_dim") != self.faiss_embedding_dim or meta.get("sbert_model") != self.sbert_model_name_cfg:
+            self.logger.warning(
+                f"POPULATE_FAISS: Index persistant construit pour un autre modèle/dimension "
+                f"({meta.get('sbert_model')}/{meta.get('embedding_dim')}). Reconstruction complète."
+            )
+            return False
+
+        try:
+            try:
+                loaded_index = faiss.read_index(str(self.faiss_index_path), faiss.IO_FLAG_MMAP) # type: ignore
+            except RuntimeError:
+                # Certains types d'index ne supportent pas le mmap : lecture classique
+                loaded_index = faiss.read_index(str(self.faiss_index_path)) # type: ignore
+        except Exception as e_read:
+            self.logger.warning(f"POPULATE_FAISS: Lecture de l'index persistant impossible ({self.faiss_index_path}): {e_read}. Reconstruction complète.")
+            return False
+
+        checksums = {int(k): v for k, v in meta.get("checksums", {}).items()}
+        if loaded_index.d != self.faiss_embedding_dim or loaded_index.ntotal != len(checksums):
+            self.logger.warning(
+                f"POPULATE_FAISS: Index persistant incohérent avec son manifeste "
+                f"(ntotal={loaded_index.ntotal}, manifeste={len(checksums)}). Reconstruction complète."
+            )
+            return False
+
+        self.faiss_index = loaded_index
+        self.faiss_indexed_checksums = checksums
+        self.faiss_max_file_id = int(meta.get("max_file_id", max(checksums, default=0)))
+        self.faiss_index_dirty = False
+        self.logger.info(
+            f"POPULATE_FAISS: Index persistant chargé depuis {self.faiss_index_path} "
+            f"({loaded_index.ntotal} vecteurs, max file_id: {self.faiss_max_file_id})."
+        )
+        return True
+
+    def save_faiss_index(self, force: bool = False) -> bool:
+        """
+        Écrit l'index et son manifeste à côté de la KB (écriture atomique via fichiers temporaires).
+        Ne fait rien si l'index n'a pas changé depuis la dernière sauvegarde, sauf si force=True.
+        """
+        meta_path = self._faiss_meta_path()
+        if not (self.faiss_index is not None and self.faiss_index_persist and self.faiss_index_path and meta_path):
+            return False
+
+        with self.faiss_lock:
+            if not (self.faiss_index_dirty or force):
+                self.logger.debug("SAVE_FAISS: Index inchangé depuis la dernière sauvegarde.")
+                return True
+            meta = {
+                "format_version": 1,
+                "sbert_model": self.sbert_model_name_cfg,
+                "embedding_dim": self.faiss_embedding_dim,
+                "ntotal": int(self.faiss_index.ntotal),
+                "max_file_id": self.faiss_max_file_id,
+                "checksums": {str(k): v for k, v in self.faiss_indexed_checksums.items()},
+            }
+            tmp_index_path = self.faiss_index_path.with_name(self.faiss_index_path.name + ".tmp")
+            tmp_meta_path = meta_path.with_name(meta_path.name + ".tmp")
+            try:
+                self.faiss_index_path.parent.mkdir(parents=True, exist_ok=True)
+                faiss.write_index(self.faiss_index, str(tmp_index_path)) # type: ignore
+                with open(tmp_meta_path, 'w', encoding='utf-8') as f_meta:
+                    json.dump(meta, f_meta)
+                os.replace(tmp_index_path, self.faiss_index_path)
+                os.replace(tmp_meta_path, meta_path)
+                self.faiss_index_dirty = False
+                self.logger.info(f"SAVE_FAISS: Index FAISS sauvegardé ({meta['ntotal']} vecteurs) dans {self.faiss_index_path}.")
+                return True
+            except Exception as e_save:
+                self.logger.error(f"SAVE_FAISS: Échec de la sauvegarde de l'index FAISS dans {self.faiss_index_path}: {e_save}", exc_info=True)
+                for tmp_path in (tmp_index_path, tmp_meta_path):
+                    try: tmp_path.unlink()
+                    except OSError: pass
+                return False
+
+    def _embedding_blob_to_vector(self, file_id: int, embedding_blob: Optional[bytes]) -> Optional[Any]:
+        if not embedding_blob or not isinstance(embedding_blob, bytes):
+            self.logger.debug(f"FAISS: Embedding blob manquant ou invalide pour file_id {file_id}. Ignoré.")
+            return None
+        try:
+            # La normalisation L2 est faite dans ComprehensionStep avant stockage (requis pour IndexFlatIP).
+            embedding_np_arr = np.frombuffer(embedding_blob, dtype=np.float32)
+        except Exception as e_conv:
+            self.logger.error(f"FAISS: Erreur de conversion d'embedding pour file_id {file_id}: {e_conv}. Ignoré.", exc_info=False)
+            return None
+        if embedding_np_arr.shape[0] != self.faiss_embedding_dim:
+            self.logger.warning(f"FAISS: Embedding pour file_id {file_id} (shape: {embedding_np_arr.shape}) a une dimension incorrecte (attendu: {self.faiss_embedding_dim}). Ignoré.")
+            return None
+        return embedding_np_arr
+
+    def _add_embedding_rows(self, rows: List[Tuple[int, str, Optional[bytes]]]) -> int:
+        """
+        Ajoute un lot (file_id, checksum, embedding_blob) à l'index. Les ids déjà présents sont remplacés.
+        Le lot est copié dans une matrice préallouée : pas de liste de tableaux NumPy ni de vstack global.
+        """
+        batch_matrix = np.empty((len(rows), self.faiss_embedding_dim), dtype=np.float32)
+        batch_ids: List[int] = []
+        batch_checksums: List[str] = []
+        for file_id, checksum, embedding_blob in rows:
+            vector = self._embedding_blob_to_vector(file_id, embedding_blob)
+            if vector is None:
+                continue
+            batch_matrix[len(batch_ids)] = vector
+            batch_ids.append(int(file_id))
+            batch_checksums.append(checksum)
+        if not batch_ids:
+            return 0
+
+        ids_arr = np.asarray(batch_ids, dtype=np.int64)
+        with self.faiss_lock:
+            already_indexed = [fid for fid in batch_ids if fid in self.faiss_indexed_checksums]
+            if already_indexed:
+                self.faiss_index.remove_ids(np.asarray(already_indexed, dtype=np.int64)) # type: ignore
+            self.faiss_index.add_with_ids(batch_matrix[:len(batch_ids)], ids_arr) # type: ignore
+            for fid, checksum in zip(batch_ids, batch_checksums):
+                self.faiss_indexed_checksums[fid] = checksum
+            self.faiss_max_file_id = max(self.faiss_max_file_id, max(batch_ids))
+            self.faiss_index_dirty = True
+            self._mark_ann_stale(batch_ids, batch_matrix[:len(batch_ids)])
+        return len(batch_ids)
+
+    def _add_embeddings_for_ids(self, db_conn: sqlite3.Connection, file_ids: List[int]) -> int:
+        added_total = 0
+        for start in range(0, len(file_ids), self.faiss_populate_batch_size):
+            chunk_ids = file_ids[start:start + self.faiss_populate_batch_size]
+            added_total += self._add_embedding_rows(self.kb.get_document_embeddings_by_ids(db_conn, chunk_ids)) # type: ignore
+        return added_total
+
+    def upsert_document_embedding(self, file_id: int, checksum: str, embedding_blob: Optional[bytes]) -> bool:
+        """
+        Insère ou remplace le vecteur d'un document dès que son analyse est commitée dans la KB,
+        sans attendre le prochain redémarrage du service.
+        """
+        if self.faiss_index is None or not (NUMPY_AVAILABLE and np):
+            return False
+        try:
+            added = self._add_embedding_rows([(file_id, checksum, embedding_blob)])
+        except Exception as e_upsert:
+            self.logger.error(f"UPSERT_FAISS: Échec de la mise à jour du vecteur pour file_id {file_id}: {e_upsert}", exc_info=True)
+            return False
+        if not added:
+            # Le document n'a plus d'embedding valide : retirer l'ancien vecteur s'il existe
+            self.remove_document_embedding(file_id)
+            return False
+        self.logger.debug(f"UPSERT_FAISS: Vecteur pour file_id {file_id} ajouté/remplacé (ntotal: {self.faiss_index.ntotal}).")
+        self._maybe_schedule_ann_rebuild()
+        return True
+
+    def remove_document_embedding(self, file_id: int) -> bool:
+        """Retire le vecteur d'un document supprimé de la KB."""
+        if self.faiss_index is None or not (NUMPY_AVAILABLE and np):
+            return False
+        with self.faiss_lock:
+            if file_id not in self.faiss_indexed_checksums:
+                return False
+            self.faiss_index.remove_ids(np.asarray([file_id], dtype=np.int64)) # type: ignore
+            del self.faiss_indexed_checksums[file_id]
+            self.faiss_index_dirty = True
+            self._mark_ann_stale([file_id], None)
+        self.logger.debug(f"REMOVE_FAISS: Vecteur pour file_id {file_id} retiré de l'index.")
+        self._maybe_schedule_ann_rebuild()
+        return True
+
+    # --- Tier ANN (IVF-Flat / IVF-PQ / HNSW) ---
+
+    def _mark_ann_stale(self, file_ids: List[int], vectors: Optional[Any]) -> None:
+        """Enregistre les documents modifiés depuis l'instantané de l'index ANN (appelé sous faiss_lock)."""
+        if self.faiss_ann_index is None and self.faiss_ann_pending_stale_ids is None:
+            return
+        for row_i, fid in enumerate(file_ids):
+            self.faiss_ann_stale_ids.add(fid)
+            if self.faiss_ann_pending_stale_ids is not None:
+                self.faiss_ann_pending_stale_ids.add(fid)
+            if vectors is not None:
+                self.faiss_ann_delta_vectors[fid] = np.array(vectors[row_i], dtype=np.float32)
+            else:
+                self.faiss_ann_delta_vectors.pop(fid, None)
+
+    def choose_ann_index_type(self, ntotal: int, system_resources: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Choisit le type d'index de recherche selon la taille du corpus et la RAM disponible
+        (telle que rapportée par CerveauService._detect_system_resources).
+        """
+        if self.faiss_ann_index_type_cfg in ("flat", "ivf_flat", "ivf_pq", "hnsw"):
+            # Même forcé, un index IVF ne s'entraîne pas sur un corpus trop petit
+            if ntotal < self._ann_training_minimum(self.faiss_ann_index_type_cfg, ntotal):
+                return "flat"
+            return self.faiss_ann_index_type_cfg
+        if ntotal < self.faiss_ann_min_vectors:
+            return "flat"
+
+        resources = system_resources if system_resources is not None else self.system_resources
+        ram_available_gb = float(resources.get("ram_available_gb") or 0.0)
+        if ram_available_gb <= 0:
+            # RAM inconnue (psutil absent) : IVF-PQ est le choix le plus sobre en mémoire
+            return "ivf_pq"
+        memory_budget_bytes = ram_available_gb * (1024 ** 3) * self.faiss_ann_memory_fraction
+        vector_bytes = ntotal * self.faiss_embedding_dim * 4
+        hnsw_bytes = vector_bytes + ntotal * self.faiss_hnsw_m * 2 * 4
+        if hnsw_bytes <= memory_budget_bytes:
+            return "hnsw"
+        if vector_bytes <= memory_budget_bytes:
+            return "ivf_flat"
+        return "ivf_pq"
+
+    def _ann_training_minimum(self, index_type: str, ntotal: int) -> int:
+        """Nombre minimal de vecteurs pour entraîner un index (un point par centroïde IVF / PQ)."""
+        if index_type == "ivf_flat":
+            return self._ivf_nlist_for(ntotal)
+        if index_type == "ivf_pq":
+            return max(self._ivf_nlist_for(ntotal), 2 ** 8)
+        return 0
+
+    def _ivf_nlist_for(self, ntotal: int) -> int:
+        return int(max(16, min(65536, 4 * int(ntotal ** 0.5))))
+
+    def _pq_m_for(self) -> int:
+        """Nombre de sous-quantificateurs PQ : ~8 dimensions par sous-vecteur, diviseur de la dimension."""
+        for pq_m in range(max(1, self.faiss_embedding_dim // 8), 0, -1):
+            if self.faiss_embedding_dim % pq_m == 0:
+                return pq_m
+        return 1
+
+    def _build_ann_index(self, index_type: str, vectors: Any, ids: Any) -> Any:
+        """Construit (entraîne et peuple) un index ANN sur un instantané (vectors, ids)."""
+        dim = self.faiss_embedding_dim
+        ntotal = vectors.shape[0]
+        if index_type == "hnsw":
+            hnsw_index = faiss.IndexHNSWFlat(dim, self.faiss_hnsw_m, faiss.METRIC_INNER_PRODUCT) # type: ignore
+            hnsw_index.hnsw.efConstruction = self.faiss_hnsw_ef_construction
+            ann_index = faiss.IndexIDMap2(hnsw_index) # type: ignore
+        else:
+            nlist = self._ivf_nlist_for(ntotal)
+            quantizer = faiss.IndexFlatIP(dim) # type: ignore
+            if index_type == "ivf_pq":
+                ann_index = faiss.IndexIVFPQ(quantizer, dim, nlist, self._pq_m_for(), 8, faiss.METRIC_INNER_PRODUCT) # type: ignore
+            else:
+                ann_index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT) # type: ignore
+            # ~50 points par centroïde suffisent à l'entraînement
+            train_size = min(ntotal, nlist * 50)
+            train_rows = np.random.default_rng(0).choice(ntotal, size=train_size, replace=False) if train_size < ntotal else slice(None)
+            ann_index.train(np.ascontiguousarray(vectors[train_rows]))
+        ann_index.add_with_ids(vectors, ids)
+        self._apply_ann_search_params(ann_index, index_type)
+        return ann_index
+
+    def _apply_ann_search_params(self, ann_index: Any, index_type: str,
+                                 nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+        if index_type in ("ivf_flat", "ivf_pq"):
+            faiss.extract_index_ivf(ann_index).nprobe = nprobe or self.faiss_ivf_nprobe # type: ignore
+        elif index_type == "hnsw":
+            faiss.downcast_index(ann_index.index).hnsw.efSearch = ef_search or self.faiss_hnsw_ef_search # type: ignore
+
+    def _snapshot_flat_vectors(self) -> Tuple[Any, Any]:
+        """Copie (vecteurs, ids) de l'index plat. Appelé sous faiss_lock."""
+        flat_index = faiss.downcast_index(self.faiss_index.index) # type: ignore
+        vectors = flat_index.reconstruct_n(0, self.faiss_index.ntotal) # type: ignore
+        ids = faiss.vector_to_array(self.faiss_index.id_map).astype(np.int64) # type: ignore
+        return vectors, ids
+
+    def configure_ann_tier(self, system_resources: Dict[str, Any]) -> None:
+        """Mémorise les ressources système et lance si besoin la construction de l'index ANN."""
+        self.system_resources = dict(system_resources or {})
+        self._maybe_schedule_ann_rebuild()
+
+    def _maybe_schedule_ann_rebuild(self) -> None:
+        if not self.faiss_ann_background_build:
+            return
+        if self.faiss_index is None or not (FAISS_AVAILABLE and faiss and NUMPY_AVAILABLE and np):
+            return
+        with self.faiss_lock:
+            if self.faiss_ann_build_thread is not None and self.faiss_ann_build_thread.is_alive():
+                return
+            ntotal = int(self.faiss_index.ntotal)
+            wanted_type = self.choose_ann_index_type(ntotal)
+            if wanted_type == "flat":
+                if self.faiss_ann_index is not None:
+                    self.logger.info(f"ANN_FAISS: Corpus de {ntotal} vecteurs, retour à la recherche exacte (IndexFlatIP).")
+                self.faiss_ann_index = None
+                self.faiss_ann_type = "flat"
+                self.faiss_ann_stale_ids.clear()
+                self.faiss_ann_delta_vectors.clear()
+                return
+            failed = self.faiss_ann_failed_build
+            if failed is not None and failed[0] == wanted_type and ntotal < 2 * failed[1]:
+                return
+            too_stale = len(self.faiss_ann_stale_ids) > self.faiss_ann_rebuild_stale_ratio * max(1, ntotal)
+            if self.faiss_ann_index is not None and wanted_type == self.faiss_ann_type and not too_stale:
+                return
+            self.faiss_ann_build_thread = threading.Thread(
+                target=self._ann_rebuild_worker, args=(wanted_type,), daemon=True, name="FaissAnnBuilder"
+            )
+            self.faiss_ann_build_thread.start()
+
+    def _ann_rebuild_worker(self, index_type: str) -> None:
+        """Thread de fond : entraîne un nouvel index ANN puis le substitue à l'ancien."""
+        start_time = time.perf_counter()
+        with self.faiss_lock:
+            vectors, ids = self._snapshot_flat_vectors()
+            self.faiss_ann_pending_stale_ids = set()
+        self.logger.info(f"ANN_FAISS: Construction d'un index '{index_type}' sur {len(ids)} vecteurs (tâche de fond)...")
+        try:
+            new_ann_index = self._build_ann_index(index_type, vectors, ids)
+        except Exception as e_build:
+            self.logger.error(f"ANN_FAISS: Échec de la construction de l'index '{index_type}': {e_build}. Recherche exacte conservée jusqu'à ce que le corpus double.", exc_info=True)
+            with self.faiss_lock:
+                self.faiss_ann_pending_stale_ids = None
+                self.faiss_ann_failed_build = (index_type, len(ids))
+            return
+        with self.faiss_lock:
+            # Seuls les documents modifiés pendant la construction restent à comparer exactement
+            pending_stale = self.faiss_ann_pending_stale_ids or set()
+            self.faiss_ann_delta_vectors = {fid: vec for fid, vec in self.faiss_ann_delta_vectors.items() if fid in pending_stale}
+            self.faiss_ann_stale_ids = pending_stale
+            self.faiss_ann_pending_stale_ids = None
+            self.faiss_ann_index = new_ann_index
+            self.faiss_ann_type = index_type
+            self.faiss_ann_failed_build = None
+        self.logger.info(f"ANN_FAISS: Index '{index_type}' actif ({new_ann_index.ntotal} vecteurs, construit en {time.perf_counter() - start_time:.1f}s).")
+
+    def _search_top_k(self, query_vectors: Any, k: int) -> Tuple[Any, Any]:
+        """
+        Recherche les k plus proches voisins. Utilise l'index ANN s'il est prêt,
+        complété par une comparaison exacte des documents modifiés depuis sa construction.
+        Retourne (scores, file_ids) au format FAISS (1, k).
+        """
+        with self.faiss_lock:
+            ann_index = self.faiss_ann_index
+            if ann_index is None:
+                return self.faiss_index.search(query_vectors, k) # type: ignore
+            stale_ids = set(self.faiss_ann_stale_ids)
+            delta_items = list(self.faiss_ann_delta_vectors.items())
+
+        # L'index ANN n'est jamais modifié après sa construction : recherche hors verrou.
+        # Sur-échantillonnage : les documents "stale" sont écartés, k est élargi tant que
+        # moins de k documents valides reviennent et que l'index peut en fournir davantage.
+        candidates: Dict[int, float] = {}
+        ann_ntotal = int(ann_index.ntotal)
+        k_ann = min(ann_ntotal, k + min(len(stale_ids), 4 * k))
+        while k_ann > 0:
+            ann_scores, ann_ids = ann_index.search(query_vectors, k_ann)
+            candidates.clear()
+            returned = 0
+            for fid, score in zip(ann_ids[0], ann_scores[0]):
+                if fid == -1: continue
+                returned += 1
+                if int(fid) not in stale_ids:
+                    candidates[int(fid)] = float(score)
+            if len(candidates) >= k or k_ann >= ann_ntotal or returned < k_ann:
+                break # Assez de résultats valides, ou index épuisé (nprobe/efSearch compris)
+            k_ann = min(ann_ntotal, 2 * k_ann)
+        if delta_items:
+            delta_scores = np.stack([vec for _, vec in delta_items]) @ query_vectors[0]
+            for (fid, _), score in zip(delta_items, delta_scores):
+                candidates[fid] = float(score)
+        best = sorted(candidates.items(), key=lambda item: item[1], reverse=True)[:k]
+        scores_out = np.full((1, k), -np.inf, dtype=np.float32)
+        ids_out = np.full((1, k), -1, dtype=np.int64)
+        for rank, (fid, score) in enumerate(best):
+            ids_out[0, rank] = fid
+            scores_out[0, rank] = score
+        return scores_out, ids_out
+
+    def get_index_status(self) -> Dict[str, Any]:
+        """Résumé de l'état de l'index sémantique pour le rapport d'auto-analyse."""
+        with self.faiss_lock:
+            return {
+                "ntotal": int(self.faiss_index.ntotal) if self.faiss_index is not None else 0,
+                "search_index_type": self.faiss_ann_type,
+                "ann_stale_documents": len(self.faiss_ann_stale_ids),
+                "ann_build_in_progress": bool(self.faiss_ann_build_thread and self.faiss_ann_build_thread.is_alive()),
+                "persisted_path": str(self.faiss_index_path) if self.faiss_index_persist else None,
+                "unsaved_changes": self.faiss_index_dirty,
+            }
+
+    def benchmark_ann_recall(self,
+                             index_types: Optional[List[str]] = None,
+                             num_queries: int = 200,
+                             k: int = 10,
+                             nprobe_values: Tuple[int, ...] = (1, 4, 8, 16, 32, 64, 128),
+                             ef_search_values: Tuple[int, ...] = (16, 32, 64, 128, 256, 512)) -> Dict[str, Any]:
+        """
+        Mode benchmark : compare chaque type d'index ANN à l'index plat (vérité terrain) sur les
+        vecteurs de la KB chargée. Les requêtes sont des documents de la KB tirés au hasard.
+        Retourne, pour chaque réglage de nprobe/efSearch, le recall@k et la latence par requête.
+        """
+        if self.faiss_index is None or not self.faiss_index.ntotal:
+            self.logger.warning("BENCHMARK_ANN: Index FAISS vide ou non initialisé. Benchmark impossible.")
+            return {}
+        with self.faiss_lock:
+            vectors, ids = self._snapshot_flat_vectors()
+        ntotal = len(ids)
+        k = min(k, ntotal)
+        query_rows = np.random.default_rng(0).choice(ntotal, size=min(num_queries, ntotal), replace=False)
+        queries = np.ascontiguousarray(vectors[query_rows])
+
+        exact_index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.faiss_embedding_dim)) # type: ignore
+        exact_index.add_with_ids(vectors, ids)
+
+        def timed_search(index: Any) -> Tuple[Any, float]:
+            found_ids = np.empty((len(queries), k), dtype=np.int64)
+            start = time.perf_counter()
+            for q_i in range(len(queries)): # Une requête à la fois, comme dans le pipeline
+                found_ids[q_i] = index.search(queries[q_i:q_i + 1], k)[1][0]
+            return found_ids, (time.perf_counter() - start) * 1000.0 / len(queries)
+
+        ground_truth, flat_latency_ms = timed_search(exact_index)
+        report: Dict[str, Any] = {
+            "ntotal": ntotal, "embedding_dim": self.faiss_embedding_dim, "num_queries": len(queries), "k": k,
+            "auto_selected_type": self.choose_ann_index_type(ntotal),
+            "flat": {"latency_ms_per_query": round(flat_latency_ms, 4), "recall_at_k": 1.0},
+            "ann": {},
+        }
+        for index_type in (index_types or ["ivf_flat", "ivf_pq", "hnsw"]):
+            try:
+                build_start = time.perf_counter()
+                ann_index = self._build_ann_index(index_type, vectors, ids)
+                build_seconds = time.perf_counter() - build_start
+            except Exception as e_bench_build:
+                self.logger.error(f"BENCHMARK_ANN: Construction '{index_type}' impossible: {e_bench_build}", exc_info=True)
+                continue
+            param_name = "efSearch" if index_type == "hnsw" else "nprobe"
+            sweep = []
+            for param_value in (ef_search_values if index_type == "hnsw" else nprobe_values):
+                if param_name == "nprobe":
+                    self._apply_ann_search_params(ann_index, index_type, nprobe=param_value)
+                else:
+                    self._apply_ann_search_params(ann_index, index_type, ef_search=param_value)
+                ann_ids, ann_latency_ms = timed_search(ann_index)
+                recall = float(np.mean([len(set(ann_ids[q_i]) & set(ground_truth[q_i])) / k for q_i in range(len(queries))]))
+                sweep.append({param_name: param_value, "recall_at_k": round(recall, 4),
+                              "latency_ms_per_query": round(ann_latency_ms, 4),
+                              "speedup_vs_flat": round(flat_latency_ms / ann_latency_ms, 2) if ann_latency_ms > 0 else None})
+            report["ann"][index_type] = {"build_seconds": round(build_seconds, 2), "sweep": sweep}
+            self.logger.info(f"BENCHMARK_ANN: {index_type} -> {json.dumps(sweep)}")
+        return report
+
     def populate_faiss_index_from_kb(self, db_conn: sqlite3.Connection):
         """
-        Peuple l'index FAISS en mémoire avec les embeddings stockés dans la KnowledgeBase.
-        Cette méthode est typiquement appelée une fois au démarrage de CerveauService.
+        Prépare l'index FAISS au démarrage de CerveauService.
+        Recharge l'index persistant (mmap) s'il existe puis ne synchronise que les lignes
+        ajoutées, modifiées (checksum différent) ou supprimées depuis la dernière sauvegarde.
+        Sans index réutilisable, reconstruit l'index complet par lots depuis la KB.
         """
         if not self.kb:
             self.logger.error("POPULATE_FAISS: Instance KnowledgeBase (self.kb) non disponible.")
@@ -687,58 +1193,37 @@ class KnowledgeLinker:
             self.logger.error("POPULATE_FAISS: Modèle SBERT (self.sbert_model) non disponible. Impossible de valider la dimension des embeddings.")
             return
 
-
-        self.logger.info("POPULATE_FAISS: Début du peuplement de l'index FAISS depuis la KB...")
-        self.faiss_index.reset() # type: ignore # Vider l'index existant
-        self.doc_id_to_faiss_idx.clear()
-        self.faiss_idx_to_doc_id.clear() # Utiliser une liste simple
-
+        self.logger.info("POPULATE_FAISS: Début de la synchronisation de l'index FAISS avec la KB...")
         try:
-            # get_all_document_embeddings retourne List[Tuple[file_id: int, embedding_blob: Optional[bytes]]]
-            all_embeddings_data = self.kb.get_all_document_embeddings(db_conn)
-            if not all_embeddings_data:
-                self.logger.info("POPULATE_FAISS: Aucune donnée d'embedding retournée par la KB.")
-                return
-
-            embeddings_to_add_list: List[np.ndarray] = [] # type: ignore
-            file_ids_for_faiss_mapping: List[int] = []
-
-            expected_dim = self.sbert_model.get_sentence_embedding_dimension()
-
-            for file_id, embedding_blob in all_embeddings_data:
-                if embedding_blob and isinstance(embedding_blob, bytes) and len(embedding_blob) > 0:
-                    try:
-                        embedding_np_arr = np.frombuffer(embedding_blob, dtype=np.float32)
-                        if embedding_np_arr.shape[0] == expected_dim:
-                            # La normalisation L2 est cruciale pour IndexFlatIP et doit être faite
-                            # soit ici, soit au moment de la génération de l'embedding.
-                            # Supposons qu'elle a été faite dans ComprehensionStep avant stockage.
-                            # Si ce n'est pas le cas, il faut la faire ici :
-                            # norm = np.linalg.norm(embedding_np_arr)
-                            # if norm > 0: embedding_np_arr = embedding_np_arr / norm
-                            # else: self.logger.warning(f"POPULATE_FAISS: Embedding pour file_id {file_id} a une norme nulle. Ignoré."); continue
-                            embeddings_to_add_list.append(embedding_np_arr)
-                            file_ids_for_faiss_mapping.append(file_id)
-                        else:
-                            self.logger.warning(f"POPULATE_FAISS: Embedding pour file_id {file_id} (shape: {embedding_np_arr.shape}) a une dimension incorrecte (attendu: {expected_dim}). Ignoré.")
-                    except Exception as e_conv_pop:
-                        self.logger.error(f"POPULATE_FAISS: Erreur de conversion d'embedding pour file_id {file_id}: {e_conv_pop}. Ignoré.", exc_info=False)
-                else:
-                    self.logger.debug(f"POPULATE_FAISS: Embedding blob manquant ou invalide pour file_id {file_id}. Ignoré.")
-
-            if embeddings_to_add_list:
-                embeddings_matrix = np.vstack(embeddings_to_add_list).astype('float32')
-                self.faiss_index.add(embeddings_matrix) # type: ignore
-
-                # Construire les mappings
-                # L'index FAISS est 0-based et correspond à l'ordre d'ajout.
-                self.faiss_idx_to_doc_id = file_ids_for_faiss_mapping
-                for faiss_i, kb_file_id in enumerate(file_ids_for_faiss_mapping):
-                    self.doc_id_to_faiss_idx[kb_file_id] = faiss_i
-
-                self.logger.info(f"POPULATE_FAISS: Index FAISS peuplé avec {self.faiss_index.ntotal} embeddings de documents. Mappings créés.") # type: ignore
-            else:
-                self.logger.info("POPULATE_FAISS: Aucun embedding de document valide trouvé dans la KB pour peupler l'index FAISS.")
+            with self.faiss_lock:
+                if not self._load_faiss_index_from_disk():
+                    self.faiss_index = self._create_empty_faiss_index()
+                    self.faiss_indexed_checksums = {}
+                    self.faiss_max_file_id = 0
+                    self.faiss_index_dirty = True
+
+                # Manifeste léger (id, checksum) de la KB : aucun blob n'est lu à ce stade
+                kb_manifest = dict(self.kb.get_document_embedding_manifest(db_conn))
+
+                removed_ids = [fid for fid in self.faiss_indexed_checksums if fid not in kb_manifest]
+                changed_ids = [fid for fid, checksum in kb_manifest.items()
+                               if self.faiss_indexed_checksums.get(fid) != checksum]
+
+                if removed_ids:
+                    self.faiss_index.remove_ids(np.asarray(removed_ids, dtype=np.int64)) # type: ignore
+                    for fid in removed_ids:
+                        del self.faiss_indexed_checksums[fid]
+                    self.faiss_index_dirty = True
+                    self._mark_ann_stale(removed_ids, None)
+
+                added_count = self._add_embeddings_for_ids(db_conn, sorted(changed_ids)) if changed_ids else 0
+
+            self.logger.info(
+                f"POPULATE_FAISS: Index FAISS synchronisé: {self.faiss_index.ntotal} vecteurs " # type: ignore
+                f"({added_count} ajoutés/mis à jour, {len(removed_ids)} retirés, max file_id: {self.faiss_max_file_id})."
+            )
+            if self.faiss_index_dirty:
+                self.save_faiss_index()
 
         except sqlite3.Error as e_sql_pop:
             self.logger.error(f"POPULATE_FAISS: Erreur SQLite lors du peuplement de l'index FAISS: {e_sql_pop}", exc_info=True)
@@ -790,15 +1275,15 @@ class KnowledgeLinker:
                 # +1 car le document lui-même pourrait être dans l'index si déjà traité
                 k_neighbors = self.num_semantic_links_to_propose + 1
 
-                # D: distances (scores de similarité), I: indices FAISS des voisins
-                distances_faiss, indices_faiss = self.faiss_index.search(current_embedding_faiss_query, k_neighbors) # type: ignore
+                # D: distances (scores de similarité), I: ids des voisins (= file_id KB grâce à IndexIDMap2)
+                distances_faiss, ids_faiss = self._search_top_k(current_embedding_faiss_query, k_neighbors)
 
                 num_found_by_faiss = 0
-                for faiss_internal_idx, score in zip(indices_faiss[0], distances_faiss[0]):
+                for faiss_label, score in zip(ids_faiss[0], distances_faiss[0]):
                     if num_found_by_faiss >= self.num_semantic_links_to_propose: break # Assez de propositions
-                    if faiss_internal_idx == -1 or faiss_internal_idx >= len(self.faiss_idx_to_doc_id): continue
+                    if faiss_label == -1: continue
 
-                    target_kb_file_id = self.faiss_idx_to_doc_id[faiss_internal_idx] # KB file_id
+                    target_kb_file_id = int(faiss_label) # KB file_id
                     if target_kb_file_id == current_file_id: continue # Exclure soi-même
 
                     similarity_score = float(score) # Pour IndexFlatIP, D est le produit scalaire (similarité cosinus si normalisé)
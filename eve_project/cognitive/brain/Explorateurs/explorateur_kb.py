@@ -13,7 +13,7 @@ type_execution: cli
 last_update: 2025-05-24
 dossier: ALMA/Cerveau/Explorateurs/
 tags: [V20, alma, connaissance, explorateur, cli, sqlite, yaml, csv]
-dependencies: [PyYAML (optionnel pour lire cerveau_config.yaml)]
+dependencies: [PyYAML (optionnel pour lire cerveau_config.yaml), cerveau.py et numpy (tokens en stockage 'packed')]
 ---
 """
 
@@ -27,6 +27,7 @@ import sys
 import re
 import datetime
 import csv
+import contextlib
 from typing import Optional, List, Dict, Any, Tuple, Union
 
 try:
@@ -36,6 +37,10 @@ except ImportError:
     yaml = None # type: ignore
     PYYAML_AVAILABLE = False
 
+# Module cerveau.py, importé à la demande pour décoder le stockage compact des tokens
+# (knowledge_base.token_storage: "packed") : l'import charge spaCy, inutile pour les autres commandes
+_cerveau_module: Optional[Any] = None
+
 # Configuration du logger pour ce module spécifique
 logger = logging.getLogger("ALMA.ExplorateurKB")
 
@@ -319,6 +324,60 @@ def _get_file_data_and_proposals(
     return file_data, proposals_data
 
 # --- Fonctions pour les Commandes CLI ---
+def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (table_name,)).fetchone() is not None
+
+def _lookup_interned(conn: sqlite3.Connection, table: str, column: str, ids: List[int]) -> Dict[int, str]:
+    unique_ids = list(dict.fromkeys(ids))
+    values_by_id: Dict[int, str] = {}
+    for start in range(0, len(unique_ids), 500):
+        chunk = unique_ids[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT id, {column} FROM {table} WHERE id IN ({placeholders})", chunk):
+            values_by_id[row[0]] = row[1]
+    return values_by_id
+
+def _import_cerveau() -> Optional[Any]:
+    """Importe cerveau.py (format du BLOB compact et drapeaux de tokens) ; None s'il est inutilisable."""
+    global _cerveau_module
+    if _cerveau_module is None:
+        try:
+            # cerveau.py écrit ses traces de démarrage sur stdout : ne pas polluer les sorties json/csv
+            with contextlib.redirect_stdout(sys.stderr):
+                try:
+                    from eve_project.cognitive.brain import cerveau as cerveau_module
+                except ImportError: # Explorateur lancé comme script, hors du paquet
+                    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+                    import cerveau as cerveau_module # type: ignore
+            _cerveau_module = cerveau_module
+        except Exception as e_import_cerveau:
+            logger.warning(f"Impossible d'importer cerveau.py pour décoder les tokens 'packed': {e_import_cerveau}")
+    return _cerveau_module
+
+def _get_packed_significant_tokens(conn: sqlite3.Connection, file_id: int, limit: int) -> List[Dict[str, Any]]:
+    """Tokens significatifs d'un fichier en stockage compact, décodés par KnowledgeBase.unpack_token_columns de cerveau.py."""
+    if not _table_exists(conn, "file_tokens_packed"):
+        return []
+    row = conn.execute("SELECT token_count, codec, data FROM file_tokens_packed WHERE file_id = ?", (file_id,)).fetchone()
+    if not row:
+        return []
+    cerveau_module = _import_cerveau()
+    if cerveau_module is None:
+        return []
+    try:
+        token_ids, lemma_ids, pos_ids, flags = cerveau_module.KnowledgeBase.unpack_token_columns(row["data"], row["token_count"], row["codec"])
+    except (RuntimeError, ValueError) as e_unpack:
+        logger.warning(f"Tokens de file_id {file_id} non décodables: {e_unpack}")
+        return []
+    token_ids, lemma_ids, pos_ids = token_ids.tolist(), lemma_ids.tolist(), pos_ids.tolist()
+
+    selected = [i for i, flag in enumerate(flags.tolist()) if flag & cerveau_module.TOKEN_FLAG_SIGNIFICANT][:limit]
+    forms = _lookup_interned(conn, "token_forms", "form", [token_ids[i] for i in selected])
+    lemmas = _lookup_interned(conn, "lemmas", "lemma", [lemma_ids[i] for i in selected])
+    pos_tags = _lookup_interned(conn, "pos_tags", "pos", [pos_ids[i] for i in selected])
+    return [{"token_text": forms.get(token_ids[i]), "lemma": lemmas.get(lemma_ids[i]), "pos": pos_tags.get(pos_ids[i]),
+             "is_significant": True} for i in selected]
+
 def handle_file_info(conn: sqlite3.Connection, identifier_or_path_arg: str, output_format: str, verbose: bool) -> None:
     """TODO: Add docstring."""
     logger.info(f"Récupération des informations pour l'argument: '{identifier_or_path_arg}' (verbose: {verbose})")
@@ -390,6 +449,10 @@ def handle_file_info(conn: sqlite3.Connection, identifier_or_path_arg: str, outp
     tok_cols = "token_text, lemma, pos, is_significant" if verbose else "token_text, lemma, pos" # is_significant est bool
     cursor.execute(f"SELECT {tok_cols} FROM linguistic_tokens WHERE file_id = ? AND is_significant = 1 ORDER BY id LIMIT {tok_limit}", (file_id,))
     tokens_res = [dict(row) for row in cursor.fetchall()]
+    if not tokens_res: # Fichier analysé en mode "packed"
+        tokens_res = _get_packed_significant_tokens(conn, file_id, tok_limit)
+        if not verbose:
+            for t in tokens_res: t.pop('is_significant', None)
     if verbose: # Convertir bool en int pour affichage si verbose
         for t in tokens_res:
             if 'is_significant' in t: t['is_significant'] = 1 if t['is_significant'] else 0
@@ -777,6 +840,12 @@ def handle_db_summary(conn: sqlite3.Connection, output_format: str) -> None:
         "fichiers_avec_embedding": "SELECT COUNT(*) FROM files WHERE embedding IS NOT NULL;", # NOUVEAU
         "total_tokens_linguistiques": "SELECT COUNT(*) FROM linguistic_tokens;",
         "total_tokens_significatifs": "SELECT COUNT(*) FROM linguistic_tokens WHERE is_significant = 1;",
+        # Stockage compact (token_storage: packed) ; "Erreur d'accès" sur une base antérieure à ces tables
+        "fichiers_tokens_compacts": "SELECT COUNT(*) FROM file_tokens_packed;",
+        "total_tokens_compacts": "SELECT SUM(token_count) FROM file_tokens_packed;",
+        "total_tokens_significatifs_compacts": "SELECT SUM(significant_count) FROM lemma_frequencies;",
+        "taille_blobs_tokens_mo": "SELECT ROUND(SUM(LENGTH(data)) / 1048576.0, 2) FROM file_tokens_packed;",
+        "total_lemmes_internes": "SELECT COUNT(*) FROM lemmas;",
         "total_entites_nommees_occurrences": "SELECT COUNT(*) FROM named_entities;", # Total des occurrences
         "total_entites_nommees_uniques": "SELECT COUNT(DISTINCT LOWER(entity_text) || '_' || LOWER(entity_type)) FROM named_entities;", # Plus précis pour uniques
         "total_types_entites_distincts": "SELECT COUNT(DISTINCT LOWER(entity_type)) FROM named_entities;",
@@ -806,6 +875,29 @@ def handle_db_summary(conn: sqlite3.Connection, output_format: str) -> None:
         summary_data["taille_db_mo"] = "N/A (Chemin DB non trouvé)"
     format_output(summary_data, output_format, title="Résumé de la KnowledgeBase")
 
+def handle_list_lemmas(conn: sqlite3.Connection, args: argparse.Namespace) -> None:
+    """Lemmes les plus fréquents (corpus entier ou un fichier), via la vue v_lemma_frequencies (tous modes de stockage)."""
+    output_format = getattr(args, "output_format", "text")
+    count_column = "count" if args.all_tokens else "significant_count"
+    if _table_exists(conn, "v_lemma_frequencies"):
+        query = f"SELECT lemma, SUM({count_column}) AS frequency, COUNT(DISTINCT file_id) AS distinct_documents FROM v_lemma_frequencies"
+    else: # Base antérieure au stockage compact
+        count_expr = "COUNT(*)" if args.all_tokens else "SUM(CASE WHEN is_significant THEN 1 ELSE 0 END)"
+        query = f"SELECT lemma, {count_expr} AS frequency, COUNT(DISTINCT file_id) AS distinct_documents FROM linguistic_tokens"
+    params: List[Any] = []
+    if args.file_id is not None:
+        query += " WHERE file_id = ?"
+        params.append(args.file_id)
+    query += " GROUP BY lemma HAVING frequency > 0 ORDER BY frequency DESC, lemma LIMIT ?"
+    params.append(args.limit)
+    logger.debug(f"Exécution SQL pour list-lemmas: {query} avec params: {params}")
+    try:
+        lemmas_result = [dict(row) for row in conn.execute(query, tuple(params)).fetchall()]
+        format_output(lemmas_result or "Aucun lemme trouvé.", output_format, title="Lemmes les plus fréquents")
+    except sqlite3.Error as e_sql:
+        logger.error(f"Erreur SQLite lors du listage des lemmes: {e_sql}", exc_info=True)
+        format_output({"erreur_sql": str(e_sql)}, output_format)
+
 def main():
     global EXPLORER_APP_CONFIG # Nécessaire car load_cerveau_configuration_for_explorer modifie cette globale
 
@@ -900,6 +992,14 @@ def main():
     db_summary_parser = subparsers.add_parser("db-summary", help="Afficher un résumé statistique de la KnowledgeBase.",
                                               description="Affiche des statistiques globales sur la KnowledgeBase (nombre de fichiers, tokens, entités, taille de la base, etc.).")
     db_summary_parser.set_defaults(func_to_call=handle_db_summary)
+
+    # --- Commande list-lemmas ---
+    list_lemmas_parser = subparsers.add_parser("list-lemmas", help="Lister les lemmes les plus fréquents (corpus ou fichier).",
+                                               description="Liste les lemmes les plus fréquents, que les tokens soient stockés en lignes ou en blobs compacts.")
+    list_lemmas_parser.add_argument("-f", "--file-id", type=int, default=None, help="Limiter à un fichier (ID numérique dans la KB).")
+    list_lemmas_parser.add_argument("-a", "--all-tokens", action="store_true", help="Compter tous les tokens (par défaut: tokens significatifs uniquement).")
+    list_lemmas_parser.add_argument("-l", "--limit", type=int, default=50, help="Nombre maximum de lemmes à afficher (défaut: 50).")
+    list_lemmas_parser.set_defaults(func_to_call=handle_list_lemmas)
     # --- Fin Définition des Sous-Parseurs ---
 
     args = parser.parse_args()
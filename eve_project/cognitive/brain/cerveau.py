@@ -45,32 +45,46 @@ import datetime
 import logging
 from logging.handlers import RotatingFileHandler
 import threading
+import queue
 import signal
 import json
 import hashlib
+import heapq
+import io
+import math
+import mmap
+import random
 import re
 import tempfile
 import sqlite3
+import cProfile
+import pstats
 from pathlib import Path
-from collections import deque
-from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
-from typing import Any, Dict, List, Optional, Tuple, Deque, Type, Union
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Deque, Type, Union
 import platform
 
 # --- IMPORT CONDITIONNEL WATCHDOG (DÉPLACÉ ICI) ---
 WATCHDOG_AVAILABLE = False
 Observer_alias: Optional[Type] = None # Pour typer Observer
+PollingObserver_alias: Optional[Type] = None # Repli sans inotify (NFS, limite max_user_watches)
 FileSystemEventHandler_alias: Optional[Type] = None # Pour typer FileSystemEventHandler
 try:
     from watchdog.observers import Observer as ImportedObserver
+    from watchdog.observers.polling import PollingObserver as ImportedPollingObserver
     from watchdog.events import FileSystemEventHandler as ImportedFileSystemEventHandler
     Observer_alias = ImportedObserver
+    PollingObserver_alias = ImportedPollingObserver
     FileSystemEventHandler_alias = ImportedFileSystemEventHandler
     WATCHDOG_AVAILABLE = True
     print("DEBUG SCRIPT: 'watchdog.observers.Observer' et 'watchdog.events.FileSystemEventHandler' importés avec succès.")
 except ImportError:
     print("DEBUG SCRIPT: 'watchdog' non trouvé ou impossible à importer. La surveillance événementielle sera désactivée.")
 Observer = Observer_alias # Rendre accessible globalement (ou None)
+PollingObserver = PollingObserver_alias
 FileSystemEventHandler = FileSystemEventHandler_alias # Rendre accessible globalement (ou None)
 
 # --- IMPORT CONDITIONNEL YAML ---
@@ -98,6 +112,54 @@ except ImportError:
 psutil = psutil_module_alias
 # --- FIN IMPORT PSUTIL ---
 
+# --- IMPORT CONDITIONNEL HACHAGE RAPIDE (xxhash / blake3) ---
+XXHASH_AVAILABLE = False
+xxhash_module_alias = None
+try:
+    import xxhash as xxhash_imported_module
+    xxhash_module_alias = xxhash_imported_module
+    XXHASH_AVAILABLE = True
+    print("DEBUG SCRIPT: xxhash importé avec succès.")
+except ImportError:
+    print("DEBUG SCRIPT: xxhash non trouvé (checksums via blake3 ou sha256).")
+xxhash = xxhash_module_alias
+
+BLAKE3_AVAILABLE = False
+blake3_module_alias = None
+try:
+    import blake3 as blake3_imported_module
+    blake3_module_alias = blake3_imported_module
+    BLAKE3_AVAILABLE = True
+    print("DEBUG SCRIPT: blake3 importé avec succès.")
+except ImportError:
+    print("DEBUG SCRIPT: blake3 non trouvé.")
+blake3 = blake3_module_alias
+# --- FIN IMPORT HACHAGE RAPIDE ---
+
+# --- IMPORT CONDITIONNEL STOCKAGE COMPACT DES TOKENS (numpy / zstandard) ---
+NUMPY_AVAILABLE = False
+numpy_module_alias = None
+try:
+    import numpy as numpy_imported_module
+    numpy_module_alias = numpy_imported_module
+    NUMPY_AVAILABLE = True
+    print("DEBUG SCRIPT: numpy importé avec succès.")
+except ImportError:
+    print("DEBUG SCRIPT: numpy non trouvé (stockage 'packed' des tokens indisponible).")
+np = numpy_module_alias
+
+ZSTD_AVAILABLE = False
+zstd_module_alias = None
+try:
+    import zstandard as zstd_imported_module
+    zstd_module_alias = zstd_imported_module
+    ZSTD_AVAILABLE = True
+    print("DEBUG SCRIPT: zstandard importé avec succès.")
+except ImportError:
+    print("DEBUG SCRIPT: zstandard non trouvé (blobs de tokens stockés sans compression).")
+zstd = zstd_module_alias
+# --- FIN IMPORT STOCKAGE COMPACT ---
+
 # --- LIGNES DE DEBUG (peuvent être retirées en production) ---
 # print(f"DEBUG SCRIPT: Exécutable Python utilisé par cerveau.py: {sys.executable}")
 # print(f"DEBUG SCRIPT: sys.path utilisé par cerveau.py: {sys.path}")
@@ -354,12 +416,37 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "health_check_interval_seconds": 900,
         # AJOUTÉ: Configuration pour l'exclusion de répertoires
         "excluded_dir_parts": ['.venv', 'venv', 'env', '__pycache__', 'node_modules', '.git', '.hg', '.svn'],
-        "excluded_dir_prefixes": ['.'] # Pour tous les dossiers cachés commençant par un point
+        "excluded_dir_prefixes": ['.'], # Pour tous les dossiers cachés commençant par un point
+        # Détection des changements : watcher événementiel + réconciliation (mtime, taille) périodique
+        "watcher_backend": "auto", # "auto" (inotify natif puis polling), "inotify", "polling", "none"
+        "watcher_polling_interval_seconds": 5,
+        "reconcile_interval_seconds": 900, # Intervalle de réconciliation quand un watcher est actif
+        # Micro-batcher SBERT partagé par les workers
+        "embedding_batcher_enabled": True,
+        "embedding_batch_max_size": 32,
+        "embedding_batch_max_wait_ms": 20,
+        # Mode d'exécution des étapes NLP CPU-bound : "thread" (historique) ou "process"
+        # (Comprehension/Analysis dans un ProcessPoolExecutor, écritures SQLite et SBERT restent dans le parent)
+        "executor_mode": "thread",
+        "process_pool_workers": None, # None => max_workers
+        "process_start_method": "spawn"
     },
     "circuit_breaker": {
         "threshold": 3,
         "timeout_seconds": 3600
     },
+    # Profileur du pipeline : latences par étape (p50/p95/p99), débit, profondeur de file, attentes SQLite
+    "profiling": {
+        "enabled": True,
+        "samples_per_stage": 2048,          # Échantillons conservés par étape pour les quantiles
+        "throughput_window_seconds": 60,    # Fenêtre glissante du débit (documents/s, octets/s)
+        "queue_sample_interval_seconds": 5,
+        "queue_samples_max": 720,           # 1 h d'historique à 5 s
+        "export_format": "prometheus",      # "prometheus" (fichier texte pour node_exporter) | "jsonl" | "none"
+        "export_interval_seconds": 60,
+        "cprofile_sample_rate": 0.0,        # Fraction des fichiers exécutés sous cProfile (0 = désactivé)
+        "cprofile_keep_slowest": 5          # Profils .prof conservés (les N fichiers profilés les plus lents)
+    },
     "nlp": {
         "use_spacy_if_available": True,
         "spacy_model_names": ["fr_core_news_lg", "fr_core_news_sm", "en_core_web_sm"],
@@ -377,18 +464,49 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "use_sqlite_db": True,
         "db_name": "cerveau_knowledge.sqlite",
         "schema_file": "cerveau_kb_schema.sql",
-        "db_timeout_seconds": 10
+        "db_timeout_seconds": 10,
+        # Écrivain SQLite unique : seul détenteur d'une connexion en écriture, transactions groupées
+        "db_writer_enabled": True,
+        "db_writer_max_batch_rows": 20000,  # Lignes estimées (files + tokens + entités + métadonnées) par transaction
+        "db_writer_max_latency_ms": 50,     # Attente max pour grouper d'autres analyses avant COMMIT
+        "db_synchronous": "NORMAL",         # NORMAL est sûr en WAL (seule la dernière transaction peut être perdue)
+        "db_cache_size_kib": 65536,
+        "db_mmap_size_mb": 256,
+        # Manifeste (inode, taille, mtime_ns, checksum) : un stat inchangé évite le hachage et la requête KB
+        "file_manifest_enabled": True,
+        "checksum_algorithm": "sha256", # "sha256" (défaut, format des checksums déjà en base), "auto" (xxh3_128 > blake3 > sha256), "xxh3_128", "blake3"
+        # Stockage des tokens : "rows" (une ligne linguistic_tokens par token) ou "packed"
+        # (lemmes internés + un BLOB colonnaire par fichier + table lemma_frequencies)
+        "token_storage": "rows",
+        "token_storage_compression": "zstd", # "zstd" (si zstandard installé, sinon brut) ou "none"
+        # Fréquences documentaires du corpus (TF-IDF incrémental d'AnalysisStep)
+        "corpus_tfidf_enabled": True,
+        "corpus_tfidf_refresh_seconds": 60 # Rechargement max des IDF en cache (si les DF ont changé)
     },
     "pipeline_steps": {
         "ComprehensionStep": {"enabled": True, "priority": 10},
-        "AnalysisStep": {"enabled": True, "priority": 20, "sentiment_threshold": 0.1},
+        "AnalysisStep": {"enabled": True, "priority": 20, "sentiment_threshold": 0.1, "topic_model": "corpus", "topics_top_n": 5},
         "StudyStep": {"enabled": True, "priority": 30},
         "ImprovementProposalStep": {"enabled": True, "priority": 40},
         "ActiveImprovementStep": {"enabled": True, "priority": 50, "auto_apply_summary": False, "auto_apply_grammar": False}
     },
     "core_algorithms_config": {
         "text_improver": {"default_language": "fr", "summary_ratio": 0.15, "grammar_api_config": None},
-        "knowledge_linker": {"min_similarity_for_link": 0.7}
+        "knowledge_linker": {
+            "min_similarity_for_link": 0.7,
+            "faiss_index_path": None, # None => "<db_name>.faiss" à côté de la KB SQLite
+            "faiss_index_persist": True,
+            "faiss_populate_batch_size": 2048,
+            "faiss_ann_index_type": "auto", # auto | flat | ivf_flat | ivf_pq | hnsw
+            "faiss_ann_min_vectors": 50000,
+            "faiss_ann_memory_fraction": 0.25,
+            "faiss_ann_rebuild_stale_ratio": 0.10,
+            "faiss_ann_background_build": True, # Désactivé par --benchmark-ann
+            "faiss_ivf_nprobe": 16,
+            "faiss_hnsw_m": 32,
+            "faiss_hnsw_ef_construction": 80,
+            "faiss_hnsw_ef_search": 64
+        }
     }
 }
 APP_CONFIG: Dict[str, Any] = {} # Sera rempli par load_configuration
@@ -737,14 +855,58 @@ def enregistrer_module(status: str = "actif", message: str = "") -> None:
                 os.close(fd_fcntl)
             except Exception: pass
 
-def calculate_checksum(filepath: Path, chunk_size: int = 8192) -> Optional[str]:
-    # ... (code inchangé) ...
-    sha256_hash = hashlib.sha256()
+# Algorithme de checksum effectif ("xxh3_128", "blake3" ou "sha256"), fixé par configure_checksum_algorithm.
+# sha256 reste sans préfixe (compatibilité avec les checksums déjà en base) ; les autres sont préfixés "algo:".
+CHECKSUM_ALGORITHM: str = "sha256"
+CHECKSUM_PREFIXED_ALGORITHMS: Tuple[str, ...] = ("xxh3_128", "blake3")
+CHECKSUM_MMAP_MIN_BYTES: int = 1024 * 1024 # En dessous, une simple lecture est moins coûteuse qu'un mmap
+
+def configure_checksum_algorithm(requested: str = "sha256") -> str:
+    """Choisit l'algorithme de checksum : "auto" préfère xxh3_128, puis blake3, puis sha256."""
+    global CHECKSUM_ALGORITHM
+    requested = (requested or "sha256").lower()
+    if requested in ("auto", "xxh3_128", "xxhash") and XXHASH_AVAILABLE:
+        CHECKSUM_ALGORITHM = "xxh3_128"
+    elif requested in ("auto", "blake3") and BLAKE3_AVAILABLE:
+        CHECKSUM_ALGORITHM = "blake3"
+    else:
+        if requested not in ("auto", "sha256"):
+            log_message("WARNING", f"Algorithme de checksum '{requested}' indisponible. Utilisation de sha256.")
+        CHECKSUM_ALGORITHM = "sha256"
+    return CHECKSUM_ALGORITHM
+
+def checksum_algorithm_of(stored_checksum: Optional[str]) -> str:
+    """Algorithme ayant produit un checksum stocké : son préfixe "algo:", sha256 s'il n'en a pas."""
+    if stored_checksum and ":" in stored_checksum:
+        prefix = stored_checksum.split(":", 1)[0]
+        if prefix in CHECKSUM_PREFIXED_ALGORITHMS:
+            return prefix
+    return "sha256"
+
+def calculate_checksum(filepath: Path, chunk_size: int = 8192, algorithm: Optional[str] = None) -> Optional[str]:
+    """Checksum de `filepath` avec `algorithm` (défaut : CHECKSUM_ALGORITHM) ; None si l'algorithme est indisponible."""
+    algorithm = algorithm or CHECKSUM_ALGORITHM
+    if algorithm == "xxh3_128" and XXHASH_AVAILABLE:
+        hasher: Any = xxhash.xxh3_128() # type: ignore[union-attr]
+    elif algorithm == "blake3" and BLAKE3_AVAILABLE:
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO) # type: ignore[union-attr]
+    elif algorithm == "sha256":
+        hasher = hashlib.sha256()
+    else:
+        log_message("WARNING", f"Algorithme de checksum '{algorithm}' indisponible pour {filepath}.")
+        return None
     try:
         with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(chunk_size), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size >= CHECKSUM_MMAP_MIN_BYTES:
+                # Fichier mappé en mémoire : pas de copie vers des tampons Python
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                    hasher.update(mapped_file)
+            else:
+                for byte_block in iter(lambda: f.read(chunk_size), b""):
+                    hasher.update(byte_block)
+        hex_digest = hasher.hexdigest()
+        return hex_digest if algorithm == "sha256" else f"{algorithm}:{hex_digest}"
     except IOError as e:
         """TODO: Add docstring."""
         log_message("ERROR", f"Erreur de lecture du fichier {filepath} pour calcul du checksum: {e}", exc_info=True)
@@ -774,13 +936,125 @@ def robust_file_read(filepath: Path) -> Tuple[Optional[str], Optional[str]]:
     return None, None
 
 
+# --- Stockage compact des tokens (knowledge_base.token_storage = "packed") ---
+# Un BLOB par fichier : 4 colonnes concaténées (token_id <u4, lemma_id <u4, pos_id u1, flags u1),
+# soit 10 octets par token, éventuellement compressé en zstd. Les chaînes sont internées.
+TOKEN_FLAG_STOP = 1
+TOKEN_FLAG_PUNCT = 2
+TOKEN_FLAG_ALPHA = 4
+TOKEN_FLAG_SIGNIFICANT = 8
+TOKEN_INTERN_CHUNK_SIZE = 500 # Taille des requêtes IN (...) : reste sous SQLITE_MAX_VARIABLE_NUMBER
+
+
+def token_flags(t_info: Dict[str, Any]) -> int:
+    """Drapeaux d'un token au format historique (stop, punct, alpha, significatif) réunis dans un octet."""
+    return ((TOKEN_FLAG_STOP if t_info.get('is_stop') else 0) |
+            (TOKEN_FLAG_PUNCT if t_info.get('is_punct') else 0) |
+            (TOKEN_FLAG_ALPHA if t_info.get('is_alpha') else 0) |
+            (TOKEN_FLAG_SIGNIFICANT if t_info.get('is_significant') else 0))
+
+TOKEN_STORAGE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS lemmas (
+    id INTEGER PRIMARY KEY,
+    lemma TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS token_forms (
+    id INTEGER PRIMARY KEY,
+    form TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pos_tags (
+    id INTEGER PRIMARY KEY,
+    pos TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_tokens_packed (
+    file_id INTEGER PRIMARY KEY,
+    token_count INTEGER NOT NULL,
+    codec TEXT NOT NULL, -- 'raw' ou 'zstd'
+    data BLOB NOT NULL,
+    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS lemma_frequencies (
+    file_id INTEGER NOT NULL,
+    lemma_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    significant_count INTEGER NOT NULL,
+    PRIMARY KEY (file_id, lemma_id),
+    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE,
+    FOREIGN KEY (lemma_id) REFERENCES lemmas (id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_lemma_frequencies_lemma_id ON lemma_frequencies (lemma_id);
+
+-- Fréquences de lemmes par fichier, quel que soit le mode de stockage (packed + lignes historiques)
+CREATE VIEW IF NOT EXISTS v_lemma_frequencies AS
+    SELECT lf.file_id AS file_id, l.lemma AS lemma, lf.count AS count, lf.significant_count AS significant_count
+    FROM lemma_frequencies lf JOIN lemmas l ON l.id = lf.lemma_id
+    UNION ALL
+    SELECT file_id, lemma, COUNT(*), SUM(CASE WHEN is_significant THEN 1 ELSE 0 END)
+    FROM linguistic_tokens GROUP BY file_id, lemma;
+"""
+
+# --- Modèle TF-IDF au niveau du corpus (AnalysisStep) ---
+# Fréquences documentaires des termes (lemmes significatifs normalisés), maintenues par
+# record_file_analysis / remove_file_record dans la même transaction que les tokens.
+CORPUS_TFIDF_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS corpus_document_frequencies (
+    term TEXT PRIMARY KEY,
+    doc_count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS corpus_stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+# Construits une seule fois (et non à chaque fichier) à partir des stopwords spaCy chargés à l'import
+TFIDF_STOP_WORDS = frozenset(w.lower() for w in SPACY_STOP_WORDS)
+
+
+def document_tokens(linguistic_features: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Tokens d'un document : ceux de spaCy, ou ceux de NLTK si spaCy n'en a produit aucun (stockage, DF et thèmes TF-IDF)."""
+    unpack_process_tokens(linguistic_features) # Tokens revenus compactés d'un processus enfant
+    return linguistic_features.get('tokens', []) or linguistic_features.get('tokens_nltk', [])
+
+
+def extract_tfidf_terms(tokens: List[Dict[str, Any]]) -> Counter:
+    """Occurrences des termes TF-IDF d'un document : lemmes significatifs, en minuscules, hors stopwords et mots d'une lettre."""
+    terms: Counter = Counter()
+    for t_info in tokens:
+        if not t_info.get('is_significant'):
+            continue
+        term = str(t_info.get('lemma') or '').strip().lower()[:255]
+        if len(term) > 1 and term not in TFIDF_STOP_WORDS:
+            terms[term] += 1
+    return terms
+
+
 class KnowledgeBase:
-    def __init__(self, nlp_config: Dict[str, Any]):
+    # Tables des données d'analyse d'un fichier (purgées à chaque ré-analyse), dans un ordre d'insertion valide
+    # pour les clés étrangères (named_entities avant entity_relations)
+    FILE_ANALYSIS_TABLES: Tuple[str, ...] = ("linguistic_tokens", "file_tokens_packed", "lemma_frequencies", "named_entities", "metadata", "entity_relations")
+
+    def __init__(self, nlp_config: Dict[str, Any], kb_config: Optional[Dict[str, Any]] = None):
         self.nlp_config: Dict[str, Any] = nlp_config
+        kb_config = kb_config or {}
+        self.token_storage: str = kb_config.get("token_storage", DEFAULT_CONFIG["knowledge_base"]["token_storage"])
+        self.token_storage_codec: str = KnowledgeBase.resolve_token_codec(
+            kb_config.get("token_storage_compression", DEFAULT_CONFIG["knowledge_base"]["token_storage_compression"]))
         self.nlp_instance: Optional[Any] = None # Sera l'instance spaCy si chargée
             """TODO: Add docstring."""
         self.is_spacy_ready: bool = False
         self.logger = logging.getLogger(f"{MODULE_NAME}.KnowledgeBase")
+        if self.token_storage == "packed" and not NUMPY_AVAILABLE:
+            self.logger.warning("TOKEN_STORAGE: mode 'packed' demandé mais numpy indisponible. Repli sur le stockage 'rows'.")
+            self.token_storage = "rows"
+        elif self.token_storage not in ("rows", "packed"):
+            self.logger.warning(f"TOKEN_STORAGE: mode '{self.token_storage}' inconnu. Utilisation de 'rows'.")
+            self.token_storage = "rows"
+        # IDF du corpus mis en cache pour AnalysisStep (les DF ne sont maintenues par record_file_analysis que si le modèle est activé)
+        self.corpus_tfidf: Optional[CorpusTfidfModel] = None
+        self.corpus_tfidf_enabled: bool = bool(kb_config.get("corpus_tfidf_enabled", DEFAULT_CONFIG["knowledge_base"]["corpus_tfidf_enabled"]))
+        if self.corpus_tfidf_enabled and kb_config.get("use_sqlite_db", DEFAULT_CONFIG["knowledge_base"]["use_sqlite_db"]):
+            self.corpus_tfidf = CorpusTfidfModel(
+                refresh_seconds=kb_config.get("corpus_tfidf_refresh_seconds", DEFAULT_CONFIG["knowledge_base"]["corpus_tfidf_refresh_seconds"]))
 
         # L'initialisation des ressources NLP (chargement du modèle spaCy, etc.)
         self._initialize_nlp_resources()
@@ -823,7 +1097,9 @@ class KnowledgeBase:
                             last_processed_utc TEXT NOT NULL,
                             size_bytes INTEGER,
                             encoding TEXT,
-                            embedding BLOB -- Colonne pour les embeddings de documents
+                            embedding BLOB, -- Colonne pour les embeddings de documents
+                            inode INTEGER,
+                            mtime_ns INTEGER
                         );
                         CREATE INDEX IF NOT EXISTS idx_files_filepath ON files (filepath);
 
@@ -876,7 +1152,7 @@ class KnowledgeBase:
                             FOREIGN KEY (target_entity_id) REFERENCES named_entities (id) ON DELETE SET NULL
                         );
                         CREATE INDEX IF NOT EXISTS idx_entity_relations_file_id ON entity_relations (file_id);
-                        """
+                        """ + TOKEN_STORAGE_SCHEMA_SQL + CORPUS_TFIDF_SCHEMA_SQL
 
                     if schema_sql:
                         temp_conn.executescript(schema_sql)
@@ -895,6 +1171,314 @@ class KnowledgeBase:
         else:
             logger_static.debug(f"Base de données {db_path.name} existe déjà et n'est pas vide. Aucune initialisation de schéma effectuée.")
 
+    @staticmethod
+    def ensure_manifest_columns(db_conn: sqlite3.Connection) -> None:
+        """Migration : ajoute les colonnes du manifeste (inode, mtime_ns) à `files` sur les bases existantes."""
+        existing_columns = {row[1] for row in db_conn.execute("PRAGMA table_info(files)").fetchall()}
+        for column_name in ("inode", "mtime_ns"):
+            if existing_columns and column_name not in existing_columns:
+                db_conn.execute(f"ALTER TABLE files ADD COLUMN {column_name} INTEGER")
+        db_conn.commit()
+
+    def get_file_manifest(self, db_conn: sqlite3.Connection) -> Dict[str, Tuple[Optional[int], Optional[int], Optional[int], str]]:
+        """Charge en une requête le manifeste {filepath: (inode, size_bytes, mtime_ns, checksum)}."""
+        manifest: Dict[str, Tuple[Optional[int], Optional[int], Optional[int], str]] = {}
+        try:
+            for row in db_conn.execute("SELECT filepath, inode, size_bytes, mtime_ns, checksum FROM files"):
+                manifest[row[0]] = (row[1], row[2], row[3], row[4])
+        except sqlite3.Error as e_manifest:
+            self.logger.error(f"Erreur SQLite lors du chargement du manifeste des fichiers: {e_manifest}", exc_info=True)
+        return manifest
+
+    def update_file_stat(self, db_conn: sqlite3.Connection, filepath_str: str, checksum: str, file_stat: Dict[str, int]) -> bool:
+        """
+        Rafraîchit (inode, taille, mtime_ns) d'un fichier au contenu inchangé, sans ré-analyse.
+        Conditionné au checksum stocké : une ré-analyse concurrente a priorité. Renvoie True si la ligne a été mise à jour.
+        """
+        cursor = db_conn.execute(
+            "UPDATE files SET inode = ?, size_bytes = ?, mtime_ns = ? WHERE filepath = ? AND checksum = ?",
+            (file_stat.get('inode'), file_stat.get('size'), file_stat.get('mtime_ns'), filepath_str, checksum)
+        )
+        return cursor.rowcount > 0
+
+    # --- Stockage compact des tokens ---
+    @staticmethod
+    def resolve_token_codec(requested: str) -> str:
+        """'zstd' si demandé et zstandard disponible, sinon 'raw'."""
+        return "zstd" if requested == "zstd" and ZSTD_AVAILABLE else "raw"
+
+    @staticmethod
+    def ensure_token_storage_tables(db_conn: sqlite3.Connection) -> None:
+        """Migration : crée les tables du stockage compact (lemmes internés, blobs, fréquences) et la vue v_lemma_frequencies."""
+        db_conn.executescript(TOKEN_STORAGE_SCHEMA_SQL)
+        db_conn.commit()
+
+    @staticmethod
+    def _intern_strings(cursor: sqlite3.Cursor, table: str, column: str, values: Iterable[str]) -> Dict[str, int]:
+        """
+        Renvoie {chaîne: id} en insérant les chaînes inconnues. Pas de cache mémoire :
+        un ROLLBACK (SAVEPOINT de l'écrivain) ne peut pas laisser d'id fantôme.
+        """
+        unique_values = list(dict.fromkeys(values))
+        ids_by_value: Dict[str, int] = {}
+        for chunk_start in range(0, len(unique_values), TOKEN_INTERN_CHUNK_SIZE):
+            chunk = unique_values[chunk_start:chunk_start + TOKEN_INTERN_CHUNK_SIZE]
+            cursor.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", [(v,) for v in chunk])
+            placeholders = ",".join("?" * len(chunk))
+            for row in cursor.execute(f"SELECT id, {column} FROM {table} WHERE {column} IN ({placeholders})", chunk):
+                ids_by_value[row[1]] = row[0]
+        return ids_by_value
+
+    @staticmethod
+    def _lookup_strings(cursor: sqlite3.Cursor, table: str, column: str, ids: Iterable[int]) -> Dict[int, str]:
+        unique_ids = list(dict.fromkeys(int(i) for i in ids))
+        values_by_id: Dict[int, str] = {}
+        for chunk_start in range(0, len(unique_ids), TOKEN_INTERN_CHUNK_SIZE):
+            chunk = unique_ids[chunk_start:chunk_start + TOKEN_INTERN_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for row in cursor.execute(f"SELECT id, {column} FROM {table} WHERE id IN ({placeholders})", chunk):
+                values_by_id[row[0]] = row[1]
+        return values_by_id
+
+    @staticmethod
+    def pack_token_columns(token_ids: Any, lemma_ids: Any, pos_ids: Any, flags: Any, codec: str) -> bytes:
+        """Concatène les 4 colonnes (little-endian explicite) puis compresse si codec == 'zstd'."""
+        data = (np.asarray(token_ids, dtype="<u4").tobytes() + np.asarray(lemma_ids, dtype="<u4").tobytes() +
+                np.asarray(pos_ids, dtype="u1").tobytes() + np.asarray(flags, dtype="u1").tobytes())
+        if codec == "zstd":
+            return zstd.ZstdCompressor(level=3).compress(data)
+        return data
+
+    @staticmethod
+    def unpack_token_columns(data: bytes, token_count: int, codec: str) -> Tuple[Any, Any, Any, Any]:
+        """Inverse de pack_token_columns : renvoie (token_ids, lemma_ids, pos_ids, flags) en tableaux numpy."""
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Blob de tokens compressé en zstd mais zstandard n'est pas installé.")
+            data = zstd.ZstdDecompressor().decompress(data, max_output_size=token_count * 10)
+        expected_size = token_count * 10
+        if len(data) != expected_size:
+            raise ValueError(f"Blob de tokens corrompu: {len(data)} octets pour {token_count} tokens (attendu {expected_size}).")
+        offset_pos = token_count * 8
+        offset_flags = token_count * 9
+        return (np.frombuffer(data, dtype="<u4", count=token_count, offset=0),
+                np.frombuffer(data, dtype="<u4", count=token_count, offset=token_count * 4),
+                np.frombuffer(data, dtype="u1", count=token_count, offset=offset_pos),
+                np.frombuffer(data, dtype="u1", count=token_count, offset=offset_flags))
+
+    @staticmethod
+    def _insert_token_rows(cursor: sqlite3.Cursor, file_id: int, tokens_data: List[Dict[str, Any]]) -> int:
+        tokens_to_insert = [
+            (file_id,
+             str(t_info.get('text',''))[:500],
+             str(t_info.get('lemma',''))[:255],
+             str(t_info.get('pos',''))[:50],
+             1 if t_info.get('is_stop') else 0,
+             1 if t_info.get('is_punct') else 0,
+             1 if t_info.get('is_alpha') else 0,
+             1 if t_info.get('is_significant') else 0)
+            for t_info in tokens_data
+        ]
+        if tokens_to_insert:
+            cursor.executemany("INSERT INTO linguistic_tokens (file_id, token_text, lemma, pos, is_stop, is_punct, is_alpha, is_significant) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", tokens_to_insert)
+        return len(tokens_to_insert)
+
+    @staticmethod
+    def _record_tokens_packed(cursor: sqlite3.Cursor, file_id: int, tokens_data: List[Dict[str, Any]], codec: str) -> bool:
+        """
+        Écrit les tokens d'un fichier sous forme compacte (un BLOB + fréquences de lemmes).
+        Renvoie False si le dictionnaire de POS dépasse uint8 (l'appelant repasse alors en lignes).
+        """
+        texts = [str(t_info.get('text',''))[:500] for t_info in tokens_data]
+        lemmas = [str(t_info.get('lemma',''))[:255] for t_info in tokens_data]
+        pos_values = [str(t_info.get('pos',''))[:50] for t_info in tokens_data]
+
+        pos_ids_by_value = KnowledgeBase._intern_strings(cursor, "pos_tags", "pos", pos_values)
+        if pos_ids_by_value and max(pos_ids_by_value.values()) > 255:
+            return False
+        form_ids_by_value = KnowledgeBase._intern_strings(cursor, "token_forms", "form", texts)
+        lemma_ids_by_value = KnowledgeBase._intern_strings(cursor, "lemmas", "lemma", lemmas)
+
+        lemma_ids = [lemma_ids_by_value[lemma] for lemma in lemmas]
+        flags = [token_flags(t_info) for t_info in tokens_data]
+        packed_blob = KnowledgeBase.pack_token_columns(
+            [form_ids_by_value[text] for text in texts], lemma_ids,
+            [pos_ids_by_value[pos] for pos in pos_values], flags, codec)
+        cursor.execute("INSERT OR REPLACE INTO file_tokens_packed (file_id, token_count, codec, data) VALUES (?, ?, ?, ?)",
+                       (file_id, len(tokens_data), codec, packed_blob))
+
+        # Fréquences par lemme : ce que TF-IDF et l'explorateur interrogent, sans décoder le blob
+        lemma_counts: Dict[int, List[int]] = {}
+        for lemma_id, flag in zip(lemma_ids, flags):
+            counts = lemma_counts.setdefault(lemma_id, [0, 0])
+            counts[0] += 1
+            if flag & TOKEN_FLAG_SIGNIFICANT:
+                counts[1] += 1
+        cursor.executemany("INSERT OR REPLACE INTO lemma_frequencies (file_id, lemma_id, count, significant_count) VALUES (?, ?, ?, ?)",
+                           [(file_id, lemma_id, c[0], c[1]) for lemma_id, c in lemma_counts.items()])
+        return True
+
+    @staticmethod
+    def unpack_file_tokens(db_conn: sqlite3.Connection, file_id: int) -> List[Dict[str, Any]]:
+        """
+        Tokens d'un fichier au format historique (text, lemma, pos, is_stop, ...), quel que soit
+        le mode de stockage utilisé lors de son analyse.
+        """
+        cursor = db_conn.cursor()
+        packed_row = cursor.execute("SELECT token_count, codec, data FROM file_tokens_packed WHERE file_id = ?", (file_id,)).fetchone()
+        if not packed_row:
+            return [
+                {"text": row[0], "lemma": row[1], "pos": row[2], "is_stop": bool(row[3]),
+                 "is_punct": bool(row[4]), "is_alpha": bool(row[5]), "is_significant": bool(row[6])}
+                for row in cursor.execute("SELECT token_text, lemma, pos, is_stop, is_punct, is_alpha, is_significant "
+                                          "FROM linguistic_tokens WHERE file_id = ? ORDER BY id", (file_id,))
+            ]
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy est requis pour décoder le stockage 'packed' des tokens.")
+        token_ids, lemma_ids, pos_ids, flags = KnowledgeBase.unpack_token_columns(packed_row[2], packed_row[0], packed_row[1])
+        forms = KnowledgeBase._lookup_strings(cursor, "token_forms", "form", token_ids.tolist())
+        lemmas = KnowledgeBase._lookup_strings(cursor, "lemmas", "lemma", lemma_ids.tolist())
+        pos_tags = KnowledgeBase._lookup_strings(cursor, "pos_tags", "pos", pos_ids.tolist())
+        return [
+            {"text": forms.get(t_id, ""), "lemma": lemmas.get(l_id, ""), "pos": pos_tags.get(p_id, ""),
+             "is_stop": bool(flag & TOKEN_FLAG_STOP), "is_punct": bool(flag & TOKEN_FLAG_PUNCT),
+             "is_alpha": bool(flag & TOKEN_FLAG_ALPHA), "is_significant": bool(flag & TOKEN_FLAG_SIGNIFICANT)}
+            for t_id, l_id, p_id, flag in zip(token_ids.tolist(), lemma_ids.tolist(), pos_ids.tolist(), flags.tolist())
+        ]
+
+    @staticmethod
+    def get_lemma_frequencies(db_conn: sqlite3.Connection, file_id: Optional[int] = None,
+                              significant_only: bool = True, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """[(lemme, occurrences)] triés par fréquence décroissante, pour un fichier ou tout le corpus (vue v_lemma_frequencies)."""
+        count_column = "significant_count" if significant_only else "count"
+        sql = f"SELECT lemma, SUM({count_column}) AS total FROM v_lemma_frequencies"
+        params: List[Any] = []
+        if file_id is not None:
+            sql += " WHERE file_id = ?"
+            params.append(file_id)
+        sql += " GROUP BY lemma HAVING total > 0 ORDER BY total DESC, lemma"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [(row[0], row[1]) for row in db_conn.execute(sql, params)]
+
+    @staticmethod
+    def migrate_token_storage(db_conn: sqlite3.Connection, codec: str = "zstd", batch_size: int = 200, vacuum: bool = False) -> Dict[str, int]:
+        """
+        Convertit les lignes linguistic_tokens existantes au format 'packed', fichier par fichier,
+        avec un COMMIT par lot de `batch_size` fichiers (la migration peut être interrompue et relancée).
+        """
+        migration_logger = logging.getLogger(f"{MODULE_NAME}.KnowledgeBase.TokenMigration")
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy est requis pour migrer vers le stockage 'packed' des tokens.")
+        codec = KnowledgeBase.resolve_token_codec(codec)
+        KnowledgeBase.ensure_token_storage_tables(db_conn)
+        stats = {"files_migrated": 0, "tokens_migrated": 0, "files_kept_as_rows": 0}
+        file_ids = [row[0] for row in db_conn.execute("SELECT DISTINCT file_id FROM linguistic_tokens ORDER BY file_id")]
+        migration_logger.info(f"TOKEN_MIGRATION: {len(file_ids)} fichiers à convertir (codec: {codec}).")
+
+        for batch_start in range(0, len(file_ids), max(1, batch_size)):
+            with db_conn: # COMMIT du lot, ou ROLLBACK si une erreur survient
+                cursor = db_conn.cursor()
+                for file_id in file_ids[batch_start:batch_start + batch_size]:
+                    tokens_data = [
+                        {"text": row[0] or "", "lemma": row[1] or "", "pos": row[2] or "", "is_stop": row[3],
+                         "is_punct": row[4], "is_alpha": row[5], "is_significant": row[6]}
+                        for row in cursor.execute("SELECT token_text, lemma, pos, is_stop, is_punct, is_alpha, is_significant "
+                                                  "FROM linguistic_tokens WHERE file_id = ? ORDER BY id", (file_id,)).fetchall()
+                    ]
+                    cursor.execute("DELETE FROM lemma_frequencies WHERE file_id = ?", (file_id,))
+                    if not KnowledgeBase._record_tokens_packed(cursor, file_id, tokens_data, codec):
+                        stats["files_kept_as_rows"] += 1
+                        continue
+                    cursor.execute("DELETE FROM linguistic_tokens WHERE file_id = ?", (file_id,))
+                    stats["files_migrated"] += 1
+                    stats["tokens_migrated"] += len(tokens_data)
+            migration_logger.info(f"TOKEN_MIGRATION: {stats['files_migrated']}/{len(file_ids)} fichiers convertis.")
+
+        if vacuum:
+            migration_logger.info("TOKEN_MIGRATION: VACUUM de la base pour récupérer l'espace libéré...")
+            db_conn.execute("VACUUM")
+        return stats
+
+    # --- Fréquences documentaires du corpus (TF-IDF) ---
+    @staticmethod
+    def ensure_corpus_tfidf_tables(db_conn: sqlite3.Connection) -> None:
+        """Migration : crée les tables DF du corpus et les reconstruit si elles sont vides alors que la KB contient des tokens."""
+        db_conn.executescript(CORPUS_TFIDF_SCHEMA_SQL)
+        db_conn.commit()
+        df_initialized = db_conn.execute("SELECT 1 FROM corpus_stats WHERE key = 'tfidf_documents'").fetchone()
+        if not df_initialized:
+            KnowledgeBase.rebuild_corpus_document_frequencies(db_conn)
+
+    @staticmethod
+    def invalidate_corpus_document_frequencies(db_conn: sqlite3.Connection) -> None:
+        """Modèle désactivé : les DF ne sont plus tenues à jour, elles seront reconstruites à sa réactivation."""
+        db_conn.executescript(CORPUS_TFIDF_SCHEMA_SQL)
+        db_conn.execute("DELETE FROM corpus_stats WHERE key = 'tfidf_documents'")
+        db_conn.commit()
+
+    @staticmethod
+    def _stored_tfidf_terms(cursor: sqlite3.Cursor, file_id: int) -> Set[str]:
+        """Termes TF-IDF actuellement enregistrés pour un fichier (stockage 'rows' ou 'packed')."""
+        stored_lemmas = [row[0] for row in cursor.execute(
+            "SELECT DISTINCT lemma FROM linguistic_tokens WHERE file_id = ? AND is_significant = 1", (file_id,))]
+        stored_lemmas.extend(row[0] for row in cursor.execute(
+            "SELECT l.lemma FROM lemma_frequencies lf JOIN lemmas l ON l.id = lf.lemma_id "
+            "WHERE lf.file_id = ? AND lf.significant_count > 0", (file_id,)))
+        return set(extract_tfidf_terms([{"lemma": lemma, "is_significant": True} for lemma in stored_lemmas]))
+
+    @staticmethod
+    def update_corpus_document_frequencies(cursor: sqlite3.Cursor, old_terms: Set[str], new_terms: Set[str]) -> None:
+        """Applique le delta d'un document (anciens termes -> nouveaux termes) aux DF et au nombre de documents."""
+        added_terms = new_terms - old_terms
+        removed_terms = old_terms - new_terms
+        if added_terms:
+            cursor.executemany("INSERT INTO corpus_document_frequencies (term, doc_count) VALUES (?, 1) "
+                               "ON CONFLICT(term) DO UPDATE SET doc_count = doc_count + 1", [(t,) for t in added_terms])
+        if removed_terms:
+            removed_params = [(t,) for t in removed_terms]
+            cursor.executemany("UPDATE corpus_document_frequencies SET doc_count = doc_count - 1 WHERE term = ?", removed_params)
+            cursor.executemany("DELETE FROM corpus_document_frequencies WHERE term = ? AND doc_count <= 0", removed_params)
+        documents_delta = (1 if new_terms else 0) - (1 if old_terms else 0)
+        if documents_delta or added_terms or removed_terms:
+            cursor.execute("INSERT INTO corpus_stats (key, value) VALUES ('tfidf_documents', MAX(?, 0)) "
+                           "ON CONFLICT(key) DO UPDATE SET value = MAX(value + ?, 0)", (documents_delta, documents_delta))
+            cursor.execute("INSERT INTO corpus_stats (key, value) VALUES ('tfidf_df_version', 1) "
+                           "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+
+    @staticmethod
+    def rebuild_corpus_document_frequencies(db_conn: sqlite3.Connection) -> int:
+        """Recalcule entièrement les DF depuis les tokens enregistrés (bases existantes). Renvoie le nombre de documents."""
+        rebuild_logger = logging.getLogger(f"{MODULE_NAME}.KnowledgeBase.CorpusTfidf")
+        document_frequencies: Counter = Counter()
+        documents_count = 0
+        current_file_id: Optional[int] = None
+        current_lemmas: List[str] = []
+
+        def _flush_document() -> None:
+            nonlocal documents_count
+            document_terms = extract_tfidf_terms([{"lemma": lemma, "is_significant": True} for lemma in current_lemmas])
+            if document_terms:
+                documents_count += 1
+                document_frequencies.update(document_terms.keys())
+
+        for file_id, lemma in db_conn.execute("SELECT file_id, lemma FROM v_lemma_frequencies WHERE significant_count > 0 ORDER BY file_id"):
+            if file_id != current_file_id:
+                _flush_document()
+                current_file_id, current_lemmas = file_id, []
+            current_lemmas.append(lemma)
+        _flush_document()
+
+        with db_conn:
+            db_conn.execute("DELETE FROM corpus_document_frequencies")
+            db_conn.executemany("INSERT INTO corpus_document_frequencies (term, doc_count) VALUES (?, ?)", document_frequencies.items())
+            db_conn.execute("INSERT OR REPLACE INTO corpus_stats (key, value) VALUES ('tfidf_documents', ?)", (documents_count,))
+            db_conn.execute("INSERT INTO corpus_stats (key, value) VALUES ('tfidf_df_version', 1) "
+                            "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+        rebuild_logger.info(f"CORPUS_TFIDF: DF reconstruites ({len(document_frequencies)} termes, {documents_count} documents).")
+        return documents_count
+
     def get_file_checksum(self, db_conn: sqlite3.Connection, filepath_str: str) -> Optional[str]:
         try:
             cursor = db_conn.cursor()
@@ -1129,24 +1713,30 @@ class KnowledgeBase:
             # Aucun BEGIN, COMMIT, ou ROLLBACK ici.
 
             embedding_blob_to_store = analysis_data.get('document_embedding_blob')
+            # Stat relevé AVANT le calcul du checksum (manifeste : un stat identique garantit le checksum)
+            file_stat = analysis_data.get('file_stat') or {}
 
             cursor.execute("""
-                INSERT INTO files (filepath, checksum, last_processed_utc, size_bytes, encoding, embedding)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO files (filepath, checksum, last_processed_utc, size_bytes, encoding, embedding, inode, mtime_ns)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(filepath) DO UPDATE SET
                     checksum=excluded.checksum,
                     last_processed_utc=excluded.last_processed_utc,
                     size_bytes=excluded.size_bytes,
                     encoding=excluded.encoding,
-                    embedding=excluded.embedding
+                    embedding=excluded.embedding,
+                    inode=excluded.inode,
+                    mtime_ns=excluded.mtime_ns
                 RETURNING id;
             """, (
                 filepath_str,
                 checksum,
                 datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                analysis_data.get('file_size'),
+                file_stat.get('size', analysis_data.get('file_size')),
                 analysis_data.get('encoding'),
-                embedding_blob_to_store
+                embedding_blob_to_store,
+                file_stat.get('inode'),
+                file_stat.get('mtime_ns')
             ))
             file_id_row = cursor.fetchone()
 
@@ -1160,30 +1750,28 @@ class KnowledgeBase:
             self.logger.debug(f"Obtenu file_id: {file_id} pour le fichier: '{filepath_str}'.")
 
             # Suppression explicite des anciennes données associées avant réinsertion
-            tables_to_clear = ["linguistic_tokens", "named_entities", "metadata", "entity_relations"]
-            for table in tables_to_clear:
+            # Termes déjà comptés dans les DF du corpus pour ce fichier (lus avant la purge des tokens)
+            old_tfidf_terms = KnowledgeBase._stored_tfidf_terms(cursor, file_id) if self.corpus_tfidf_enabled else set()
+
+            # Les deux modes de stockage des tokens sont purgés : un fichier peut changer de mode entre deux analyses
+            for table in KnowledgeBase.FILE_ANALYSIS_TABLES:
                 self.logger.debug(f"Nettoyage de la table '{table}' pour file_id {file_id} avant réinsertion...")
                 cursor.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
                 # Log facultatif du nombre de lignes supprimées si utile pour le débogage
                 # self.logger.debug(f"{cursor.rowcount} lignes supprimées de '{table}' pour file_id {file_id}.")
 
             # Insertion des tokens linguistiques
-            tokens_data = analysis_data.get('linguistic_features', {}).get('tokens', [])
+            tokens_data = document_tokens(analysis_data.get('linguistic_features', {}))
             if tokens_data:
-                tokens_to_insert = [
-                    (file_id,
-                     str(t_info.get('text',''))[:500],
-                     str(t_info.get('lemma',''))[:255],
-                     str(t_info.get('pos',''))[:50],
-                     1 if t_info.get('is_stop') else 0,
-                     1 if t_info.get('is_punct') else 0,
-                     1 if t_info.get('is_alpha') else 0,
-                     1 if t_info.get('is_significant') else 0)
-                    for t_info in tokens_data
-                ]
-                if tokens_to_insert:
-                    cursor.executemany("INSERT INTO linguistic_tokens (file_id, token_text, lemma, pos, is_stop, is_punct, is_alpha, is_significant) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", tokens_to_insert)
-                    self.logger.debug(f"{len(tokens_to_insert)} tokens linguistiques insérés pour file_id {file_id}.")
+                if self.token_storage == "packed" and KnowledgeBase._record_tokens_packed(cursor, file_id, tokens_data, self.token_storage_codec):
+                    self.logger.debug(f"{len(tokens_data)} tokens linguistiques empaquetés ({self.token_storage_codec}) pour file_id {file_id}.")
+                else:
+                    if self.token_storage == "packed":
+                        self.logger.warning(f"TOKEN_STORAGE: plus de 255 étiquettes POS distinctes, tokens de file_id {file_id} stockés en lignes.")
+                    inserted_tokens_count = KnowledgeBase._insert_token_rows(cursor, file_id, tokens_data)
+                    self.logger.debug(f"{inserted_tokens_count} tokens linguistiques insérés pour file_id {file_id}.")
+            if self.corpus_tfidf_enabled:
+                KnowledgeBase.update_corpus_document_frequencies(cursor, old_tfidf_terms, set(extract_tfidf_terms(tokens_data)))
 
             # Insertion des entités nommées
             entities_data = analysis_data.get('linguistic_features', {}).get('entities', [])
@@ -1256,6 +1844,38 @@ class KnowledgeBase:
             self.logger.error(f"Erreur générale inattendue lors de la récupération de tous les embeddings: {e_general}", exc_info=True)
             return [] # Retourner une liste vide en cas d'erreur
 
+    def get_document_embedding_manifest(self, db_conn: sqlite3.Connection) -> List[Tuple[int, str]]:
+        """
+        Récupère (file_id, checksum) des fichiers ayant un embedding, sans lire les blobs.
+        Sert à la synchronisation incrémentale de l'index FAISS persistant.
+        Les erreurs SQLite sont propagées : un manifeste vide viderait l'index.
+        """
+        cursor = db_conn.cursor()
+        cursor.execute("SELECT id, checksum FROM files WHERE embedding IS NOT NULL")
+        manifest = [(row_data[0], row_data[1]) for row_data in cursor.fetchall()]
+        self.logger.debug(f"Manifeste des embeddings: {len(manifest)} documents dans la KB.")
+        return manifest
+
+    def get_document_embeddings_by_ids(self, db_conn: sqlite3.Connection, file_ids: List[int]) -> List[Tuple[int, str, Optional[bytes]]]:
+        """Récupère (file_id, checksum, embedding) pour un lot de file_id (taille du lot gérée par l'appelant)."""
+        if not file_ids:
+            return []
+        placeholders = ",".join("?" * len(file_ids))
+        cursor = db_conn.cursor()
+        cursor.execute(f"SELECT id, checksum, embedding FROM files WHERE id IN ({placeholders}) AND embedding IS NOT NULL", list(file_ids))
+        return [(row_data[0], row_data[1], row_data[2]) for row_data in cursor.fetchall()]
+
+    def get_file_id(self, db_conn: sqlite3.Connection, filepath_str: str) -> Optional[int]:
+        """Récupère le file_id d'un chemin, ou None s'il n'est pas dans la KB."""
+        try:
+            cursor = db_conn.cursor()
+            cursor.execute("SELECT id FROM files WHERE filepath = ?", (filepath_str,))
+            result_row = cursor.fetchone()
+            return int(result_row[0]) if result_row else None
+        except sqlite3.Error as e_sqlite:
+            self.logger.error(f"Erreur SQLite lors de la récupération du file_id pour '{filepath_str}': {e_sqlite}", exc_info=True)
+            return None
+
     def get_filepath_by_id(self, db_conn: sqlite3.Connection, file_id: int) -> Optional[str]:
         """Récupère le chemin de fichier (filepath) pour un file_id donné."""
         self.logger.debug(f"Récupération du chemin pour file_id {file_id} depuis la KB...")
@@ -1389,6 +2009,10 @@ class KnowledgeBase:
         try:
             cursor = db_conn.cursor()
                 """TODO: Add docstring."""
+            # Retirer le document des DF du corpus avant que ON DELETE CASCADE n'efface ses tokens
+            file_row = cursor.execute("SELECT id FROM files WHERE filepath = ?", (filepath_str,)).fetchone()
+            if file_row and self.corpus_tfidf_enabled:
+                KnowledgeBase.update_corpus_document_frequencies(cursor, KnowledgeBase._stored_tfidf_terms(cursor, file_row[0]), set())
             # La suppression des données associées est gérée par ON DELETE CASCADE dans le schéma SQL
             cursor.execute("DELETE FROM files WHERE filepath = ?", (filepath_str,))
 
@@ -1403,6 +2027,133 @@ class KnowledgeBase:
         except Exception as e_general:
             self.logger.error(f"Erreur générale inattendue lors de la tentative de suppression de '{filepath_str}': {e_general}", exc_info=True)
 
+    @staticmethod
+    def snapshot_file_record(db_conn: sqlite3.Connection, filepath_str: str) -> Optional[Dict[str, Any]]:
+        """
+        Copie la ligne `files` d'un fichier et ses lignes d'analyse (FILE_ANALYSIS_TABLES), pour restore_file_record.
+        Renvoie None si le fichier est inconnu de la KB.
+        """
+        files_cursor = db_conn.execute("SELECT * FROM files WHERE filepath = ?", (filepath_str,))
+        file_row = files_cursor.fetchone()
+        if file_row is None:
+            return None
+        files_columns = [column[0] for column in files_cursor.description]
+        snapshot: Dict[str, Any] = {"files": (files_columns, tuple(file_row)), "tables": {}}
+        file_id = file_row[files_columns.index("id")]
+        for table in KnowledgeBase.FILE_ANALYSIS_TABLES:
+            table_cursor = db_conn.execute(f"SELECT * FROM {table} WHERE file_id = ?", (file_id,))
+            snapshot["tables"][table] = ([column[0] for column in table_cursor.description], [tuple(row) for row in table_cursor.fetchall()])
+        return snapshot
+
+    def restore_file_record(self, db_conn: sqlite3.Connection, filepath_str: str, snapshot: Optional[Dict[str, Any]]) -> None:
+        """
+        Rétablit l'état capturé par snapshot_file_record (ligne `files` avec son id, lignes d'analyse, DF du corpus).
+        Sans instantané, le fichier était inconnu : seule l'analyse ajoutée depuis est retirée.
+        La transaction est gérée par l'appelant ; les erreurs SQLite sont propagées.
+        """
+        if snapshot is None:
+            self.remove_file_record(db_conn, filepath_str)
+            return
+        cursor = db_conn.cursor()
+        files_columns, files_values = snapshot["files"]
+        file_id = files_values[files_columns.index("id")]
+        current_row = cursor.execute("SELECT id FROM files WHERE filepath = ?", (filepath_str,)).fetchone()
+        current_terms: Set[str] = set()
+        if current_row is not None:
+            current_terms = KnowledgeBase._stored_tfidf_terms(cursor, current_row[0]) if self.corpus_tfidf_enabled else set()
+            if current_row[0] != file_id: # Ligne recréée entre-temps : l'ancienne est rétablie à sa place
+                cursor.execute("DELETE FROM files WHERE id = ?", (current_row[0],))
+        for table in KnowledgeBase.FILE_ANALYSIS_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+        if current_row is not None and current_row[0] == file_id:
+            # UPDATE et non DELETE + INSERT : les lignes hors analyse (propositions, etc.) restent attachées au fichier
+            cursor.execute(f"UPDATE files SET {', '.join(f'{column} = ?' for column in files_columns if column != 'id')} WHERE id = ?",
+                           [value for column, value in zip(files_columns, files_values) if column != "id"] + [file_id])
+        else:
+            cursor.execute(f"INSERT INTO files ({', '.join(files_columns)}) VALUES ({', '.join('?' for _ in files_columns)})", files_values)
+        for table in KnowledgeBase.FILE_ANALYSIS_TABLES:
+            table_columns, table_rows = snapshot["tables"][table]
+            if table_rows:
+                cursor.executemany(f"INSERT INTO {table} ({', '.join(table_columns)}) VALUES ({', '.join('?' for _ in table_columns)})", table_rows)
+        if self.corpus_tfidf_enabled:
+            KnowledgeBase.update_corpus_document_frequencies(cursor, current_terms, KnowledgeBase._stored_tfidf_terms(cursor, file_id))
+        self.logger.info(f"Enregistrement antérieur de '{filepath_str}' (ID: {file_id}) rétabli dans la KB (commit sera fait par l'appelant).")
+
+
+class CorpusTfidfModel:
+    """
+    Poids IDF du corpus mis en cache (lecture seule). Le score d'un document est un produit creux
+    tf * idf sur ses seuls termes : aucun ajustement de vectoriseur dans le chemin critique.
+    Le cache est rechargé au plus toutes les `refresh_seconds`, et seulement si la version des DF a changé.
+    """
+    def __init__(self, refresh_seconds: float = 60.0, db_path: Optional[Path] = None):
+        self.refresh_seconds = max(0.0, float(refresh_seconds))
+        self.db_path = db_path # None : KB_DB_PATH (globale) au moment du chargement
+        self.logger = logging.getLogger(f"{MODULE_NAME}.CorpusTfidfModel")
+        self._lock = threading.Lock()
+        self._document_frequencies: Dict[str, int] = {}
+        self._documents_count = 0
+        self._df_version: Optional[int] = None
+        self._last_refresh_mono = 0.0
+        self._available = False
+
+    def _refresh_if_stale(self) -> None:
+        now_mono = time.monotonic()
+        with self._lock:
+            if self._last_refresh_mono and now_mono - self._last_refresh_mono < self.refresh_seconds:
+                return
+            self._last_refresh_mono = now_mono
+        db_path = self.db_path or KB_DB_PATH
+        if not db_path or not Path(db_path).exists():
+            return
+        refresh_conn: Optional[sqlite3.Connection] = None
+        try:
+            refresh_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=5)
+            stats = dict(refresh_conn.execute("SELECT key, value FROM corpus_stats WHERE key IN ('tfidf_documents', 'tfidf_df_version')").fetchall())
+            if self._available and stats.get('tfidf_df_version') == self._df_version:
+                return
+            document_frequencies = dict(refresh_conn.execute("SELECT term, doc_count FROM corpus_document_frequencies").fetchall())
+            with self._lock:
+                self._document_frequencies = document_frequencies
+                self._documents_count = int(stats.get('tfidf_documents', 0))
+                self._df_version = stats.get('tfidf_df_version')
+                self._available = True
+            self.logger.debug(f"CORPUS_TFIDF: {len(document_frequencies)} termes chargés (documents: {self._documents_count}, version: {self._df_version}).")
+        except sqlite3.Error as e_refresh:
+            self.logger.debug(f"CORPUS_TFIDF: DF du corpus non lisibles ({e_refresh}).")
+        finally:
+            if refresh_conn:
+                try: refresh_conn.close()
+                except sqlite3.Error: pass
+
+    def is_ready(self) -> bool:
+        self._refresh_if_stale()
+        return self._available # Corpus vide compris : idf = 1, comme le TF-IDF sur le seul document
+
+    def top_terms(self, term_counts: Counter, top_n: int = 5, min_score: float = 0.01) -> List[Tuple[str, float]]:
+        """
+        Termes du document classés par tf-idf normalisé L2, idf lissé comme scikit-learn : ln((1+N)/(1+df)) + 1.
+        Le document scoré compte dans le corpus (N + 1, df + 1 pour chacun de ses termes) : un terme absent
+        des DF (df = 0) est traité comme le serait un terme présent dans ce seul document.
+        """
+        total_terms = sum(term_counts.values())
+        if not total_terms:
+            return []
+        with self._lock:
+            documents_count = self._documents_count + 1
+            document_frequencies = self._document_frequencies
+        scores = {term: (count / total_terms) *
+                        (math.log((1 + documents_count) / (1 + min(documents_count, document_frequencies.get(term, 0) + 1))) + 1.0)
+                  for term, count in term_counts.items()}
+        norm = math.sqrt(sum(score * score for score in scores.values())) or 1.0
+        ranked = sorted(((term, score / norm) for term, score in scores.items()), key=lambda item: (-item[1], item[0]))
+        return [(term, round(score, 4)) for term, score in ranked[:top_n] if score > min_score]
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"available": self._available, "documents": self._documents_count,
+                    "terms": len(self._document_frequencies), "df_version": self._df_version}
+
 
 class PipelineStepInterface:
     # MODIFICATION: Le constructeur prend maintenant une référence à l'instance de KnowledgeBase
@@ -1413,7 +2164,8 @@ class PipelineStepInterface:
                  kb_instance: Optional[KnowledgeBase],
                  # --- CES DEUX ARGUMENTS SONT LES NOUVEAUX ET IMPORTANTS ---
                  text_improver_shared: Optional[alma_core.TextImprover],      # NOUVEL ARGUMENT
-                 knowledge_linker_shared: Optional[alma_core.KnowledgeLinker] # NOUVEL ARGUMENT
+                 knowledge_linker_shared: Optional[alma_core.KnowledgeLinker], # NOUVEL ARGUMENT
+                 embedding_batcher_shared: Optional['EmbeddingBatcher'] = None # Micro-batcher SBERT du service
                 ):
         self.step_config = step_config
         self.global_config = global_config
@@ -1423,9 +2175,12 @@ class PipelineStepInterface:
         # --- CORRECTION : UTILISER LES INSTANCES PARTAGÉES PASSÉES EN ARGUMENT ---
         self.text_improver = text_improver_shared
         self.knowledge_linker = knowledge_linker_shared
+        self.embedding_batcher = embedding_batcher_shared
 
     """TODO: Add docstring."""
-        if alma_core:
+        # Fallback : instances Core locales uniquement si le service n'en fournit pas
+        # (sinon chaque étape rechargerait ses propres modèles SBERT/Transformers).
+        if alma_core and text_improver_shared is None and knowledge_linker_shared is None:
             core_cfg = self.global_config.get("core_algorithms_config", {})
             ti_cfg = core_cfg.get("text_improver")
                 """TODO: Add docstring."""
@@ -1442,7 +2197,7 @@ class PipelineStepInterface:
                 """TODO: Add docstring."""
                 try: self.knowledge_linker = alma_core.KnowledgeLinker(kl_cfg, self.kb_instance, nlp_inst_for_core, self.logger)
                 except Exception as e: self.logger.error(f"Erreur init KnowledgeLinker: {e}", exc_info=True)
-        else:
+        elif not alma_core:
             self.logger.warning("Module alma_core non disponible.")
 
     # MODIFICATION: La méthode process prend maintenant une connexion DB en argument
@@ -1455,10 +2210,11 @@ class ComprehensionStep(PipelineStepInterface):
                  global_config: Dict[str, Any],
                  kb_instance: Optional[KnowledgeBase],
                  text_improver_shared: Optional[alma_core.TextImprover],
-                 knowledge_linker_shared: Optional[alma_core.KnowledgeLinker]
+                 knowledge_linker_shared: Optional[alma_core.KnowledgeLinker],
+                 embedding_batcher_shared: Optional['EmbeddingBatcher'] = None
                 ):
         super().__init__(step_config, global_config, kb_instance,
-                         text_improver_shared, knowledge_linker_shared)
+                         text_improver_shared, knowledge_linker_shared, embedding_batcher_shared)
 
         # Utiliser self.logger qui est initialisé dans PipelineStepInterface.__init__
         # self.logger.debug("Initialisation de ComprehensionStep...") # Log de debug optionnel
@@ -1719,33 +2475,7 @@ class ComprehensionStep(PipelineStepInterface):
                     self._extract_with_nltk(processor.file_content, processor.processed_data)
                 self._extract_keywords_fallback(processor.file_content, processor.processed_data)
 
-            sbert_model_to_use = None
-            if alma_core and hasattr(self, 'knowledge_linker') and self.knowledge_linker and \
-               isinstance(self.knowledge_linker, alma_core.KnowledgeLinker) and \
-               self.knowledge_linker.sbert_model:
-                sbert_model_to_use = self.knowledge_linker.sbert_model
-
-            if sbert_model_to_use and processor.file_content:
-                _numpy_module_local = None
-                try:
-                    import numpy
-                        """TODO: Add docstring."""
-                    _numpy_module_local = numpy
-                except ImportError: self.logger.warning("Numpy non trouvé. SBERT embedding désactivé.")
-                if _numpy_module_local:
-                    try:
-                        self.logger.info(f"Génération SBERT embedding pour {processor.filepath}...")
-                        embedding_np = sbert_model_to_use.encode(processor.file_content, convert_to_numpy=True, show_progress_bar=False)
-                        norm = _numpy_module_local.linalg.norm(embedding_np)
-                        normalized_embedding_np = embedding_np / norm if norm > 0 else embedding_np
-                        if norm == 0: self.logger.warning(f"Vecteur SBERT nul pour {processor.filepath}.")
-                        processor.processed_data['document_embedding_blob'] = normalized_embedding_np.astype(_numpy_module_local.float32).tobytes()
-                        self.logger.info(f"SBERT embedding généré (blob: {len(processor.processed_data['document_embedding_blob'])} octets) pour {processor.filepath}.")
-                    except Exception as e_sbert_embed: self.logger.error(f"Erreur génération SBERT embedding pour {processor.filepath}: {e_sbert_embed}", exc_info=True)
-            else:
-                if not sbert_model_to_use: self.logger.debug(f"Modèle SBERT non dispo. Pas d'embedding SBERT pour {processor.filepath}.")
-                if not processor.file_content: self.logger.debug(f"Contenu fichier vide. Pas d'embedding SBERT pour {processor.filepath}.")
-                    """TODO: Add docstring."""
+            self.compute_document_embedding(processor)
 
             self.logger.audit(f"Compréhension OK pour: {processor.filepath}")
             return True
@@ -1757,7 +2487,48 @@ class ComprehensionStep(PipelineStepInterface):
             self.logger.error(f"Erreur inattendue dans ComprehensionStep.process pour {processor.filepath}: {e}", exc_info=True)
             return False
 
+    def compute_document_embedding(self, processor: 'FileProcessor') -> None:
+        """
+        Calcule l'embedding SBERT du document (via le micro-batcher si actif).
+        Séparé de process() pour que le mode "process" puisse l'exécuter dans le processus parent,
+        qui est le seul à détenir le modèle SBERT.
+        """
+        sbert_model_to_use = None
+        if alma_core and hasattr(self, 'knowledge_linker') and self.knowledge_linker and \
+           isinstance(self.knowledge_linker, alma_core.KnowledgeLinker) and \
+           self.knowledge_linker.sbert_model:
+            sbert_model_to_use = self.knowledge_linker.sbert_model
+
+        if sbert_model_to_use and processor.file_content:
+            _numpy_module_local = None
+            try:
+                import numpy
+                    """TODO: Add docstring."""
+                _numpy_module_local = numpy
+            except ImportError: self.logger.warning("Numpy non trouvé. SBERT embedding désactivé.")
+            if _numpy_module_local:
+                try:
+                    self.logger.info(f"Génération SBERT embedding pour {processor.filepath}...")
+                    if self.embedding_batcher and self.embedding_batcher.is_running():
+                        # Le micro-batcher du service regroupe les documents de tous les workers (déjà normalisé L2)
+                        normalized_embedding_np = self.embedding_batcher.submit(processor.file_content).result(
+                            timeout=self.embedding_batcher.result_timeout_seconds)
+                    else:
+                        embedding_np = sbert_model_to_use.encode(processor.file_content, convert_to_numpy=True, show_progress_bar=False)
+                        norm = _numpy_module_local.linalg.norm(embedding_np)
+                        normalized_embedding_np = embedding_np / norm if norm > 0 else embedding_np
+                        if norm == 0: self.logger.warning(f"Vecteur SBERT nul pour {processor.filepath}.")
+                    processor.processed_data['document_embedding_blob'] = normalized_embedding_np.astype(_numpy_module_local.float32).tobytes()
+                    self.logger.info(f"SBERT embedding généré (blob: {len(processor.processed_data['document_embedding_blob'])} octets) pour {processor.filepath}.")
+                except Exception as e_sbert_embed: self.logger.error(f"Erreur génération SBERT embedding pour {processor.filepath}: {e_sbert_embed}", exc_info=True)
+        else:
+            if not sbert_model_to_use: self.logger.debug(f"Modèle SBERT non dispo. Pas d'embedding SBERT pour {processor.filepath}.")
+            if not processor.file_content: self.logger.debug(f"Contenu fichier vide. Pas d'embedding SBERT pour {processor.filepath}.")
+                """TODO: Add docstring."""
+
 class AnalysisStep(PipelineStepInterface):
+    _sklearn_stop_words: Optional[List[str]] = None # Liste passée à TfidfVectorizer (repli), construite une seule fois
+
     def _analyze_sentiment_basic(self, text_content: str) -> Dict[str, Any]:
         # Utilise self.global_config pour les listes de mots
         pos_words = set(self.global_config.get("nlp",{}).get("sentiment_positive_words",[]))
@@ -1779,16 +2550,27 @@ class AnalysisStep(PipelineStepInterface):
         return {"score":score, "label":lbl, "method":"basic_keyword"}
 
     def _detect_topics_tfidf(self, processor_data: Dict[str, Any]) -> Optional[List[str]]:
-        if not sklearn_tfidf:
-            self.logger.debug("sklearn_tfidf non disponible pour TF-IDF.")
-            return None
-
-        tokens = processor_data.get('linguistic_features',{}).get('tokens',[]) or \
-                 processor_data.get('linguistic_features',{}).get('tokens_nltk',[])
+        tokens = document_tokens(processor_data.get('linguistic_features', {}))
         if not tokens:
             self.logger.debug("Aucun token disponible pour TF-IDF.")
             return None
 
+        # Modèle du corpus : produit creux tf * idf (IDF en cache), sans ajustement de vectoriseur
+        corpus_tfidf = self.kb_instance.corpus_tfidf if self.kb_instance else None
+        if self.step_config.get("topic_model", "corpus") == "corpus" and corpus_tfidf and corpus_tfidf.is_ready():
+            ranked_terms = corpus_tfidf.top_terms(extract_tfidf_terms(tokens), top_n=int(self.step_config.get("topics_top_n", 5)))
+            if ranked_terms:
+                processor_data['detected_topics_tfidf_scores'] = ranked_terms
+                self.logger.debug(f"Thèmes TF-IDF (corpus) détectés: {ranked_terms}")
+                return [term for term, _ in ranked_terms]
+            self.logger.debug("Aucun thème TF-IDF (corpus) détecté avec un score suffisant.")
+            return None
+
+        # Repli : TF-IDF sur le seul document (DF du corpus illisibles ou modèle désactivé)
+        if not sklearn_tfidf:
+            self.logger.debug("sklearn_tfidf non disponible pour TF-IDF.")
+            return None
+
         terms = [t['lemma'] for t in tokens if t.get('is_significant')]
         if not terms:
             self.logger.debug("Aucun terme significatif pour TF-IDF.")
@@ -1804,8 +2586,10 @@ class AnalysisStep(PipelineStepInterface):
             # 1. Essayer les stopwords de spaCy (globaux) s'ils sont chargés
             # 2. Sinon, utiliser les noms de langue pour sklearn ('french', 'english')
             # 3. Sinon, pas de stopwords (None)
-            if SPACY_STOP_WORDS: # Variable globale SPACY_STOP_WORDS_SET
-                sw = list(SPACY_STOP_WORDS)
+            if TFIDF_STOP_WORDS: # Stopwords spaCy (frozenset construit une fois à l'import)
+                if self._sklearn_stop_words is None:
+                    self._sklearn_stop_words = sorted(TFIDF_STOP_WORDS)
+                sw = self._sklearn_stop_words
                 self.logger.debug(f"Utilisation des stopwords spaCy (taille: {len(sw)}) pour TF-IDF (langue de config: {lang_cfg})")
             elif lang_cfg == "fr":
                 sw = "french"
@@ -1912,8 +2696,8 @@ class StudyStep(PipelineStepInterface):
         try:
             if self.kb_instance and processor.checksum:
                 """TODO: Add docstring."""
-                # MODIFICATION: Passer db_conn_worker à record_file_analysis
-                file_id = self.kb_instance.record_file_analysis(db_conn_worker, str(processor.filepath), processor.checksum, processor.processed_data)
+                # Écriture via l'écrivain KB unique si actif (file_id rendu après COMMIT du groupe)
+                file_id = processor.record_file_analysis(str(processor.filepath), processor.checksum, processor.processed_data)
                 if file_id:
                     processor.processed_data['kb_file_id'] = file_id
                     # La logique de cross-référencement utiliserait aussi db_conn_worker si elle accède à la KB
@@ -2018,15 +2802,16 @@ class ActiveImprovementStep(PipelineStepInterface):
                  global_config: Dict[str, Any],
                  kb_instance: Optional[KnowledgeBase], # Mettre Optional par cohérence
                  text_improver_shared: Optional[alma_core.TextImprover],      # AJOUTER CET ARGUMENT
-                 knowledge_linker_shared: Optional[alma_core.KnowledgeLinker] # AJOUTER CET ARGUMENT
+                 knowledge_linker_shared: Optional[alma_core.KnowledgeLinker], # AJOUTER CET ARGUMENT
+                 embedding_batcher_shared: Optional['EmbeddingBatcher'] = None
                 ):
         super().__init__(step_config, global_config, kb_instance,
-                         text_improver_shared, knowledge_linker_shared) # PASSER CES ARGUMENTS AU SUPER
+                         text_improver_shared, knowledge_linker_shared, embedding_batcher_shared) # PASSER CES ARGUMENTS AU SUPER
         self.auto_apply_summary = bool(step_config.get("auto_apply_summary", False))
         self.auto_apply_grammar = bool(step_config.get("auto_apply_grammar", False))
         # Le reste de votre __init__ spécifique à ActiveImprovementStep, s'il y en a.
 
-    def _save_improved_content(self, db_conn_worker: sqlite3.Connection, original_filepath: Path, original_checksum: str, improvement_type: str, improved_content: str) -> Optional[Path]:
+    def _save_improved_content(self, processor: 'FileProcessor', original_filepath: Path, original_checksum: str, improvement_type: str, improved_content: str) -> Optional[Path]:
         try:
             ACTIVE_IMPROVEMENTS_DIR.mkdir(parents=True, exist_ok=True)
                 """TODO: Add docstring."""
@@ -2037,8 +2822,8 @@ class ActiveImprovementStep(PipelineStepInterface):
             self.logger.audit(f"Contenu amélioré ({improvement_type}) -> {improved_fp} (CS: {new_cs})")
             if self.kb_instance and new_cs:
                 adata = {'file_size':improved_fp.stat().st_size, 'encoding':'utf-8', 'extracted_metadata':{"source_improvement_of":str(original_filepath), "improvement_type":improvement_type}}
-                # MODIFICATION: Passer db_conn_worker
-                self.kb_instance.record_file_analysis(db_conn_worker, str(improved_fp), new_cs, adata)
+                # Écriture via l'écrivain KB unique si actif, sinon sur la connexion du worker
+                processor.record_file_analysis(str(improved_fp), new_cs, adata)
                     """TODO: Add docstring."""
             return improved_fp
         except Exception as e: self.logger.error(f"Erreur sauvegarde contenu amélioré ({improvement_type}) pour {original_filepath}: {e}", exc_info=True); return None
@@ -2054,7 +2839,7 @@ class ActiveImprovementStep(PipelineStepInterface):
                 if corrected != processor.file_content:
                     # MODIFICATION: Passer db_conn_worker
                         """TODO: Add docstring."""
-                    sp = self._save_improved_content(db_conn_worker, processor.filepath, processor.checksum, "grammar_corrected", corrected)
+                    sp = self._save_improved_content(processor, processor.filepath, processor.checksum, "grammar_corrected", corrected)
                     if sp: actions.append(f"Grammaire/typo (auto): {sp.name}. Log: {log}")
             except Exception as e: self.logger.error(f"Erreur correction grammaire Core: {e}", exc_info=True)
         if self.auto_apply_summary:
@@ -2063,7 +2848,7 @@ class ActiveImprovementStep(PipelineStepInterface):
                 if summary:
                     """TODO: Add docstring."""
                     # MODIFICATION: Passer db_conn_worker
-                    sp = self._save_improved_content(db_conn_worker, processor.filepath, processor.checksum, "summary_generated", summary)
+                    sp = self._save_improved_content(processor, processor.filepath, processor.checksum, "summary_generated", summary)
                     if sp: actions.append(f"Résumé (auto): {sp.name}. Log: {log}")
             except Exception as e: self.logger.error(f"Erreur résumé Core: {e}", exc_info=True)
         if actions: processor.processed_data["active_improvements_applied"] = actions; self.logger.audit(f"Améliorations actives OK: {'; '.join(actions)}")
@@ -2071,8 +2856,11 @@ class ActiveImprovementStep(PipelineStepInterface):
 
 class FileProcessor:
     # MODIFICATION: Le constructeur prend maintenant une connexion DB dédiée pour ce worker
-    def __init__(self, filepath: Path, config: Dict[str, Any], pipeline_steps: List[PipelineStepInterface], kb_instance: KnowledgeBase, db_conn_worker: sqlite3.Connection):
+    def __init__(self, filepath: Path, config: Dict[str, Any], pipeline_steps: List[PipelineStepInterface], kb_instance: KnowledgeBase, db_conn_worker: sqlite3.Connection,
+                 nlp_process_pool: Optional[ProcessPoolExecutor] = None, kb_writer: Optional['KnowledgeBaseWriter'] = None):
         self.filepath = filepath
+        self.kb_writer = kb_writer # Écrivain SQLite unique (None => écriture sur db_conn_worker)
+        self.nlp_process_pool = nlp_process_pool # Mode "process" : étapes CPU-bound déportées
         self.config = config
         self.kb_instance = kb_instance # L'instance KB pour NLP, etc.
         self.db_conn_worker = db_conn_worker # La connexion DB dédiée
@@ -2080,6 +2868,8 @@ class FileProcessor:
         self.logger = logging.getLogger(f"{MODULE_NAME}.FileProcessor")
         self.file_content: Optional[str] = None; self.encoding: Optional[str] = None; self.checksum: Optional[str] = None
         self.processed_data: Dict[str, Any] = {}; self.pipeline_stage_timings: Dict[str, float] = {}
+        self.kb_writer_records: List[str] = [] # Chemins déjà commités par l'écrivain unique (à rétablir si le pipeline échoue)
+        self.kb_writer_snapshots: Dict[str, Optional[Dict[str, Any]]] = {} # État KB de ces chemins avant leur première écriture
             """TODO: Add docstring."""
 
     def _is_valid_path(self) -> bool:
@@ -2109,12 +2899,28 @@ class FileProcessor:
         self.logger.info(f"Début traitement pipeline pour: {self.filepath}")
         if not self._is_valid_path(): return False
             """TODO: Add docstring."""
+        try:
+            # Stat AVANT le hachage : si le fichier change pendant le calcul, le manifeste sera simplement périmé
+            file_st = self.filepath.stat()
+            self.processed_data['file_stat'] = {'inode': file_st.st_ino, 'size': file_st.st_size, 'mtime_ns': file_st.st_mtime_ns}
+        except OSError as e_stat: self.logger.error(f"Impossible de lire le stat de {self.filepath}: {e_stat}, arrêt."); return False
         self.checksum = calculate_checksum(self.filepath)
         if not self.checksum: self.logger.error(f"Impossible de calculer le checksum pour {self.filepath}, arrêt."); return False
         self.processed_data['initial_checksum'] = self.checksum
         self.logger.audit(f"Fichier: {self.filepath}, Checksum: {self.checksum}")
+        offloaded_steps = self._offloadable_step_names()
+        offloaded_done = False
         for step in self.pipeline_steps:
-            step_name = step.__class__.__name__; start_time = time.perf_counter()
+            step_name = step.__class__.__name__
+            if step_name in offloaded_steps:
+                # Les timings par étape sont renseignés par le processus enfant
+                if not offloaded_done:
+                    offloaded_done = True
+                    try:
+                        if not self._run_offloaded_steps(offloaded_steps): return False
+                    except Exception as e_offload: self.logger.error(f"Exception non gérée (mode process) pour {self.filepath}: {e_offload}", exc_info=True); return False
+                continue
+            start_time = time.perf_counter()
             try:
                 if not step.step_config.get("enabled", True): self.logger.debug(f"Étape {step_name} désactivée. Sautée."); continue
                 # MODIFICATION: Passer la connexion DB du worker à la méthode process de l'étape
@@ -2124,6 +2930,762 @@ class FileProcessor:
             finally: self.pipeline_stage_timings[step_name] = time.perf_counter() - start_time
         self.logger.info(f"Traitement pipeline terminé avec succès pour: {self.filepath}"); return True
 
+    def record_file_analysis(self, filepath_str: str, checksum: str, analysis_data: Dict[str, Any]) -> Optional[int]:
+        """Enregistre une analyse dans la KB : via l'écrivain unique s'il tourne, sinon dans la transaction du worker."""
+        if self.kb_writer and self.kb_writer.is_running():
+            write_wait_start = time.perf_counter()
+            try:
+                file_id = self.kb_writer.submit_file_analysis(filepath_str, checksum, analysis_data, self.kb_writer_snapshots).result(timeout=self.kb_writer.result_timeout_seconds)
+                if filepath_str not in self.kb_writer_records:
+                    self.kb_writer_records.append(filepath_str)
+                return file_id
+            except Exception as e_writer:
+                self.logger.error(f"KB_WRITER: Écriture échouée pour '{filepath_str}': {e_writer}")
+                return None
+            finally:
+                # Attente du COMMIT groupé, incluse dans la durée de l'étape appelante (profileur : "db.*")
+                self.pipeline_stage_timings["db.write_wait"] = time.perf_counter() - write_wait_start
+        if self.db_conn_worker is None or self.kb_instance is None:
+            return None
+        return self.kb_instance.record_file_analysis(self.db_conn_worker, filepath_str, checksum, analysis_data)
+
+    def restore_writer_records(self) -> None:
+        """
+        Rétablit, après un échec du pipeline, l'état antérieur des fichiers déjà commités par l'écrivain unique :
+        l'écrivain commite dès StudyStep, le rollback du worker ne les couvre donc pas.
+        Aucune donnée antérieure n'est perdue ; l'index FAISS n'est pas touché (mis à jour seulement en cas de succès).
+        """
+        if not self.kb_writer_records or not (self.kb_writer and self.kb_writer.is_running()) or self.kb_instance is None:
+            return
+        kb_for_restore = self.kb_instance
+        for filepath_str in self.kb_writer_records:
+            prior_snapshot = self.kb_writer_snapshots.get(filepath_str)
+            def _restore_record(conn: sqlite3.Connection, path: str = filepath_str, snapshot: Optional[Dict[str, Any]] = prior_snapshot) -> None:
+                kb_for_restore.restore_file_record(conn, path, snapshot)
+            try:
+                self.kb_writer.submit(filepath_str, _restore_record).result(timeout=self.kb_writer.result_timeout_seconds)
+                self.logger.warning(f"KB_WRITER: État antérieur de '{filepath_str}' rétabli dans la KB (pipeline en échec).")
+            except Exception as e_restore:
+                self.logger.error(f"KB_WRITER: Rétablissement échoué pour '{filepath_str}': {e_restore}")
+        self.kb_writer_records.clear()
+        self.kb_writer_snapshots.clear()
+
+    def _offloadable_step_names(self) -> List[str]:
+        """Étapes CPU-bound consécutives en tête de pipeline, exécutables dans le pool de processus."""
+        if self.nlp_process_pool is None: return []
+        names: List[str] = []
+        for step in self.pipeline_steps:
+            if not step.step_config.get("enabled", True): continue
+            step_name = step.__class__.__name__
+            if step_name not in CPU_BOUND_STEP_NAMES: break # Garder l'ordre du pipeline
+            names.append(step_name)
+        return names
+
+    def _run_offloaded_steps(self, step_names: List[str]) -> bool:
+        """Exécute les étapes CPU-bound dans le pool de processus puis fusionne le résultat dans ce processeur."""
+        task_timeout = self.config.get("service_params", {}).get("task_timeout_seconds", DEFAULT_CONFIG["service_params"]["task_timeout_seconds"])
+        try:
+            future = self.nlp_process_pool.submit(_nlp_process_run, str(self.filepath), self.checksum, step_names) # type: ignore[union-attr]
+            result = future.result(timeout=task_timeout)
+        except BrokenProcessPool as e_broken:
+            self.logger.critical(f"NLP_PROCESS: Pool de processus 'broken' pendant {self.filepath}: {e_broken}. Réinitialisation au prochain health check.")
+            raise
+        except Exception as e_pool:
+            self.logger.error(f"NLP_PROCESS: Échec exécution déportée {step_names} pour {self.filepath}: {e_pool}")
+            raise
+        self.pipeline_stage_timings.update(result.get("stage_timings", {}))
+        self.file_content = result.get("file_content"); self.encoding = result.get("encoding")
+        self.processed_data.update(result.get("processed_data", {}))
+        if not result.get("success"):
+            self.logger.error(f"Étape {result.get('failed_step')} (processus) échouée pour {self.filepath}: {result.get('error')}. Arrêt pipeline.")
+            return False
+        # L'embedding SBERT reste calculé dans le parent (modèle partagé + micro-batcher)
+        for step in self.pipeline_steps:
+            if isinstance(step, ComprehensionStep) and step.__class__.__name__ in step_names:
+                start_time = time.perf_counter()
+                step.compute_document_embedding(self)
+                self.pipeline_stage_timings["ComprehensionStep.embedding"] = time.perf_counter() - start_time
+                break
+        return True
+
+class EmbeddingBatcher:
+    """
+    Micro-batcher SBERT partagé par les threads CerveauWorker.
+    Les workers soumettent un texte et reçoivent une Future ; un thread dédié regroupe les requêtes
+    pendant au plus `max_wait_ms` ou jusqu'à `max_batch_size` éléments, exécute un seul `encode`
+    batché, normalise (L2) et renvoie chaque vecteur float32 à sa Future.
+    """
+    BATCH_SIZE_BUCKETS: Tuple[int, ...] = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+    QUEUE_WAIT_MS_BUCKETS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+    def __init__(self, sbert_model: Any, max_batch_size: int = 32, max_wait_ms: float = 20.0,
+                 result_timeout_seconds: float = 300.0):
+        self.sbert_model = sbert_model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_seconds = max(0.0, float(max_wait_ms)) / 1000.0
+        self.result_timeout_seconds = float(result_timeout_seconds)
+        self.logger = logging.getLogger(f"{MODULE_NAME}.EmbeddingBatcher")
+
+        self._requests: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats_lock = threading.Lock()
+        self._batch_size_hist = [0] * (len(self.BATCH_SIZE_BUCKETS) + 1)
+        self._queue_wait_hist = [0] * (len(self.QUEUE_WAIT_MS_BUCKETS) + 1)
+        self._batches_total = 0
+        self._items_total = 0
+        self._encode_seconds_total = 0.0
+        self._errors_total = 0
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="EmbeddingBatcher")
+        self._thread.start()
+        self.logger.info(f"EmbeddingBatcher démarré (batch max: {self.max_batch_size}, attente max: {self.max_wait_seconds * 1000:.0f} ms).")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        # Les requêtes restantes ne seront jamais servies : les débloquer
+        while True:
+            try:
+                _, pending_future, _ = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if not pending_future.done():
+                pending_future.set_exception(RuntimeError("EmbeddingBatcher arrêté avant traitement de la requête."))
+        self.logger.info("EmbeddingBatcher arrêté.")
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stop_event.is_set())
+
+    def submit(self, text: str) -> Future:
+        """Soumet un texte ; la Future renvoie un vecteur numpy float32 normalisé L2."""
+        result_future: Future = Future()
+        self._requests.put((text, result_future, time.monotonic()))
+        return result_future
+
+    def _run(self) -> None:
+        import numpy as _np_batcher # numpy est une dépendance de sentence-transformers
+        while not self._stop_event.is_set():
+            try:
+                first_request = self._requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first_request]
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            batch_start = time.monotonic()
+            texts = [text for text, _, _ in batch]
+            try:
+                embeddings = _np_batcher.asarray(
+                    self.sbert_model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False),
+                    dtype=_np_batcher.float32)
+                norms = _np_batcher.linalg.norm(embeddings, axis=1, keepdims=True)
+                embeddings = embeddings / _np_batcher.where(norms > 0, norms, 1.0)
+                for row_i, (_, result_future, _) in enumerate(batch):
+                    if not result_future.done():
+                        result_future.set_result(embeddings[row_i])
+            except Exception as e_encode:
+                self.logger.error(f"Erreur encode SBERT batché ({len(batch)} textes): {e_encode}", exc_info=True)
+                with self._stats_lock:
+                    self._errors_total += 1
+                for _, result_future, _ in batch:
+                    if not result_future.done():
+                        result_future.set_exception(e_encode)
+            self._record_batch(batch, batch_start, time.monotonic() - batch_start)
+
+    @staticmethod
+    def _bucket_index(value: float, buckets: Tuple[float, ...]) -> int:
+        for bucket_i, upper_bound in enumerate(buckets):
+            if value <= upper_bound:
+                return bucket_i
+        return len(buckets)
+
+    def _record_batch(self, batch: List[Tuple[str, Future, float]], batch_start: float, encode_seconds: float) -> None:
+        with self._stats_lock:
+            self._batches_total += 1
+            self._items_total += len(batch)
+            self._encode_seconds_total += encode_seconds
+            self._batch_size_hist[self._bucket_index(len(batch), self.BATCH_SIZE_BUCKETS)] += 1
+            for _, _, submit_time in batch:
+                wait_ms = (batch_start - submit_time) * 1000.0
+                self._queue_wait_hist[self._bucket_index(wait_ms, self.QUEUE_WAIT_MS_BUCKETS)] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Histogrammes (bornes supérieures incluses, "+Inf" pour le dernier seau) pour generate_self_report."""
+        with self._stats_lock:
+            batch_labels = [f"le_{b}" for b in self.BATCH_SIZE_BUCKETS] + ["+Inf"]
+            wait_labels = [f"le_{b}ms" for b in self.QUEUE_WAIT_MS_BUCKETS] + ["+Inf"]
+            return {
+                "running": self.is_running(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+                "queue_depth_now": self._requests.qsize(),
+                "batches_total": self._batches_total,
+                "items_total": self._items_total,
+                "errors_total": self._errors_total,
+                "avg_batch_size": round(self._items_total / self._batches_total, 2) if self._batches_total else 0.0,
+                "items_per_second_encoding": round(self._items_total / self._encode_seconds_total, 2) if self._encode_seconds_total > 0 else 0.0,
+                "batch_size_histogram": dict(zip(batch_labels, self._batch_size_hist)),
+                "queue_wait_histogram": dict(zip(wait_labels, self._queue_wait_hist)),
+            }
+
+
+class KnowledgeBaseWriter:
+    """
+    Écrivain SQLite unique de la KnowledgeBase.
+    Un thread dédié détient la seule connexion en écriture (WAL) ; les workers lui remettent leurs
+    analyses terminées et reçoivent une Future (file_id). Les analyses de plusieurs fichiers sont
+    regroupées dans une même transaction, bornée en lignes estimées et en latence ; chaque fichier
+    est isolé par un SAVEPOINT pour qu'un échec n'annule pas le reste du groupe.
+    Les Futures ne sont résolues qu'après le COMMIT du groupe.
+    """
+    _SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    def __init__(self, db_path: Path, kb_instance: KnowledgeBase, db_timeout_seconds: float = 10.0,
+                 max_batch_rows: int = 20000, max_latency_ms: float = 50.0, synchronous: str = "NORMAL",
+                 cache_size_kib: int = 65536, mmap_size_mb: int = 256, result_timeout_seconds: float = 300.0,
+                 profiler: Optional['PipelineProfiler'] = None):
+        self.db_path = db_path
+        self.profiler = profiler # Reçoit les attentes de verrou (BEGIN IMMEDIATE) et de file de l'écrivain
+        self.kb_instance = kb_instance
+        self.db_timeout_seconds = float(db_timeout_seconds)
+        self.max_batch_rows = max(1, int(max_batch_rows))
+        self.max_latency_seconds = max(0.0, float(max_latency_ms)) / 1000.0
+        self.synchronous = str(synchronous).upper() if str(synchronous).upper() in self._SYNCHRONOUS_MODES else "NORMAL"
+        self.cache_size_kib = max(0, int(cache_size_kib))
+        self.mmap_size_bytes = max(0, int(mmap_size_mb)) * 1024 * 1024
+        self.result_timeout_seconds = float(result_timeout_seconds)
+        self.logger = logging.getLogger(f"{MODULE_NAME}.KnowledgeBaseWriter")
+
+        # (description, opération(conn) -> résultat, Future, lignes estimées, instant de soumission)
+        self._requests: "queue.Queue[Tuple[str, Any, Future, int, float]]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self._stats_lock = threading.Lock()
+        self._transactions_total = 0
+        self._operations_total = 0
+        self._operations_failed = 0
+        self._rows_estimated_total = 0
+        self._transaction_seconds_total = 0.0
+        self._commit_seconds_total = 0.0
+        self._max_operations_per_tx = 0
+        self._lock_wait_seconds_total = 0.0
+        self._lock_wait_max_seconds = 0.0
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=self.db_timeout_seconds, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(f"PRAGMA synchronous={self.synchronous};")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib};") # Valeur négative = taille en KiB
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size_bytes};")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._conn = self._open_connection()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="KnowledgeBaseWriter")
+        self._thread.start()
+        self.logger.info(f"KB_WRITER: Démarré sur {self.db_path.name} (synchronous={self.synchronous}, "
+                         f"lignes max/TX: {self.max_batch_rows}, latence max: {self.max_latency_seconds * 1000:.0f} ms).")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Arrête le thread après avoir vidé la file (les requêtes déjà soumises sont écrites)."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                self.logger.warning(f"KB_WRITER: Thread non terminé après {timeout}s.")
+        while True:
+            try:
+                _, _, pending_future, _, _ = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if not pending_future.done():
+                pending_future.set_exception(RuntimeError("KnowledgeBaseWriter arrêté avant écriture de la requête."))
+        if self._conn and not (self._thread and self._thread.is_alive()):
+            try: self._conn.close()
+            except sqlite3.Error as e_close: self.logger.warning(f"KB_WRITER: Erreur fermeture connexion: {e_close}")
+            self._conn = None
+        self.logger.info("KB_WRITER: Arrêté.")
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stop_event.is_set())
+
+    def submit(self, description: str, operation: Any, estimated_rows: int = 1) -> Future:
+        """Soumet `operation(conn)` ; exécutée dans un SAVEPOINT, son résultat est rendu après COMMIT."""
+        result_future: Future = Future()
+        self._requests.put((description, operation, result_future, max(1, int(estimated_rows)), time.monotonic()))
+        return result_future
+
+    def submit_file_analysis(self, filepath_str: str, checksum: str, analysis_data: Dict[str, Any],
+                             prior_snapshots: Optional[Dict[str, Optional[Dict[str, Any]]]] = None) -> Future:
+        """
+        Remet une analyse terminée ; la Future renvoie le file_id une fois la transaction commitée.
+        Si `prior_snapshots` est fourni, l'état du fichier avant sa première écriture y est copié (snapshot_file_record).
+        """
+        linguistic_features = analysis_data.get('linguistic_features', {})
+        estimated_rows = 1 + len(document_tokens(linguistic_features)) + len(linguistic_features.get('entities', [])) + \
+                         len(analysis_data.get('extracted_metadata', {}))
+
+        def _record(conn: sqlite3.Connection) -> int:
+            if prior_snapshots is not None and filepath_str not in prior_snapshots:
+                prior_snapshots[filepath_str] = KnowledgeBase.snapshot_file_record(conn, filepath_str)
+            file_id = self.kb_instance.record_file_analysis(conn, filepath_str, checksum, analysis_data)
+            if not file_id:
+                raise RuntimeError(f"record_file_analysis a échoué pour '{filepath_str}'.")
+            return file_id
+        return self.submit(filepath_str, _record, estimated_rows)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first_request = self._requests.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    break
+                continue
+            batch = [first_request]
+            batch_rows = first_request[3]
+            deadline = time.monotonic() + self.max_latency_seconds
+            while batch_rows < self.max_batch_rows:
+                remaining = deadline - time.monotonic()
+                try:
+                    next_request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(next_request)
+                batch_rows += next_request[3]
+            self._write_batch(batch, batch_rows)
+
+    def _write_batch(self, batch: List[Tuple[str, Any, Future, int, float]], batch_rows: int) -> None:
+        conn = self._conn
+        if conn is None:
+            for _, _, result_future, _, _ in batch:
+                if not result_future.done(): result_future.set_exception(RuntimeError("Connexion KB_WRITER indisponible."))
+            return
+        tx_start = time.monotonic()
+        outcomes: List[Tuple[Future, bool, Any]] = []
+        lock_wait_seconds = 0.0
+        commit_seconds: Optional[float] = None # None : pas de COMMIT (transaction annulée)
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            lock_wait_seconds = time.monotonic() - tx_start # Attente du verrou d'écriture (autres connexions, checkpoint)
+            for op_i, (description, operation, result_future, _, _) in enumerate(batch):
+                savepoint = f"kbw_{op_i}"
+                conn.execute(f"SAVEPOINT {savepoint};")
+                try:
+                    outcomes.append((result_future, True, operation(conn)))
+                    conn.execute(f"RELEASE {savepoint};")
+                except Exception as e_op:
+                    conn.execute(f"ROLLBACK TO {savepoint};")
+                    conn.execute(f"RELEASE {savepoint};")
+                    self.logger.error(f"KB_WRITER: Opération annulée pour '{description}': {e_op}")
+                    outcomes.append((result_future, False, e_op))
+            commit_start = time.monotonic()
+            conn.execute("COMMIT;")
+            commit_seconds = time.monotonic() - commit_start # COMMIT seul (fsync du WAL), hors verrou et opérations
+        except sqlite3.Error as e_tx:
+            self.logger.error(f"KB_WRITER: Échec transaction groupée ({len(batch)} opérations): {e_tx}", exc_info=True)
+            try: conn.execute("ROLLBACK;")
+            except sqlite3.Error: pass
+            outcomes = [(result_future, False, e_tx) for _, _, result_future, _, _ in batch]
+        transaction_seconds = time.monotonic() - tx_start
+
+        failed = 0
+        for result_future, ok, value in outcomes:
+            if result_future.done(): continue
+            if ok: result_future.set_result(value)
+            else:
+                failed += 1
+                result_future.set_exception(value)
+        with self._stats_lock:
+            self._transactions_total += 1
+            self._operations_total += len(batch)
+            self._operations_failed += failed
+            self._rows_estimated_total += batch_rows
+            self._transaction_seconds_total += transaction_seconds
+            self._commit_seconds_total += commit_seconds or 0.0
+            self._max_operations_per_tx = max(self._max_operations_per_tx, len(batch))
+            self._lock_wait_seconds_total += lock_wait_seconds
+            self._lock_wait_max_seconds = max(self._lock_wait_max_seconds, lock_wait_seconds)
+        if self.profiler:
+            self.profiler.record_stage_sample("db.writer_lock_wait", lock_wait_seconds)
+            self.profiler.record_stage_sample("db.writer_transaction", transaction_seconds)
+            if commit_seconds is not None:
+                self.profiler.record_stage_sample("db.writer_commit", commit_seconds)
+            for _, _, _, _, submit_mono in batch:
+                self.profiler.record_stage_sample("db.writer_queue_wait", tx_start - submit_mono)
+        self.logger.debug(f"KB_WRITER: TX commitée ({len(batch)} opérations, ~{batch_rows} lignes, {transaction_seconds * 1000:.1f} ms dont COMMIT {(commit_seconds or 0.0) * 1000:.1f} ms).")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "running": self.is_running(),
+                "synchronous": self.synchronous,
+                "max_batch_rows": self.max_batch_rows,
+                "max_latency_ms": round(self.max_latency_seconds * 1000, 2),
+                "queue_depth_now": self._requests.qsize(),
+                "transactions_total": self._transactions_total,
+                "operations_total": self._operations_total,
+                "operations_failed": self._operations_failed,
+                "max_operations_per_transaction": self._max_operations_per_tx,
+                "avg_operations_per_transaction": round(self._operations_total / self._transactions_total, 2) if self._transactions_total else 0.0,
+                "rows_per_second": round(self._rows_estimated_total / self._transaction_seconds_total, 2) if self._transaction_seconds_total > 0 else 0.0,
+                "commit_seconds_total": round(self._commit_seconds_total, 4),
+                "lock_wait_seconds_total": round(self._lock_wait_seconds_total, 4),
+                "lock_wait_max_ms": round(self._lock_wait_max_seconds * 1000, 2),
+            }
+
+class PipelineProfiler:
+    """
+    Instrumentation du pipeline de traitement.
+    - latences par étape (quantiles p50/p95/p99 sur les derniers échantillons, cumul total/nombre) ;
+      les attentes SQLite (verrou BEGIN IMMEDIATE, file de l'écrivain) sont des étapes "db.*" ;
+    - débit en documents/s et octets/s sur une fenêtre glissante ;
+    - profondeur de la file d'attente échantillonnée dans le temps ;
+    - profils cProfile d'une fraction des fichiers, dont seuls les N plus lents sont conservés.
+    Exporté dans generate_self_report et en fichier texte Prometheus ou en JSON-lines.
+    """
+    QUANTILES = (0.5, 0.95, 0.99)
+    # Étapes agrégées ou d'attente : exclues du calcul de la part de temps par étape du pipeline
+    _NON_STEP_PREFIXES = ("pipeline.", "queue.", "db.")
+
+    def __init__(self, samples_per_stage: int = 2048, throughput_window_seconds: float = 60.0, queue_samples_max: int = 720,
+                 cprofile_sample_rate: float = 0.0, cprofile_keep_slowest: int = 5, profiles_dir: Optional[Path] = None):
+        self.samples_per_stage = max(16, int(samples_per_stage))
+        self.throughput_window_seconds = max(1.0, float(throughput_window_seconds))
+        self.cprofile_sample_rate = min(1.0, max(0.0, float(cprofile_sample_rate)))
+        self.cprofile_keep_slowest = max(0, int(cprofile_keep_slowest))
+        self.profiles_dir = profiles_dir
+        self.logger = logging.getLogger(f"{MODULE_NAME}.PipelineProfiler")
+
+        self._lock = threading.Lock()
+        self._stage_samples: Dict[str, Deque[float]] = {}
+        self._stage_totals: Dict[str, List[float]] = {} # étape -> [nombre, somme des secondes]
+        self._documents_total = {"success": 0, "failure": 0}
+        self._bytes_total = 0
+        self._recent_documents: Deque[Tuple[float, int]] = deque() # (instant monotone, octets) dans la fenêtre
+        self._queue_samples: Deque[Tuple[str, int, int]] = deque(maxlen=max(1, int(queue_samples_max)))
+        self._slowest_profiles: List[Tuple[float, str, str, str]] = [] # tas min : (durée, fichier, chemin .prof, résumé)
+        # Un seul cProfile actif à la fois : depuis Python 3.12 (sys.monitoring), un second enable() lève ValueError
+        self._profile_slot = threading.Lock()
+        self._started_mono = time.monotonic()
+
+    # --- Collecte ---
+    def record_stage_sample(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._record_stage_sample_locked(stage, seconds)
+
+    def _record_stage_sample_locked(self, stage: str, seconds: float) -> None:
+        self._stage_samples.setdefault(stage, deque(maxlen=self.samples_per_stage)).append(seconds)
+        totals = self._stage_totals.setdefault(stage, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+
+    def record_document(self, stage_timings: Dict[str, float], size_bytes: Optional[int], success: bool,
+                        processing_seconds: float, queue_wait_seconds: Optional[float] = None) -> None:
+        now_mono = time.monotonic()
+        with self._lock:
+            for stage, duration in stage_timings.items():
+                self._record_stage_sample_locked(stage, duration)
+            self._record_stage_sample_locked("pipeline.total", processing_seconds)
+            if queue_wait_seconds is not None: # Mise en file -> début du worker (file + executor)
+                self._record_stage_sample_locked("queue.wait", queue_wait_seconds)
+            self._documents_total["success" if success else "failure"] += 1
+            self._bytes_total += size_bytes or 0
+            self._recent_documents.append((now_mono, size_bytes or 0))
+            self._trim_throughput_window_locked(now_mono)
+
+    def _trim_throughput_window_locked(self, now_mono: float) -> None:
+        while self._recent_documents and now_mono - self._recent_documents[0][0] > self.throughput_window_seconds:
+            self._recent_documents.popleft()
+
+    def record_queue_depth(self, queue_depth: int, active_tasks: int) -> None:
+        with self._lock:
+            self._queue_samples.append((datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), queue_depth, active_tasks))
+
+    def should_profile(self) -> bool:
+        """Tire le fichier selon le taux d'échantillonnage et réserve l'unique profil actif ; si True, appeler release_profile()."""
+        if not (self.cprofile_sample_rate > 0 and self.cprofile_keep_slowest > 0 and random.random() < self.cprofile_sample_rate):
+            return False
+        return self._profile_slot.acquire(blocking=False) # Un autre worker est déjà profilé : ce fichier ne l'est pas
+
+    def release_profile(self) -> None:
+        self._profile_slot.release()
+
+    def offer_profile(self, duration_seconds: float, filepath_str: str, profile: cProfile.Profile) -> None:
+        """Conserve le profil s'il fait partie des N fichiers profilés les plus lents (fichier .prof lisible par pstats/snakeviz)."""
+        with self._lock:
+            if len(self._slowest_profiles) >= self.cprofile_keep_slowest and duration_seconds <= self._slowest_profiles[0][0]:
+                return
+        summary_stream = io.StringIO()
+        pstats.Stats(profile, stream=summary_stream).sort_stats("cumulative").print_stats(15)
+        profile_path_str = ""
+        if self.profiles_dir:
+            try:
+                self.profiles_dir.mkdir(parents=True, exist_ok=True)
+                profile_path = self.profiles_dir / f"{int(time.time() * 1000)}_{Path(filepath_str).name}.prof"
+                profile.dump_stats(str(profile_path))
+                profile_path_str = str(profile_path)
+            except OSError as e_dump:
+                self.logger.warning(f"PROFILER: Impossible d'écrire le profil de {filepath_str}: {e_dump}")
+        evicted: Optional[Tuple[float, str, str, str]] = None
+        with self._lock:
+            entry = (duration_seconds, filepath_str, profile_path_str, summary_stream.getvalue())
+            if len(self._slowest_profiles) < self.cprofile_keep_slowest:
+                heapq.heappush(self._slowest_profiles, entry)
+            else:
+                evicted = heapq.heappushpop(self._slowest_profiles, entry)
+        if evicted and evicted[2]:
+            try: Path(evicted[2]).unlink()
+            except OSError: pass
+
+    # --- Restitution ---
+    @classmethod
+    def _quantiles(cls, samples: Iterable[float]) -> Dict[str, float]:
+        ordered = sorted(samples)
+        if not ordered:
+            return {}
+        return {f"p{int(q * 100)}": ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)] for q in cls.QUANTILES}
+
+    def snapshot(self) -> Dict[str, Any]:
+        now_mono = time.monotonic()
+        with self._lock:
+            self._trim_throughput_window_locked(now_mono)
+            stage_samples = {stage: list(samples) for stage, samples in self._stage_samples.items()}
+            stage_totals = {stage: tuple(totals) for stage, totals in self._stage_totals.items()}
+            documents_total = dict(self._documents_total)
+            bytes_total = self._bytes_total
+            recent_documents = list(self._recent_documents)
+            queue_samples = list(self._queue_samples)
+            slowest_profiles = sorted(self._slowest_profiles, reverse=True)
+
+        window_seconds = min(self.throughput_window_seconds, max(now_mono - self._started_mono, 1.0))
+        stages: Dict[str, Any] = {}
+        for stage, samples in sorted(stage_samples.items()):
+            count, total_seconds = stage_totals.get(stage, (0, 0.0))
+            stage_quantiles = self._quantiles(samples)
+            stages[stage] = {
+                "count": int(count), "total_seconds": round(total_seconds, 4),
+                "mean_ms": round(total_seconds / count * 1000, 2) if count else 0.0,
+                **{f"{name}_ms": round(value * 1000, 2) for name, value in stage_quantiles.items()},
+                "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+            }
+        step_totals = {stage: totals[1] for stage, totals in stage_totals.items() if not stage.startswith(self._NON_STEP_PREFIXES)}
+        step_time_sum = sum(step_totals.values())
+        time_share = {stage: round(total / step_time_sum, 4) for stage, total in sorted(step_totals.items(), key=lambda item: -item[1])} if step_time_sum else {}
+        queue_depths = [depth for _, depth, _ in queue_samples]
+        return {
+            "stages": stages,
+            "step_time_share": time_share,
+            "bottleneck_stage": next(iter(time_share), None),
+            "documents_total": documents_total,
+            "bytes_total": bytes_total,
+            "throughput": {
+                "window_seconds": round(window_seconds, 1),
+                "documents_per_second": round(len(recent_documents) / window_seconds, 3),
+                "bytes_per_second": round(sum(size for _, size in recent_documents) / window_seconds, 1),
+            },
+            "queue_depth": {
+                "current": queue_depths[-1] if queue_depths else None,
+                "max": max(queue_depths) if queue_depths else None,
+                "mean": round(sum(queue_depths) / len(queue_depths), 2) if queue_depths else None,
+                "recent_samples": [{"utc": utc, "depth": depth, "active_tasks": active} for utc, depth, active in queue_samples[-60:]],
+            },
+            "slowest_profiled_files": [
+                {"file": filepath_str, "duration_seconds": round(duration, 3), "profile_path": profile_path or None, "top_cumulative": summary}
+                for duration, filepath_str, profile_path, summary in slowest_profiles
+            ],
+        }
+
+    @staticmethod
+    def _prometheus_label(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    def to_prometheus_text(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        snapshot = snapshot or self.snapshot()
+        lines = ["# HELP cerveau_pipeline_stage_seconds Durée des étapes du pipeline (quantiles sur les derniers échantillons).",
+                 "# TYPE cerveau_pipeline_stage_seconds summary"]
+        for stage, stage_stats in snapshot["stages"].items():
+            stage_label = self._prometheus_label(stage)
+            for quantile in self.QUANTILES:
+                quantile_value = stage_stats.get(f"p{int(quantile * 100)}_ms")
+                if quantile_value is not None:
+                    lines.append(f'cerveau_pipeline_stage_seconds{{stage="{stage_label}",quantile="{quantile}"}} {quantile_value / 1000:.6f}')
+            lines.append(f'cerveau_pipeline_stage_seconds_sum{{stage="{stage_label}"}} {stage_stats["total_seconds"]:.6f}')
+            lines.append(f'cerveau_pipeline_stage_seconds_count{{stage="{stage_label}"}} {stage_stats["count"]}')
+        lines += ["# HELP cerveau_documents_processed_total Documents traités par statut.",
+                  "# TYPE cerveau_documents_processed_total counter"]
+        for status, count in snapshot["documents_total"].items():
+            lines.append(f'cerveau_documents_processed_total{{status="{status}"}} {count}')
+        lines += ["# HELP cerveau_bytes_processed_total Octets de documents traités.",
+                  "# TYPE cerveau_bytes_processed_total counter",
+                  f"cerveau_bytes_processed_total {snapshot['bytes_total']}",
+                  "# HELP cerveau_throughput_documents_per_second Débit en documents/s (fenêtre glissante).",
+                  "# TYPE cerveau_throughput_documents_per_second gauge",
+                  f"cerveau_throughput_documents_per_second {snapshot['throughput']['documents_per_second']}",
+                  "# HELP cerveau_throughput_bytes_per_second Débit en octets/s (fenêtre glissante).",
+                  "# TYPE cerveau_throughput_bytes_per_second gauge",
+                  f"cerveau_throughput_bytes_per_second {snapshot['throughput']['bytes_per_second']}"]
+        if snapshot["queue_depth"]["current"] is not None:
+            lines += ["# HELP cerveau_file_queue_depth Profondeur de la file d'attente (dernier échantillon).",
+                      "# TYPE cerveau_file_queue_depth gauge",
+                      f"cerveau_file_queue_depth {snapshot['queue_depth']['current']}",
+                      "# HELP cerveau_file_queue_depth_max Profondeur maximale sur l'historique conservé.",
+                      "# TYPE cerveau_file_queue_depth_max gauge",
+                      f"cerveau_file_queue_depth_max {snapshot['queue_depth']['max']}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, export_format: str, output_dir: Path) -> Optional[Path]:
+        """Écrit les métriques : cerveau_metrics.prom (remplacement atomique) ou ajout d'une ligne à cerveau_metrics.jsonl."""
+        export_format = str(export_format).lower()
+        if export_format not in ("prometheus", "jsonl"):
+            return None
+        snapshot = self.snapshot()
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            if export_format == "prometheus":
+                target_path = output_dir / "cerveau_metrics.prom"
+                temp_path = target_path.with_suffix(".prom.tmp")
+                temp_path.write_text(self.to_prometheus_text(snapshot), encoding="utf-8")
+                os.replace(temp_path, target_path) # node_exporter ne lit jamais un fichier à moitié écrit
+            else:
+                target_path = output_dir / "cerveau_metrics.jsonl"
+                snapshot_line = dict(snapshot, timestamp_utc=datetime.datetime.now(datetime.timezone.utc).isoformat(), pid=os.getpid())
+                snapshot_line["queue_depth"] = {k: v for k, v in snapshot["queue_depth"].items() if k != "recent_samples"}
+                snapshot_line["slowest_profiled_files"] = [{k: v for k, v in p.items() if k != "top_cumulative"} for p in snapshot["slowest_profiled_files"]]
+                with open(target_path, "a", encoding="utf-8") as f_metrics:
+                    f_metrics.write(json.dumps(snapshot_line, ensure_ascii=False) + "\n")
+            return target_path
+        except OSError as e_export:
+            self.logger.warning(f"PROFILER: Échec de l'export des métriques ({export_format}): {e_export}")
+            return None
+
+# --- Mode "process" : étapes NLP CPU-bound exécutées hors GIL ---
+# Étapes sans écriture SQLite, exécutables dans un processus enfant. L'embedding SBERT de
+# ComprehensionStep est recalculé dans le parent (modèle et micro-batcher non dupliqués).
+CPU_BOUND_STEP_NAMES: Tuple[str, ...] = ("ComprehensionStep", "AnalysisStep")
+PROCESS_TOKEN_LISTS: Tuple[str, ...] = ("tokens", "tokens_nltk") # Listes de tokens compactées au retour de l'enfant
+_NLP_PROCESS_STATE: Dict[str, Any] = {}
+
+def pack_process_tokens(linguistic_features: Dict[str, Any]) -> None:
+    """
+    Remplace les listes de tokens (un dict par token) par des colonnes compactes avant le retour au parent :
+    chaînes internées localement + blob pack_token_columns ('raw'). Une liste à plus de 256 POS reste telle quelle.
+    """
+    if not NUMPY_AVAILABLE: return
+    packed: Dict[str, Tuple[int, List[str], List[str], bytes]] = {}
+    for key in PROCESS_TOKEN_LISTS:
+        tokens = linguistic_features.get(key)
+        if not tokens: continue
+        strings: Dict[str, int] = {}
+        pos_tags: Dict[str, int] = {}
+        text_ids = [strings.setdefault(str(t_info.get('text', '')), len(strings)) for t_info in tokens]
+        lemma_ids = [strings.setdefault(str(t_info.get('lemma', '')), len(strings)) for t_info in tokens]
+        pos_ids = [pos_tags.setdefault(str(t_info.get('pos', '')), len(pos_tags)) for t_info in tokens]
+        if len(pos_tags) > 256: continue
+        packed[key] = (len(tokens), list(strings), list(pos_tags),
+                       KnowledgeBase.pack_token_columns(text_ids, lemma_ids, pos_ids, [token_flags(t) for t in tokens], "raw"))
+        del linguistic_features[key]
+    if packed:
+        linguistic_features["packed_tokens"] = packed
+
+def unpack_process_tokens(linguistic_features: Dict[str, Any]) -> None:
+    """Inverse de pack_process_tokens, au premier accès aux tokens dans le parent (sans effet sinon)."""
+    packed = linguistic_features.pop("packed_tokens", None)
+    if not packed: return
+    for key, (token_count, strings, pos_tags, data) in packed.items():
+        token_ids, lemma_ids, pos_ids, flags = KnowledgeBase.unpack_token_columns(data, token_count, "raw")
+        linguistic_features[key] = [
+            {"text": strings[t_id], "lemma": strings[l_id], "pos": pos_tags[p_id],
+             "is_stop": bool(flag & TOKEN_FLAG_STOP), "is_punct": bool(flag & TOKEN_FLAG_PUNCT),
+             "is_alpha": bool(flag & TOKEN_FLAG_ALPHA), "is_significant": bool(flag & TOKEN_FLAG_SIGNIFICANT)}
+            for t_id, l_id, p_id, flag in zip(token_ids.tolist(), lemma_ids.tolist(), pos_ids.tolist(), flags.tolist())
+        ]
+
+def _nlp_process_initializer(config: Dict[str, Any], kb_db_path: Optional[Path] = None,
+                             checksum_algorithm: str = "sha256") -> None:
+    """
+    Initialise un processus enfant : charge spaCy une seule fois et instancie les étapes CPU-bound.
+    En 'spawn', le module est ré-importé sans l'état construit par main() : les globales utiles sont réappliquées ici.
+    """
+    global APP_CONFIG, KB_DB_PATH, alma_core, ALMA_CORE_AVAILABLE
+    APP_CONFIG = config
+    KB_DB_PATH = kb_db_path # Lecture seule (IDF du corpus) ; les écritures restent dans le processus parent
+    configure_checksum_algorithm(checksum_algorithm)
+    # Pas d'algorithmes Core dans l'enfant : SBERT/Transformers restent dans le processus parent.
+    alma_core, ALMA_CORE_AVAILABLE = None, False
+    child_config = dict(config)
+    child_config["core_algorithms_config"] = {}
+    child_logger = logging.getLogger(f"{MODULE_NAME}.NlpProcess.{os.getpid()}")
+    kb_child = KnowledgeBase(child_config.get("nlp", DEFAULT_CONFIG["nlp"]), child_config.get("knowledge_base"))
+    step_classes: Dict[str, Type[PipelineStepInterface]] = {"ComprehensionStep": ComprehensionStep, "AnalysisStep": AnalysisStep}
+    steps: Dict[str, PipelineStepInterface] = {}
+    for step_name, step_cls in step_classes.items():
+        step_cfg = child_config.get("pipeline_steps", {}).get(step_name, {})
+        steps[step_name] = step_cls(step_config=step_cfg, global_config=child_config, kb_instance=kb_child,
+                                    text_improver_shared=None, knowledge_linker_shared=None)
+    _NLP_PROCESS_STATE.update({"config": child_config, "kb": kb_child, "steps": steps, "logger": child_logger})
+    child_logger.info(f"NLP_PROCESS: Processus {os.getpid()} prêt (spaCy prêt: {kb_child.is_spacy_ready}).")
+
+def _nlp_process_run(filepath_str: str, checksum: Optional[str], step_names: List[str]) -> Dict[str, Any]:
+    """
+    Exécute les étapes CPU-bound demandées dans le processus enfant et renvoie un résultat picklable réduit :
+    données ajoutées par les étapes seulement, tokens compactés (pack_process_tokens).
+    """
+    result: Dict[str, Any] = {"success": False, "failed_step": None, "error": None, "file_content": None,
+                              "encoding": None, "processed_data": {}, "stage_timings": {}}
+    if not _NLP_PROCESS_STATE:
+        result["error"] = "Processus NLP non initialisé."
+        return result
+    processor = FileProcessor(Path(filepath_str), _NLP_PROCESS_STATE["config"], [], _NLP_PROCESS_STATE["kb"], None) # type: ignore[arg-type]
+    processor.checksum = checksum
+    processor.processed_data['initial_checksum'] = checksum
+    for step_name in step_names:
+        step = _NLP_PROCESS_STATE["steps"].get(step_name)
+        if step is None: continue
+        start_time = time.perf_counter()
+        try:
+            ok = step.process(processor, None) # type: ignore[arg-type]
+        except Exception as e_step:
+            _NLP_PROCESS_STATE["logger"].error(f"NLP_PROCESS: Exception dans {step_name} pour {filepath_str}: {e_step}", exc_info=True)
+            ok = False
+            result["error"] = f"{type(e_step).__name__}: {e_step}"
+        finally:
+            result["stage_timings"][step_name] = time.perf_counter() - start_time
+        if not ok:
+            result["failed_step"] = step_name
+            break
+    else:
+        result["success"] = True
+    result["file_content"] = processor.file_content
+    result["encoding"] = processor.encoding
+    processor.processed_data.pop('initial_checksum', None) # Déjà connu du parent
+    pack_process_tokens(processor.processed_data.get('linguistic_features', {}))
+    result["processed_data"] = processor.processed_data
+    return result
+
 class CerveauService:
     def _reset_stats(self) -> Dict[str, Any]:
         return {
@@ -2143,11 +3705,21 @@ class CerveauService:
         self.executor: Optional[ThreadPoolExecutor] = None
         self.watchdog_observer: Optional[Any] = None
         self.scanner_thread: Optional[threading.Thread] = None
+        self.watcher_backend_active: Optional[str] = None # Ex: "native:InotifyObserver", "polling:PollingObserver"
 
         # Structures de données pour la gestion des fichiers
         self.file_queue: Deque[Dict[str, Any]] = deque() # Sera configurée avec maxlen dans _apply_config_settings
         self.processed_files_cache: Dict[str, str] = {}
         self.file_quarantine: Dict[str, Dict[str, Any]] = {}
+        self.queued_file_paths: set[str] = set() # Chemins présents dans file_queue (déduplication)
+        self.queued_file_paths_lock = threading.Lock()
+        # Manifeste (mtime_ns, taille) des fichiers déjà évalués, pour la réconciliation sans re-hachage
+        self.file_stat_manifest: Dict[str, Tuple[int, int]] = {}
+        self.file_stat_manifest_lock = threading.Lock()
+        # Manifeste persistant {chemin résolu: (inode, taille, mtime_ns, checksum)} chargé en bloc depuis la KB
+        self.file_manifest: Dict[str, Tuple[Optional[int], Optional[int], Optional[int], str]] = {}
+        self.file_manifest_loaded = False
+        self.file_manifest_lock = threading.Lock()
 
         # Suivi des tâches et statistiques
         self.active_tasks: Dict[Future, Tuple[str, float]] = {} # (filepath_str, submit_time_mono)
@@ -2180,6 +3752,10 @@ class CerveauService:
         self.pipeline_steps_instances: List[PipelineStepInterface] = []
         self.text_improver_instance: Optional[alma_core.TextImprover] = None
         self.knowledge_linker_instance: Optional[alma_core.KnowledgeLinker] = None
+        self.embedding_batcher: Optional[EmbeddingBatcher] = None
+        self.nlp_process_pool: Optional[ProcessPoolExecutor] = None # Mode "process" uniquement
+        self.kb_writer: Optional[KnowledgeBaseWriter] = None
+        self.pipeline_profiler: Optional[PipelineProfiler] = None
 
         # --- Séquence d'initialisation critique ---
         # 1. Adapter la configuration en fonction des ressources (modifie self.config)
@@ -2427,7 +4003,7 @@ class CerveauService:
         nlp_cfg_for_kb = self.config.get("nlp", DEFAULT_CONFIG.get("nlp", {})) # La config NLP adaptée
 
         # Créer l'instance de KnowledgeBase
-        self.kb_instance = KnowledgeBase(nlp_cfg_for_kb) # Passe la config NLP
+        self.kb_instance = KnowledgeBase(nlp_cfg_for_kb, kb_config_section) # Passe la config NLP et KB (mode de stockage des tokens)
         self.logger.info(f"Instance de KnowledgeBase créée. is_spacy_ready: {self.kb_instance.is_spacy_ready}")
 
         # Initialiser le schéma de la base de données SQLite (si activée)
@@ -2449,6 +4025,25 @@ class CerveauService:
         else:
             self.logger.warning("Base de données SQLite désactivée ou chemin KB_DB_PATH non configuré. KnowledgeBase n'utilisera pas SQLite. Certaines fonctionnalités Core seront limitées.")
 
+        # --- 2a. Tables du stockage compact des tokens (créées aussi sur les bases existantes) ---
+        if use_sqlite_db_cfg and KB_DB_PATH:
+            try:
+                with sqlite3.connect(str(KB_DB_PATH), timeout=kb_config_section.get("db_timeout_seconds", DEFAULT_CONFIG["knowledge_base"]["db_timeout_seconds"])) as token_schema_conn:
+                    KnowledgeBase.ensure_token_storage_tables(token_schema_conn)
+                    if self.kb_instance.corpus_tfidf_enabled:
+                        KnowledgeBase.ensure_corpus_tfidf_tables(token_schema_conn)
+                    else:
+                        KnowledgeBase.invalidate_corpus_document_frequencies(token_schema_conn)
+                token_schema_conn.close()
+                self.logger.info(f"TOKEN_STORAGE: mode '{self.kb_instance.token_storage}' (codec: {self.kb_instance.token_storage_codec}).")
+            except sqlite3.Error as e_token_schema:
+                self.logger.error(f"TOKEN_STORAGE: Échec de la création des tables du stockage compact: {e_token_schema}", exc_info=True)
+
+        # --- 2b. Checksums et manifeste des fichiers (évite de re-hacher les fichiers inchangés) ---
+        checksum_algorithm_effective = configure_checksum_algorithm(kb_config_section.get("checksum_algorithm", DEFAULT_CONFIG["knowledge_base"]["checksum_algorithm"]))
+        self.logger.info(f"Algorithme de checksum: {checksum_algorithm_effective}.")
+        self._load_file_manifest(kb_config_section, use_sqlite_db_cfg)
+
 
         # --- 3. Initialisation des Instances Partagées de Core (TextImprover, KnowledgeLinker) ---
         # Doit être APRÈS l'initialisation de self.kb_instance (pour self.kb_instance.nlp_instance)
@@ -2468,7 +4063,7 @@ class CerveauService:
                     self.text_improver_instance = alma_core.TextImprover(
                         config=ti_yaml_cfg,
                         kb_instance=self.kb_instance,
-                        nlp_instance=nlp_instance_for_core,
+                        nlp_spacy_instance=nlp_instance_for_core,
                         parent_logger=self.logger
                     )
                     self.logger.info("Instance partagée de TextImprover créée avec succès.")
@@ -2476,11 +4071,14 @@ class CerveauService:
                     self.logger.error(f"Erreur lors de l'initialisation de l'instance partagée de TextImprover: {e_ti_init}", exc_info=True)
 
             if kl_yaml_cfg:
+                # L'index FAISS persistant est rangé à côté de la KB SQLite sauf chemin explicite
+                if not kl_yaml_cfg.get("faiss_index_path") and KB_DB_PATH and use_sqlite_db_cfg:
+                    kl_yaml_cfg = {**kl_yaml_cfg, "faiss_index_path": str(KB_DB_PATH.with_suffix(".faiss"))}
                 try:
                     self.knowledge_linker_instance = alma_core.KnowledgeLinker(
                         config=kl_yaml_cfg,
                         kb_instance=self.kb_instance,
-                        nlp_instance=nlp_instance_for_core,
+                        nlp_spacy_instance=nlp_instance_for_core,
                         parent_logger=self.logger
                     )
                     self.logger.info("Instance partagée de KnowledgeLinker créée avec succès.")
@@ -2490,6 +4088,56 @@ class CerveauService:
             self.logger.warning("Module alma_core non importé ou non disponible. Les instances partagées de TextImprover/KnowledgeLinker ne seront pas créées.")
 
 
+        # --- 3b. Micro-batcher SBERT partagé (regroupe les embeddings de tous les workers) ---
+        if self.embedding_batcher:
+            self.embedding_batcher.stop()
+            self.embedding_batcher = None
+        service_params_for_batcher = self.config.get("service_params", DEFAULT_CONFIG["service_params"])
+        if service_params_for_batcher.get("embedding_batcher_enabled", True) and \
+           self.knowledge_linker_instance and self.knowledge_linker_instance.sbert_model:
+            self.embedding_batcher = EmbeddingBatcher(
+                self.knowledge_linker_instance.sbert_model,
+                max_batch_size=service_params_for_batcher.get("embedding_batch_max_size", 32),
+                max_wait_ms=service_params_for_batcher.get("embedding_batch_max_wait_ms", 20),
+                result_timeout_seconds=service_params_for_batcher.get("task_timeout_seconds", 300)
+            )
+            self.embedding_batcher.start()
+
+        # --- 3b'. Profileur du pipeline (avant l'écrivain KB, qui y rapporte ses attentes de verrou) ---
+        profiling_cfg = self.config.get("profiling", DEFAULT_CONFIG["profiling"])
+        self.pipeline_profiler = None
+        if profiling_cfg.get("enabled", True):
+            self.pipeline_profiler = PipelineProfiler(
+                samples_per_stage=profiling_cfg.get("samples_per_stage", 2048),
+                throughput_window_seconds=profiling_cfg.get("throughput_window_seconds", 60),
+                queue_samples_max=profiling_cfg.get("queue_samples_max", 720),
+                cprofile_sample_rate=profiling_cfg.get("cprofile_sample_rate", 0.0),
+                cprofile_keep_slowest=profiling_cfg.get("cprofile_keep_slowest", 5),
+                profiles_dir=(LOG_DIR / "profiles") if LOG_DIR else None
+            )
+
+        # --- 3c. Écrivain SQLite unique (seule connexion en écriture, transactions groupées) ---
+        if self.kb_writer:
+            self.kb_writer.stop()
+            self.kb_writer = None
+        if use_sqlite_db_cfg and KB_DB_PATH and kb_config_section.get("db_writer_enabled", True):
+            try:
+                self.kb_writer = KnowledgeBaseWriter(
+                    KB_DB_PATH, self.kb_instance,
+                    db_timeout_seconds=kb_config_section.get("db_timeout_seconds", DEFAULT_CONFIG["knowledge_base"]["db_timeout_seconds"]),
+                    max_batch_rows=kb_config_section.get("db_writer_max_batch_rows", 20000),
+                    max_latency_ms=kb_config_section.get("db_writer_max_latency_ms", 50),
+                    synchronous=kb_config_section.get("db_synchronous", "NORMAL"),
+                    cache_size_kib=kb_config_section.get("db_cache_size_kib", 65536),
+                    mmap_size_mb=kb_config_section.get("db_mmap_size_mb", 256),
+                    result_timeout_seconds=self.config.get("service_params", {}).get("task_timeout_seconds", 300),
+                    profiler=self.pipeline_profiler
+                )
+                self.kb_writer.start()
+            except Exception as e_writer:
+                self.logger.error(f"KB_WRITER: Échec du démarrage ({e_writer}). Repli sur les transactions par worker.", exc_info=True)
+                self.kb_writer = None
+
         # --- 4. Initialisation des Étapes du Pipeline (qui utiliseront les instances partagées) ---
         self.pipeline_steps_instances = self._initialize_pipeline_steps()
         self.logger.info(f"Étapes du pipeline initialisées: {[s.__class__.__name__ for s in self.pipeline_steps_instances]}")
@@ -2522,6 +4170,8 @@ class CerveauService:
 
                 self.knowledge_linker_instance.populate_faiss_index_from_kb(temp_conn_faiss)
                 # La méthode populate_faiss_index_from_kb doit loguer le nombre d'embeddings chargés.
+                # Choix IVF/HNSW selon la taille de l'index et la RAM ; l'entraînement se fait en tâche de fond
+                self.knowledge_linker_instance.configure_ann_tier(self.system_resources)
 
             except sqlite3.OperationalError as e_op_faiss:
                  if "unable to open database file" in str(e_op_faiss).lower() or \
@@ -2586,7 +4236,8 @@ class CerveauService:
                             kb_instance=self.kb_instance, # Peut être None si DB désactivée
                                 """TODO: Add docstring."""
                             text_improver_shared=self.text_improver_instance,    # Instance partagée
-                            knowledge_linker_shared=self.knowledge_linker_instance # Instance partagée
+                            knowledge_linker_shared=self.knowledge_linker_instance, # Instance partagée
+                            embedding_batcher_shared=self.embedding_batcher # Instance partagée (peut être None)
                         )
                         steps.append(step_instance)
                         self.logger.debug(f"Étape du pipeline '{step_name}' initialisée et ajoutée avec succès.")
@@ -2632,6 +4283,37 @@ class CerveauService:
     """TODO: Add docstring."""
         self.executor = ThreadPoolExecutor(max_workers=effective_max_workers, thread_name_prefix="CerveauWorker")
         self.logger.info(f"ThreadPoolExecutor (ré)initialisé avec max_workers={effective_max_workers}.")
+        self._initialize_nlp_process_pool(effective_max_workers)
+
+    def _initialize_nlp_process_pool(self, default_workers: int) -> None:
+        """
+        Mode "process" : crée le ProcessPoolExecutor des étapes NLP CPU-bound.
+        Les threads CerveauWorker restent les orchestrateurs (DB, SBERT) et y délèguent le travail spaCy/TF-IDF.
+        """
+        if self.nlp_process_pool:
+            self.logger.info("Arrêt de l'ancien pool de processus NLP...")
+            try: self.nlp_process_pool.shutdown(wait=True, cancel_futures=True)
+            except Exception as e_pool_stop: self.logger.warning(f"Erreur arrêt ancien pool de processus NLP: {e_pool_stop}")
+            self.nlp_process_pool = None
+
+        service_params_cfg = self.config.get("service_params", DEFAULT_CONFIG.get("service_params", {}))
+        executor_mode = str(service_params_cfg.get("executor_mode", "thread")).lower()
+        if executor_mode != "process":
+            if executor_mode != "thread":
+                self.logger.warning(f"executor_mode '{executor_mode}' inconnu. Utilisation du mode 'thread'.")
+            return
+
+        pool_workers = max(1, int(service_params_cfg.get("process_pool_workers") or default_workers))
+        start_method = service_params_cfg.get("process_start_method", "spawn")
+        try:
+            mp_context = multiprocessing.get_context(start_method)
+            self.nlp_process_pool = ProcessPoolExecutor(max_workers=pool_workers, mp_context=mp_context,
+                                                        initializer=_nlp_process_initializer,
+                                                        initargs=(self.config, KB_DB_PATH, CHECKSUM_ALGORITHM))
+            self.logger.info(f"Pool de processus NLP initialisé (workers={pool_workers}, start_method={start_method}, étapes={list(CPU_BOUND_STEP_NAMES)}).")
+        except Exception as e_pool:
+            self.logger.error(f"Échec création du pool de processus NLP ({e_pool}). Repli sur le mode 'thread'.", exc_info=True)
+            self.nlp_process_pool = None
 
     def _setup_signal_handlers(self) -> None: # Inchangé
         signal.signal(signal.SIGINT, self._handle_signal)
@@ -2679,7 +4361,7 @@ class CerveauService:
     """TODO: Add docstring."""
         self.logger.info("Configuration rechargée et appliquée avec succès.")
 
-    class AlmaKnowledgeEventHandler(FileSystemEventHandler): # FileSystemEventHandler doit être importé globalement
+    class AlmaKnowledgeEventHandler(FileSystemEventHandler or object): # type: ignore[misc] # object si watchdog absent
         def __init__(self, service_instance: 'CerveauService'):
             super().__init__()
             self.service_ref = service_instance
@@ -2691,217 +4373,306 @@ class CerveauService:
             if event.is_directory:
                 return
 
-            filepath_to_process: Optional[Path] = None
-            event_description = ""
-
-            if event.event_type == 'created':
-                filepath_to_process = Path(event.src_path)
-                event_description = "créé"
-            elif event.event_type == 'modified':
-                filepath_to_process = Path(event.src_path)
-                event_description = "modifié"
+            if event.event_type in ('created', 'modified', 'closed'):
+                self.service_ref._handle_changed_path(Path(event.src_path), "créé" if event.event_type == 'created' else "modifié")
             elif event.event_type == 'moved':
                 source_path = Path(event.src_path)
                 dest_path = Path(event.dest_path)
                 self.event_logger.info(f"WATCHDOG_EVENT: Fichier déplacé de '{source_path}' vers '{dest_path}'.")
+                self.service_ref._forget_file_stat(source_path)
                 self.service_ref._handle_deleted_file(source_path)
-                filepath_to_process = dest_path
-                event_description = f"déplacé vers {dest_path}"
+                self.service_ref._handle_changed_path(dest_path, f"déplacé depuis {source_path}")
             elif event.event_type == 'deleted':
                 deleted_path = Path(event.src_path)
                 self.event_logger.info(f"WATCHDOG_EVENT: Fichier '{deleted_path}' supprimé, traitement de suppression enclenché.")
+                self.service_ref._forget_file_stat(deleted_path)
                 self.service_ref._handle_deleted_file(deleted_path)
-                return
-
-            if filepath_to_process:
-                # Utiliser les attributs d'exclusion de l'instance CerveauService (service_ref)
-                path_parts_lower_wd = {str(part).lower() for part in filepath_to_process.parts}
-                is_excluded_by_part_wd = any(excluded_part in path_parts_lower_wd for excluded_part in self.service_ref.excluded_dir_parts)
-
-                is_excluded_by_prefix_wd = False
-                for part_comp_str in map(str, filepath_to_process.parts):
-                    if any(part_comp_str.startswith(prefix) for prefix in self.service_ref.excluded_dir_prefixes):
-                        is_excluded_by_prefix_wd = True
-                        break
-
-                if is_excluded_by_part_wd or is_excluded_by_prefix_wd:
-                    self.event_logger.debug(f"WATCHDOG_SKIP_EXCLUDED: Événement pour '{filepath_to_process}' ignoré (exclu).")
-                    return
 
-                self.event_logger.info(f"WATCHDOG_EVENT_DETECTED: Fichier '{filepath_to_process}' {event_description}.")
-                if self.service_ref._is_file_processable(filepath_to_process):
-                    self.service_ref.enqueue_file(filepath_to_process)
+    def _is_path_excluded(self, filepath: Path) -> bool:
+        """Exclusion par composant de chemin (excluded_dir_parts) ou par préfixe (excluded_dir_prefixes), relatif à Connaissance."""
+        try:
+            parts_to_check = filepath.relative_to(CONNAISSANCE_DIR).parts
+        except ValueError:
+            parts_to_check = filepath.parts
+        for part_str in parts_to_check:
+            if part_str.lower() in self.excluded_dir_parts:
+                return True
+            if any(part_str.startswith(prefix) for prefix in self.excluded_dir_prefixes):
+                return True
+        return False
+
+    def _is_dir_name_excluded(self, dir_name: str) -> bool:
+        return dir_name.lower() in self.excluded_dir_parts or any(dir_name.startswith(prefix) for prefix in self.excluded_dir_prefixes)
+
+    def enqueue_file(self, filepath: Path) -> bool:
+        """Ajoute un fichier à la file de traitement (sans doublon). Retourne False si déjà en file."""
+        filepath_str = str(filepath)
+        with self.queued_file_paths_lock:
+            if filepath_str in self.queued_file_paths:
+                self.logger.debug(f"ENQUEUE_SKIP_DUPLICATE: '{filepath_str}' déjà en file.")
+                return False
+            if self.file_queue.maxlen is not None and len(self.file_queue) >= self.file_queue.maxlen:
+                self.logger.warning(f"ENQUEUE_SKIP_FULL: File pleine ({self.file_queue.maxlen}). '{filepath_str}' sera repris par la réconciliation.")
+                self._forget_file_stat(filepath)
+                return False
+            self.queued_file_paths.add(filepath_str)
+            self.file_queue.append({"path": filepath_str, "submit_time_mono": time.monotonic()})
+        self.logger.info(f"ENQUEUE: '{filepath_str}' ajouté à la file (taille: {len(self.file_queue)}).")
+        return True
 
-            def _init_file_monitoring(self) -> None:
-                self.logger.info("INIT_FILE_MONITORING: Début de l'initialisation de la surveillance des fichiers...")
+    def _record_file_stat(self, filepath: Path, st: os.stat_result) -> None:
+        with self.file_stat_manifest_lock:
+            self.file_stat_manifest[str(filepath)] = (st.st_mtime_ns, st.st_size)
 
-                # --- VALIDATION ET CRÉATION DU RÉPERTOIRE CONNAISSANCE ---
-                # CONNAISSANCE_DIR est une variable globale initialisée à partir de la config.
-                if not CONNAISSANCE_DIR: # Au cas où CONNAISSANCE_DIR serait None (ne devrait pas arriver)
-                    err_msg_no_connaissance_path = "Le chemin du répertoire Connaissance (CONNAISSANCE_DIR) n'est pas défini."
-                    self.logger.critical(f"INIT_FILE_MONITORING: {err_msg_no_connaissance_path}")
-                    raise FileNotFoundError(err_msg_no_connaissance_path)
-
-                if not CONNAISSANCE_DIR.exists():
-                    self.logger.info(f"INIT_FILE_MONITORING: Répertoire Connaissance '{CONNAISSANCE_DIR}' non trouvé. Tentative de création...")
-                    try:
-                        CONNAISSANCE_DIR.mkdir(parents=True, exist_ok=True)
-                        self.logger.info(f"INIT_FILE_MONITORING: Répertoire Connaissance créé avec succès : {CONNAISSANCE_DIR}")
-                    except OSError as e_mkdir_connaissance:
-                        self.logger.critical(f"INIT_FILE_MONITORING: Impossible de créer le répertoire Connaissance '{CONNAISSANCE_DIR}': {e_mkdir_connaissance}. Le service ne peut pas surveiller les fichiers.", exc_info=True)
-                        raise FileNotFoundError(f"Répertoire Connaissance '{CONNAISSANCE_DIR}' non trouvé et impossible à créer.") from e_mkdir_connaissance
-                elif not CONNAISSANCE_DIR.is_dir():
-                    err_msg_not_dir = f"Le chemin spécifié pour Connaissance '{CONNAISSANCE_DIR}' existe mais n'est pas un répertoire."
-                    self.logger.critical(f"INIT_FILE_MONITORING: {err_msg_not_dir}")
-                    raise NotADirectoryError(err_msg_not_dir)
-                else:
-                    self.logger.debug(f"INIT_FILE_MONITORING: Répertoire Connaissance '{CONNAISSANCE_DIR}' validé.")
+    def _forget_file_stat(self, filepath: Path) -> None:
+        with self.file_stat_manifest_lock:
+            self.file_stat_manifest.pop(str(filepath), None)
 
+    def _handle_changed_path(self, filepath: Path, event_description: str) -> None:
+        """Chemin créé/modifié/déplacé signalé par le watcher : filtre d'exclusion puis évaluation."""
+        if self._is_path_excluded(filepath):
+            self.logger.debug(f"WATCHDOG_SKIP_EXCLUDED: Événement pour '{filepath}' ignoré (exclu).")
+            return
+        try:
+            st = filepath.stat()
+        except OSError:
+            return # Fichier déjà disparu (fichier temporaire d'éditeur, etc.)
+        with self.file_stat_manifest_lock:
+            unchanged = self.file_stat_manifest.get(str(filepath)) == (st.st_mtime_ns, st.st_size)
+        if unchanged:
+            return # Événements 'modified' répétés pour une même écriture
+        self.logger.info(f"WATCHDOG_EVENT_DETECTED: Fichier '{filepath}' {event_description}.")
+        self._record_file_stat(filepath, st)
+        if self._is_file_processable(filepath):
+            self.enqueue_file(filepath)
+
+    def _initialize_file_monitoring(self) -> None:
+        self.logger.info("INIT_FILE_MONITORING: Début de l'initialisation de la surveillance des fichiers...")
+
+        # --- VALIDATION ET CRÉATION DU RÉPERTOIRE CONNAISSANCE ---
+        # CONNAISSANCE_DIR est une variable globale initialisée à partir de la config.
+        if not CONNAISSANCE_DIR: # Au cas où CONNAISSANCE_DIR serait None (ne devrait pas arriver)
+            err_msg_no_connaissance_path = "Le chemin du répertoire Connaissance (CONNAISSANCE_DIR) n'est pas défini."
+            self.logger.critical(f"INIT_FILE_MONITORING: {err_msg_no_connaissance_path}")
+            raise FileNotFoundError(err_msg_no_connaissance_path)
+
+        if not CONNAISSANCE_DIR.exists():
+            self.logger.info(f"INIT_FILE_MONITORING: Répertoire Connaissance '{CONNAISSANCE_DIR}' non trouvé. Tentative de création...")
+            try:
+                CONNAISSANCE_DIR.mkdir(parents=True, exist_ok=True)
+                self.logger.info(f"INIT_FILE_MONITORING: Répertoire Connaissance créé avec succès : {CONNAISSANCE_DIR}")
+            except OSError as e_mkdir_connaissance:
+                self.logger.critical(f"INIT_FILE_MONITORING: Impossible de créer le répertoire Connaissance '{CONNAISSANCE_DIR}': {e_mkdir_connaissance}. Le service ne peut pas surveiller les fichiers.", exc_info=True)
+                raise FileNotFoundError(f"Répertoire Connaissance '{CONNAISSANCE_DIR}' non trouvé et impossible à créer.") from e_mkdir_connaissance
+        elif not CONNAISSANCE_DIR.is_dir():
+            err_msg_not_dir = f"Le chemin spécifié pour Connaissance '{CONNAISSANCE_DIR}' existe mais n'est pas un répertoire."
+            self.logger.critical(f"INIT_FILE_MONITORING: {err_msg_not_dir}")
+            raise NotADirectoryError(err_msg_not_dir)
+        else:
+            self.logger.debug(f"INIT_FILE_MONITORING: Répertoire Connaissance '{CONNAISSANCE_DIR}' validé.")
 
-                # --- 1. SCAN INITIAL DU RÉPERTOIRE CONNAISSANCE ---
-                self.logger.info("INIT_FILE_MONITORING: Lancement du scan initial du répertoire Connaissance...")
-                initial_scan_added_count = 0
-                try:
-                    for filepath_obj in CONNAISSANCE_DIR.rglob('*'): # rglob pour récursif
-                        if self.running.is_set():
-                            self.logger.info("INIT_FILE_MONITORING: Arrêt du service demandé pendant le scan initial. Scan interrompu.")
-                            break
-
-                        # Logique d'exclusion (utilise les attributs d'instance)
-                        path_parts_as_str_lower = {str(part).lower() for part in filepath_obj.parts}
-                        is_excluded_by_part = any(excluded_part in path_parts_as_str_lower for excluded_part in self.excluded_dir_parts)
-                        is_excluded_by_prefix = False
-                        for part_component_str in map(str, filepath_obj.parts):
-                            if any(part_component_str.startswith(prefix) for prefix in self.excluded_dir_prefixes):
-                                is_excluded_by_prefix = True
-                                break
-                        if is_excluded_by_part or is_excluded_by_prefix:
-                            self.logger.debug(f"INITIAL_SCAN_SKIP_EXCLUDED: Ignoré (exclu): {filepath_obj} (part_match={is_excluded_by_part}, prefix_match={is_excluded_by_prefix})")
-                            continue
-                        # self.logger.debug(f"INITIAL_SCAN_CHECK: Vérification de {filepath_obj}") # Peut être trop verbeux
-                        if filepath_obj.is_file():
-                            if self._is_file_processable(filepath_obj): # Gère les extensions et autres filtres
-                                self.enqueue_file(filepath_obj)
-                                initial_scan_added_count += 1
-                    self.logger.info(f"INIT_FILE_MONITORING: Scan initial terminé. {initial_scan_added_count} fichiers potentiellement ajoutés à la file d'attente.")
-                except PermissionError as e_perm_scan:
-                    self.logger.error(f"INIT_FILE_MONITORING: Erreur de permission lors du scan initial de '{CONNAISSANCE_DIR}': {e_perm_scan}. Vérifiez les droits d'accès.", exc_info=False)
-                except Exception as e_initial_scan_generic:
-                    self.logger.error(f"INIT_FILE_MONITORING: Erreur inattendue durant le scan initial de '{CONNAISSANCE_DIR}': {e_initial_scan_generic}", exc_info=True)
-
-
-            # --- 2. MISE EN PLACE DE WATCHDOG (si activé et disponible) ---
-            service_params_cfg = self.config.get("service_params", DEFAULT_CONFIG.get("service_params", {}))
-            watchdog_should_be_enabled_in_config = service_params_cfg.get("watchdog_enabled", True)
-
-            if watchdog_should_be_enabled_in_config and WATCHDOG_AVAILABLE: # WATCHDOG_AVAILABLE est la globale
-                self.logger.info("INIT_FILE_MONITORING: Tentative d'initialisation/réinitialisation de Watchdog...")
-                try:
-                    # Les imports de Observer et FileSystemEventHandler sont au niveau du module cerveau.py
-                    # et WATCHDOG_AVAILABLE confirme leur succès.
+        # --- 1. MISE EN PLACE DU WATCHER (avant le scan initial pour ne rien manquer entre les deux) ---
+        self._start_watcher_backend()
 
-                    # Arrêter et nettoyer l'ancien observer s'il existe et est en vie
-                    if self.watchdog_observer and self.watchdog_observer.is_alive():
-                        self.logger.debug("INIT_FILE_MONITORING: Arrêt de l'ancien observer Watchdog...")
-                        try:
-                            self.watchdog_observer.stop()
-                            self.watchdog_observer.join(timeout=2.0)
-                            if self.watchdog_observer.is_alive():
-                                """TODO: Add docstring."""
-                                self.logger.warning("INIT_FILE_MONITORING: L'ancien observer Watchdog n'a pas pu être arrêté dans le délai.")
-                            else:
-                                self.logger.debug("INIT_FILE_MONITORING: Ancien observer Watchdog arrêté avec succès.")
-                        except Exception as e_old_wd_stop_cleanup: # Attraper toute exception lors de l'arrêt
-                            self.logger.warning(f"INIT_FILE_MONITORING: Erreur lors de l'arrêt de l'ancien observer Watchdog: {e_old_wd_stop_cleanup}", exc_info=False)
-
-                    # Observer et FileSystemEventHandler sont les variables globales définies en haut du script
-                    if Observer and FileSystemEventHandler: # Vérifier qu'ils ne sont pas None
-                        self.watchdog_observer = Observer()
-                        event_handler_instance = self.AlmaKnowledgeEventHandler(self)
-                        self.watchdog_observer.schedule(event_handler_instance, str(CONNAISSANCE_DIR), recursive=True)
-                        self.watchdog_observer.start()
-                        self.logger.info(f"INIT_FILE_MONITORING: Surveillance Watchdog de '{CONNAISSANCE_DIR}' (ré)activée avec succès.")
-                    else:
-                        self.logger.error("INIT_FILE_MONITORING: Observer ou FileSystemEventHandler non disponibles (None) malgré WATCHDOG_AVAILABLE=True. Incohérence.")
-                        self.config.get("service_params", {})["watchdog_enabled"] = False
+        # --- 2. SCAN INITIAL = première réconciliation (manifeste vide : tout est évalué une fois) ---
+        if not self.file_stat_manifest:
+            self.logger.info("INIT_FILE_MONITORING: Lancement du scan initial du répertoire Connaissance...")
+            initial_stats = self._reconcile_file_tree()
+            self.logger.info(f"INIT_FILE_MONITORING: Scan initial terminé. {initial_stats['enqueued']} fichiers ajoutés à la file d'attente ({initial_stats['seen']} vus).")
 
+        # --- 3. LANCEMENT DE LA RÉCONCILIATION PÉRIODIQUE ---
+        # Toujours lancée : rattrape les événements perdus (débordement inotify, montages réseau, arrêt du service).
+        if self.scanner_thread and self.scanner_thread.is_alive():
+            self.logger.info("INIT_FILE_MONITORING: Un thread de réconciliation périodique est déjà actif. Il continuera.")
+        elif not self.running.is_set(): # Ne pas lancer si le service est en train de s'arrêter
+            self.logger.info(f"INIT_FILE_MONITORING: Activation du thread de réconciliation périodique (intervalle: {self._current_reconcile_interval()}s).")
+            try:
+                self.scanner_thread = threading.Thread(target=self._periodic_scan, daemon=True, name="PeriodicScanner")
+                self.scanner_thread.start()
+                self.logger.info("INIT_FILE_MONITORING: Thread de réconciliation périodique démarré.")
+            except Exception as e_start_scanner:
+                self.logger.error(f"INIT_FILE_MONITORING: Échec du démarrage du thread de réconciliation périodique: {e_start_scanner}", exc_info=True)
+        else:
+            self.logger.info("INIT_FILE_MONITORING: Service en cours d'arrêt, lancement de la réconciliation périodique annulé.")
 
-                except Exception as e_wd_init_fatal: # Attraper toute exception lors de l'init de Watchdog
-                    self.logger.error(f"INIT_FILE_MONITORING: Erreur critique lors de l'initialisation de Watchdog: {e_wd_init_fatal}. Passage au scan périodique uniquement.", exc_info=True)
-                    # Mettre à jour la config en mémoire pour refléter que watchdog n'est pas utilisé
-                    self.config.get("service_params", {})["watchdog_enabled"] = False
+        self.logger.info("INIT_FILE_MONITORING: Initialisation de la surveillance des fichiers terminée.")
 
-            elif watchdog_should_be_enabled_in_config and not WATCHDOG_AVAILABLE:
-                self.logger.warning("INIT_FILE_MONITORING: Watchdog activé dans config mais non disponible globalement (échec import initial). Scan périodique sera utilisé.")
-                self.config.get("service_params", {})["watchdog_enabled"] = False # Mettre à jour en mémoire
-            else: # Watchdog désactivé dans la config
-                self.logger.info("INIT_FILE_MONITORING: Watchdog désactivé dans la configuration. Le scan périodique sera le principal mécanisme de détection en temps réel.")
+    def _start_watcher_backend(self) -> None:
+        """
+        Démarre le watcher événementiel selon service_params.watcher_backend :
+        "auto" (Observer natif = inotify sous Linux, repli polling), "inotify" (natif seul), "polling", "none".
+        """
+        service_params_cfg = self.config.get("service_params", DEFAULT_CONFIG.get("service_params", {}))
+        backend_cfg = str(service_params_cfg.get("watcher_backend", "auto")).lower()
+        self.watcher_backend_active = None
 
+        # Arrêter et nettoyer l'ancien observer s'il existe et est en vie
+        if self.watchdog_observer and self.watchdog_observer.is_alive():
+            self.logger.debug("INIT_FILE_MONITORING: Arrêt de l'ancien observer Watchdog...")
+            try:
+                self.watchdog_observer.stop()
+                self.watchdog_observer.join(timeout=2.0)
+                if self.watchdog_observer.is_alive():
+                    self.logger.warning("INIT_FILE_MONITORING: L'ancien observer Watchdog n'a pas pu être arrêté dans le délai.")
+            except Exception as e_old_wd_stop_cleanup:
+                self.logger.warning(f"INIT_FILE_MONITORING: Erreur lors de l'arrêt de l'ancien observer Watchdog: {e_old_wd_stop_cleanup}", exc_info=False)
+        self.watchdog_observer = None
 
-            # --- 3. LANCEMENT DU SCAN PÉRIODIQUE ---
-            # Le scan périodique est toujours lancé. Il sert de fallback robuste et attrape
-            # les événements potentiellement manqués par Watchdog ou les changements survenus
-            # lorsque le service était arrêté.
-            scan_interval_cfg = service_params_cfg.get("file_scan_interval_seconds", DEFAULT_CONFIG["service_params"]["file_scan_interval_seconds"])
+        if not service_params_cfg.get("watchdog_enabled", True) or backend_cfg == "none":
+            self.logger.info("INIT_FILE_MONITORING: Watcher désactivé dans la configuration. La réconciliation périodique sera le seul mécanisme de détection.")
+            return
+        if not WATCHDOG_AVAILABLE or not Observer:
+            self.logger.warning("INIT_FILE_MONITORING: Watchdog activé dans config mais non disponible globalement (échec import initial). Réconciliation périodique uniquement.")
+            self.config.get("service_params", {})["watchdog_enabled"] = False # Mettre à jour en mémoire
+            return
 
-            if self.scanner_thread and self.scanner_thread.is_alive():
-                self.logger.info("INIT_FILE_MONITORING: Un thread de scan périodique est déjà actif. Il continuera.")
-                # La boucle _periodic_scan lit l'intervalle à chaque itération, donc elle s'adaptera
-                # si l'intervalle change via un reload_configuration.
-                    """TODO: Add docstring."""
-            elif not self.running.is_set(): # Ne pas lancer si le service est en train de s'arrêter
-                self.logger.info(f"INIT_FILE_MONITORING: Activation du thread de scan périodique (intervalle: {scan_interval_cfg}s).")
-                try:
-                    self.scanner_thread = threading.Thread(target=self._periodic_scan, daemon=True, name="PeriodicScanner")
-                    self.scanner_thread.start()
-                    self.logger.info("INIT_FILE_MONITORING: Thread de scan périodique démarré.")
-                except Exception as e_start_scanner:
-                    self.logger.error(f"INIT_FILE_MONITORING: Échec du démarrage du thread de scan périodique: {e_start_scanner}", exc_info=True)
-            else:
-                self.logger.info("INIT_FILE_MONITORING: Service en cours d'arrêt, lancement du scan périodique annulé.")
+        candidates: List[Tuple[str, Any]] = []
+        if backend_cfg in ("auto", "inotify"):
+            candidates.append(("native", Observer))
+        if backend_cfg in ("auto", "polling") and PollingObserver:
+            candidates.append(("polling", PollingObserver))
 
-            self.logger.info("INIT_FILE_MONITORING: Initialisation de la surveillance des fichiers terminée.")
+        for backend_name, observer_cls in candidates:
+            try:
+                if backend_name == "polling":
+                    observer = observer_cls(timeout=float(service_params_cfg.get("watcher_polling_interval_seconds", 5)))
+                else:
+                    observer = observer_cls()
+                observer.schedule(self.AlmaKnowledgeEventHandler(self), str(CONNAISSANCE_DIR), recursive=True)
+                observer.start() # Lève OSError (ex: ENOSPC, limite max_user_watches atteinte) pour inotify
+                self.watchdog_observer = observer
+                self.watcher_backend_active = f"{backend_name}:{type(observer).__name__}"
+                self.logger.info(f"INIT_FILE_MONITORING: Surveillance de '{CONNAISSANCE_DIR}' activée (backend: {self.watcher_backend_active}).")
+                return
+            except Exception as e_wd_start:
+                self.logger.error(f"INIT_FILE_MONITORING: Échec démarrage du watcher '{backend_name}': {e_wd_start}.", exc_info=False)
+        self.logger.warning("INIT_FILE_MONITORING: Aucun watcher n'a pu démarrer. Réconciliation périodique uniquement.")
+
+    def _current_reconcile_interval(self) -> float:
+        """Intervalle long si un watcher alimente la file, sinon l'intervalle de scan historique."""
+        service_params_cfg = self.config.get("service_params", {})
+        if self.watchdog_observer and self.watchdog_observer.is_alive():
+            return float(service_params_cfg.get("reconcile_interval_seconds", DEFAULT_CONFIG["service_params"]["reconcile_interval_seconds"]))
+        return float(service_params_cfg.get("file_scan_interval_seconds", DEFAULT_CONFIG["service_params"]["file_scan_interval_seconds"]))
+
+    def _reconcile_file_tree(self) -> Dict[str, int]:
+        """
+        Réconciliation bon marché : parcours os.scandir (répertoires exclus élagués), comparaison
+        (mtime_ns, taille) au manifeste en mémoire. Seuls les fichiers nouveaux ou modifiés passent par
+        _is_file_processable (checksum) ; les entrées du manifeste absentes du disque sont traitées comme supprimées.
+        """
+        counters = {"seen": 0, "changed": 0, "enqueued": 0, "deleted": 0}
+        seen_paths: set = set()
+        pending_dirs: List[str] = [str(CONNAISSANCE_DIR)]
+        interrupted = False
+
+        while pending_dirs:
+            if self.running.is_set():
+                interrupted = True
+                break
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as dir_entries:
+                    for entry in dir_entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not self._is_dir_name_excluded(entry.name):
+                                    pending_dirs.append(entry.path)
+                                continue
+                            if not entry.is_file() or self._is_dir_name_excluded(entry.name):
+                                continue
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        counters["seen"] += 1
+                        seen_paths.add(entry.path)
+                        with self.file_stat_manifest_lock:
+                            unchanged = self.file_stat_manifest.get(entry.path) == (st.st_mtime_ns, st.st_size)
+                        if unchanged:
+                            continue
+                        counters["changed"] += 1
+                        self._record_file_stat(Path(entry.path), st)
+                        if self._is_file_processable(Path(entry.path)) and self.enqueue_file(Path(entry.path)):
+                            counters["enqueued"] += 1
+            except OSError as e_scandir:
+                self.logger.warning(f"RECONCILE: Répertoire illisible '{current_dir}': {e_scandir}")
+                interrupted = True # Ne pas conclure à des suppressions sur un parcours incomplet
+
+        if not interrupted:
+            with self.file_stat_manifest_lock:
+                vanished_paths = [p for p in self.file_stat_manifest if p not in seen_paths]
+            for vanished_path_str in vanished_paths:
+                if os.path.lexists(vanished_path_str):
+                    continue
+                self._forget_file_stat(Path(vanished_path_str))
+                self._handle_deleted_file(Path(vanished_path_str))
+                counters["deleted"] += 1
+        return counters
 
     def _periodic_scan(self) -> None:
-        # Utiliser self.config qui peut être mis à jour par reload_configuration
-        # Donc, récupérer scan_interval à chaque itération de la boucle
-        while not self.running.is_set():
-            current_scan_interval = self.config.get("service_params", {}).get("file_scan_interval_seconds", 60)
-            self.logger.debug(f"PERIODIC_SCAN_CYCLE: Début du scan périodique de {CONNAISSANCE_DIR} (intervalle actuel: {current_scan_interval}s)...")
+        # L'intervalle est relu à chaque itération (reload_configuration, watcher arrêté/relancé)
+        while not self.running.wait(timeout=self._current_reconcile_interval()):
+            self.logger.debug(f"PERIODIC_SCAN_CYCLE: Réconciliation de {CONNAISSANCE_DIR}...")
+            cycle_start = time.monotonic()
             try:
-                processed_in_this_scan = 0
-                for filepath_obj in CONNAISSANCE_DIR.rglob('*'):
-                    if self.running.is_set():
-                        self.logger.info("Arrêt demandé pendant le scan périodique. Scan interrompu.")
-                        break
-
-                    # --- Logique d'exclusion (identique au scan initial) ---
-                    path_parts_lower = {str(part).lower() for part in filepath_obj.parts}
-                    is_excluded_by_part = any(excluded_part in path_parts_lower for excluded_part in self.excluded_dir_parts)
-
-                    is_excluded_by_prefix = False
-                    for part_str in filepath_obj.parts:
-                        if any(str(part_str).startswith(prefix) for prefix in self.excluded_dir_prefixes):
-                            is_excluded_by_prefix = True
-                            break
-
-                    if is_excluded_by_part or is_excluded_by_prefix:
-                        self.logger.debug(f"PERIODIC_SCAN_SKIP_EXCLUDED: Ignoré (exclu): {filepath_obj} (part_match={is_excluded_by_part}, prefix_match={is_excluded_by_prefix})")
-                        continue
-                    # --- Fin Logique d'exclusion ---
-
-                    self.logger.debug(f"PERIODIC_SCAN_CHECK: Vérification de {filepath_obj}")
-                    if filepath_obj.is_file(): # Traiter uniquement les fichiers
-                        if self._is_file_processable(filepath_obj): # Gère les extensions et autres filtres
-                            self.enqueue_file(filepath_obj)
-                            processed_in_this_scan += 1
-                        # else: _is_file_processable logue déjà la raison du rejet
-                self.logger.debug(f"Scan périodique terminé. {processed_in_this_scan} fichiers potentiellement ajoutés à la file d'attente.")
+                reconcile_stats = self._reconcile_file_tree()
+                self.logger.debug(
+                    f"PERIODIC_SCAN_CYCLE: Réconciliation terminée en {time.monotonic() - cycle_start:.2f}s "
+                    f"(vus: {reconcile_stats['seen']}, modifiés: {reconcile_stats['changed']}, "
+                    f"en file: {reconcile_stats['enqueued']}, supprimés: {reconcile_stats['deleted']})."
+                )
             except Exception as e_periodic_scan:
-                self.logger.error(f"Erreur lors du scan périodique: {e_periodic_scan}", exc_info=True)
+                self.logger.error(f"Erreur lors de la réconciliation périodique: {e_periodic_scan}", exc_info=True)
+
+    def _load_file_manifest(self, kb_config_section: Dict[str, Any], use_sqlite_db_cfg: bool) -> None:
+        """Migre les colonnes du manifeste puis charge en bloc (inode, taille, mtime_ns, checksum) de tous les fichiers connus."""
+        with self.file_manifest_lock:
+            self.file_manifest = {}
+            self.file_manifest_loaded = False
+        if not (use_sqlite_db_cfg and KB_DB_PATH and self.kb_instance and kb_config_section.get("file_manifest_enabled", True)):
+            return
+        manifest_conn: Optional[sqlite3.Connection] = None
+        try:
+            manifest_conn = sqlite3.connect(str(KB_DB_PATH), timeout=kb_config_section.get("db_timeout_seconds", DEFAULT_CONFIG["knowledge_base"]["db_timeout_seconds"]))
+            KnowledgeBase.ensure_manifest_columns(manifest_conn)
+            loaded_manifest = self.kb_instance.get_file_manifest(manifest_conn)
+        except sqlite3.Error as e_manifest:
+            self.logger.error(f"FILE_MANIFEST: Échec du chargement du manifeste: {e_manifest}. Vérification par checksum/KB fichier par fichier.", exc_info=True)
+            return
+        finally:
+            if manifest_conn:
+                try: manifest_conn.close()
+                except sqlite3.Error: pass
+        with self.file_manifest_lock:
+            self.file_manifest = loaded_manifest
+            self.file_manifest_loaded = True
+        # Amorcer le manifeste de réconciliation : les fichiers inchangés depuis le dernier arrêt ne sont pas réévalués
+        with self.file_stat_manifest_lock:
+            for manifest_path_str, (_, manifest_size, manifest_mtime_ns, _) in loaded_manifest.items():
+                if manifest_mtime_ns is not None and manifest_size is not None:
+                    self.file_stat_manifest.setdefault(manifest_path_str, (manifest_mtime_ns, manifest_size))
+        self.logger.info(f"FILE_MANIFEST: {len(loaded_manifest)} entrées chargées depuis la KB.")
+
+    def _update_file_manifest(self, filepath_str: str, file_stat: Optional[Dict[str, int]], checksum: Optional[str]) -> None:
+        if not file_stat or not checksum:
+            return
+        with self.file_manifest_lock:
+            self.file_manifest[filepath_str] = (file_stat.get('inode'), file_stat.get('size'), file_stat.get('mtime_ns'), checksum)
+
+    def _persist_file_stat(self, filepath_str: str, file_stat: Dict[str, int], checksum: str) -> None:
+        """Rafraîchit le stat d'un fichier inchangé dans le manifeste et, via l'écrivain, dans la KB (sans attendre)."""
+        self._update_file_manifest(filepath_str, file_stat, checksum)
+        if not (self.kb_writer and self.kb_writer.is_running() and self.kb_instance):
+            return # Sans écrivain : manifeste en mémoire seulement, le fichier sera re-haché au prochain démarrage
+        kb_instance = self.kb_instance
 
-            # Attendre avant le prochain scan, en utilisant l'intervalle actuel de la config
-            self.running.wait(timeout=current_scan_interval)
+        def _update_stat(conn: sqlite3.Connection) -> bool:
+            return kb_instance.update_file_stat(conn, filepath_str, checksum, file_stat)
+
+        def _log_stat_failure(stat_future: Future) -> None:
+            if stat_future.exception() is not None:
+                self.logger.warning(f"FILE_MANIFEST: Stat de '{filepath_str}' non persisté: {stat_future.exception()}")
+        self.kb_writer.submit(filepath_str, _update_stat).add_done_callback(_log_stat_failure)
 
     def _is_file_processable(self, filepath: Path) -> bool:
         filepath_str = str(filepath.resolve())
@@ -2934,8 +4705,24 @@ class CerveauService:
                 self.logger.info(f"IS_PROCESSABLE_INFO_QUARANTINE_LIFTED: Fichier '{filepath_str}' sort de quarantaine (sera réévalué).")
                 # On ne supprime pas de la quarantaine ici, mais au succès du traitement.
 
-        # 4. Calcul du checksum actuel
-        current_checksum = calculate_checksum(filepath)
+        # 4. Chemin rapide : stat identique au manifeste => contenu inchangé, ni hachage ni requête KB
+        with self.file_manifest_lock:
+            manifest_entry = self.file_manifest.get(filepath_str)
+            manifest_authoritative = self.file_manifest_loaded
+        try:
+            current_st = filepath.stat()
+        except OSError as e_stat:
+            self.logger.debug(f"IS_PROCESSABLE_REJECT_STAT: stat impossible pour '{filepath_str}': {e_stat}")
+            return False
+        if manifest_entry and manifest_entry[2] is not None and \
+           manifest_entry[:3] == (current_st.st_ino, current_st.st_size, current_st.st_mtime_ns):
+            self.logger.debug(f"IS_PROCESSABLE_REJECT_MANIFEST_UNCHANGED: '{filepath_str}' (inode, taille, mtime) inchangés.")
+            return False
+
+        # 4b. Calcul du checksum actuel (uniquement si le stat a changé), avec l'algorithme du checksum stocké :
+        # une KB remplie en sha256 reste comparable après un changement de checksum_algorithm.
+        stored_checksum = manifest_entry[3] if manifest_entry else None
+        current_checksum = calculate_checksum(filepath, algorithm=checksum_algorithm_of(stored_checksum) if stored_checksum else None)
         if not current_checksum:
             self.logger.warning(f"IS_PROCESSABLE_REJECT_NO_CHECKSUM: Impossible de calculer le checksum pour '{filepath_str}'. Fichier ignoré.")
             return False
@@ -2952,6 +4739,17 @@ class CerveauService:
         if not (self.kb_instance and KB_DB_PATH and kb_config_section.get("use_sqlite_db", True)):
             self.logger.info(f"IS_PROCESSABLE_ACCEPT_NO_DB_CHECK: '{filepath_str}' (CS: {current_checksum}) est processable (DB non vérifiée).")
             return True
+
+        # Manifeste chargé en bloc : il reflète la KB, inutile d'y faire une requête par fichier
+        if manifest_authoritative:
+            if manifest_entry and manifest_entry[3] == current_checksum:
+                # Contenu identique (simple touch, ou stat jamais renseigné sur une KB antérieure au manifeste) :
+                # rafraîchir le stat en mémoire et en base pour éviter de re-hacher la prochaine fois
+                self._persist_file_stat(filepath_str, {'inode': current_st.st_ino, 'size': current_st.st_size, 'mtime_ns': current_st.st_mtime_ns}, current_checksum)
+                self.logger.debug(f"IS_PROCESSABLE_REJECT_KB_UNCHANGED: '{filepath_str}' (CS: {current_checksum}) dans le manifeste et inchangé.")
+                return False
+            self.logger.info(f"IS_PROCESSABLE_ACCEPT_FINAL: '{filepath_str}' (CS: {current_checksum}) est processable ({'modifié' if manifest_entry else 'nouveau'}, manifeste).")
+            return True
                 """TODO: Add docstring."""
 
         # Si la DB est utilisée, on vérifie le checksum
@@ -2971,6 +4769,8 @@ class CerveauService:
                  self.logger.debug(f"Note: échec activation WAL sur connexion temporaire ro: {e_wal_temp}")
 
             kb_checksum = self.kb_instance.get_file_checksum(temp_conn_kb_check, filepath_str)
+            if kb_checksum is not None and checksum_algorithm_of(kb_checksum) != checksum_algorithm_of(current_checksum):
+                current_checksum = calculate_checksum(filepath, algorithm=checksum_algorithm_of(kb_checksum)) or current_checksum
 
             if kb_checksum is not None: # Le fichier est connu dans la KB
                 if kb_checksum == current_checksum:
@@ -3054,6 +4854,8 @@ class CerveauService:
         try:
             # popleft() est une opération atomique sur collections.deque
             file_task_info = self.file_queue.popleft()
+            with self.queued_file_paths_lock:
+                self.queued_file_paths.discard(file_task_info.get("path"))
             self.logger.info(
                 f"PROCESS_QUEUE_POP: Pris '{file_task_info.get('path', 'Chemin inconnu')}' de la file. "
                 f"Taille restante: {len(self.file_queue)}"
@@ -3109,6 +4911,7 @@ class CerveauService:
             )
             # Remettre la tâche en tête de file pour un traitement ultérieur (prioritaire)
             self.file_queue.appendleft(file_task_info)
+            with self.queued_file_paths_lock: self.queued_file_paths.add(filepath_str_from_task)
             self.logger.info(f"PROCESS_QUEUE_REQUEUE: Tâche pour '{filepath_obj_for_worker}' remise en tête de file suite à une erreur de soumission Runtime.")
         except Exception as e_unexpected_submit:
             self.logger.error(
@@ -3116,6 +4919,7 @@ class CerveauService:
             )
             # Remettre aussi en tête de file par prudence
             self.file_queue.appendleft(file_task_info)
+            with self.queued_file_paths_lock: self.queued_file_paths.add(filepath_str_from_task)
             self.logger.info(f"PROCESS_QUEUE_REQUEUE: Tâche pour '{filepath_obj_for_worker}' remise en tête de file suite à une erreur de soumission inattendue.")
 
     def _file_processing_worker(self,
@@ -3128,6 +4932,8 @@ class CerveauService:
         """
         proposals_count = 0
         stage_timings: Dict[str, float] = {}
+        worker_start_mono = time.monotonic()
+        processed_size_bytes: Optional[int] = None
         # Créer un logger spécifique pour ce worker et cette tâche, incluant le nom du fichier
         # Cela aide à suivre les logs d'un traitement de fichier spécifique.
         worker_logger_name = f"{MODULE_NAME}.Worker.{threading.current_thread().name}.{filepath.name}"
@@ -3138,11 +4944,14 @@ class CerveauService:
         transaction_active_by_this_worker = False # Flag pour suivre si CE worker a démarré la transaction
         pipeline_final_success = False # Résultat final du pipeline et des opérations DB
         exception_to_report: Optional[Exception] = None # Pour stocker l'exception principale à remonter
+        processor: Optional[FileProcessor] = None
 
         # Lire la configuration de la base de données à partir de self.config (qui est adapté)
         kb_config_section = self.config.get("knowledge_base", DEFAULT_CONFIG.get("knowledge_base", {}))
         use_sqlite_db_for_this_task = kb_config_section.get("use_sqlite_db", True) and KB_DB_PATH is not None
         db_timeout_for_this_task = kb_config_section.get("db_timeout_seconds", DEFAULT_CONFIG["knowledge_base"]["db_timeout_seconds"])
+        # Avec l'écrivain unique, la connexion du worker ne sert qu'aux lectures : pas de transaction d'écriture ici
+        writes_via_kb_writer = bool(self.kb_writer and self.kb_writer.is_running())
 
         try:
             # --- 1. Ouverture de la connexion DB dédiée au worker (si la DB est activée) ---
@@ -3177,12 +4986,14 @@ class CerveauService:
 
 
             # --- 2. Démarrage de la Transaction (si la connexion DB est valide) ---
-            if worker_db_conn and not exception_to_report: # Ne pas démarrer de TX si la connexion a échoué
+            if worker_db_conn and not exception_to_report and not writes_via_kb_writer: # Ne pas démarrer de TX si la connexion a échoué
                 try:
                     # BEGIN IMMEDIATE pour un verrou exclusif au début, peut aider à éviter des conflits
                     # si d'autres processus tentent d'écrire (bien que moins probable avec WAL).
                     # BEGIN seul est aussi une option (verrou différé).
+                    begin_wait_start = time.perf_counter()
                     worker_db_conn.execute("BEGIN IMMEDIATE TRANSACTION;")
+                    stage_timings["db.lock_wait"] = time.perf_counter() - begin_wait_start # Attente du verrou d'écriture SQLite
                     transaction_active_by_this_worker = True
                     worker_logger.info(f"DB TX: Transaction DÉMARRÉE pour: {filepath}")
                 except sqlite3.Error as e_begin_tx:
@@ -3201,13 +5012,34 @@ class CerveauService:
                         config=self.config,
                         pipeline_steps=self.pipeline_steps_instances,
                         kb_instance=self.kb_instance, # L'instance partagée de KnowledgeBase (pour ses méthodes logiques)
-                        db_conn_worker=worker_db_conn # La connexion dédiée, peut être None
+                        db_conn_worker=worker_db_conn, # La connexion dédiée, peut être None
+                        nlp_process_pool=self.nlp_process_pool, # None en mode "thread"
+                        kb_writer=self.kb_writer if writes_via_kb_writer else None
                     )
 
                     # run_pipeline exécute les étapes et gère leurs exceptions internes.
                     # Il retourne True si toutes les étapes activées ont réussi.
-                    pipeline_run_successful = processor.run_pipeline()
+                    # Profilage cProfile échantillonné (thread courant uniquement : les étapes déportées ne sont pas couvertes)
+                    file_profile: Optional[cProfile.Profile] = None
+                    if self.pipeline_profiler and self.pipeline_profiler.should_profile():
+                        file_profile = cProfile.Profile()
+                        try:
+                            file_profile.enable()
+                        except Exception as e_profile: # Autre profileur actif dans le processus (ValueError en Python >= 3.12)
+                            worker_logger.debug(f"PROFILER: Profilage de {filepath} ignoré: {e_profile}")
+                            self.pipeline_profiler.release_profile()
+                            file_profile = None
+                    pipeline_run_start = time.perf_counter()
+                    try:
+                        pipeline_run_successful = processor.run_pipeline()
+                    finally:
+                        if file_profile:
+                            file_profile.disable()
+                            self.pipeline_profiler.release_profile() # type: ignore[union-attr]
+                            self.pipeline_profiler.offer_profile(time.perf_counter() - pipeline_run_start, str(filepath), file_profile) # type: ignore[union-attr]
+                    processor.pipeline_stage_timings.update(stage_timings) # Conserver l'attente BEGIN mesurée ci-dessus
                     stage_timings = processor.pipeline_stage_timings # Récupérer les timings
+                    processed_size_bytes = (processor.processed_data.get('file_stat') or {}).get('size', processor.processed_data.get('file_size'))
 
                     if pipeline_run_successful:
                         # Si le pipeline a réussi, et si nous avions une transaction active, on la commite.
@@ -3225,6 +5057,8 @@ class CerveauService:
                                 except sqlite3.Error: pass
                         elif not use_sqlite_db_for_this_task: # Si la DB n'était pas utilisée, le succès du pipeline est le succès final
                              pipeline_final_success = True
+                        elif writes_via_kb_writer and not exception_to_report: # Écritures déjà commitées par l'écrivain unique
+                             pipeline_final_success = True
                         # else: pipeline réussi mais pas de transaction à commiter (ex: DB désactivée ou BEGIN a échoué)
                         # Dans ce cas, pipeline_final_success reste False si BEGIN a échoué.
 
@@ -3233,9 +5067,18 @@ class CerveauService:
                             if processor.checksum: # processor.checksum est calculé dans run_pipeline
                                 with self.processed_files_cache_lock: # Protéger l'accès
                                     self.processed_files_cache[str(filepath)] = processor.checksum
+                                self._update_file_manifest(str(filepath.resolve()), processor.processed_data.get('file_stat'), processor.checksum)
 
                             proposals_count = processor.processed_data.get("proposals_generated_count", 0)
 
+                            # Pousser le vecteur dans l'index FAISS seulement après le commit (pas de vecteur orphelin en cas de rollback)
+                            kb_file_id_committed = processor.processed_data.get("kb_file_id")
+                            if self.knowledge_linker_instance and kb_file_id_committed and processor.checksum:
+                                self.knowledge_linker_instance.upsert_document_embedding(
+                                    kb_file_id_committed, processor.checksum,
+                                    processor.processed_data.get("document_embedding_blob")
+                                )
+
                             if "active_improvements_applied" in processor.processed_data:
                                 with self.stats_lock:
                                     self.stats["active_improvements_count"] += len(processor.processed_data["active_improvements_applied"])
@@ -3254,7 +5097,11 @@ class CerveauService:
             # Si une exception critique de DB (connexion, BEGIN) est survenue plus tôt,
             # pipeline_final_success est déjà False et exception_to_report est déjà défini.
 
-            # --- 4. Rollback en cas d'échec si une transaction était active ---
+            # --- 4. Rétablissement des écritures déjà commitées par l'écrivain unique (pas de rollback possible) ---
+            if not pipeline_final_success and writes_via_kb_writer and processor is not None:
+                processor.restore_writer_records()
+
+            # --- 5. Rollback en cas d'échec si une transaction était active ---
             if not pipeline_final_success and worker_db_conn and transaction_active_by_this_worker:
                 worker_logger.warning(f"Tentative de ROLLBACK pour {filepath} suite à échec (pipeline_success={pipeline_final_success}, exception: {type(exception_to_report).__name__ if exception_to_report else 'N/A'}).")
                 try:
@@ -3268,6 +5115,8 @@ class CerveauService:
         except Exception as e_global_worker_catch: # Un filet de sécurité ultime
             worker_logger.critical(f"WORKER: Erreur fatale et inattendue dans _file_processing_worker pour {filepath}: {e_global_worker_catch}", exc_info=True)
             exception_to_report = e_global_worker_catch
+            if writes_via_kb_writer and processor is not None:
+                processor.restore_writer_records()
             # Tenter un rollback si une transaction était active et que la connexion existe encore
             if worker_db_conn and transaction_active_by_this_worker:
                 try:
@@ -3278,7 +5127,13 @@ class CerveauService:
             return str(filepath), False, exception_to_report, stage_timings, proposals_count
 
         finally:
-            # --- 5. Fermeture de la connexion DB dédiée au worker ---
+            if self.pipeline_profiler:
+                self.pipeline_profiler.record_document(
+                    stage_timings, processed_size_bytes, pipeline_final_success,
+                    processing_seconds=time.monotonic() - worker_start_mono,
+                    queue_wait_seconds=worker_start_mono - task_info["submit_time_mono"] if task_info.get("submit_time_mono") else None
+                )
+            # --- 6. Fermeture de la connexion DB dédiée au worker ---
             if worker_db_conn:
                 try:
                     # S'assurer qu'une transaction potentiellement "oubliée" est rollbackée avant de fermer
@@ -3419,6 +5274,8 @@ class CerveauService:
         # de file_quarantine simultanément, ou si la structure était plus complexe.
         quarantine_entry = self.file_quarantine.setdefault(filepath_str, {'errors': 0, 'quarantined_until': 0.0})
         quarantine_entry['errors'] += 1
+        # Oublier le stat : la prochaine réconciliation réévaluera le fichier (sous réserve de quarantaine)
+        self._forget_file_stat(filepath)
 
         cb_config = self.config.get("circuit_breaker", DEFAULT_CONFIG["circuit_breaker"]) # Accès plus sûr à la config
 
@@ -3557,6 +5414,8 @@ class CerveauService:
         """
         filepath_str_resolved = str(filepath.resolve())
         self.logger.audit(f"HANDLING_DELETED_FILE: Gestion de la suppression du fichier: {filepath_str_resolved}")
+        with self.file_manifest_lock:
+            self.file_manifest.pop(filepath_str_resolved, None)
 
         # 1. Retirer des caches en mémoire (protéger si accès concurrents fréquents)
         with self.processed_files_cache_lock: # Assurez-vous que ce lock est défini
@@ -3577,7 +5436,28 @@ class CerveauService:
 
         # 2. Supprimer de la KnowledgeBase (si DB activée)
         kb_config_section = self.config.get("knowledge_base", DEFAULT_CONFIG.get("knowledge_base", {}))
-        if self.kb_instance and KB_DB_PATH and kb_config_section.get("use_sqlite_db", True):
+        if self.kb_instance and KB_DB_PATH and kb_config_section.get("use_sqlite_db", True) and \
+           self.kb_writer and self.kb_writer.is_running():
+            # Suppression via l'écrivain unique (aucune connexion en écriture concurrente)
+            kb_for_delete = self.kb_instance
+            def _remove_record(conn: sqlite3.Connection) -> Optional[int]:
+                file_id_to_remove = kb_for_delete.get_file_id(conn, filepath_str_resolved)
+                kb_for_delete.remove_file_record(conn, filepath_str_resolved)
+                return file_id_to_remove
+
+            def _remove_embedding(remove_future: Future) -> None:
+                # Après COMMIT (thread de l'écrivain) : l'appelant, souvent le watchdog, n'attend pas la transaction
+                if remove_future.exception() is not None:
+                    self.logger.error(f"Erreur KB_WRITER lors de la suppression de l'enregistrement KB pour {filepath_str_resolved}: {remove_future.exception()}")
+                    return
+                removed_file_id = remove_future.result()
+                if removed_file_id is not None and self.knowledge_linker_instance:
+                    try:
+                        self.knowledge_linker_instance.remove_document_embedding(removed_file_id)
+                    except Exception as e_del_faiss:
+                        self.logger.error(f"Erreur FAISS lors du retrait de l'embedding de {filepath_str_resolved} (file_id {removed_file_id}): {e_del_faiss}", exc_info=True)
+            self.kb_writer.submit(filepath_str_resolved, _remove_record).add_done_callback(_remove_embedding)
+        elif self.kb_instance and KB_DB_PATH and kb_config_section.get("use_sqlite_db", True):
             temp_conn_delete: Optional[sqlite3.Connection] = None
             db_timeout_cfg = kb_config_section.get("db_timeout_seconds", DEFAULT_CONFIG["knowledge_base"]["db_timeout_seconds"])
             try:
@@ -3590,9 +5470,13 @@ class CerveauService:
                 except sqlite3.Error as e_pragma_del:
                     self.logger.debug(f"Note: échec activation PRAGMAs sur connexion de suppression pour {filepath_str_resolved}: {e_pragma_del}")
 
-                # La méthode remove_file_record doit gérer sa propre transaction (BEGIN, COMMIT/ROLLBACK)
+                removed_file_id = self.kb_instance.get_file_id(temp_conn_delete, filepath_str_resolved)
+                # remove_file_record laisse la transaction à l'appelant
                 self.kb_instance.remove_file_record(temp_conn_delete, filepath_str_resolved)
+                temp_conn_delete.commit()
                 # remove_file_record logue déjà son succès.
+                if removed_file_id is not None and self.knowledge_linker_instance:
+                    self.knowledge_linker_instance.remove_document_embedding(removed_file_id)
 
             except sqlite3.Error as e_del_db_sqlite:
                 self.logger.error(f"Erreur SQLite lors de la suppression de l'enregistrement KB pour {filepath_str_resolved}: {e_del_db_sqlite}", exc_info=True)
@@ -3694,12 +5578,18 @@ class CerveauService:
             "system_resources_snapshot": self.system_resources, # Données de psutil
             "configuration_summary": {
                 "max_workers_effective": self.config.get("service_params", {}).get("max_workers"),
+                "executor_mode": "process" if self.nlp_process_pool else "thread",
+                "watcher_backend_active": self.watcher_backend_active,
+                "file_stat_manifest_entries": len(self.file_stat_manifest),
+                "token_storage": self.kb_instance.token_storage if self.kb_instance else None,
+                "corpus_tfidf": self.kb_instance.corpus_tfidf.get_status() if self.kb_instance and self.kb_instance.corpus_tfidf else None,
                 "spacy_model_in_use": self.kb_instance.nlp_instance.meta['name'] if self.kb_instance and self.kb_instance.is_spacy_ready and hasattr(self.kb_instance.nlp_instance, 'meta') else "N/A ou non chargé",
                 "spacy_active": bool(self.kb_instance and self.kb_instance.is_spacy_ready),
                 "knowledge_base_path_exists": kb_path_exists,
                 "knowledge_base_connectable_and_valid": kb_is_connectable_and_valid,
                 "active_pipeline_steps_count": len(self.pipeline_steps_instances),
-                "active_pipeline_steps_names": [s.__class__.__name__ for s in self.pipeline_steps_instances]
+                "active_pipeline_steps_names": [s.__class__.__name__ for s in self.pipeline_steps_instances],
+                "semantic_index": self.knowledge_linker_instance.get_index_status() if self.knowledge_linker_instance else None
             },
             "performance_and_activity_stats": {
                 "file_queue_current_size": len(self.file_queue),
@@ -3715,7 +5605,11 @@ class CerveauService:
                 "active_improvements_applied_this_session": current_stats.get("active_improvements_count", 0),
                 "processed_files_cache_current_size": current_processed_files_cache_size,
                 "pipeline_stage_avg_execution_time_ms": avg_timings,
+                "embedding_batcher": self.embedding_batcher.get_stats() if self.embedding_batcher else None,
+                "kb_writer": self.kb_writer.get_stats() if self.kb_writer else None,
             },
+            # Latences par étape (p50/p95/p99), débit, profondeur de file, attentes SQLite, fichiers profilés les plus lents
+            "pipeline_profile": self.pipeline_profiler.snapshot() if self.pipeline_profiler else None,
             "timestamp_utc_report_generated": datetime.datetime.now(datetime.timezone.utc).isoformat()
         }
 
@@ -3773,6 +5667,14 @@ class CerveauService:
                         all_ok = False
             else:
                 self.logger.debug("HEALTH_CHECK_EXECUTOR: ThreadPoolExecutor semble opérationnel.")
+            # Pool de processus NLP (mode "process") : un enfant mort rend tout le pool inutilisable
+            if self.nlp_process_pool and getattr(self.nlp_process_pool, '_broken', False) and not self.running.is_set():
+                self.logger.critical("HEALTH_CHECK_EXECUTOR: Pool de processus NLP 'broken'. Tentative de réinitialisation.")
+                try:
+                    self._initialize_nlp_process_pool(self.config.get("service_params", {}).get("max_workers", 1))
+                except Exception as e_reinit_pool:
+                    self.logger.critical(f"HEALTH_CHECK_EXECUTOR: Échec de la réinitialisation du pool de processus NLP: {e_reinit_pool}", exc_info=True)
+                    all_ok = False
         else: # self.executor est None
             self.logger.warning("HEALTH_CHECK_EXECUTOR: ThreadPoolExecutor n'est pas initialisé. Tentative d'initialisation.")
             if not self.running.is_set():
@@ -3783,6 +5685,16 @@ class CerveauService:
                     self.logger.error(f"HEALTH_CHECK_EXECUTOR: Échec de l'initialisation du ThreadPoolExecutor pendant la vérification de santé: {e_init_exec_health}", exc_info=True)
                     all_ok = False
 
+        # --- 1b. Vérifier l'écrivain KB unique (un thread mort ferait retomber les workers sur leurs propres TX) ---
+        if self.kb_writer and not self.kb_writer.is_running() and not self.running.is_set():
+            self.logger.warning("HEALTH_CHECK_KB_WRITER: Thread écrivain KB inactif. Tentative de redémarrage.")
+            try:
+                self.kb_writer.stop(timeout=1.0)
+                self.kb_writer.start()
+            except Exception as e_restart_writer:
+                self.logger.error(f"HEALTH_CHECK_KB_WRITER: Échec du redémarrage: {e_restart_writer}", exc_info=True)
+                all_ok = False
+
         # --- 2. Vérifier la connectivité de la base de données (si configurée pour être utilisée) ---
         kb_config_section = self.config.get("knowledge_base", DEFAULT_CONFIG.get("knowledge_base", {}))
         if KB_DB_PATH and kb_config_section.get("use_sqlite_db", True):
@@ -3945,6 +5857,8 @@ class CerveauService:
         # Timers pour les tâches périodiques
         last_self_report_time_mono = time.monotonic()
         last_health_check_time_mono = time.monotonic()
+        last_queue_sample_time_mono = 0.0
+        last_metrics_export_time_mono = time.monotonic()
 
         try:
             while not self.running.is_set(): # Boucle principale tant que l'arrêt n'est pas demandé
@@ -3988,6 +5902,18 @@ class CerveauService:
                     self.generate_self_report() # Cette méthode est conçue pour être thread-safe dans ses lectures
                     last_self_report_time_mono = current_monotonic_time
 
+                # Profileur : échantillon de profondeur de file et export des métriques (Prometheus / JSON-lines)
+                if self.pipeline_profiler:
+                    profiling_cfg = self.config.get("profiling", DEFAULT_CONFIG["profiling"])
+                    if current_monotonic_time - last_queue_sample_time_mono >= profiling_cfg.get("queue_sample_interval_seconds", 5):
+                        with self.active_tasks_lock:
+                            active_tasks_for_sample = len(self.active_tasks)
+                        self.pipeline_profiler.record_queue_depth(len(self.file_queue), active_tasks_for_sample)
+                        last_queue_sample_time_mono = current_monotonic_time
+                    if current_monotonic_time - last_metrics_export_time_mono >= profiling_cfg.get("export_interval_seconds", 60):
+                        self.pipeline_profiler.export(profiling_cfg.get("export_format", "prometheus"), LOG_DIR)
+                        last_metrics_export_time_mono = current_monotonic_time
+
                 # Vérification de santé
                 health_check_interval_cfg = self.config.get("service_params", {}).get("health_check_interval_seconds", 900) # Ex: 15 min
                 if current_monotonic_time - last_health_check_time_mono > health_check_interval_cfg:
@@ -4107,6 +6033,16 @@ class CerveauService:
         else:
             self.logger.info("STOP_EXECUTOR: ThreadPoolExecutor non initialisé, pas d'arrêt nécessaire.")
 
+        # Pool de processus NLP : plus aucun thread worker ne peut y soumettre de tâche
+        if self.nlp_process_pool:
+            self.logger.info("STOP_EXECUTOR: Arrêt du pool de processus NLP...")
+            try:
+                self.nlp_process_pool.shutdown(wait=True, cancel_futures=True)
+                self.logger.info("STOP_EXECUTOR_SUCCESS: Pool de processus NLP arrêté.")
+            except Exception as e_pool_shutdown:
+                self.logger.error(f"STOP_EXECUTOR_ERROR: Erreur lors de l'arrêt du pool de processus NLP: {e_pool_shutdown}", exc_info=True)
+            self.nlp_process_pool = None
+
         # --- 4. Fermeture de la Connexion Principale à la KnowledgeBase (si elle était gérée par CerveauService) ---
         # Dans notre design actuel V20.5.1, CerveauService n'a plus de self.knowledge_base.conn.
         # self.kb_instance est juste une instance de la classe KnowledgeBase.
@@ -4114,6 +6050,22 @@ class CerveauService:
         # ou temporairement par d'autres méthodes (comme _is_file_processable, generate_self_report).
         # Donc, pas de fermeture de connexion DB centralisée ici pour CerveauService.
 
+        # Le micro-batcher n'a plus de producteurs une fois l'executor arrêté
+        if self.embedding_batcher:
+            self.embedding_batcher.stop()
+
+        # L'écrivain KB vide sa file (analyses déjà remises) puis ferme la seule connexion en écriture
+        if self.kb_writer:
+            self.kb_writer.stop()
+
+        # Dernier export des métriques du profileur (couvre les tâches terminées pendant l'arrêt)
+        if self.pipeline_profiler and LOG_DIR:
+            self.pipeline_profiler.export(self.config.get("profiling", DEFAULT_CONFIG["profiling"]).get("export_format", "prometheus"), LOG_DIR)
+
+        # --- 4b. Sauvegarder l'Index FAISS Persistant (mises à jour incrémentales de la session) ---
+        if self.knowledge_linker_instance:
+            self.knowledge_linker_instance.save_faiss_index()
+
         # --- 5. Générer un Dernier Rapport et Enregistrer l'État Final ---
         self.logger.info("Génération du rapport final d'auto-analyse avant l'arrêt complet...")
         self.generate_self_report() # Utilise self.stats qui devrait être à jour
@@ -4235,6 +6187,55 @@ if __name__ == "__main__":
     else:
         logger.info("CORE_MODULE_AVAILABLE: Module Core (Cerveau.Core.core) importé avec succès.")
 
+    # --- 6b. Mode Benchmark ANN (python cerveau.py --benchmark-ann) ---
+    # Compare IVF-Flat / IVF-PQ / HNSW à la recherche exacte sur la KB réelle, écrit le résultat
+    # dans LOG_DIR/faiss_ann_benchmark.json puis quitte sans démarrer la boucle de service.
+    if "--benchmark-ann" in sys.argv:
+        logger.info("BENCHMARK_ANN: Mode benchmark recall/latence de l'index sémantique...")
+        # Pas de construction ANN en tâche de fond : elle fausserait les latences mesurées
+        benchmark_core_cfg = dict(APP_CONFIG.get("core_algorithms_config", {}))
+        benchmark_core_cfg["knowledge_linker"] = dict(benchmark_core_cfg.get("knowledge_linker", {}), faiss_ann_background_build=False)
+        benchmark_config = dict(APP_CONFIG, core_algorithms_config=benchmark_core_cfg)
+        benchmark_service = CerveauService(benchmark_config)
+        if not benchmark_service.knowledge_linker_instance:
+            logger.critical("BENCHMARK_ANN: KnowledgeLinker non disponible (SBERT/FAISS/numpy manquants ?).")
+            sys.exit(1)
+        benchmark_report = benchmark_service.knowledge_linker_instance.benchmark_ann_recall()
+        benchmark_file_path = LOG_DIR / "faiss_ann_benchmark.json"
+        with open(benchmark_file_path, 'w', encoding='utf-8') as f_bench:
+            json.dump(benchmark_report, f_bench, indent=2, ensure_ascii=False)
+        logger.info(f"BENCHMARK_ANN: Résultats écrits dans {benchmark_file_path}")
+        logging.shutdown()
+        sys.exit(0)
+
+    # --- 6c. Migration du stockage des tokens (python cerveau.py --migrate-token-storage [--vacuum]) ---
+    # Convertit les lignes linguistic_tokens existantes en blobs compacts + fréquences de lemmes, puis quitte.
+    # Pensez à passer knowledge_base.token_storage à "packed" pour les analyses suivantes.
+    if "--migrate-token-storage" in sys.argv:
+        kb_cfg_migration = APP_CONFIG.get("knowledge_base", DEFAULT_CONFIG["knowledge_base"])
+        if not KB_DB_PATH or not KB_DB_PATH.exists():
+            logger.critical(f"TOKEN_MIGRATION: Base de connaissances introuvable ({KB_DB_PATH}).")
+            sys.exit(1)
+        logger.info(f"TOKEN_MIGRATION: Migration du stockage des tokens de {KB_DB_PATH}...")
+        migration_conn = sqlite3.connect(str(KB_DB_PATH), timeout=kb_cfg_migration.get("db_timeout_seconds", DEFAULT_CONFIG["knowledge_base"]["db_timeout_seconds"]))
+        try:
+            migration_conn.execute("PRAGMA foreign_keys = ON;")
+            KnowledgeBase.ensure_manifest_columns(migration_conn)
+            size_before_bytes = KB_DB_PATH.stat().st_size
+            migration_stats = KnowledgeBase.migrate_token_storage(
+                migration_conn,
+                codec=kb_cfg_migration.get("token_storage_compression", DEFAULT_CONFIG["knowledge_base"]["token_storage_compression"]),
+                vacuum="--vacuum" in sys.argv
+            )
+            logger.info(f"TOKEN_MIGRATION: Terminé: {migration_stats}. Taille de la base: {size_before_bytes} -> {KB_DB_PATH.stat().st_size} octets.")
+        except (sqlite3.Error, RuntimeError, ValueError) as e_migration:
+            logger.critical(f"TOKEN_MIGRATION: Échec de la migration: {e_migration}", exc_info=True)
+            sys.exit(1)
+        finally:
+            migration_conn.close()
+        logging.shutdown()
+        sys.exit(0)
+
     # --- 7. Instanciation et Démarrage du Service Cerveau ---
     # Toutes les configurations et les globales sont maintenant prêtes.
     logger.info(f"Instanciation du service CerveauService avec la configuration adaptée...")
@@ -8,9 +8,14 @@ CREATE TABLE IF NOT EXISTS files (
     last_processed_utc TEXT NOT NULL,
     size_bytes INTEGER,
     encoding TEXT,
-    embedding BLOB -- Clé : Ajouté pour le stockage des embeddings de documents
+    embedding BLOB, -- Clé : Ajouté pour le stockage des embeddings de documents
+    inode INTEGER, -- Manifeste : (inode, size_bytes, mtime_ns) relevés avant le calcul du checksum
+    mtime_ns INTEGER
 );
 
+-- Tokens d'un document (document_tokens) : ceux de spaCy, ou ceux de NLTK quand spaCy n'en a produit
+-- aucun. Les tokens NLTK (pos = étiquette Penn Treebank) sont donc stockés ici comme ceux de spaCy,
+-- et dans file_tokens_packed / lemma_frequencies en stockage "packed".
 CREATE TABLE IF NOT EXISTS linguistic_tokens (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     file_id INTEGER NOT NULL,
@@ -59,3 +64,56 @@ CREATE TABLE IF NOT EXISTS entity_relations (
     FOREIGN KEY (target_entity_id) REFERENCES named_entities (id) ON DELETE SET NULL
 );
 CREATE INDEX IF NOT EXISTS idx_entity_relations_file_id ON entity_relations (file_id);
+
+-- Stockage compact des tokens (knowledge_base.token_storage: "packed")
+-- Chaînes internées + un BLOB colonnaire par fichier : token_id <u4, lemma_id <u4, pos_id u1, flags u1
+-- (flags : 1=stop, 2=punct, 4=alpha, 8=significatif), éventuellement compressé en zstd.
+CREATE TABLE IF NOT EXISTS lemmas (
+    id INTEGER PRIMARY KEY,
+    lemma TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS token_forms (
+    id INTEGER PRIMARY KEY,
+    form TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pos_tags (
+    id INTEGER PRIMARY KEY,
+    pos TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_tokens_packed (
+    file_id INTEGER PRIMARY KEY,
+    token_count INTEGER NOT NULL,
+    codec TEXT NOT NULL, -- 'raw' ou 'zstd'
+    data BLOB NOT NULL,
+    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS lemma_frequencies (
+    file_id INTEGER NOT NULL,
+    lemma_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    significant_count INTEGER NOT NULL,
+    PRIMARY KEY (file_id, lemma_id),
+    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE,
+    FOREIGN KEY (lemma_id) REFERENCES lemmas (id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_lemma_frequencies_lemma_id ON lemma_frequencies (lemma_id);
+
+-- Fréquences de lemmes par fichier, quel que soit le mode de stockage (packed + lignes historiques)
+CREATE VIEW IF NOT EXISTS v_lemma_frequencies AS
+    SELECT lf.file_id AS file_id, l.lemma AS lemma, lf.count AS count, lf.significant_count AS significant_count
+    FROM lemma_frequencies lf JOIN lemmas l ON l.id = lf.lemma_id
+    UNION ALL
+    SELECT file_id, lemma, COUNT(*), SUM(CASE WHEN is_significant THEN 1 ELSE 0 END)
+    FROM linguistic_tokens GROUP BY file_id, lemma;
+
+-- Fréquences documentaires du corpus pour le TF-IDF d'AnalysisStep
+-- (termes = lemmes significatifs en minuscules des tokens stockés, spaCy ou NLTK ; mises à jour
+-- incrémentales à chaque analyse/suppression). IDF lissé : ln((1+N)/(1+df)) + 1, le document scoré compté.
+CREATE TABLE IF NOT EXISTS corpus_document_frequencies (
+    term TEXT PRIMARY KEY,
+    doc_count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS corpus_stats (
+    key TEXT PRIMARY KEY, -- 'tfidf_documents', 'tfidf_df_version'
+    value INTEGER NOT NULL
+);
@@ -7,6 +7,11 @@ from eve_src.core.genetique import AdvancedGenome
 from eve_src.archetypes.archetype_vegetal import Vegetal
 from eve_src.archetypes.archetype_insecte import Insecte
 from eve_src.core.physique import calculer_degats
+from eve_src.core.cerveau import (
+    construire_perceptions,
+    decider_actions,
+    matrice_poids,
+)
 
 
 class Animal(EntiteVivante):
@@ -18,6 +23,7 @@ class Animal(EntiteVivante):
         self.energie = CONFIG["organisme"]["energie_initiale"]
         self.en_gestation = 0
         self.etat = "normal"
+        self.action_planifiee = None
         self.genome = genome if genome else AdvancedGenome()
         self.phenotype = self.genome.get_phenotype()
         self.update_couleur()
@@ -34,6 +40,8 @@ class Animal(EntiteVivante):
         perception = []
         # ... (la logique de perception reste similaire mais doit être adaptée)
         # Pour la stabilité, nous laissons une perception simple pour l'instant
+        cadavres = env.voisinage("cadavres", self.x, self.y)
+        obstacles = env.voisinage("obstacles", self.x, self.y)
         for dy in [-1, 0, 1]:
             for dx in [-1, 0, 1]:
                 if dx == 0 and dy == 0:
@@ -43,8 +51,8 @@ class Animal(EntiteVivante):
                 is_food = pos in pop_dict and (
                     isinstance(pop_dict[pos], (Vegetal, Insecte))
                 )
-                perception.append(1.0 if pos in env.cadavres or is_food else 0.0)
-                perception.append(1.0 if pos in env.obstacles else 0.0)
+                perception.append(1.0 if cadavres[dy + 1, dx + 1] or is_food else 0.0)
+                perception.append(1.0 if obstacles[dy + 1, dx + 1] else 0.0)
                 if (
                     pos in pop_dict
                     and pop_dict[pos] is not self
@@ -58,25 +66,31 @@ class Animal(EntiteVivante):
 
     def decision_action(self, perception):
         """Calcule la sortie du réseau neuronal."""
-        valeurs_sortie = [0.0] * CONFIG["cerveau"]["neurones_sortie"]
-        brain_gene = self.genome.get_all_genes().get("cerveau_neural_network")
-        if not brain_gene:
-            return 4
-        poids_plats = brain_gene.sequence
-        num_entrees = CONFIG["cerveau"]["neurones_entree"]
-        num_sorties = CONFIG["cerveau"]["neurones_sortie"]
-        if len(poids_plats) < num_entrees * num_sorties:
-            return 4
-        poids = [
-            poids_plats[i * num_sorties : (i + 1) * num_sorties]
-            for i in range(num_entrees)
-        ]
-        for i, p_val in enumerate(perception):
-            if p_val > 0 and i < len(poids):
-                for j in range(num_sorties):
-                    if j < len(poids[i]):
-                        valeurs_sortie[j] += p_val * poids[i][j]
-        return valeurs_sortie.index(max(valeurs_sortie))
+        return int(decider_actions([perception], [matrice_poids(self.genome)])[0])
+
+    @classmethod
+    def planifier_actions(cls, animaux, env, pop_dict):
+        """
+        Calcule en un seul passage l'action de chaque animal pour ce cycle.
+        Doit être appelé avec le pop_dict qui sera passé à vivre().
+        """
+        if not animaux:
+            return
+        perceptions = construire_perceptions(
+            animaux, env, pop_dict, (Vegetal, Insecte), Animal
+        )
+        actions = decider_actions(
+            perceptions, [matrice_poids(animal.genome) for animal in animaux]
+        )
+        for animal, action in zip(animaux, actions.tolist()):
+            animal.action_planifiee = action
+
+    def choisir_action(self, env, pop_dict):
+        """Action planifiée pour ce cycle, ou calculée à la demande."""
+        action, self.action_planifiee = self.action_planifiee, None
+        if action is None:
+            action = self.decision_action(self.percevoir(env, pop_dict))
+        return action
 
     def vivre(self, env, pop_dict):
         """Exécute un cycle de vie basé sur le phénotype."""
@@ -90,8 +104,7 @@ class Animal(EntiteVivante):
         ).get("taille", 1.0)
         self.energie -= cout_de_vie_pheno
 
-        perception = self.percevoir(env, pop_dict)
-        action = self.decision_action(perception)
+        action = self.choisir_action(env, pop_dict)
 
         if action < 5:
             mvt = [(-1, 0), (1, 0), (0, -1), (0, 1), (0, 0)]
@@ -100,7 +113,7 @@ class Animal(EntiteVivante):
             if (
                 0 <= nx < env.taille
                 and 0 <= ny < env.taille
-                and (nx, ny) not in env.obstacles
+                and not env.grille_obstacles[ny, nx]
             ):
                 self.x, self.y = nx, ny
 
@@ -56,8 +56,7 @@ class Humanoide(Animal):
         )
 
         # --- Logique de décision et d'action ---
-        perception = self.percevoir(env, pop_dict)
-        action = self.decision_action(perception)
+        action = self.choisir_action(env, pop_dict)
 
         if action < 5:  # Mouvements
             self._gerer_mouvement(action, env)
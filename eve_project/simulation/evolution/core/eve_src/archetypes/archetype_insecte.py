@@ -30,7 +30,7 @@ class Insecte(EntiteVivante):
         if (
             0 <= nx < env.taille
             and 0 <= ny < env.taille
-            and (nx, ny) not in env.obstacles
+            and not env.grille_obstacles[ny, nx]
         ):
             self.x, self.y = nx, ny
 
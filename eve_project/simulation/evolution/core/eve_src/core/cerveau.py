@@ -0,0 +1,132 @@
+# eve_src/core/cerveau.py
+"""
+Inférence neuronale groupée pour toute la population animale.
+Les perceptions de tous les animaux sont lues en une fois dans une grille
+du voisinage, et les matrices de poids sont mémorisées par génome ; le
+résultat est identique, animal par animal, à Animal.percevoir suivi de
+Animal.decision_action.
+"""
+import numpy as np
+from eve_src.config import CONFIG
+
+NOM_GENE_CERVEAU = "cerveau_neural_network"
+ACTION_PAR_DEFAUT = 4
+
+# Décalages du voisinage, dans l'ordre de lecture de Animal.percevoir
+VOISINAGE = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+
+# Codes de la grille des occupants
+AUCUN_ANIMAL = -2
+ANIMAL_HORS_LOT = -1
+
+
+def matrice_poids(genome):
+    """
+    Matrice (entrées, sorties) du cerveau d'un génome, ou None s'il n'a pas
+    de cerveau exploitable. Mémorisée jusqu'à la prochaine mutation.
+    """
+    version = getattr(genome, "version", 0)
+    cache = getattr(genome, "_cache_cerveau", None)
+    if cache is not None and cache[0] == version:
+        return cache[1]
+
+    num_entrees = CONFIG["cerveau"]["neurones_entree"]
+    num_sorties = CONFIG["cerveau"]["neurones_sortie"]
+    brain_gene = genome.get_all_genes().get(NOM_GENE_CERVEAU)
+    matrice = None
+    if brain_gene and len(brain_gene.sequence) >= num_entrees * num_sorties:
+        matrice = np.asarray(
+            brain_gene.sequence[: num_entrees * num_sorties], dtype=float
+        ).reshape(num_entrees, num_sorties)
+
+    genome._cache_cerveau = (version, matrice)
+    return matrice
+
+
+def construire_perceptions(animaux, env, pop_dict, types_nourriture, type_animal):
+    """
+    Tenseur (n, 3 * 8 + 1) des perceptions de n animaux.
+
+    Les cases voisines de tous les animaux sont projetées sur une grille
+    couvrant leur emprise : nourriture (cadavre, végétal ou insecte),
+    obstacle et rang de l'animal occupant, pour exclure l'observateur.
+    Cadavres et obstacles sont découpés dans les couches de l'environnement.
+    """
+    n = len(animaux)
+    xs = np.fromiter((a.x for a in animaux), dtype=np.int64, count=n)
+    ys = np.fromiter((a.y for a in animaux), dtype=np.int64, count=n)
+    x0, y0 = int(xs.min()) - 1, int(ys.min()) - 1
+    forme = (int(xs.max()) + 2 - x0, int(ys.max()) + 2 - y0)
+
+    nourriture = np.zeros(forme, dtype=bool)
+    obstacle = np.zeros(forme, dtype=bool)
+    occupant = np.full(forme, AUCUN_ANIMAL, dtype=np.int64)
+
+    def case(pos):
+        """Indices de pos dans la grille, ou None hors de l'emprise."""
+        gx, gy = pos[0] - x0, pos[1] - y0
+        if 0 <= gx < forme[0] and 0 <= gy < forme[1]:
+            return gx, gy
+        return None
+
+    # Couches [y, x] de l'environnement recopiées sur l'emprise, en [x, y]
+    xs_carte = slice(max(0, x0), min(env.taille, x0 + forme[0]))
+    ys_carte = slice(max(0, y0), min(env.taille, y0 + forme[1]))
+    if xs_carte.start < xs_carte.stop and ys_carte.start < ys_carte.stop:
+        emprise = (
+            slice(xs_carte.start - x0, xs_carte.stop - x0),
+            slice(ys_carte.start - y0, ys_carte.stop - y0),
+        )
+        nourriture[emprise] = env.presence_cadavres[ys_carte, xs_carte].T > 0
+        obstacle[emprise] = env.grille_obstacles[ys_carte, xs_carte].T > 0
+
+    rangs = {id(animal): rang for rang, animal in enumerate(animaux)}
+    for pos, unite in pop_dict.items():
+        indices = case(pos)
+        if not indices:
+            continue
+        if isinstance(unite, types_nourriture):
+            nourriture[indices] = True
+        if isinstance(unite, type_animal):
+            occupant[indices] = rangs.get(id(unite), ANIMAL_HORS_LOT)
+
+    perceptions = np.zeros((n, 3 * len(VOISINAGE) + 1))
+    propres_rangs = np.arange(n)
+    for k, (dx, dy) in enumerate(VOISINAGE):
+        gx, gy = xs - x0 + dx, ys - y0 + dy
+        voisins = occupant[gx, gy]
+        perceptions[:, 3 * k] = nourriture[gx, gy]
+        perceptions[:, 3 * k + 1] = obstacle[gx, gy]
+        perceptions[:, 3 * k + 2] = (voisins != AUCUN_ANIMAL) & (
+            voisins != propres_rangs
+        )
+    perceptions[:, -1] = 1.0
+    return perceptions
+
+
+def decider_actions(perceptions, matrices):
+    """
+    Actions (argmax des sorties) pour un lot de perceptions.
+
+    Les sorties sont accumulées entrée par entrée, vectorisées sur le lot :
+    l'ordre des additions est celui de la boucle scalaire, si bien que les
+    égalités de l'argmax sont départagées exactement de la même façon.
+    """
+    perceptions = np.asarray(perceptions, dtype=float)
+    actions = np.full(len(matrices), ACTION_PAR_DEFAUT, dtype=np.int64)
+    valides = [rang for rang, matrice in enumerate(matrices) if matrice is not None]
+    if not valides:
+        return actions
+
+    poids = np.stack([matrices[rang] for rang in valides])
+    entrees = perceptions[valides]
+    sorties = np.zeros((len(valides), poids.shape[2]))
+    for i in range(min(entrees.shape[1], poids.shape[1])):
+        actives = entrees[:, i] > 0
+        if actives.any():
+            sorties += np.where(
+                actives[:, None], entrees[:, i, None] * poids[:, i, :], 0.0
+            )
+
+    actions[valides] = np.argmax(sorties, axis=1)
+    return actions
@@ -1,12 +1,119 @@
 # eve_src/core/environnement.py
 """
 Définit la classe Environnement.
-Cette version est spécifiquement adaptée pour être compatible avec le moteur
-de simulation existant, sans optimisations de grille spatiale.
+Le monde est stocké dans des couches NumPy indexées [y, x] (coût du terrain,
+obstacles, ressources, masse des cadavres) : décomposition, saisons et
+repousse sont des mises à jour de tableaux entiers, et les archétypes lisent
+leur voisinage par découpage. Les anciens attributs ensemblistes (obstacles,
+cadavres, bois, pierre, ressources) restent disponibles comme vues sur ces
+couches.
 """
 import random
+from collections.abc import MutableMapping, MutableSet
+
+import numpy as np
 from eve_src.config import CONFIG
 
+DECOMPOSITION_PAR_CYCLE = 0.5
+
+
+class VueEnsembleGrille(MutableSet):
+    """Vue ensembliste {(x, y)} des cases non nulles d'une couche."""
+
+    def __init__(self, couche):
+        """Enveloppe une couche [y, x] existante."""
+        self.couche = couche
+
+    def _indices(self, pos):
+        """Indices [y, x] de pos, ou None hors de la carte."""
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return None
+        hauteur, largeur = self.couche.shape
+        if 0 <= x < largeur and 0 <= y < hauteur and x == int(x) and y == int(y):
+            return int(y), int(x)
+        return None
+
+    def __contains__(self, pos):
+        """Vrai si la case pos est occupée."""
+        indices = self._indices(pos)
+        return indices is not None and bool(self.couche[indices] > 0)
+
+    def __iter__(self):
+        """Parcourt les cases occupées, ligne par ligne."""
+        ys, xs = np.nonzero(self.couche > 0)
+        return iter(zip(xs.tolist(), ys.tolist()))
+
+    def __len__(self):
+        """Nombre de cases occupées."""
+        return int(np.count_nonzero(self.couche > 0))
+
+    def add(self, pos):
+        """Occupe la case pos (une case déjà occupée garde sa valeur)."""
+        indices = self._indices(pos)
+        if indices is None:
+            raise ValueError(f"Position hors de la carte : {pos}")
+        if not self.couche[indices] > 0:
+            self.couche[indices] = 1
+
+    def discard(self, pos):
+        """Libère la case pos."""
+        indices = self._indices(pos)
+        if indices is not None:
+            self.couche[indices] = 0
+
+    def __repr__(self):
+        """Représentation sous forme d'ensemble."""
+        return f"{self.__class__.__name__}({set(self)})"
+
+
+class VueCadavres(MutableMapping):
+    """Vue dictionnaire {(x, y): masse} des cadavres."""
+
+    def __init__(self, masse, presence):
+        """Enveloppe les couches de masse et de présence des cadavres."""
+        self.masse = masse
+        self.presence = presence
+        self._cases = VueEnsembleGrille(presence)
+
+    def __contains__(self, pos):
+        """Vrai si un cadavre occupe pos."""
+        return pos in self._cases
+
+    def __getitem__(self, pos):
+        """Masse du cadavre en pos."""
+        if pos not in self._cases:
+            raise KeyError(pos)
+        x, y = pos
+        return float(self.masse[int(y), int(x)])
+
+    def __setitem__(self, pos, valeur):
+        """Place (ou remplace) un cadavre de masse valeur en pos."""
+        self._cases.add(pos)
+        x, y = pos
+        self.masse[int(y), int(x)] = valeur
+
+    def __delitem__(self, pos):
+        """Retire le cadavre en pos."""
+        if pos not in self._cases:
+            raise KeyError(pos)
+        self._cases.discard(pos)
+        x, y = pos
+        self.masse[int(y), int(x)] = 0.0
+
+    def __iter__(self):
+        """Parcourt les positions des cadavres."""
+        return iter(self._cases)
+
+    def __len__(self):
+        """Nombre de cadavres."""
+        return len(self._cases)
+
+    def __repr__(self):
+        """Représentation sous forme de dictionnaire."""
+        return f"{self.__class__.__name__}({dict(self.items())})"
+
 
 class Environnement:
     """Gère le monde, ses cycles, son terrain, ses ressources et obstacles."""
@@ -14,16 +121,38 @@ class Environnement:
     def __init__(self, taille):
         """Initialise l'environnement."""
         self.taille = taille
-        self.ressources = set()
-        self.obstacles = set()
-        self.terrain = [[1.0 for _ in range(taille)] for _ in range(taille)]
-        self.cadavres = {}
+        forme = (taille, taille)
+
+        # Couches de la grille, indexées [y, x] ; float64 comme les anciens flottants Python
+        self.cout_terrain = np.ones(forme, dtype=np.float64)
+        self.grille_obstacles = np.zeros(forme, dtype=np.uint8)
+        self.grille_ressources = np.zeros(forme, dtype=np.float64)
+        self.masse_cadavres = np.zeros(forme, dtype=np.float64)
+        self.presence_cadavres = np.zeros(forme, dtype=np.uint8)
+        self.grille_bois = np.zeros(forme, dtype=np.uint8)
+        self.grille_pierre = np.zeros(forme, dtype=np.uint8)
+
+        # Couche de compatibilité : self.terrain[y][x] reste valide
+        self.terrain = self.cout_terrain
+        self.ressources = VueEnsembleGrille(self.grille_ressources)
+        self.obstacles = VueEnsembleGrille(self.grille_obstacles)
+        self.cadavres = VueCadavres(self.masse_cadavres, self.presence_cadavres)
         self.saison = "Été"
         self.cycle_saisonnier = 0
 
         # NOTE : Les ressources technologiques sont prévues pour le futur
-        self.bois = set()
-        self.pierre = set()
+        self.bois = VueEnsembleGrille(self.grille_bois)
+        self.pierre = VueEnsembleGrille(self.grille_pierre)
+
+        self.couches = {
+            "terrain": self.cout_terrain,
+            "obstacles": self.grille_obstacles,
+            "ressources": self.grille_ressources,
+            "cadavres": self.presence_cadavres,
+            "masse_cadavres": self.masse_cadavres,
+            "bois": self.grille_bois,
+            "pierre": self.grille_pierre,
+        }
 
         self.generer_monde()
 
@@ -36,48 +165,85 @@ class Environnement:
                 0, self.taille - t_obs
             )
             is_h = random.random() > 0.5
-            for i in range(t_obs):
-                self.obstacles.add((x_s + i, y_s) if is_h else (x_s, y_s + i))
+            if is_h:
+                self.grille_obstacles[y_s, x_s : x_s + t_obs] = 1
+            else:
+                self.grille_obstacles[y_s : y_s + t_obs, x_s] = 1
 
         # Génération du terrain difficile
         if CONFIG["environnement"]["terrain_variable"]:
+            cout = CONFIG["environnement"]["cout_mouvement_difficile"]
             for _ in range(int(self.taille / 3)):
                 x_c, y_c = random.randint(0, self.taille - 1), random.randint(
                     0, self.taille - 1
                 )
                 radius = random.randint(int(self.taille / 25), int(self.taille / 10))
-                for y in range(max(0, y_c - radius), min(self.taille, y_c + radius)):
-                    for x in range(
-                        max(0, x_c - radius), min(self.taille, x_c + radius)
-                    ):
-                        if (x, y) not in self.obstacles:
-                            self.terrain[y][x] = CONFIG["environnement"][
-                                "cout_mouvement_difficile"
-                            ]
+                zone = (
+                    slice(max(0, y_c - radius), min(self.taille, y_c + radius)),
+                    slice(max(0, x_c - radius), min(self.taille, x_c + radius)),
+                )
+                libre = self.grille_obstacles[zone] == 0
+                self.cout_terrain[zone][libre] = cout
 
         # Génération des ressources de crafting (pour le futur)
         for _ in range(int((self.taille**2) * 0.005)):
             x, y = random.randint(0, self.taille - 1), random.randint(
                 0, self.taille - 1
             )
-            if (x, y) not in self.obstacles:
-                self.bois.add((x, y))
+            if not self.grille_obstacles[y, x]:
+                self.grille_bois[y, x] = 1
         for _ in range(int((self.taille**2) * 0.005)):
             x, y = random.randint(0, self.taille - 1), random.randint(
                 0, self.taille - 1
             )
-            if (x, y) not in self.obstacles:
-                self.pierre.add((x, y))
+            if not self.grille_obstacles[y, x]:
+                self.grille_pierre[y, x] = 1
+
+    @property
+    def modificateur_saisonnier(self):
+        """Facteur appliqué à la repousse des ressources selon la saison."""
+        if self.saison == "Hiver":
+            return CONFIG["cycles_temporels"].get("modificateur_ressources_hiver", 1.0)
+        return 1.0
 
     def update_cycle(self):
-        """Met à jour les cycles saisonniers et la décomposition."""
+        """Met à jour les cycles saisonniers, la décomposition et la repousse."""
         if CONFIG["cycles_temporels"]["saisons_activees"]:
             d_saison = CONFIG["cycles_temporels"]["duree_saison"]
             self.cycle_saisonnier = (self.cycle_saisonnier + 1) % d_saison
             self.saison = "Été" if self.cycle_saisonnier < d_saison / 2 else "Hiver"
 
         # Décomposition des cadavres
-        for pos in list(self.cadavres.keys()):
-            self.cadavres[pos] -= 0.5
-            if self.cadavres[pos] <= 0:
-                del self.cadavres[pos]
+        presents = self.presence_cadavres > 0
+        self.masse_cadavres[presents] -= DECOMPOSITION_PAR_CYCLE
+        decomposes = presents & (self.masse_cadavres <= 0)
+        self.presence_cadavres[decomposes] = 0
+        self.masse_cadavres[decomposes] = 0.0
+
+        # Repousse des ressources, répartie sur les cases libres
+        repousse = CONFIG["environnement"].get("ressources_par_cycle", 0)
+        if repousse:
+            increment = repousse * self.modificateur_saisonnier / self.taille**2
+            libres = self.grille_obstacles == 0
+            self.grille_ressources[libres] = np.minimum(
+                1.0, self.grille_ressources[libres] + increment
+            )
+
+    def voisinage(self, couche, x, y, rayon=1, remplissage=0):
+        """
+        Fenêtre (2 * rayon + 1) x (2 * rayon + 1) d'une couche centrée sur
+        (x, y), indexée [dy + rayon, dx + rayon]. Les cases hors de la carte
+        valent remplissage.
+        """
+        grille = self.couches[couche]
+        cote = 2 * rayon + 1
+        fenetre = np.full((cote, cote), remplissage, dtype=grille.dtype)
+
+        y0, x0 = y - rayon, x - rayon
+        ys = slice(max(0, y0), min(self.taille, y0 + cote))
+        xs = slice(max(0, x0), min(self.taille, x0 + cote))
+        if ys.start < ys.stop and xs.start < xs.stop:
+            fenetre[ys.start - y0 : ys.stop - y0, xs.start - x0 : xs.stop - x0] = (
+                grille[ys, xs]
+            )
+        return fenetre
@@ -17,6 +17,26 @@ import time
 
 from eve_src.config import CONFIG
 
+# Compteurs du cache de phénotype, remis à zéro à chaque nouvelle simulation
+_STATISTIQUES_CACHE_PHENOTYPE = {"succes": 0, "echecs": 0}
+
+
+def reinitialiser_statistiques_cache_phenotype():
+    """Remet à zéro les compteurs du cache de phénotype (nouvelle simulation)."""
+    _STATISTIQUES_CACHE_PHENOTYPE["succes"] = 0
+    _STATISTIQUES_CACHE_PHENOTYPE["echecs"] = 0
+
+
+def statistiques_cache_phenotype():
+    """Succès, échecs et taux de succès cumulés du cache de phénotype."""
+    succes = _STATISTIQUES_CACHE_PHENOTYPE["succes"]
+    total = succes + _STATISTIQUES_CACHE_PHENOTYPE["echecs"]
+    return {
+        "cache_phenotype_succes": succes,
+        "cache_phenotype_echecs": total - succes,
+        "cache_phenotype_taux": succes / total if total else 0.0,
+    }
+
 
 class MutationType(Enum):
     """Types de mutations possibles"""
@@ -87,6 +107,15 @@ class Chromosome:
         }
 
 
+@dataclass(frozen=True)
+class PackedGene:
+    """Vue NumPy figée d'un gène, pour les calculs de distance vectorisés"""
+
+    sequence: np.ndarray
+    methylation: np.ndarray
+    expression_level: float
+
+
 class EpigeneticController:
     """Contrôleur épigénétique pour la régulation de l'expression génique"""
 
@@ -104,6 +133,7 @@ class EpigeneticController:
         if environmental_stress > stress_threshold:
             # Activation des gènes de stress
             self._activate_stress_response_genes(genome)
+            genome.mark_modified()
             # Mémorisation épigénétique
             self.environmental_memory.append(
                 {
@@ -141,6 +171,7 @@ class EpigeneticController:
                     for gene in chrom.genes.values():
                         if "adaptation" in gene.name:
                             gene.expression_level *= 1.2
+                genome.mark_modified()
 
 
 class EvolutionaryConstraints:
@@ -255,11 +286,13 @@ class NetworkEvolution:
                     if available_partners:
                         new_partner = random.choice(available_partners)
                         gene.interaction_partners.add(new_partner)
+                        genome.mark_modified()
 
                 # Probabilité de perdre des interactions
                 if len(gene.interaction_partners) > 1 and random.random() < 0.02:
                     lost_partner = random.choice(list(gene.interaction_partners))
                     gene.interaction_partners.remove(lost_partner)
+                    genome.mark_modified()
 
     def _evolve_modularity(self, genome):
         """Fait évoluer la structure modulaire"""
@@ -276,6 +309,7 @@ class NetworkEvolution:
                                 genome.get_all_genes()[gene1].interaction_partners.add(
                                     gene2
                                 )
+                                genome.mark_modified()
 
     def _detect_functional_modules(self, genome):
         """Détecte les modules fonctionnels dans le réseau"""
@@ -356,6 +390,7 @@ class NetworkEvolution:
             # Ajoute au même chromosome ou à un autre
             target_chrom = random.choice(list(genome.chromosomes.values()))
             target_chrom.add_gene(duplicate_gene)
+            genome.mark_modified()
 
 
 class AdvancedGenome:
@@ -368,6 +403,11 @@ class AdvancedGenome:
         self.mutation_rate = CONFIG.get("genetique", {}).get("taux_mutation_base", 0.01)
         self.generation = 0
         self.lineage_id = self._generate_lineage_id()
+        # Incrémentée à chaque modification : invalide les caches dérivés
+        self.version = 0
+        self._cache_phenotype = None
+        self._cache_genes = None
+        self._cache_packed = None
 
         # Systèmes de contrôle avancés
         self.epigenetic_controller = EpigeneticController()
@@ -478,6 +518,7 @@ class AdvancedGenome:
             "autosome_2": autosome2,
             "sex_chromosome": sex_chromosome,
         }
+        self.mark_modified()
 
     def _create_founder_genome(self):
         """Crée un génome fondateur riche avec potentiel évolutif"""
@@ -629,6 +670,11 @@ class AdvancedGenome:
             "sex_chromosome": sex_chromosome,
             "adaptation_chromosome": adaptation_chromosome,
         }
+        self.mark_modified()
+
+    def mark_modified(self):
+        """Signale une modification du génome (phénotype et gènes à recalculer)."""
+        self.version += 1
 
     def advanced_mutation(self, environmental_pressure=0.0, mutagenic_factors=None):
         """Système de mutation ultra-avancé avec contraintes évolutives"""
@@ -756,6 +802,8 @@ class AdvancedGenome:
         elif mutation_type == MutationType.POLYPLOIDY:
             self._polyploidy_mutation()
 
+        self.mark_modified()
+
         # Mise à jour des métriques génomiques
         self._update_genome_metrics()
 
@@ -912,6 +960,22 @@ class AdvancedGenome:
         self.genome_stability = max(0.0, 1.0 - recent_mutations * 0.1)
 
     def get_phenotype(self):
+        """
+        Phénotype basé sur l'expression génique, mémorisé jusqu'à la prochaine
+        modification du génome. Le dictionnaire retourné est partagé : ne pas
+        le modifier.
+        """
+        cache = getattr(self, "_cache_phenotype", None)
+        if cache is not None and cache[0] == self.version:
+            _STATISTIQUES_CACHE_PHENOTYPE["succes"] += 1
+            return cache[1]
+        _STATISTIQUES_CACHE_PHENOTYPE["echecs"] += 1
+
+        phenotype = self._compute_phenotype()
+        self._cache_phenotype = (self.version, phenotype)
+        return phenotype
+
+    def _compute_phenotype(self):
         """Calcule le phénotype basé sur l'expression génique"""
         phenotype = {
             "physique": {},
@@ -984,12 +1048,34 @@ class AdvancedGenome:
         return phenotype
 
     def get_all_genes(self):
-        """Retourne tous les gènes du génome"""
+        """Retourne tous les gènes du génome (dictionnaire partagé, en lecture)"""
+        cache = getattr(self, "_cache_genes", None)
+        if cache is not None and cache[0] == self.version:
+            return cache[1]
+
         all_genes = {}
         for chrom in self.chromosomes.values():
             all_genes.update(chrom.genes)
+        self._cache_genes = (self.version, all_genes)
         return all_genes
 
+    def get_packed_genes(self):
+        """Séquences et méthylations des gènes en tableaux NumPy (mémorisés)"""
+        cache = getattr(self, "_cache_packed", None)
+        if cache is not None and cache[0] == self.version:
+            return cache[1]
+
+        packed = {
+            name: PackedGene(
+                sequence=np.asarray(gene.sequence, dtype=float),
+                methylation=np.asarray(gene.methylation_pattern, dtype=bool),
+                expression_level=float(gene.expression_level),
+            )
+            for name, gene in self.get_all_genes().items()
+        }
+        self._cache_packed = (self.version, packed)
+        return packed
+
     def get_all_gene_names(self):
         """Retourne tous les noms de gènes"""
         return list(self.get_all_genes().keys())
@@ -999,11 +1085,11 @@ class AdvancedGenome:
         if not isinstance(other_genome, AdvancedGenome):
             return 1.0  # Distance maximale si types incompatibles
 
-        self_genes = self.get_all_genes()
-        other_genes = other_genome.get_all_genes()
+        self_genes = self.get_packed_genes()
+        other_genes = other_genome.get_packed_genes()
 
-        # Gènes communs
-        common_genes = set(self_genes.keys()) & set(other_genes.keys())
+        # Gènes communs (ordre fixe, comme genetic_distance_matrix)
+        common_genes = sorted(set(self_genes.keys()) & set(other_genes.keys()))
 
         if not common_genes:
             return 1.0
@@ -1028,14 +1114,19 @@ class AdvancedGenome:
 
     def _sequence_distance(self, seq1, seq2):
         """Calcule la distance entre deux séquences"""
-        if not seq1 or not seq2:
+        if len(seq1) == 0 or len(seq2) == 0:
             return 1.0
 
         min_len = min(len(seq1), len(seq2))
         max_len = max(len(seq1), len(seq2))
 
         # Distance basée sur les différences de valeurs
-        differences = sum(abs(seq1[i] - seq2[i]) for i in range(min_len))
+        differences = float(
+            np.abs(
+                np.asarray(seq1[:min_len], dtype=float)
+                - np.asarray(seq2[:min_len], dtype=float)
+            ).sum()
+        )
 
         # Pénalité pour les différences de longueur
         length_penalty = abs(len(seq1) - len(seq2)) / max_len
@@ -1048,21 +1139,183 @@ class AdvancedGenome:
         # Distance d'expression
         expr_distance = abs(gene1.expression_level - gene2.expression_level)
 
-        # Distance de méthylation
+        # Distance de méthylation (Gene ou PackedGene)
+        meth1 = _methylation_array(gene1)
+        meth2 = _methylation_array(gene2)
         meth_distance = 0.0
-        if len(gene1.methylation_pattern) == len(gene2.methylation_pattern):
-            differences = sum(
-                1
-                for a, b in zip(gene1.methylation_pattern, gene2.methylation_pattern)
-                if a != b
-            )
-            meth_distance = differences / len(gene1.methylation_pattern)
+        if len(meth1) == len(meth2):
+            if len(meth1):
+                meth_distance = np.count_nonzero(meth1 != meth2) / len(meth1)
         else:
             meth_distance = 1.0
 
         return (expr_distance + meth_distance) / 2
 
 
+def _methylation_array(gene):
+    """Motif de méthylation d'un Gene ou d'un PackedGene en tableau booléen"""
+    if isinstance(gene, PackedGene):
+        return gene.methylation
+    return np.asarray(gene.methylation_pattern, dtype=bool)
+
+
+def _familles_genes(genomes):
+    """
+    Gènes de la population regroupés par famille (nom), dans l'ordre des noms :
+    rangs des génomes porteurs, séquences et méthylations complétées à la
+    longueur maximale, niveaux d'expression. Rien n'y est de taille (m, m).
+    """
+    packed = [
+        g.get_packed_genes() if isinstance(g, AdvancedGenome) else {} for g in genomes
+    ]
+    familles = []
+    for name in sorted(set().union(*packed)):
+        rangs = np.array([i for i, genes in enumerate(packed) if name in genes])
+        genes = [packed[i][name] for i in rangs]
+        m = len(rangs)
+
+        # Séquences complétées par des zéros
+        longueurs = np.array([len(g.sequence) for g in genes])
+        sequences = np.zeros((m, max(longueurs.max(), 1)))
+        for k, g in enumerate(genes):
+            sequences[k, : len(g.sequence)] = g.sequence
+
+        # Méthylations complétées par False : le décompte des écarts reste exact
+        longueurs_meth = np.array([len(g.methylation) for g in genes])
+        methylations = np.zeros((m, max(longueurs_meth.max(), 1)))
+        for k, g in enumerate(genes):
+            methylations[k, : len(g.methylation)] = g.methylation
+
+        # Ligne de chaque génome dans la famille (-1 : gène absent)
+        lignes = np.full(len(genomes), -1)
+        lignes[rangs] = np.arange(m)
+        familles.append(
+            (
+                rangs,
+                lignes,
+                longueurs,
+                sequences,
+                longueurs_meth,
+                methylations,
+                methylations.sum(axis=1),
+                np.array([g.expression_level for g in genes]),
+            )
+        )
+    return familles
+
+
+def genetic_distance_blocks(genomes, block_bytes=64 * 1024 * 1024):
+    """
+    Distances génétiques par blocs de lignes : produit (debut, fin, bloc) où
+    bloc[i, j] vaut calculate_genetic_distance entre genomes[debut + i] et
+    genomes[j].
+
+    Toutes les familles de gènes sont traitées bloc par bloc et accumulées
+    sur place dans les sommes du bloc : aucun temporaire (m, m) par famille,
+    ni matrice (n, n). Le nombre de lignes d'un bloc est choisi pour que le
+    plus gros temporaire (écarts de séquences) reste sous block_bytes ; les
+    écarts de méthylation se déduisent d'un produit matriciel
+    (|a| + |b| - 2 a.b).
+    """
+    n = len(genomes)
+    valides = np.array([isinstance(g, AdvancedGenome) for g in genomes], dtype=bool)
+    familles = _familles_genes(genomes)
+    par_ligne = max(
+        [8 * len(famille[0]) * famille[3].shape[1] for famille in familles] + [8 * n]
+    )
+    taille_bloc = max(1, block_bytes // par_ligne)
+
+    for debut in range(0, n, taille_bloc):
+        fin = min(n, debut + taille_bloc)
+        total = np.zeros((fin - debut, n))
+        communs = np.zeros((fin - debut, n), dtype=np.int64)
+
+        for (
+            rangs,
+            lignes,
+            longueurs,
+            sequences,
+            longueurs_meth,
+            methylations,
+            actifs,
+            expressions,
+        ) in familles:
+            lignes_bloc = lignes[debut:fin]
+            locales = np.flatnonzero(lignes_bloc >= 0)
+            if len(locales) == 0:
+                continue
+            k = lignes_bloc[locales]
+
+            longueur_min = np.minimum(longueurs[k, None], longueurs[None, :])
+            longueur_max = np.maximum(longueurs[k, None], longueurs[None, :])
+            ecarts = np.abs(sequences[k, None, :] - sequences[None, :, :])
+            ecarts *= np.arange(sequences.shape[1]) < longueur_min[:, :, None]
+            differences = ecarts.sum(axis=2)
+            del ecarts
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                seq_distance = np.minimum(
+                    1.0,
+                    (
+                        differences / longueur_min
+                        + np.abs(longueurs[k, None] - longueurs[None, :]) / longueur_max
+                    )
+                    / 2,
+                )
+            seq_distance[longueur_min == 0] = 1.0
+
+            ecarts_meth = (
+                actifs[k, None] + actifs[None, :] - 2 * methylations[k] @ methylations.T
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                meth_distance = np.where(
+                    longueurs_meth[k, None] == longueurs_meth[None, :],
+                    np.nan_to_num(ecarts_meth / longueurs_meth[k, None]),
+                    1.0,
+                )
+            expr_distance = np.abs(expressions[k, None] - expressions[None, :])
+
+            gene_distance = (seq_distance + (expr_distance + meth_distance) / 2) / 2
+            if len(rangs) == n:
+                total[locales] += gene_distance
+                communs[locales] += 1
+            else:
+                total[np.ix_(locales, rangs)] += gene_distance
+                communs[np.ix_(locales, rangs)] += 1
+
+        bloc = np.ones((fin - debut, n))
+        np.divide(total, communs, out=bloc, where=communs > 0)
+        bloc[~valides[debut:fin], :] = 1.0
+        bloc[:, ~valides] = 1.0
+        yield debut, fin, bloc
+
+
+def genetic_distance_matrix(genomes, block_bytes=64 * 1024 * 1024):
+    """
+    Matrice (n, n) des distances génétiques entre génomes, équivalente à
+    calculate_genetic_distance pour chaque paire, assemblée à partir de
+    genetic_distance_blocks.
+    """
+    distances = np.ones((len(genomes), len(genomes)))
+    for debut, fin, bloc in genetic_distance_blocks(genomes, block_bytes):
+        distances[debut:fin] = bloc
+    return distances
+
+
+def genetic_diversity(genomes, block_bytes=64 * 1024 * 1024):
+    """
+    Distance génétique moyenne entre paires de génomes distincts (0.0 en
+    dessous de deux génomes), sans construire la matrice (n, n).
+    """
+    n = len(genomes)
+    if n < 2:
+        return 0.0
+    somme = 0.0
+    for debut, fin, bloc in genetic_distance_blocks(genomes, block_bytes):
+        somme += bloc.sum() - bloc[np.arange(fin - debut), np.arange(debut, fin)].sum()
+    return somme / (n * (n - 1))
+
+
 def advanced_crossover(genome1, genome2, recombination_rate=0.5):
     """
     Croisement génétique ultra-avancé avec recombinaison chromosomique,
@@ -1103,6 +1356,7 @@ def advanced_crossover(genome1, genome2, recombination_rate=0.5):
             child_chrom = copy.deepcopy(parent2_chrom)
 
         child_genome.chromosomes[chrom_type] = child_chrom
+    child_genome.mark_modified()
 
     # Héritage épigénétique
     _inherit_epigenetic_marks(child_genome, genome1, genome2)
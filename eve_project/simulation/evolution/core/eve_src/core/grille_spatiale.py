@@ -0,0 +1,99 @@
+# eve_src/core/grille_spatiale.py
+"""
+Hachage spatial des unités sur (x, y).
+La grille est reconstruite une fois par cycle et partagée par les analyses
+de voisinage (symbioses, appariement, coordination) : chaque requête ne
+parcourt que les cellules proches au lieu de toute la population.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+TAILLE_CELLULE_DEFAUT = 4
+
+
+class GrilleSpatiale:
+    """Index des unités par cellule carrée, interrogé en distance de Manhattan."""
+
+    def __init__(self, taille_cellule=TAILLE_CELLULE_DEFAUT):
+        """Initialise une grille vide."""
+        self.taille_cellule = max(1, int(taille_cellule))
+        self.unites = []
+        self.positions: List[Tuple[float, float]] = []
+        self.cellules: Dict[Tuple[int, int], List[int]] = {}
+        self._rangs: Dict[int, int] = {}
+
+    def __len__(self):
+        """Nombre d'unités indexées."""
+        return len(self.unites)
+
+    def _cellule(self, x, y):
+        """Coordonnées de la cellule contenant (x, y)."""
+        return int(x // self.taille_cellule), int(y // self.taille_cellule)
+
+    def reconstruire(self, unites):
+        """Indexe les unités à leurs positions actuelles."""
+        self.unites = list(unites)
+        self.positions = [(unite.x, unite.y) for unite in self.unites]
+        self._rangs = {id(unite): rang for rang, unite in enumerate(self.unites)}
+
+        cellules = defaultdict(list)
+        for rang, (x, y) in enumerate(self.positions):
+            cellules[self._cellule(x, y)].append(rang)
+        self.cellules = dict(cellules)
+
+    def rang(self, unite) -> Optional[int]:
+        """Rang d'une unité dans la grille (None si elle n'est pas indexée)."""
+        return self._rangs.get(id(unite))
+
+    def dans_rayon(self, x, y, rayon) -> List[int]:
+        """Rangs, par ordre croissant, des unités à distance <= rayon de (x, y)."""
+        cx_min, cy_min = self._cellule(x - rayon, y - rayon)
+        cx_max, cy_max = self._cellule(x + rayon, y + rayon)
+
+        resultats = []
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                for rang in self.cellules.get((cx, cy), ()):
+                    ux, uy = self.positions[rang]
+                    if abs(ux - x) + abs(uy - y) <= rayon:
+                        resultats.append(rang)
+
+        resultats.sort()
+        return resultats
+
+    def k_plus_proches(self, x, y, k, exclure=None) -> List[int]:
+        """
+        Rangs des k unités les plus proches de (x, y), de la plus proche à la
+        plus lointaine (égalités départagées par rang).
+
+        Les cellules sont parcourues par anneaux croissants ; la recherche
+        s'arrête dès qu'aucun anneau suivant ne peut contenir plus proche.
+        """
+        if k <= 0 or not self.unites:
+            return []
+
+        cx, cy = self._cellule(x, y)
+        etendue = max(
+            max(abs(cellule[0] - cx), abs(cellule[1] - cy)) for cellule in self.cellules
+        )
+
+        candidats = []
+        for anneau in range(etendue + 1):
+            for cellule_x in range(cx - anneau, cx + anneau + 1):
+                for cellule_y in range(cy - anneau, cy + anneau + 1):
+                    if max(abs(cellule_x - cx), abs(cellule_y - cy)) != anneau:
+                        continue
+                    for rang in self.cellules.get((cellule_x, cellule_y), ()):
+                        if rang == exclure:
+                            continue
+                        ux, uy = self.positions[rang]
+                        candidats.append((abs(ux - x) + abs(uy - y), rang))
+
+            # Tout point au-delà de cet anneau est à plus de anneau * taille
+            if len(candidats) >= k:
+                candidats.sort()
+                if candidats[k - 1][0] <= anneau * self.taille_cellule:
+                    break
+
+        candidats.sort()
+        return [rang for _, rang in candidats[:k]]
@@ -15,7 +15,16 @@ import time
 
 from eve_src.config import CONFIG
 from eve_src.core.environnement import Environnement
-from eve_src.core.genetique import Genome, crossover
+from eve_src.core.genetique import (
+    AdvancedGenome,
+    Genome,
+    crossover,
+    genetic_distance_matrix,
+    genetic_diversity,
+    reinitialiser_statistiques_cache_phenotype,
+    statistiques_cache_phenotype,
+)
+from eve_src.core.grille_spatiale import GrilleSpatiale
 from eve_src.archetypes.archetype_animal import Animal
 from eve_src.archetypes.archetype_vegetal import Vegetal
 from eve_src.archetypes.archetype_insecte import Insecte
@@ -113,16 +122,15 @@ class IntelligenceEmergente:
         # Algorithme de mesure de coordination spatiale
         coordination_scores = []
         for pattern_positions in patterns.values():
-            if len(pattern_positions) > 1:
-                # Calcul de la cohésion spatiale
-                avg_distance = np.mean(
-                    [
-                        abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
-                        for i, p1 in enumerate(pattern_positions)
-                        for j, p2 in enumerate(pattern_positions[i + 1 :])
-                    ]
-                )
-                coordination_scores.append(1.0 / (1.0 + avg_distance))
+            n = len(pattern_positions)
+            if n > 1:
+                # Cohésion spatiale en O(n) autour du centroïde : la distance
+                # quadratique moyenne entre deux individus vaut 2n/(n-1) fois
+                # la variance des positions, sur chaque axe
+                positions = np.asarray(pattern_positions, dtype=float)
+                variances = positions.var(axis=0)
+                dispersion = np.sqrt(2.0 * variances * n / (n - 1)).sum()
+                coordination_scores.append(1.0 / (1.0 + dispersion))
 
         return np.mean(coordination_scores) if coordination_scores else 0.0
 
@@ -139,7 +147,7 @@ class AdaptiveEcosystem:
         self.symbiotic_relationships = []
         self.ecosystem_memory = deque(maxlen=1000)
 
-    def update_ecosystem_dynamics(self, population):
+    def update_ecosystem_dynamics(self, population, grille=None):
         """Met à jour la dynamique écosystémique"""
         # Calcul de la capacité de charge adaptative
         self._update_carrying_capacity(population)
@@ -151,7 +159,7 @@ class AdaptiveEcosystem:
         self._evolve_ecological_niches(population)
 
         # Formation de relations symbiotiques
-        self._develop_symbioses(population)
+        self._develop_symbioses(population, grille)
 
         # Mémorisation de l'état écosystémique
         self._store_ecosystem_state(population)
@@ -258,13 +266,21 @@ class AdaptiveEcosystem:
 
         return base_fitness * seasonal_bonus * social_bonus
 
-    def _develop_symbioses(self, population):
+    def _develop_symbioses(self, population, grille=None):
         """Développement de relations symbiotiques"""
         potential_partnerships = []
 
-        # Recherche de partenaires symbiotiques potentiels
+        # La grille doit indexer cette population, dans le même ordre
+        if grille is None or len(grille) != len(population):
+            grille = GrilleSpatiale()
+            grille.reconstruire(population)
+
+        # Recherche de partenaires symbiotiques potentiels (voisins seulement)
         for i, unit1 in enumerate(population):
-            for unit2 in population[i + 1 :]:
+            for j in grille.dans_rayon(unit1.x, unit1.y, 3):
+                if j <= i:
+                    continue
+                unit2 = population[j]
                 if self._can_form_symbiosis(unit1, unit2):
                     symbiosis_strength = self._calculate_symbiosis_potential(
                         unit1, unit2
@@ -487,12 +503,15 @@ class AdvancedSimulation:
         self.monde = Environnement(CONFIG["environnement"]["taille"])
         self.population = []
         self.age_simulation = 0
+        # Statistiques du cache de phénotype propres à cette simulation
+        reinitialiser_statistiques_cache_phenotype()
         self.evo_manager = MondeEvoManager()
 
         # === NOUVEAUX SYSTÈMES RÉVOLUTIONNAIRES ===
         self.intelligence_emergente = IntelligenceEmergente()
         self.adaptive_ecosystem = AdaptiveEcosystem(self.monde)
         self.meta_evolution = MetaEvolutionEngine()
+        self.grille_spatiale = GrilleSpatiale()
 
         # Historique et métriques avancées
         self.stats_history = deque(maxlen=10000)
@@ -580,9 +599,14 @@ class AdvancedSimulation:
             self._emergency_recovery()
             return
 
+        # Index spatial du cycle, partagé par les analyses de voisinage
+        self.grille_spatiale.reconstruire(self.population)
+
         # === PHASE 1: Mise à jour environnementale ===
         self.monde.update_cycle()
-        self.adaptive_ecosystem.update_ecosystem_dynamics(self.population)
+        self.adaptive_ecosystem.update_ecosystem_dynamics(
+            self.population, self.grille_spatiale
+        )
 
         # === PHASE 2: Simulation des organismes ===
         nouveaux_nes, morts = self._simulate_organisms()
@@ -593,6 +617,9 @@ class AdvancedSimulation:
 
         # === PHASE 4: Gestion des événements évolutifs ===
         stats = self.get_advanced_stats()
+        stats.update(statistiques_cache_phenotype())
+        self.ecosystem_metrics.diversite_genetique = self._diversite_genetique()
+        stats["diversite_genetique"] = self.ecosystem_metrics.diversite_genetique
         self.stats_history.append(stats)
 
         # Détection de crises et activation des systèmes de récupération
@@ -622,6 +649,11 @@ class AdvancedSimulation:
         if CONFIG["genetique"]["mode_reproduction"] == "sexuee":
             nouveaux_nes.extend(self._advanced_sexual_reproduction())
 
+        # Décisions de tous les animaux en un seul passage neuronal
+        Animal.planifier_actions(
+            [u for u in self.population if isinstance(u, Animal)], self.monde, pop_dict
+        )
+
         # Simulation de chaque organisme
         for unite in self.population:
             # Application des effets symbiotiques
@@ -688,12 +720,35 @@ class AdvancedSimulation:
         couples = []
         used = set()
 
+        # Index des candidats parmi les unités de la grille du cycle
+        grille = self.grille_spatiale
+        if any(grille.rang(c) is None for c in candidates):
+            grille = GrilleSpatiale()
+            grille.reconstruire(candidates)
+        indices = {id(c): i for i, c in enumerate(candidates)}
+
+        # Distances génétiques de tous les candidats, calculées par blocs
+        genomes = [getattr(c, "genome", None) for c in candidates]
+        distances = None
+        if len(candidates) > 1 and all(isinstance(g, AdvancedGenome) for g in genomes):
+            distances = genetic_distance_matrix(genomes)
+
         # Tri par compatibilité génétique
         compatibility_matrix = []
         for i, c1 in enumerate(candidates):
-            for j, c2 in enumerate(candidates[i + 1 :], i + 1):
+            voisins = sorted(
+                indices[id(grille.unites[rang])]
+                for rang in grille.dans_rayon(c1.x, c1.y, 5)
+                if id(grille.unites[rang]) in indices
+            )
+            for j in voisins:
+                if j <= i:
+                    continue
+                c2 = candidates[j]
                 if abs(c1.x - c2.x) + abs(c1.y - c2.y) < 5:  # Proximité
-                    compatibility = self._calculate_genetic_compatibility(c1, c2)
+                    compatibility = self._calculate_genetic_compatibility(
+                        c1, c2, None if distances is None else distances[i, j]
+                    )
                     compatibility_matrix.append((i, j, compatibility))
 
         # Sélection des meilleures compatibilités
@@ -707,12 +762,16 @@ class AdvancedSimulation:
 
         return couples
 
-    def _calculate_genetic_compatibility(self, animal1, animal2):
-        """Calcule la compatibilité génétique entre deux animaux"""
+    def _calculate_genetic_compatibility(self, animal1, animal2, genetic_distance=None):
+        """
+        Calcule la compatibilité génétique entre deux animaux ; genetic_distance
+        reprend la distance déjà calculée par genetic_distance_matrix.
+        """
         if not (hasattr(animal1, "genome") and hasattr(animal2, "genome")):
             return 0.5
 
-        genome1, genome2 = animal1.genome.data, animal2.genome.data
+        genome1 = animal1.genome.get_phenotype()
+        genome2 = animal2.genome.get_phenotype()
 
         # Facteurs de compatibilité
         compatibility_score = 0.0
@@ -728,5 +787,19 @@ class AdvancedSimulation:
             compatibility_score += 0.2
 
         # Diversité génétique (favorise la diversité)
-        genetic_distance = self._calculate_genetic_distance(genome1, genome2)
-        compatibility_score += min(0.5, genetic_distance)
\ No newline at end of file
+        if genetic_distance is None:
+            genetic_distance = animal1.genome.calculate_genetic_distance(animal2.genome)
+        compatibility_score += min(0.5, genetic_distance)
+
+        return compatibility_score
+
+    def _diversite_genetique(self, taille_echantillon=256):
+        """Diversité génétique moyenne sur un échantillon borné des animaux."""
+        genomes = [
+            u.genome
+            for u in self.population
+            if isinstance(u, Animal) and isinstance(u.genome, AdvancedGenome)
+        ]
+        if len(genomes) > taille_echantillon:
+            genomes = random.sample(genomes, taille_echantillon)
+        return genetic_diversity(genomes)
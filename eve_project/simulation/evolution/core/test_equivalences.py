@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+# Script de vérification des chemins vectorisés d'EVE
+
+"""
+Vérifie que les chemins vectorisés d'EVE (requêtes spatiales, calculs groupés
+NumPy) donnent les mêmes résultats que les calculs scalaires qu'ils
+remplacent.
+À lancer depuis ce dossier, comme main.py (config.json requis).
+"""
+
+import sys
+import random
+from typing import Dict, List, Any
+
+import numpy as np
+
+
+def _rapport(resultats: Dict[str, Any], message_ok: str) -> Dict[str, Any]:
+    """Termine un test : succès si aucune erreur, puis affichage."""
+    resultats["succes"] = not resultats["erreurs"]
+    for erreur in resultats["erreurs"]:
+        print(f"✗ {erreur}")
+    if resultats["succes"]:
+        print(f"✓ {message_ok}")
+    return resultats
+
+
+def tester_grille_spatiale(graine: int = 42) -> Dict[str, Any]:
+    """
+    Compare GrilleSpatiale.dans_rayon et k_plus_proches à un parcours de toute
+    la population (tri par distance puis par rang).
+    """
+    print("\n=== GRILLE SPATIALE ===")
+
+    from eve_src.core.grille_spatiale import GrilleSpatiale
+
+    class Unite:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    generateur = random.Random(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    try:
+        unites = [
+            Unite(generateur.randint(-5, 60), generateur.randint(-5, 60))
+            for _ in range(400)
+        ]
+        for taille_cellule in (1, 3, 4, 10):
+            grille = GrilleSpatiale(taille_cellule)
+            grille.reconstruire(unites)
+            for _ in range(200):
+                x, y = generateur.randint(-10, 70), generateur.randint(-10, 70)
+                rayon = generateur.choice((0, 1, 2, 5, 12))
+                attendus = [
+                    rang
+                    for rang, unite in enumerate(unites)
+                    if abs(unite.x - x) + abs(unite.y - y) <= rayon
+                ]
+                obtenus = grille.dans_rayon(x, y, rayon)
+                if obtenus != attendus:
+                    resultats["erreurs"].append(
+                        f"dans_rayon({x}, {y}, {rayon}) cellule {taille_cellule} : "
+                        f"{len(obtenus)} rangs au lieu de {len(attendus)}"
+                    )
+                    break
+
+                k = generateur.choice((1, 3, 10, 50, 500))
+                exclure = generateur.choice((None, generateur.randrange(len(unites))))
+                attendus = [
+                    rang
+                    for _, rang in sorted(
+                        (abs(unite.x - x) + abs(unite.y - y), rang)
+                        for rang, unite in enumerate(unites)
+                        if rang != exclure
+                    )[:k]
+                ]
+                obtenus = grille.k_plus_proches(x, y, k, exclure=exclure)
+                if obtenus != attendus:
+                    resultats["erreurs"].append(
+                        f"k_plus_proches({x}, {y}, {k}) cellule {taille_cellule} : "
+                        "ordre ou voisins différents du tri complet"
+                    )
+                    break
+            if any(grille.rang(unite) != rang for rang, unite in enumerate(unites)):
+                resultats["erreurs"].append("rang() incohérent avec reconstruire()")
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    return _rapport(
+        resultats, "dans_rayon et k_plus_proches identiques au parcours complet"
+    )
+
+
+def _decision_scalaire(genome, perception) -> int:
+    """Ancienne décision neuronale, entrée par entrée, en Python pur."""
+    from eve_src.config import CONFIG
+
+    num_entrees = CONFIG["cerveau"]["neurones_entree"]
+    num_sorties = CONFIG["cerveau"]["neurones_sortie"]
+    valeurs_sortie = [0.0] * num_sorties
+    brain_gene = genome.get_all_genes().get("cerveau_neural_network")
+    if not brain_gene or len(brain_gene.sequence) < num_entrees * num_sorties:
+        return 4
+    poids = [
+        brain_gene.sequence[i * num_sorties : (i + 1) * num_sorties]
+        for i in range(num_entrees)
+    ]
+    for i, p in enumerate(perception):
+        if p > 0 and i < len(poids):
+            for j in range(num_sorties):
+                valeurs_sortie[j] += p * poids[i][j]
+    return valeurs_sortie.index(max(valeurs_sortie))
+
+
+def _animal(classe, x, y, genome):
+    """Animal placé en (x, y) sans passer par la couleur de tribu (inutile ici)."""
+    animal = classe.__new__(classe)
+    animal.x, animal.y = x, y
+    animal.genome = genome
+    animal.action_planifiee = None
+    return animal
+
+
+def tester_inference_groupee(graine: int = 42) -> Dict[str, Any]:
+    """Compare planifier_actions / decider_actions à la boucle scalaire par animal."""
+    print("\n=== INFÉRENCE NEURONALE GROUPÉE ===")
+
+    from eve_src.archetypes.archetype_animal import Animal
+    from eve_src.archetypes.archetype_insecte import Insecte
+    from eve_src.archetypes.archetype_vegetal import Vegetal
+    from eve_src.core.cerveau import construire_perceptions
+    from eve_src.core.environnement import Environnement
+    from eve_src.core.genetique import AdvancedGenome, Gene
+
+    random.seed(graine)
+    np.random.seed(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    try:
+        taille = 30
+        env = Environnement(taille)
+        for _ in range(40):
+            env.cadavres[(random.randrange(taille), random.randrange(taille))] = 5
+
+        pop_dict = {}
+        animaux: List[Any] = []
+        for k in range(200):
+            genome = AdvancedGenome()
+            if k % 7 != 6:
+                # Poids discrets pour provoquer des égalités dans l'argmax
+                sequence = [
+                    (
+                        random.choice((0.5, -0.5, 0.25, 1.0))
+                        if k % 3 == 0
+                        else random.uniform(-1, 1)
+                    )
+                    for _ in range(225 + k % 4)
+                ]
+                chromosome = next(iter(genome.chromosomes.values()))
+                chromosome.add_gene(Gene("cerveau_neural_network", sequence))
+                genome.mark_modified()  # Gène ajouté à la main : cache du cerveau périmé
+            pos = (random.randrange(taille), random.randrange(taille))
+            animal = _animal(Animal, pos[0], pos[1], genome)
+            animaux.append(animal)
+            pop_dict[pos] = animal
+        for _ in range(60):
+            pos = (random.randrange(taille), random.randrange(taille))
+            classe = random.choice((Vegetal, Insecte))
+            pop_dict[pos] = classe.__new__(classe)
+        animaux = [a for a in animaux if pop_dict.get((a.x, a.y)) is a]
+
+        Animal.planifier_actions(animaux, env, pop_dict)
+        perceptions = construire_perceptions(
+            animaux, env, pop_dict, (Vegetal, Insecte), Animal
+        )
+        for rang, animal in enumerate(animaux):
+            perception = animal.percevoir(env, pop_dict)
+            if list(perceptions[rang]) != perception:
+                resultats["erreurs"].append(
+                    f"Perception groupée différente pour l'animal {rang}"
+                )
+                break
+            attendue = _decision_scalaire(animal.genome, perception)
+            if animal.action_planifiee != attendue:
+                resultats["erreurs"].append(
+                    f"Animal {rang} : action planifiée {animal.action_planifiee}, "
+                    f"scalaire {attendue}"
+                )
+                break
+            if animal.choisir_action(env, pop_dict) != attendue:
+                resultats["erreurs"].append(f"choisir_action diverge (animal {rang})")
+                break
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    return _rapport(resultats, "Actions groupées identiques à la boucle scalaire")
+
+
+def _distance_scalaire(genome1, genome2) -> float:
+    """Ancienne distance génétique, gène par gène, sur les listes Python."""
+    genes1 = genome1.get_all_genes()
+    genes2 = genome2.get_all_genes()
+    communs = set(genes1) & set(genes2)
+    if not communs:
+        return 1.0
+
+    total = 0.0
+    for nom in communs:
+        g1, g2 = genes1[nom], genes2[nom]
+        s1, s2 = list(g1.sequence), list(g2.sequence)
+        if not s1 or not s2:
+            distance_sequence = 1.0
+        else:
+            n_min, n_max = min(len(s1), len(s2)), max(len(s1), len(s2))
+            differences = sum(abs(s1[i] - s2[i]) for i in range(n_min))
+            penalite = abs(len(s1) - len(s2)) / n_max
+            distance_sequence = min(1.0, (differences / n_min + penalite) / 2)
+
+        m1, m2 = list(g1.methylation_pattern), list(g2.methylation_pattern)
+        if len(m1) != len(m2):
+            distance_methylation = 1.0
+        elif m1:
+            distance_methylation = sum(a != b for a, b in zip(m1, m2)) / len(m1)
+        else:
+            distance_methylation = 0.0
+        distance_epigenetique = (
+            abs(g1.expression_level - g2.expression_level) + distance_methylation
+        ) / 2
+        total += (distance_sequence + distance_epigenetique) / 2
+    return total / len(communs)
+
+
+def tester_distances_genetiques(graine: int = 42) -> Dict[str, Any]:
+    """
+    Compare genetic_distance_matrix, ses blocs de lignes et genetic_diversity
+    aux distances calculées paire par paire.
+    """
+    print("\n=== DISTANCES GÉNÉTIQUES ===")
+
+    from eve_src.core.genetique import (
+        AdvancedGenome,
+        genetic_distance_blocks,
+        genetic_distance_matrix,
+        genetic_diversity,
+    )
+
+    random.seed(graine)
+    np.random.seed(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    try:
+        genomes: List[Any] = []
+        for k in range(24):
+            genome = AdvancedGenome()
+            for _ in range(k % 6):
+                genome.advanced_mutation(environmental_pressure=0.8)
+            genomes.append(genome)
+        genomes.append(None)  # Type incompatible : distance maximale
+
+        # Petits blocs pour traverser le découpage par lignes
+        for block_bytes in (64 * 1024 * 1024, 4096):
+            matrice = genetic_distance_matrix(genomes, block_bytes=block_bytes)
+            for i, g1 in enumerate(genomes):
+                for j, g2 in enumerate(genomes):
+                    if isinstance(g1, AdvancedGenome):
+                        paire = g1.calculate_genetic_distance(g2)
+                        reference = (
+                            _distance_scalaire(g1, g2)
+                            if isinstance(g2, AdvancedGenome)
+                            else 1.0
+                        )
+                    else:
+                        paire = reference = 1.0
+                    if not np.isclose(matrice[i, j], paire, rtol=0, atol=1e-9):
+                        resultats["erreurs"].append(
+                            f"[{i}, {j}] matrice {matrice[i, j]:.12f} ≠ "
+                            f"calculate_genetic_distance {paire:.12f}"
+                        )
+                    elif not np.isclose(paire, reference, rtol=0, atol=1e-9):
+                        resultats["erreurs"].append(
+                            f"[{i}, {j}] calculate_genetic_distance {paire:.12f} ≠ "
+                            f"scalaire {reference:.12f}"
+                        )
+                    if resultats["erreurs"]:
+                        break
+                if resultats["erreurs"]:
+                    break
+
+        # Blocs de lignes contigus couvrant toute la population
+        blocs = list(genetic_distance_blocks(genomes, block_bytes=4096))
+        if len(blocs) < 2 or [(d, f) for d, f, _ in blocs] != [
+            (d, d + len(b)) for d, _, b in blocs
+        ]:
+            resultats["erreurs"].append("Découpage en blocs de lignes incohérent")
+        elif not np.array_equal(np.concatenate([b for _, _, b in blocs]), matrice):
+            resultats["erreurs"].append("Blocs différents de la matrice assemblée")
+
+        # Diversité : moyenne des distances entre génomes distincts
+        n = len(genomes)
+        attendue = (matrice.sum() - np.trace(matrice)) / (n * (n - 1))
+        for block_bytes in (64 * 1024 * 1024, 4096):
+            diversite = genetic_diversity(genomes, block_bytes=block_bytes)
+            if not np.isclose(diversite, attendue, rtol=0, atol=1e-12):
+                resultats["erreurs"].append(
+                    f"Diversité {diversite:.12f} ≠ moyenne des paires {attendue:.12f}"
+                )
+        if genetic_diversity(genomes[:1]) != 0.0:
+            resultats["erreurs"].append("Diversité non nulle pour un seul génome")
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    return _rapport(resultats, "Matrice, blocs et diversité identiques aux paires")
+
+
+def tester_couches_environnement(graine: int = 42) -> Dict[str, Any]:
+    """
+    Rejoue les mêmes opérations sur les vues de l'environnement et sur les
+    anciens ensemble/dictionnaire, puis compare appartenances et voisinages.
+    """
+    print("\n=== COUCHES DE L'ENVIRONNEMENT ===")
+
+    from eve_src.core.environnement import DECOMPOSITION_PAR_CYCLE, Environnement
+
+    random.seed(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    try:
+        taille = 20
+        env = Environnement(taille)
+        obstacles = set(env.obstacles)
+        cadavres = dict(env.cadavres)
+        bois = set(env.bois)
+
+        def position():
+            return (random.randint(-2, taille + 1), random.randint(-2, taille + 1))
+
+        def dans_carte(pos):
+            return 0 <= pos[0] < taille and 0 <= pos[1] < taille
+
+        for _ in range(3000):
+            pos = position()
+            operation = random.randrange(6)
+            if operation == 0 and dans_carte(pos):
+                env.obstacles.add(pos)
+                obstacles.add(pos)
+            elif operation == 1:
+                env.obstacles.discard(pos)
+                obstacles.discard(pos)
+            elif operation == 2 and dans_carte(pos):
+                masse = random.uniform(0.5, 8.0)
+                env.cadavres[pos] = masse
+                cadavres[pos] = masse
+            elif operation == 3 and pos in cadavres:
+                del env.cadavres[pos]
+                del cadavres[pos]
+            elif operation == 4 and dans_carte(pos):
+                env.bois.add(pos)
+                bois.add(pos)
+            elif operation == 5:
+                env.update_cycle()
+                for cle in list(cadavres):
+                    cadavres[cle] -= DECOMPOSITION_PAR_CYCLE
+                    if cadavres[cle] <= 0:
+                        del cadavres[cle]
+
+        if set(env.obstacles) != obstacles or len(env.obstacles) != len(obstacles):
+            resultats["erreurs"].append("Vue des obstacles ≠ ensemble de référence")
+        if set(env.bois) != bois:
+            resultats["erreurs"].append("Vue du bois ≠ ensemble de référence")
+        if dict(env.cadavres) != cadavres:
+            resultats["erreurs"].append("Vue des cadavres ≠ dictionnaire de référence")
+
+        # Fenêtres de voisinage contre les recherches pos in ensemble/dict
+        for _ in range(500):
+            x, y = position()
+            rayon = random.choice((1, 2))
+            fen_obstacles = env.voisinage("obstacles", x, y, rayon)
+            fen_cadavres = env.voisinage("cadavres", x, y, rayon)
+            fen_masse = env.voisinage("masse_cadavres", x, y, rayon)
+            for dy in range(-rayon, rayon + 1):
+                for dx in range(-rayon, rayon + 1):
+                    voisin = (x + dx, y + dy)
+                    case = (dy + rayon, dx + rayon)
+                    if bool(fen_obstacles[case]) != (voisin in obstacles):
+                        resultats["erreurs"].append(f"voisinage obstacles en {voisin}")
+                    if bool(fen_cadavres[case]) != (voisin in cadavres):
+                        resultats["erreurs"].append(f"voisinage cadavres en {voisin}")
+                    if fen_masse[case] != cadavres.get(voisin, 0):
+                        resultats["erreurs"].append(f"masse du cadavre en {voisin}")
+            if resultats["erreurs"]:
+                break
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    return _rapport(
+        resultats, "Vues et voisinages identiques aux ensembles/dictionnaires"
+    )
+
+
+def tester_cache_phenotype(graine: int = 42) -> Dict[str, Any]:
+    """
+    Vérifie que le phénotype et les gènes mémorisés suivent chaque chemin de
+    modification du génome (mutations, épigénétique, réseau, croisement).
+    """
+    print("\n=== CACHE DE PHÉNOTYPE ===")
+
+    from eve_src.core.genetique import (
+        AdvancedGenome,
+        MutationType,
+        advanced_crossover,
+        reinitialiser_statistiques_cache_phenotype,
+        statistiques_cache_phenotype,
+    )
+
+    random.seed(graine)
+    np.random.seed(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    def nouveau_genome():
+        genome = AdvancedGenome()
+        genome.get_phenotype()  # Caches remplis avant la modification
+        genome.get_packed_genes()
+        return genome
+
+    def verifier(genome, chemin: str) -> None:
+        genes = {}
+        for chromosome in genome.chromosomes.values():
+            genes.update(chromosome.genes)
+        packes = genome.get_packed_genes()
+        if genome.get_phenotype() != genome._compute_phenotype():
+            resultats["erreurs"].append(f"{chemin} : phénotype mémorisé périmé")
+        elif genome.get_all_genes() != genes or set(packes) != set(genes):
+            resultats["erreurs"].append(f"{chemin} : carte des gènes périmée")
+        elif any(
+            not np.array_equal(packes[nom].sequence, np.asarray(gene.sequence))
+            or packes[nom].expression_level != gene.expression_level
+            for nom, gene in genes.items()
+        ):
+            resultats["erreurs"].append(f"{chemin} : gènes empaquetés périmés")
+
+    def mutation(genome, type_mutation):
+        nom_chromosome = random.choice(
+            [nom for nom, c in genome.chromosomes.items() if c.genes]
+        )
+        genome._execute_mutation(
+            {
+                "type": type_mutation,
+                "target_chromosome": nom_chromosome,
+                "target_gene": random.choice(
+                    list(genome.chromosomes[nom_chromosome].genes)
+                ),
+            }
+        )
+
+    def stress_chronique(genome):
+        controleur = genome.epigenetic_controller
+        for _ in range(12):
+            controleur.apply_environmental_regulation(genome, 0.9)
+        controleur._apply_transgenerational_effects(genome)
+
+    def duplication_reseau(genome):
+        reseau = genome.network_evolution
+        critiques = reseau._identify_critical_genes(genome)
+        if critiques:
+            reseau._duplicate_gene_function(genome, random.choice(critiques))
+
+    chemins = [
+        (
+            f"_execute_mutation ({type_mutation.value})",
+            lambda g, t=type_mutation: mutation(g, t),
+        )
+        for type_mutation in MutationType
+    ] + [
+        ("advanced_mutation", lambda g: g.advanced_mutation(0.9)),
+        ("régulation épigénétique", stress_chronique),
+        (
+            "NetworkEvolution._evolve_connectivity",
+            lambda g: g.network_evolution._evolve_connectivity(g),
+        ),
+        (
+            "NetworkEvolution._evolve_modularity",
+            lambda g: g.network_evolution._evolve_modularity(g),
+        ),
+        ("NetworkEvolution._duplicate_gene_function", duplication_reseau),
+        (
+            "NetworkEvolution.evolve_network_properties",
+            lambda g: g.network_evolution.evolve_network_properties(g),
+        ),
+    ]
+
+    try:
+        for chemin, modifier in chemins:
+            for _ in range(5):
+                genome = nouveau_genome()
+                modifier(genome)
+                verifier(genome, chemin)
+
+        # Croisement : enfant cohérent, parents intacts
+        for _ in range(5):
+            parent1, parent2 = nouveau_genome(), nouveau_genome()
+            enfant = advanced_crossover(parent1, parent2)
+            for genome, role in (
+                (enfant, "enfant"),
+                (parent1, "parent"),
+                (parent2, "parent"),
+            ):
+                verifier(genome, f"advanced_crossover ({role})")
+
+        reinitialiser_statistiques_cache_phenotype()
+        genome = nouveau_genome()
+        genome.get_phenotype()
+        statistiques = statistiques_cache_phenotype()
+        if (
+            statistiques["cache_phenotype_succes"],
+            statistiques["cache_phenotype_echecs"],
+        ) != (1, 1):
+            resultats["erreurs"].append(f"Compteurs non remis à zéro : {statistiques}")
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    return _rapport(resultats, "Phénotype et gènes mémorisés à jour sur chaque chemin")
+
+
+def main():
+    """Point d'entrée principal."""
+    print("🧬 VÉRIFICATION DES CHEMINS VECTORISÉS D'EVE")
+    print("=" * 60)
+
+    grille = tester_grille_spatiale()
+    inference = tester_inference_groupee()
+    distances = tester_distances_genetiques()
+    couches = tester_couches_environnement()
+    cache = tester_cache_phenotype()
+
+    print("\n" + "=" * 60)
+    print("RAPPORT FINAL:")
+    print(f"✓ Grille spatiale: {'OK' if grille['succes'] else 'ÉCART'}")
+    print(f"✓ Inférence groupée: {'OK' if inference['succes'] else 'ÉCART'}")
+    print(f"✓ Distances génétiques: {'OK' if distances['succes'] else 'ÉCART'}")
+    print(f"✓ Couches environnement: {'OK' if couches['succes'] else 'ÉCART'}")
+    print(f"✓ Cache de phénotype: {'OK' if cache['succes'] else 'PÉRIMÉ'}")
+
+    tous = (grille, inference, distances, couches, cache)
+    return 0 if all(resultat["succes"] for resultat in tous) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
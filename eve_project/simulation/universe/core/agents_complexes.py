@@ -23,6 +23,10 @@ logger = logging.getLogger(__name__)
 class Chimiste:
     """Rôle : Maître de la Fusion Stellaire et des Supernovae"""
 
+    # Catégories lues et modifiées (« aleatoire » : random et np.random globaux)
+    CATEGORIES_LUES = ("etoiles",)
+    CATEGORIES_ECRITES = ("etoiles", "atomes", "particules", "aleatoire")
+
     def __init__(self):
         """Initialise les paramètres de fusion stellaire."""
         self.elements_forge = [
@@ -215,6 +219,10 @@ class Chimiste:
 class Planetologue:
     """Rôle : Architecte Planétaire"""
 
+    # Catégories lues et modifiées, pour l'ordonnanceur des agents
+    CATEGORIES_LUES = ("etoiles", "atomes")
+    CATEGORIES_ECRITES = ("planetes", "atomes")
+
     def __init__(self):
         """Initialise les paramètres de formation planétaire."""
         self.rayon_detection_disque = 25.0
@@ -229,27 +237,24 @@ class Planetologue:
 
     def planetologue(self, etatmonde: "EtatMonde") -> "EtatMonde":
         """Forme des planètes à partir d'atomes lourds autour d'étoiles jeunes."""
-        if cKDTree is None:
-            return etatmonde
-
         etoiles: List[Etoile] = etatmonde.entites.get("etoiles", [])
         atomes: List[Atome] = etatmonde.entites.get("atomes", [])
 
         if not etoiles or not atomes:
             return etatmonde
 
-        # Filtrer les atomes planétaires (éléments lourds)
-        atomes_planetaires = [a for a in atomes if a.type in self.elements_planetaires]
+        # Index spatial des atomes partagé avec les autres agents du tick ;
+        # seuls les atomes planétaires (éléments lourds) sont retenus
+        index_atomes = etatmonde.obtenir_index_spatial("atomes")
+        atomes_planetaires = index_atomes.entites
+        est_planetaire = np.array(
+            [a.type in self.elements_planetaires for a in atomes_planetaires],
+            dtype=bool,
+        )
 
-        if len(atomes_planetaires) < self.masse_minimale_planete:
+        if np.count_nonzero(est_planetaire) < self.masse_minimale_planete:
             return etatmonde
 
-        positions_etoiles = np.array([e.position for e in etoiles])
-        positions_atomes = np.array([a.position for a in atomes_planetaires])
-
-        arbre_etoiles = cKDTree(positions_etoiles)
-        arbre_atomes = cKDTree(positions_atomes)
-
         nouvelles_planetes = []
         indices_atomes_consommes = set()
 
@@ -264,13 +269,15 @@ class Planetologue:
                 continue
 
             # Chercher les atomes dans le disque d'accrétion
-            indices_voisins = arbre_atomes.query_ball_point(
-                etoile.position, r=self.rayon_detection_disque
+            indices_voisins = index_atomes.dans_rayon(
+                etoile.position, self.rayon_detection_disque
             )
 
-            # Filtrer les atomes non encore consommés
+            # Filtrer les atomes planétaires non encore consommés
             atomes_candidats = [
-                idx for idx in indices_voisins if idx not in indices_atomes_consommes
+                idx
+                for idx in indices_voisins[est_planetaire[indices_voisins]].tolist()
+                if idx not in indices_atomes_consommes
             ]
 
             if len(atomes_candidats) >= self.masse_minimale_planete:
@@ -357,20 +364,9 @@ class Planetologue:
         if nouvelles_planetes:
             etatmonde.entites["planetes"].extend(nouvelles_planetes)
 
-            # Retirer les atomes consommés de manière efficace
-            atomes_planetaires_filtres = [
-                a
-                for i, a in enumerate(atomes_planetaires)
-                if i not in indices_atomes_consommes
-            ]
-
-            # Reconstituer la liste complète d'atomes
-            atomes_non_planetaires = [
-                a for a in atomes if a.type not in self.elements_planetaires
-            ]
-            etatmonde.entites["atomes"] = (
-                atomes_non_planetaires + atomes_planetaires_filtres
-            )
+            # Retirer les atomes consommés (retrait O(1) par échange)
+            for idx in indices_atomes_consommes:
+                etatmonde.supprimer_entite(atomes_planetaires[idx])
 
             # Enregistrement du palier
             if not any("PremierePlanete" in p for p in etatmonde.paliers):
@@ -384,6 +380,10 @@ class Planetologue:
 class Galacticien:
     """Rôle : Organisateur de Structures Galactiques"""
 
+    # Catégories lues et modifiées, pour l'ordonnanceur des agents
+    CATEGORIES_LUES = ("etoiles",)
+    CATEGORIES_ECRITES = ("galaxies",)
+
     def __init__(self):
         """Initialise les paramètres de formation galactique."""
         self.seuil_etoiles_galaxie = 30  # Réduit pour faciliter formation
@@ -396,15 +396,11 @@ class Galacticien:
         if etatmonde.temps % self.cycles_formation != 0:
             return etatmonde
 
-        if cKDTree is None:
+        if len(etatmonde.entites.get("etoiles", [])) < self.seuil_etoiles_galaxie:
             return etatmonde
 
-        etoiles: List[Etoile] = etatmonde.entites.get("etoiles", [])
-        if len(etoiles) < self.seuil_etoiles_galaxie:
-            return etatmonde
-
-        positions_etoiles = np.array([e.position for e in etoiles])
-        arbre_etoiles = cKDTree(positions_etoiles)
+        index_etoiles = etatmonde.obtenir_index_spatial("etoiles")
+        etoiles: List[Etoile] = index_etoiles.entites
 
         indices_traitees = np.zeros(len(etoiles), dtype=bool)
         nouvelles_galaxies = []
@@ -414,8 +410,8 @@ class Galacticien:
                 continue
 
             # Recherche des voisins stellaires
-            indices_voisins = arbre_etoiles.query_ball_point(
-                etoile.position, r=self.rayon_galaxie
+            indices_voisins = index_etoiles.dans_rayon(
+                etoile.position, self.rayon_galaxie
             )
 
             if len(indices_voisins) >= self.seuil_etoiles_galaxie:
@@ -474,6 +470,10 @@ class Galacticien:
 class Astrophysicien:
     """Rôle : Formateur d'Étoiles (version optimisée)"""
 
+    # Catégories lues et modifiées (« aleatoire » : random et np.random globaux)
+    CATEGORIES_LUES = ("atomes",)
+    CATEGORIES_ECRITES = ("atomes", "etoiles", "aleatoire")
+
     def __init__(self):
         """Initialise les paramètres de formation stellaire."""
         self.seuil_densite_atomes = 100  # Seuil réaliste
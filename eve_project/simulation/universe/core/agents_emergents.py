@@ -16,21 +16,21 @@ from etatmonde import (
     Civilisation,
     TrouNoir,
 )
+from trames import EncodeurTrames
 
 if TYPE_CHECKING:
     from etatmonde import EtatMonde
 
-try:
-    from scipy.spatial import cKDTree
-except ImportError:
-    cKDTree = None
-
 logger = logging.getLogger(__name__)
 
 
 class Biologiste:
     """Rôle : Catalyseur de Vie"""
 
+    # Catégories lues et modifiées (« aleatoire » : random et np.random globaux)
+    CATEGORIES_LUES = ("planetes", "cellules_simples")
+    CATEGORIES_ECRITES = ("cellules_simples", "aleatoire")
+
     def __init__(self):
         """Initialise les paramètres d'émergence de la vie."""
         self.probabilite_abiogenese = 0.0001  # Très faible probabilité par cycle
@@ -58,15 +58,13 @@ class Biologiste:
 
         nouvelles_cellules = []
 
-        for planete in planetes:
-            # Vérifier si la planète abrite déjà la vie
-            cellules_existantes = [
-                c
-                for c in etatmonde.entites.get("cellules_simples", [])
-                if c.planete_hote_id == str(planete.id)
-            ]
+        # Planètes abritant déjà la vie, calculées une fois pour tout le cycle
+        planetes_habitees = {
+            c.planete_hote_id for c in etatmonde.entites.get("cellules_simples", [])
+        }
 
-            if cellules_existantes:
+        for planete in planetes:
+            if str(planete.id) in planetes_habitees:
                 continue  # La vie existe déjà
 
             if self._planete_habitable(planete):
@@ -171,9 +169,8 @@ class Evolutif:
         # Mise à jour de l'état du monde
         if nouveaux_organismes:
             etatmonde.entites["organismes_complexes"].extend(nouveaux_organismes)
-            etatmonde.entites["cellules_simples"] = [
-                c for c in cellules if c not in cellules_a_evoluer
-            ]
+            for cellule in cellules_a_evoluer:
+                etatmonde.supprimer_entite(cellule)
 
             if not any("PremierOrganismeComplexe" in p for p in etatmonde.paliers):
                 etatmonde.paliers.append(
@@ -232,9 +229,8 @@ class Sociologue:
         # Mise à jour de l'état du monde
         if nouvelles_civilisations:
             etatmonde.entites["civilisations"].extend(nouvelles_civilisations)
-            etatmonde.entites["organismes_complexes"] = [
-                o for o in organismes if o not in organismes_a_civiliser
-            ]
+            for organisme in organismes_a_civiliser:
+                etatmonde.supprimer_entite(organisme)
 
             if not any("PremiereCivilisation" in p for p in etatmonde.paliers):
                 etatmonde.paliers.append(
@@ -247,6 +243,10 @@ class Sociologue:
 class PhysicienExotique:
     """Rôle : Gardien des Phénomènes Extrêmes"""
 
+    # Catégories lues et modifiées, pour l'ordonnanceur des agents
+    CATEGORIES_LUES = ("etoiles", "trous_noirs", "particules", "atomes")
+    CATEGORIES_ECRITES = ("etoiles", "trous_noirs", "particules", "atomes")
+
     def __init__(self):
         """Initialise les paramètres des phénomènes exotiques."""
         self.masse_critique_trou_noir = 1000.0
@@ -254,9 +254,6 @@ class PhysicienExotique:
 
     def physicienexotique(self, etatmonde: "EtatMonde") -> "EtatMonde":
         """Gère la formation de trous noirs et leur influence gravitationnelle."""
-        if cKDTree is None:
-            return etatmonde
-
         # Phase 1 : Formation de trous noirs à partir d'étoiles effondrées
         etoiles: List = etatmonde.entites.get("etoiles", [])
         nouveaux_trous_noirs = []
@@ -288,52 +285,49 @@ class PhysicienExotique:
                     f"Rs: {rayon_schwarzschild:.6f})"
                 )
 
+        # Les nouveaux trous noirs rejoignent l'univers avant la phase 2
+        if nouveaux_trous_noirs:
+            etatmonde.entites["trous_noirs"].extend(nouveaux_trous_noirs)
+            for etoile in etoiles_a_effondrer:
+                etatmonde.supprimer_entite(etoile)
+
         # Phase 2 : Influence des trous noirs existants
-        trous_noirs: List[TrouNoir] = (
-            etatmonde.entites.get("trous_noirs", []) + nouveaux_trous_noirs
-        )
+        index_trous_noirs = etatmonde.obtenir_index_spatial("trous_noirs")
 
-        if trous_noirs:
-            positions_trous_noirs = np.array([tn.position for tn in trous_noirs])
-            arbre_trous_noirs = cKDTree(positions_trous_noirs)
+        if index_trous_noirs:
+            trous_noirs: List[TrouNoir] = index_trous_noirs.entites
 
-            # Attraction et destruction de matière
-            entites_destructibles = []
+            # Attraction et destruction de matière, par catégorie entière
             for categorie in ["particules", "atomes"]:
-                entites_destructibles.extend(
-                    [(e, categorie) for e in etatmonde.entites.get(categorie, [])]
+                index_matiere = etatmonde.obtenir_index_spatial(categorie)
+                if not index_matiere:
+                    continue
+
+                distances, indices = index_trous_noirs.plus_proches(
+                    index_matiere.positions, k=1
                 )
+                detruites = np.flatnonzero(distances < self.rayon_influence_trou_noir)
+                if not detruites.size:
+                    continue
+
+                # Gain de masse partiel de chaque trou noir attracteur
+                entites_detruites = [index_matiere.entites[i] for i in detruites]
+                gains = np.bincount(
+                    indices[detruites],
+                    weights=[e.masse * 0.1 for e in entites_detruites],
+                    minlength=len(trous_noirs),
+                )
+                for i in np.flatnonzero(gains):
+                    trous_noirs[i].masse += float(gains[i])
 
-            entites_detruites = {cat: [] for cat in ["particules", "atomes"]}
-
-            for entite, categorie in entites_destructibles:
-                distances, indices = arbre_trous_noirs.query(entite.position, k=1)
-                if distances < self.rayon_influence_trou_noir:
-                    # L'entité est attirée et détruite par le trou noir
-                    trou_noir = trous_noirs[indices]
-                    trou_noir.masse += entite.masse * 0.1  # Gain de masse partiel
-                    entites_detruites[categorie].append(entite)
-
-            # Suppression des entités détruites
-            for categorie, entites_a_supprimer in entites_detruites.items():
-                if entites_a_supprimer:
-                    ids_a_supprimer = {e.id for e in entites_a_supprimer}
-                    etatmonde.entites[categorie] = [
-                        e
-                        for e in etatmonde.entites[categorie]
-                        if e.id not in ids_a_supprimer
-                    ]
-                    logger.info(
-                        f"Accrétion trou noir : {len(entites_a_supprimer)} {categorie} détruits"
-                    )
+                for entite in entites_detruites:
+                    etatmonde.supprimer_entite(entite)
+                logger.info(
+                    f"Accrétion trou noir : {len(entites_detruites)} {categorie} détruits"
+                )
 
-        # Mise à jour de l'état du monde
+        # Enregistrement du palier
         if nouveaux_trous_noirs:
-            etatmonde.entites["trous_noirs"].extend(nouveaux_trous_noirs)
-            etatmonde.entites["etoiles"] = [
-                e for e in etoiles if e not in etoiles_a_effondrer
-            ]
-
             if not any("PremierTrouNoir" in p for p in etatmonde.paliers):
                 etatmonde.paliers.append(
                     f"[Temps: {etatmonde.temps}] - PremierTrouNoir"
@@ -345,10 +339,14 @@ class PhysicienExotique:
 class AnalysteCosmique:
     """Rôle : Observateur Quantifiable (version étendue)"""
 
-    def analystecosmique(self, etatmonde: "EtatMonde", dureecycle: float) -> dict:
+    def __init__(self):
+        """Initialise l'encodeur du flux de trames vers l'interface."""
+        self.encodeur = EncodeurTrames()
+
+    def analystecosmique(self, etatmonde: "EtatMonde", dureecycle: float) -> bytes:
         """
-        Calcule les statistiques étendues, détecte les paliers et formate l'état pour l'affichage.
-        Version étendue pour supporter toutes les nouvelles entités.
+        Calcule les statistiques étendues, détecte les paliers et encode l'état
+        affichable en une trame binaire (image clé ou delta, voir trames.py).
         """
         # Statistiques de base
         for categorie in etatmonde.entites:
@@ -356,13 +354,22 @@ class AnalysteCosmique:
                 etatmonde.entites[categorie]
             )
 
-        # Calculs spatiaux
-        toutes_positions_list = [
-            e.position for cat in etatmonde.entites.values() for e in cat
-        ]
+        # Calculs spatiaux (directement sur les colonnes si disponibles)
+        if hasattr(etatmonde, "obtenir_colonnes"):
+            colonnes = [etatmonde.obtenir_colonnes(cat) for cat in etatmonde.entites]
+            toutes_positions_list = [
+                c.positions[: c.n_lignes] for c in colonnes if c is not None
+            ]
+        else:
+            toutes_positions_list = [
+                np.atleast_2d(e.position)
+                for cat in etatmonde.entites.values()
+                for e in cat
+            ]
+        toutes_positions_list = [p for p in toutes_positions_list if len(p)]
         taille_univers, centre_de_masse = 0.0, [0.0, 0.0, 0.0]
         if toutes_positions_list:
-            toutes_positions_np = np.array(toutes_positions_list)
+            toutes_positions_np = np.concatenate(toutes_positions_list)
             centre_de_masse = np.mean(toutes_positions_np, axis=0).tolist()
             rayon_univers = np.max(
                 np.linalg.norm(toutes_positions_np - centre_de_masse, axis=1)
@@ -409,26 +416,6 @@ class AnalysteCosmique:
                 etatmonde.paliers.append(f"[Temps: {etatmonde.temps}] - {palier_name}")
                 logger.info(f"Palier atteint au Temps {etatmonde.temps}: {palier_name}")
 
-        # Formatage pour l'interface
-        entites_pour_json = {}
-        for cat, elist in etatmonde.entites.items():
-            entites_pour_json[cat] = []
-            for entite in elist:
-                data = {k: v for k, v in entite.__dict__.items()}
-                data["categorie"] = entite.categorie
-                data["id"] = str(data["id"])
-                data["position"] = data["position"].tolist()
-                if "vecteur" in data:
-                    data["vecteur"] = data["vecteur"].tolist()
-                entites_pour_json[cat].append(data)
-
-        return {
-            "temps": etatmonde.temps,
-            "statistiques": etatmonde.statistiques,
-            "paliers": etatmonde.paliers,
-            "entites": entites_pour_json,
-            "visualisation": {
-                "centredemasse": centre_de_masse,
-                "rayonunivers": taille_univers / 2,
-            },
-        }
+        # Trame binaire pour l'interface : seules les entités modifiées depuis
+        # la trame précédente sont transmises
+        return self.encodeur.encoder(etatmonde, centre_de_masse, taille_univers / 2)
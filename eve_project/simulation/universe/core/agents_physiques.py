@@ -11,8 +11,8 @@ import logging
 import pickle
 import os
 import threading
-from multiprocessing import Pool, cpu_count
-from typing import TYPE_CHECKING, List, Tuple, Optional, Dict, Any, Union
+from multiprocessing import Pool, cpu_count, shared_memory
+from typing import TYPE_CHECKING, Callable, List, Tuple, Optional, Dict, Any, Union
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, field
@@ -34,6 +34,8 @@ except ImportError:
     cKDTree = None
     SCIPY_DISPONIBLE = False
 
+from instantanes import GestionnaireInstantanes
+
 logger = logging.getLogger(__name__)
 
 # ========================================================================
@@ -47,6 +49,7 @@ class ModeCalcul(Enum):
     SEQUENTIEL = "sequentiel"
     PARALLELE = "parallele"
     ADAPTATIF = "adaptatif"
+    BARNES_HUT = "barnes_hut"
 
 
 class NiveauPerformance(Enum):
@@ -64,10 +67,15 @@ class ConfigurationPhysique:
 
     # Paramètres gravitationnels
     mode_calcul: ModeCalcul = ModeCalcul.ADAPTATIF
-    seuil_parallelisation: int = 500
+    seuil_parallelisation: int = 3000
     max_processus: int = 4
     limite_entites_performance: int = 20000
 
+    # Paramètres Barnes-Hut (octree, O(N log N))
+    seuil_barnes_hut: int = 20000
+    theta_barnes_hut: float = 0.5
+    taille_feuille_barnes_hut: int = 16
+
     # Paramètres nucléosynthèse
     seuil_fusion: float = 0.25
     rayon_exclusion_stellaire: float = 12.0
@@ -170,13 +178,355 @@ class ValidateurPhysique:
         return positions_corrigees, masses_corrigees, vecteurs_corriges
 
 
+# ========================================================================
+# OCTREE BARNES-HUT VECTORISÉ
+# ========================================================================
+
+
+class _ArbreBarnesHut:
+    """Octree Barnes-Hut construit et parcouru par lots NumPy.
+
+    Les corps sont triés selon leur clé de Morton : chaque cellule couvre alors
+    une plage contiguë du tableau trié, ce qui permet de construire l'arbre
+    niveau par niveau et de le parcourir pour des blocs de cibles entiers,
+    sans boucle Python par corps.
+    """
+
+    PROFONDEUR_MAX = 21  # 3 x 21 bits -> clé de Morton sur 63 bits
+    TAILLE_BLOC_GROUPES = 64
+
+    def __init__(
+        self,
+        positions: NDArray[np.float64],
+        masses: NDArray[np.float64],
+        taille_feuille: int = 16,
+    ):
+        """Trie les corps selon leur clé de Morton et construit l'octree."""
+        self.n_corps = len(positions)
+        self.taille_feuille = max(1, int(taille_feuille))
+
+        origine = positions.min(axis=0)
+        etendue = float(np.max(positions.max(axis=0) - origine))
+        if not np.isfinite(etendue) or etendue <= 0.0:
+            etendue = 1.0
+        etendue *= 1.0 + 1e-9  # Les corps sur le bord restent dans la racine
+
+        cles = self._calculer_cles_morton(positions, origine, etendue)
+        self.ordre = np.argsort(cles, kind="stable")
+        self.cles = cles[self.ordre]
+        self.positions = np.ascontiguousarray(positions[self.ordre])
+        self.positions_soa = np.ascontiguousarray(self.positions.T)
+        self.masses = np.ascontiguousarray(masses[self.ordre])
+        self.etendue = etendue
+
+        self._construire()
+
+    @staticmethod
+    def _etaler_bits(valeurs: NDArray[np.uint64]) -> NDArray[np.uint64]:
+        """Intercale deux bits nuls entre chaque bit (21 bits -> 63 bits)."""
+        v = valeurs & np.uint64(0x1FFFFF)
+        v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+        v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+        v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+        v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+        v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+        return v
+
+    @classmethod
+    def _calculer_cles_morton(
+        cls,
+        positions: NDArray[np.float64],
+        origine: NDArray[np.float64],
+        etendue: float,
+    ) -> NDArray[np.uint64]:
+        """Calcule la clé de Morton de chaque corps dans le cube englobant."""
+        resolution = 1 << cls.PROFONDEUR_MAX
+        grille = np.floor((positions - origine) / etendue * resolution)
+        grille = np.clip(grille, 0, resolution - 1).astype(np.uint64)
+        return (
+            cls._etaler_bits(grille[:, 0])
+            | (cls._etaler_bits(grille[:, 1]) << np.uint64(1))
+            | (cls._etaler_bits(grille[:, 2]) << np.uint64(2))
+        )
+
+    def _construire(self) -> None:
+        """Construit les cellules niveau par niveau à partir des plages triées."""
+        profondeur = self.PROFONDEUR_MAX
+        masses_bornees = np.append(self.masses, 0.0)
+        moments_bornes = np.vstack(
+            [self.positions * self.masses[:, np.newaxis], np.zeros((1, 3))]
+        )
+
+        debuts = np.zeros(1, dtype=np.int64)
+        fins = np.full(1, self.n_corps, dtype=np.int64)
+        cles_niveau = np.zeros(1, dtype=np.uint64)
+        niveaux: List[Dict[str, NDArray]] = []
+        decalage_global = 0
+
+        for niveau in range(profondeur + 1):
+            nb_noeuds = len(debuts)
+            comptes = fins - debuts
+            feuille = (comptes <= self.taille_feuille) | (niveau == profondeur)
+
+            # Masse et centre de masse : sommes exactes sur les plages contiguës
+            bornes = np.column_stack([debuts, fins]).ravel()
+            masse = np.add.reduceat(masses_bornees, bornes)[::2]
+            moment = np.add.reduceat(moments_bornes, bornes, axis=0)[::2]
+
+            premier_enfant = np.full(nb_noeuds, -1, dtype=np.int64)
+            nb_enfants = np.zeros(nb_noeuds, dtype=np.int64)
+
+            internes = np.flatnonzero(~feuille)
+            enfants = None
+            if internes.size:
+                comptes_internes = comptes[internes]
+                total = int(comptes_internes.sum())
+                cumul = np.cumsum(comptes_internes) - comptes_internes
+                indices_corps = np.arange(total) + np.repeat(
+                    debuts[internes] - cumul, comptes_internes
+                )
+
+                decalage_enfant = np.uint64(3 * (profondeur - niveau - 1))
+                prefixes = self.cles[indices_corps] >> decalage_enfant
+                ruptures = np.flatnonzero(prefixes[1:] != prefixes[:-1]) + 1
+                debuts_locaux = np.concatenate([[0], ruptures])
+                fins_locales = np.concatenate([ruptures, [total]])
+
+                rang_parent = np.repeat(np.arange(internes.size), comptes_internes)[
+                    debuts_locaux
+                ]
+                decalage_suivant = decalage_global + nb_noeuds
+                premier_enfant[internes] = decalage_suivant + np.searchsorted(
+                    rang_parent, np.arange(internes.size), side="left"
+                )
+                nb_enfants[internes] = np.bincount(rang_parent, minlength=internes.size)
+                enfants = (
+                    indices_corps[debuts_locaux],
+                    indices_corps[fins_locales - 1] + 1,
+                    prefixes[debuts_locaux],
+                )
+
+            niveaux.append(
+                {
+                    "debut": debuts,
+                    "fin": fins,
+                    "cle": cles_niveau,
+                    "decalage": np.full(
+                        nb_noeuds, 3 * (profondeur - niveau), dtype=np.uint64
+                    ),
+                    "taille_sq": np.full(
+                        nb_noeuds, (self.etendue / (1 << niveau)) ** 2
+                    ),
+                    "masse": masse,
+                    "centre_masse": moment / masse[:, np.newaxis],
+                    "feuille": feuille,
+                    "premier_enfant": premier_enfant,
+                    "nb_enfants": nb_enfants,
+                }
+            )
+            decalage_global += nb_noeuds
+
+            if enfants is None:
+                break
+            debuts, fins, cles_niveau = enfants
+
+        for attribut in niveaux[0]:
+            setattr(
+                self,
+                f"noeud_{attribut}",
+                np.concatenate([niveau[attribut] for niveau in niveaux]),
+            )
+        self.noeud_centre_masse_soa = np.ascontiguousarray(self.noeud_centre_masse.T)
+        self.nb_noeuds = decalage_global
+        self.nb_niveaux = len(niveaux)
+
+    def calculer_forces(
+        self, constante_g: float, theta: float = 0.5
+    ) -> NDArray[np.float64]:
+        """Calcule les forces sur tous les corps (ordre d'origine)."""
+        forces_triees = np.zeros((self.n_corps, 3), dtype=np.float64)
+        theta_sq = float(theta) ** 2
+
+        # Les feuilles servent de groupes de cibles : une seule descente de
+        # l'arbre par feuille au lieu d'une par corps.
+        feuilles = np.flatnonzero(self.noeud_feuille)
+        feuilles = feuilles[np.argsort(self.noeud_debut[feuilles], kind="stable")]
+
+        for debut in range(0, len(feuilles), self.TAILLE_BLOC_GROUPES):
+            groupes = feuilles[debut : debut + self.TAILLE_BLOC_GROUPES]
+            premier = int(self.noeud_debut[groupes[0]])
+            dernier = int(self.noeud_fin[groupes[-1]])
+            forces_triees[premier:dernier] = self._calculer_forces_bloc(
+                groupes, premier, dernier, constante_g, theta_sq
+            )
+
+        forces = np.empty_like(forces_triees)
+        forces[self.ordre] = forces_triees
+        return forces
+
+    @staticmethod
+    def _developper_plages(
+        debuts: NDArray[np.int64], comptes: NDArray[np.int64]
+    ) -> NDArray[np.int64]:
+        """Concatène les plages [debut, debut + compte) en un seul tableau."""
+        return np.arange(int(comptes.sum())) + np.repeat(
+            debuts - (np.cumsum(comptes) - comptes), comptes
+        )
+
+    def _calculer_forces_bloc(
+        self,
+        groupes: NDArray[np.int64],
+        premier: int,
+        dernier: int,
+        constante_g: float,
+        theta_sq: float,
+    ) -> NDArray[np.float64]:
+        """Parcourt l'arbre pour un bloc de groupes via des listes de paires."""
+        # Accumulation en « force par unité de masse cible » (3, n) : le
+        # plafond G*mj*mi/r² <= 1000*mi se factorise en mi * min(G*mj/r², 1000).
+        champ = np.zeros((3, dernier - premier), dtype=np.float64)
+
+        g_debut = self.noeud_debut[groupes]
+        g_compte = self.noeud_fin[groupes] - g_debut
+        g_cle = self.cles[g_debut]
+        positions_bloc = self.positions[premier:dernier]
+        boite_min = np.minimum.reduceat(positions_bloc, g_debut - premier, axis=0)
+        boite_max = np.maximum.reduceat(positions_bloc, g_debut - premier, axis=0)
+
+        paires_groupe = np.arange(len(groupes))
+        paires_noeud = np.zeros(len(groupes), dtype=np.int64)
+
+        while paires_groupe.size:
+            centres = self.noeud_centre_masse[paires_noeud]
+            ecart = np.maximum(
+                np.maximum(boite_min[paires_groupe] - centres, 0.0),
+                centres - boite_max[paires_groupe],
+            )
+            dist_sq_boite = np.einsum("ij,ij->i", ecart, ecart)
+
+            # Une cellule contenant le groupe n'est jamais approximée
+            contient = (
+                g_cle[paires_groupe] >> self.noeud_decalage[paires_noeud]
+            ) == self.noeud_cle[paires_noeud]
+            accepte = ~contient & (
+                self.noeud_taille_sq[paires_noeud] < theta_sq * dist_sq_boite
+            )
+
+            # Cellules acceptées : monopôle évalué sur chaque corps du groupe
+            if np.any(accepte):
+                groupe_a = paires_groupe[accepte]
+                noeud_a = np.repeat(paires_noeud[accepte], g_compte[groupe_a])
+                corps = self._developper_plages(g_debut[groupe_a], g_compte[groupe_a])
+                self._accumuler_champ(
+                    champ,
+                    corps - premier,
+                    self.noeud_centre_masse_soa.take(noeud_a, axis=1)
+                    - self.positions_soa.take(corps, axis=1),
+                    self.noeud_masse.take(noeud_a),
+                    constante_g,
+                )
+
+            a_ouvrir = ~accepte
+            est_feuille = self.noeud_feuille[paires_noeud]
+
+            # Feuilles voisines : interaction directe corps à corps (la paire
+            # d'un corps avec lui-même a un écart nul et ne contribue pas)
+            voisines = a_ouvrir & est_feuille
+            if np.any(voisines):
+                groupe_v = paires_groupe[voisines]
+                noeud_v = paires_noeud[voisines]
+                n_cibles = g_compte[groupe_v]
+                n_sources = np.repeat(
+                    self.noeud_fin[noeud_v] - self.noeud_debut[noeud_v], n_cibles
+                )
+                cibles = np.repeat(
+                    self._developper_plages(g_debut[groupe_v], n_cibles), n_sources
+                )
+                sources = self._developper_plages(
+                    np.repeat(self.noeud_debut[noeud_v], n_cibles), n_sources
+                )
+                self._accumuler_champ(
+                    champ,
+                    cibles - premier,
+                    self.positions_soa.take(sources, axis=1)
+                    - self.positions_soa.take(cibles, axis=1),
+                    self.masses.take(sources),
+                    constante_g,
+                )
+
+            # Cellules internes trop proches : descente vers les enfants
+            ouverts = a_ouvrir & ~est_feuille
+            groupe_o = paires_groupe[ouverts]
+            noeud_o = paires_noeud[ouverts]
+            nb_enfants = self.noeud_nb_enfants[noeud_o]
+            paires_groupe = np.repeat(groupe_o, nb_enfants)
+            paires_noeud = self._developper_plages(
+                self.noeud_premier_enfant[noeud_o], nb_enfants
+            )
+
+        return (champ * self.masses[premier:dernier]).T
+
+    @staticmethod
+    def _accumuler_champ(
+        champ: NDArray[np.float64],
+        indices_cibles: NDArray[np.int64],
+        diff: NDArray[np.float64],
+        masses_sources: NDArray[np.float64],
+        constante_g: float,
+    ) -> None:
+        """Accumule G*mj/r² * diff (plafonné à 1000), comme le calcul direct."""
+        dist_sq = np.einsum("ij,ij->j", diff, diff)
+        np.maximum(dist_sq, 1e-12, out=dist_sq)
+
+        with np.errstate(all="ignore"):
+            intensites = constante_g * masses_sources / dist_sq
+            np.clip(intensites, 0, 1000, out=intensites)
+
+        diff *= intensites
+        for axe in range(3):
+            champ[axe] += np.bincount(
+                indices_cibles, weights=diff[axe], minlength=champ.shape[1]
+            )
+
+
 class CalculateurForcesGravitationnelles:
     """Calculateur spécialisé pour les forces gravitationnelles."""
 
-    def __init__(self, config: ConfigurationPhysique):
+    def __init__(
+        self,
+        config: ConfigurationPhysique,
+        pool_partage: Optional["_PoolForcesPartage"] = None,
+    ):
         """TODO: Add docstring."""
         self.config = config
         self.metriques = MetriquesPhysiques()
+        self.dernier_mode_effectif: Optional[ModeCalcul] = None
+        self.pool_partage = pool_partage
+
+    def determiner_mode_effectif(
+        self, n_entites: int, mode_force: ModeCalcul = ModeCalcul.ADAPTATIF
+    ) -> ModeCalcul:
+        """Choisit le solveur effectif selon la taille du système."""
+        if mode_force != ModeCalcul.ADAPTATIF:
+            return mode_force
+
+        if n_entites > self.config.seuil_barnes_hut:
+            return ModeCalcul.BARNES_HUT
+        # Seul le pool persistant amortit le coût des processus ; le pool
+        # éphémère (démarrage + copie des tableaux par tâche) perd face au
+        # noyau tuilé séquentiel.
+        if (
+            self.pool_partage is not None
+            and n_entites > self.config.seuil_parallelisation
+            and cpu_count() > 2
+        ):
+            return ModeCalcul.PARALLELE
+        return ModeCalcul.SEQUENTIEL
+
+    # Tuiles (cibles x sources) dimensionnées pour tenir en cache L2 :
+    # 16 x 4096 float64 = 512 Ko par tableau temporaire.
+    TAILLE_TUILE_CIBLES = 16
+    TAILLE_TUILE_SOURCES = 4096
 
     @staticmethod
     def calculer_forces_lot(
@@ -185,7 +535,7 @@ class CalculateurForcesGravitationnelles:
         masses_completes: NDArray[np.float64],
         constante_g: float,
     ) -> NDArray[np.float64]:
-        """Calcule les forces gravitationnelles pour un lot d'entités (optimisé)."""
+        """Calcule les forces gravitationnelles pour un lot d'entités (noyau tuilé)."""
         n_lot = len(indices_lot)
         forces_lot = np.zeros((n_lot, 3), dtype=np.float64)
 
@@ -194,38 +544,51 @@ class CalculateurForcesGravitationnelles:
             return forces_lot
 
         try:
-            for i, index_global in enumerate(indices_lot):
-                pos_actuelle = positions_completes[index_global]
-                masse_actuelle = masses_completes[index_global]
-
-                # Calcul vectorisé des différences
-                diff = positions_completes - pos_actuelle
-                dist_sq = np.sum(diff**2, axis=1)
-
-                # Éviter auto-interaction et singularités
-                dist_sq[index_global] = np.inf
-                dist_sq = np.maximum(dist_sq, 1e-12)  # Distance minimale
-
-                # Calcul forces avec gestion erreurs numériques
-                with np.errstate(all="ignore"):
-                    force_magnitudes = (
-                        constante_g * masses_completes * masse_actuelle / dist_sq
-                    )
-
-                    # Limitation physique des forces
-                    force_max = masse_actuelle * 1000
-                    force_magnitudes = np.clip(force_magnitudes, 0, force_max)
-
-                    # Remplacement des valeurs non-finies
-                    force_magnitudes = np.where(
-                        np.isfinite(force_magnitudes), force_magnitudes, 0.0
-                    )
-
-                # Sommation vectorielle
-                force_resultante = np.sum(
-                    diff * force_magnitudes[:, np.newaxis], axis=0
+            n_total = len(positions_completes)
+            pas_cibles = CalculateurForcesGravitationnelles.TAILLE_TUILE_CIBLES
+            pas_sources = CalculateurForcesGravitationnelles.TAILLE_TUILE_SOURCES
+
+            # Sources en colonnes contiguës pour la diffusion (broadcasting)
+            sources = np.ascontiguousarray(positions_completes.T)
+            g_masses = constante_g * masses_completes
+
+            for debut in range(0, n_lot, pas_cibles):
+                indices_cibles = indices_lot[debut : debut + pas_cibles]
+                cibles = positions_completes[indices_cibles]
+                champ = np.zeros((len(indices_cibles), 3), dtype=np.float64)
+
+                for debut_src in range(0, n_total, pas_sources):
+                    fin_src = min(n_total, debut_src + pas_sources)
+
+                    # Calcul vectorisé des différences sur la tuile
+                    dx = sources[0, debut_src:fin_src] - cibles[:, 0:1]
+                    dy = sources[1, debut_src:fin_src] - cibles[:, 1:2]
+                    dz = sources[2, debut_src:fin_src] - cibles[:, 2:3]
+                    dist_sq = dx * dx
+                    dist_sq += dy * dy
+                    dist_sq += dz * dz
+
+                    # Singularités : distance minimale (l'auto-interaction a un
+                    # écart nul et ne contribue donc pas à la somme)
+                    np.maximum(dist_sq, 1e-12, out=dist_sq)
+
+                    # Force par unité de masse cible : le plafond
+                    # G*mi*mj/r² <= 1000*mi devient min(G*mj/r², 1000)
+                    with np.errstate(all="ignore"):
+                        intensites = np.divide(
+                            g_masses[debut_src:fin_src], dist_sq, out=dist_sq
+                        )
+                        np.clip(intensites, 0, 1000, out=intensites)
+                    intensites[~np.isfinite(intensites)] = 0.0
+
+                    # Sommation vectorielle
+                    champ[:, 0] += np.einsum("ij,ij->i", dx, intensites)
+                    champ[:, 1] += np.einsum("ij,ij->i", dy, intensites)
+                    champ[:, 2] += np.einsum("ij,ij->i", dz, intensites)
+
+                forces_lot[debut : debut + len(indices_cibles)] = (
+                    champ * masses_completes[indices_cibles, np.newaxis]
                 )
-                forces_lot[i] = force_resultante
 
         except Exception as e:
             logger.error(f"Erreur calcul forces lot: {e}")
@@ -239,12 +602,22 @@ class CalculateurForcesGravitationnelles:
         mode_force: ModeCalcul = ModeCalcul.ADAPTATIF,
     ) -> NDArray[np.float64]:
         """Calcule les forces pour tout le système avec stratégie adaptative."""
-        n_entites = len(entites_massives)
-
-        # Extraction et validation des propriétés
+        # Extraction des propriétés
         positions = np.array([e.position for e in entites_massives], dtype=np.float64)
         masses = np.array([e.masse for e in entites_massives], dtype=np.float64)
 
+        return self.calculer_forces_tableaux(positions, masses, constante_g, mode_force)
+
+    def calculer_forces_tableaux(
+        self,
+        positions: NDArray[np.float64],
+        masses: NDArray[np.float64],
+        constante_g: float,
+        mode_force: ModeCalcul = ModeCalcul.ADAPTATIF,
+    ) -> NDArray[np.float64]:
+        """Calcule les forces à partir de tableaux déjà extraits (colonnes)."""
+        n_entites = len(positions)
+
         # Validation stricte
         valide, erreurs = ValidateurPhysique.valider_arrays_physiques(positions, masses)
         if not valide:
@@ -257,16 +630,13 @@ class CalculateurForcesGravitationnelles:
             self.metriques.erreurs_numeriques += len(erreurs)
 
         # Choix stratégie de calcul
-        if mode_force == ModeCalcul.ADAPTATIF:
-            if n_entites > self.config.seuil_parallelisation and cpu_count() > 2:
-                mode_effectif = ModeCalcul.PARALLELE
-            else:
-                mode_effectif = ModeCalcul.SEQUENTIEL
-        else:
-            mode_effectif = mode_force
+        mode_effectif = self.determiner_mode_effectif(n_entites, mode_force)
+        self.dernier_mode_effectif = mode_effectif
 
         # Calcul selon la stratégie
-        if mode_effectif == ModeCalcul.PARALLELE:
+        if mode_effectif == ModeCalcul.BARNES_HUT:
+            return self._calculer_forces_barnes_hut(positions, masses, constante_g)
+        elif mode_effectif == ModeCalcul.PARALLELE:
             return self._calculer_forces_parallele(positions, masses, constante_g)
         else:
             return self._calculer_forces_sequentiel(positions, masses, constante_g)
@@ -277,10 +647,27 @@ class CalculateurForcesGravitationnelles:
         masses: NDArray[np.float64],
         constante_g: float,
     ) -> NDArray[np.float64]:
-        """Calcul séquentiel optimisé."""
+        """Calcul séquentiel direct via le noyau tuilé."""
         indices = np.arange(len(positions))
         return self.calculer_forces_lot(indices, positions, masses, constante_g)
 
+    def _calculer_forces_barnes_hut(
+        self,
+        positions: NDArray[np.float64],
+        masses: NDArray[np.float64],
+        constante_g: float,
+    ) -> NDArray[np.float64]:
+        """Calcul Barnes-Hut O(N log N) via octree vectorisé."""
+        try:
+            arbre = _ArbreBarnesHut(
+                positions, masses, self.config.taille_feuille_barnes_hut
+            )
+            return arbre.calculer_forces(constante_g, self.config.theta_barnes_hut)
+
+        except Exception as e:
+            logger.warning(f"Échec calcul Barnes-Hut: {e}, basculement séquentiel")
+            return self._calculer_forces_sequentiel(positions, masses, constante_g)
+
     def _calculer_forces_parallele(
         self,
         positions: NDArray[np.float64],
@@ -288,6 +675,14 @@ class CalculateurForcesGravitationnelles:
         constante_g: float,
     ) -> NDArray[np.float64]:
         """Calcul parallèle avec gestion d'erreurs."""
+        if self.pool_partage is not None:
+            try:
+                return self.pool_partage.calculer_forces(positions, masses, constante_g)
+            except Exception as e:
+                logger.warning(f"Échec pool persistant: {e}, basculement séquentiel")
+                self.pool_partage.fermer()
+                return self._calculer_forces_sequentiel(positions, masses, constante_g)
+
         try:
             with GestionnairePoolProcessus(self.config.max_processus) as pool:
                 indices = np.arange(len(positions))
@@ -350,6 +745,177 @@ def GestionnairePoolProcessus(max_processus: int = 4):
                     pass
 
 
+# ========================================================================
+# POOL PERSISTANT À MÉMOIRE PARTAGÉE
+# ========================================================================
+
+# Segments attachés côté worker, indexés par nom (réattachés au redimensionnement)
+_SEGMENTS_WORKER: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attacher_segment(nom: str) -> shared_memory.SharedMemory:
+    """Attache un segment partagé sans le confier au resource tracker (3.13+)."""
+    try:
+        return shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=nom)
+
+
+def _calculer_forces_tranche_partagee(tache: Tuple) -> int:
+    """Worker : calcule les forces d'une tranche de lignes en mémoire partagée."""
+    noms, capacite, n_entites, debut, fin, constante_g = tache
+
+    # Les anciens segments sont libérés dès que le parent a redimensionné
+    for nom in list(_SEGMENTS_WORKER):
+        if nom not in noms:
+            _SEGMENTS_WORKER.pop(nom).close()
+    for nom in noms:
+        if nom not in _SEGMENTS_WORKER:
+            _SEGMENTS_WORKER[nom] = _attacher_segment(nom)
+
+    nom_positions, nom_masses, nom_forces = noms
+    positions = np.ndarray(
+        (capacite, 3), dtype=np.float64, buffer=_SEGMENTS_WORKER[nom_positions].buf
+    )[:n_entites]
+    masses = np.ndarray(
+        (capacite,), dtype=np.float64, buffer=_SEGMENTS_WORKER[nom_masses].buf
+    )[:n_entites]
+    forces = np.ndarray(
+        (capacite, 3), dtype=np.float64, buffer=_SEGMENTS_WORKER[nom_forces].buf
+    )
+
+    forces[debut:fin] = CalculateurForcesGravitationnelles.calculer_forces_lot(
+        np.arange(debut, fin), positions, masses, constante_g
+    )
+    return fin - debut
+
+
+class _PoolForcesPartage:
+    """Pool de processus persistant travaillant sur des tampons partagés.
+
+    Positions, masses et forces vivent dans des segments `shared_memory` :
+    les workers ne reçoivent que des bornes de lignes, et les tampons ne sont
+    réalloués que lorsque le nombre d'entités dépasse la capacité.
+    """
+
+    FACTEUR_CROISSANCE = 1.5
+    TACHES_PAR_PROCESSUS = 2
+
+    def __init__(self, max_processus: int = 4):
+        """Prépare le pool (les processus sont créés au premier calcul)."""
+        self.nb_processus = max(1, min(cpu_count() - 1, max_processus))
+        self.capacite = 0
+        self.appels_total = 0
+        self.redimensionnements = 0
+        self._pool: Optional[Pool] = None
+        self._segments: List[shared_memory.SharedMemory] = []
+        self._positions: Optional[NDArray[np.float64]] = None
+        self._masses: Optional[NDArray[np.float64]] = None
+        self._forces: Optional[NDArray[np.float64]] = None
+        self._lock = threading.Lock()
+
+    def calculer_forces(
+        self,
+        positions: NDArray[np.float64],
+        masses: NDArray[np.float64],
+        constante_g: float,
+    ) -> NDArray[np.float64]:
+        """Répartit le calcul direct entre les workers par tranches de lignes."""
+        n_entites = len(positions)
+
+        with self._lock:
+            # Segments créés avant le fork : les workers partagent ainsi le
+            # resource tracker du parent au lieu d'en démarrer un chacun
+            self._assurer_capacite(n_entites)
+            if self._pool is None:
+                self._pool = Pool(processes=self.nb_processus)
+                logger.debug(f"Pool persistant créé avec {self.nb_processus} processus")
+
+            self._positions[:n_entites] = positions
+            self._masses[:n_entites] = masses
+
+            noms = tuple(segment.name for segment in self._segments)
+            nb_taches = min(n_entites, self.nb_processus * self.TACHES_PAR_PROCESSUS)
+            bornes = np.linspace(0, n_entites, nb_taches + 1).astype(np.int64)
+            taches = [
+                (noms, self.capacite, n_entites, int(debut), int(fin), constante_g)
+                for debut, fin in zip(bornes[:-1], bornes[1:])
+                if fin > debut
+            ]
+
+            self._pool.map(_calculer_forces_tranche_partagee, taches)
+            self.appels_total += 1
+
+            return self._forces[:n_entites].copy()
+
+    def _assurer_capacite(self, n_entites: int) -> None:
+        """Réalloue les segments partagés uniquement si N dépasse la capacité."""
+        if n_entites <= self.capacite:
+            return
+
+        capacite = max(n_entites, int(self.capacite * self.FACTEUR_CROISSANCE), 1024)
+        octets_vecteurs = capacite * 3 * np.dtype(np.float64).itemsize
+        octets_scalaires = capacite * np.dtype(np.float64).itemsize
+
+        anciens_segments = self._segments
+        self._segments = [
+            shared_memory.SharedMemory(create=True, size=octets_vecteurs),
+            shared_memory.SharedMemory(create=True, size=octets_scalaires),
+            shared_memory.SharedMemory(create=True, size=octets_vecteurs),
+        ]
+        self._positions = np.ndarray(
+            (capacite, 3), dtype=np.float64, buffer=self._segments[0].buf
+        )
+        self._masses = np.ndarray(
+            (capacite,), dtype=np.float64, buffer=self._segments[1].buf
+        )
+        self._forces = np.ndarray(
+            (capacite, 3), dtype=np.float64, buffer=self._segments[2].buf
+        )
+        self.capacite = capacite
+        self.redimensionnements += 1
+        logger.debug(f"Tampons partagés redimensionnés: capacité {capacite} entités")
+
+        self._liberer_segments(anciens_segments)
+
+    @staticmethod
+    def _liberer_segments(segments: List[shared_memory.SharedMemory]) -> None:
+        """Ferme et détruit des segments (les workers s'en détachent ensuite)."""
+        for segment in segments:
+            try:
+                segment.close()
+                segment.unlink()
+            except Exception as e:
+                logger.debug(f"Erreur libération segment {segment.name}: {e}")
+
+    def fermer(self) -> None:
+        """Arrête les workers et libère les tampons partagés."""
+        with self._lock:
+            if self._pool is not None:
+                try:
+                    self._pool.close()
+                    self._pool.join()
+                except Exception as e:
+                    logger.warning(f"Erreur fermeture pool persistant: {e}")
+                    self._pool.terminate()
+                self._pool = None
+
+            self._positions = self._masses = self._forces = None
+            self._liberer_segments(self._segments)
+            self._segments = []
+            self.capacite = 0
+
+    def obtenir_statut(self) -> Dict[str, Any]:
+        """Retourne l'état du pool pour les rapports de performance."""
+        return {
+            "actif": self._pool is not None,
+            "processus": self.nb_processus,
+            "capacite": self.capacite,
+            "appels_total": self.appels_total,
+            "redimensionnements": self.redimensionnements,
+        }
+
+
 # ========================================================================
 # AGENTS PHYSIQUES REFACTORISÉS
 # ========================================================================
@@ -404,10 +970,25 @@ class MaitreTemps:
 class CalculateurLois:
     """Agent physique - Dynamique gravitationnelle optimisée."""
 
+    CATEGORIES_MASSIVES = [
+        "particules",
+        "atomes",
+        "etoiles",
+        "planetes",
+        "trous_noirs",
+    ]
+
+    # Catégories lues et modifiées, pour l'ordonnanceur des agents
+    CATEGORIES_LUES = tuple(CATEGORIES_MASSIVES)
+    CATEGORIES_ECRITES = tuple(CATEGORIES_MASSIVES)
+
     def __init__(self, config: Optional[ConfigurationPhysique] = None):
         """Initialise le calculateur avec configuration flexible."""
         self.config = config or ConfigurationPhysique()
-        self.calculateur_forces = CalculateurForcesGravitationnelles(self.config)
+        self.pool_forces = _PoolForcesPartage(self.config.max_processus)
+        self.calculateur_forces = CalculateurForcesGravitationnelles(
+            self.config, self.pool_forces
+        )
         self.metriques = MetriquesPhysiques()
         self.cache_forces: Dict[str, NDArray[np.float64]] = {}
         self.derniere_invalidation = 0
@@ -420,31 +1001,18 @@ class CalculateurLois:
         temps_debut = time.time()
 
         try:
-            # Collecte des entités massives
-            entites_massives = self._collecter_entites_massives(etatmonde)
-            n_entites = len(entites_massives)
+            # Chemin colonnaire si l'univers le permet, sinon objet par objet
+            if hasattr(etatmonde, "obtenir_colonnes"):
+                n_traitees = self._calculer_sur_colonnes(etatmonde)
+            else:
+                n_traitees = self._calculer_sur_entites(etatmonde)
 
-            if n_entites < 2:
+            if n_traitees == 0:
                 return etatmonde
 
-            # Optimisation adaptative pour gros systèmes
-            entites_traitees = self._optimiser_entites_selon_performance(
-                entites_massives, n_entites
-            )
-
-            # Calcul des forces gravitationnelles
-            forces = self.calculateur_forces.calculer_forces_systeme_complet(
-                entites_traitees,
-                etatmonde.constantes["gravite"],
-                self.config.mode_calcul,
-            )
-
-            # Application de la dynamique
-            self._appliquer_dynamique(entites_traitees, forces, etatmonde)
-
             # Mise à jour métriques
             temps_calcul = time.time() - temps_debut
-            self._mettre_a_jour_metriques(temps_calcul, len(entites_traitees))
+            self._mettre_a_jour_metriques(temps_calcul, n_traitees)
 
             return etatmonde
 
@@ -452,19 +1020,99 @@ class CalculateurLois:
             logger.error(f"Erreur CalculateurLois: {e}")
             return etatmonde
 
+    def _calculer_sur_colonnes(self, etatmonde: "EtatMonde") -> int:
+        """Forces et intégration directement sur les colonnes de l'univers."""
+        blocs = []
+        for categorie in self.CATEGORIES_MASSIVES:
+            colonnes = etatmonde.obtenir_colonnes(categorie)
+            if colonnes is None or colonnes.n_lignes == 0:
+                continue
+            # Filtrer les entités avec masse significative
+            lignes = np.flatnonzero(colonnes.masses[: colonnes.n_lignes] > 1e-9)
+            if lignes.size:
+                blocs.append((colonnes, lignes))
+
+        n_entites = sum(lignes.size for _, lignes in blocs)
+        if n_entites < 2:
+            return 0
+
+        positions = np.concatenate([c.positions[lignes] for c, lignes in blocs])
+        masses = np.concatenate([c.masses[lignes] for c, lignes in blocs])
+        vecteurs = np.concatenate([c.vecteurs[lignes] for c, lignes in blocs])
+        est_mobile = np.concatenate([c.mobiles[lignes] for c, lignes in blocs])
+
+        # Optimisation adaptative pour gros systèmes
+        selection = self._selectionner_indices_performance(masses, n_entites)
+        if selection is None:
+            selection = np.arange(n_entites)
+        else:
+            positions, masses = positions[selection], masses[selection]
+            vecteurs, est_mobile = vecteurs[selection], est_mobile[selection]
+
+        if not np.any(est_mobile):
+            return len(selection)
+
+        # Calcul des forces gravitationnelles
+        forces = self.calculateur_forces.calculer_forces_tableaux(
+            positions,
+            masses,
+            etatmonde.constantes["gravite"],
+            self.config.mode_calcul,
+        )
+
+        # Application de la dynamique
+        nouvelles_positions, nouveaux_vecteurs = self._integrer_dynamique(
+            positions, masses, vecteurs, est_mobile, forces, etatmonde
+        )
+
+        # Écriture en bloc : les entités voient leurs vues mises à jour
+        debut = 0
+        for colonnes, lignes in blocs:
+            fin = debut + lignes.size
+            masque = (selection >= debut) & (selection < fin)
+            lignes_cibles = lignes[selection[masque] - debut]
+            mobiles = est_mobile[masque]
+
+            colonnes.positions[lignes_cibles] = nouvelles_positions[masque]
+            colonnes.vecteurs[lignes_cibles[mobiles]] = nouveaux_vecteurs[masque][
+                mobiles
+            ]
+            colonnes.signaler_deplacements()
+            debut = fin
+
+        return len(selection)
+
+    def _calculer_sur_entites(self, etatmonde: "EtatMonde") -> int:
+        """Chemin objet par objet pour les univers sans stockage colonnaire."""
+        # Collecte des entités massives
+        entites_massives = self._collecter_entites_massives(etatmonde)
+        n_entites = len(entites_massives)
+
+        if n_entites < 2:
+            return 0
+
+        # Optimisation adaptative pour gros systèmes
+        entites_traitees = self._optimiser_entites_selon_performance(
+            entites_massives, n_entites
+        )
+
+        # Calcul des forces gravitationnelles
+        forces = self.calculateur_forces.calculer_forces_systeme_complet(
+            entites_traitees,
+            etatmonde.constantes["gravite"],
+            self.config.mode_calcul,
+        )
+
+        # Application de la dynamique
+        self._appliquer_dynamique(entites_traitees, forces, etatmonde)
+
+        return len(entites_traitees)
+
     def _collecter_entites_massives(self, etatmonde: "EtatMonde") -> List:
         """Collecte toutes les entités ayant une masse significative."""
         entites_massives = []
 
-        categories_massives = [
-            "particules",
-            "atomes",
-            "etoiles",
-            "planetes",
-            "trous_noirs",
-        ]
-
-        for categorie in categories_massives:
+        for categorie in self.CATEGORIES_MASSIVES:
             entites_categorie = etatmonde.entites.get(categorie, [])
             # Filtrer les entités avec masse significative
             entites_valides = [e for e in entites_categorie if e.masse > 1e-9]
@@ -472,6 +1120,34 @@ class CalculateurLois:
 
         return entites_massives
 
+    def _selectionner_indices_performance(
+        self, masses: NDArray[np.float64], n_entites: int
+    ) -> Optional[NDArray[np.int64]]:
+        """Version indicielle de l'échantillonnage (None si inutile)."""
+        if n_entites <= self.config.limite_entites_performance:
+            return None
+
+        mode_effectif = self.calculateur_forces.determiner_mode_effectif(
+            n_entites, self.config.mode_calcul
+        )
+        if mode_effectif == ModeCalcul.BARNES_HUT:
+            return None
+
+        logger.info(f"Optimisation performance: {n_entites} entités -> échantillonnage")
+
+        # Même stratégie que la version objet : plus massives + échantillon
+        ordre = np.argsort(-masses, kind="stable")
+        limite_importantes = min(5000, self.config.limite_entites_performance // 4)
+        restantes = ordre[limite_importantes:]
+        pas_echantillonnage = max(
+            1,
+            len(restantes)
+            // (self.config.limite_entites_performance - limite_importantes),
+        )
+        return np.concatenate(
+            [ordre[:limite_importantes], restantes[::pas_echantillonnage]]
+        )
+
     def _optimiser_entites_selon_performance(
         self, entites_massives: List, n_entites: int
     ) -> List:
@@ -479,6 +1155,13 @@ class CalculateurLois:
         if n_entites <= self.config.limite_entites_performance:
             return entites_massives
 
+        # Barnes-Hut tient la charge : aucun échantillonnage nécessaire
+        mode_effectif = self.calculateur_forces.determiner_mode_effectif(
+            n_entites, self.config.mode_calcul
+        )
+        if mode_effectif == ModeCalcul.BARNES_HUT:
+            return entites_massives
+
         # Stratégie d'échantillonnage intelligent
         logger.info(f"Optimisation performance: {n_entites} entités -> échantillonnage")
 
@@ -524,6 +1207,26 @@ class CalculateurLois:
             [e.vecteur if hasattr(e, "vecteur") else np.zeros(3) for e in entites]
         )
 
+        nouvelles_positions, nouveaux_vecteurs = self._integrer_dynamique(
+            positions, masses, vecteurs, est_mobile, forces, etatmonde
+        )
+
+        # Mise à jour des entités
+        for i, entite in enumerate(entites):
+            entite.position = nouvelles_positions[i]
+            if est_mobile[i]:
+                entite.vecteur = nouveaux_vecteurs[i]
+
+    def _integrer_dynamique(
+        self,
+        positions: NDArray[np.float64],
+        masses: NDArray[np.float64],
+        vecteurs: NDArray[np.float64],
+        est_mobile: NDArray[np.bool_],
+        forces: NDArray[np.float64],
+        etatmonde: "EtatMonde",
+    ) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Intègre la dynamique sur des tableaux et retourne positions et vecteurs."""
         # Calcul accélérations (a = F/m)
         acceleration = np.zeros_like(positions)
         masses_mobiles = masses[est_mobile, np.newaxis]
@@ -549,11 +1252,7 @@ class CalculateurLois:
             )
             nouveaux_vecteurs[indices_rapides] *= facteur_limitation
 
-        # Mise à jour des entités
-        for i, entite in enumerate(entites):
-            entite.position = nouvelles_positions[i]
-            if est_mobile[i]:
-                entite.vecteur = nouveaux_vecteurs[i]
+        return nouvelles_positions, nouveaux_vecteurs
 
     def _mettre_a_jour_metriques(self, temps_calcul: float, nb_entites: int) -> None:
         """Met à jour les métriques de performance."""
@@ -562,6 +1261,10 @@ class CalculateurLois:
             self.metriques.temps_calcul_total += temps_calcul
             self.metriques.entites_traitees_total += nb_entites
 
+    def fermer_pool(self) -> None:
+        """Libère le pool persistant et ses tampons partagés."""
+        self.pool_forces.fermer()
+
     def obtenir_rapport_performance(self) -> Dict[str, Any]:
         """Génère un rapport de performance."""
         return {
@@ -570,12 +1273,23 @@ class CalculateurLois:
             "entites_traitees": self.metriques.entites_traitees_total,
             "erreurs_numeriques": self.metriques.erreurs_numeriques,
             "mode_calcul": self.config.mode_calcul.value,
+            "mode_calcul_effectif": (
+                self.calculateur_forces.dernier_mode_effectif.value
+                if self.calculateur_forces.dernier_mode_effectif
+                else None
+            ),
+            "theta_barnes_hut": self.config.theta_barnes_hut,
+            "pool_forces": self.pool_forces.obtenir_statut(),
         }
 
 
 class Alchimiste:
     """Agent nucléaire - Nucléosynthèse primordiale optimisée."""
 
+    # Catégories lues et modifiées (« aleatoire » : random et np.random globaux)
+    CATEGORIES_LUES = ("particules", "etoiles")
+    CATEGORIES_ECRITES = ("particules", "atomes", "aleatoire")
+
     def __init__(self, config: Optional[ConfigurationPhysique] = None):
         """Initialise les paramètres de nucléosynthèse."""
         self.config = config or ConfigurationPhysique()
@@ -599,79 +1313,67 @@ class Alchimiste:
     def _alchimiste_optimise(
         self, etatmonde: "EtatMonde", particules: List["Particule"]
     ) -> "EtatMonde":
-        """Version optimisée avec scipy et filtrage stellaire."""
-        from etatmonde import Atome
-
-        positions_particules = np.array([p.position for p in particules])
+        """Version optimisée sur l'index spatial partagé, avec filtrage stellaire."""
+        index_particules = etatmonde.obtenir_index_spatial("particules")
 
         # Filtrage : éviter fusion près des étoiles
-        particules_eligibles = self._filtrer_particules_loin_etoiles(
-            etatmonde, particules, positions_particules
+        eligibles = self._masque_particules_loin_etoiles(
+            etatmonde, index_particules.positions
         )
 
-        if len(particules_eligibles) < 2:
+        if np.count_nonzero(eligibles) < 2:
             return etatmonde
 
-        # Construction arbre spatial
-        positions_eligibles = np.array([p.position for p in particules_eligibles])
-        arbre_positions = cKDTree(positions_eligibles)
-
-        # Recherche de paires pour fusion
-        paires = arbre_positions.query_pairs(r=self.config.seuil_fusion)
-        if not paires:
+        # Recherche de paires pour fusion, restreinte aux particules éligibles
+        paires = index_particules.paires(self.config.seuil_fusion)
+        paires = paires[eligibles[paires[:, 0]] & eligibles[paires[:, 1]]]
+        if not len(paires):
             return etatmonde
 
         # Traitement des fusions
         nouveaux_atomes, indices_consommes = self._traiter_fusions(
-            particules_eligibles, paires
+            index_particules.entites, paires.tolist()
         )
 
         # Mise à jour état du monde
         if nouveaux_atomes:
             self._appliquer_resultats_fusion(
                 etatmonde,
-                particules,
-                particules_eligibles,
+                index_particules.entites,
                 nouveaux_atomes,
                 indices_consommes,
             )
 
         return etatmonde
 
-    def _filtrer_particules_loin_etoiles(
+    def _masque_particules_loin_etoiles(
         self,
         etatmonde: "EtatMonde",
-        particules: List["Particule"],
         positions_particules: NDArray[np.float64],
-    ) -> List["Particule"]:
-        """Filtre les particules éloignées des étoiles."""
-        etoiles = etatmonde.entites.get("etoiles", [])
-
-        if not etoiles:
-            return particules
+    ) -> NDArray[np.bool_]:
+        """Masque des particules éloignées des étoiles."""
+        index_etoiles = etatmonde.obtenir_index_spatial("etoiles")
 
-        positions_etoiles = np.array([e.position for e in etoiles])
-        arbre_etoiles = cKDTree(positions_etoiles)
+        if not index_etoiles:
+            return np.ones(len(positions_particules), dtype=bool)
 
-        distances_etoiles = arbre_etoiles.query(positions_particules, k=1)[0]
-        indices_isolees = distances_etoiles > self.config.rayon_exclusion_stellaire
-
-        return [p for i, p in enumerate(particules) if indices_isolees[i]]
+        distances_etoiles = index_etoiles.plus_proches(positions_particules, k=1)[0]
+        return distances_etoiles > self.config.rayon_exclusion_stellaire
 
     def _traiter_fusions(
-        self, particules_eligibles: List["Particule"], paires: set
+        self, particules: List["Particule"], paires: List[Tuple[int, int]]
     ) -> Tuple[List["Atome"], NDArray[np.bool_]]:
         """Traite les fusions de particules en atomes."""
         from etatmonde import Atome
 
-        indices_consommes = np.zeros(len(particules_eligibles), dtype=bool)
+        indices_consommes = np.zeros(len(particules), dtype=bool)
         nouveaux_atomes: List[Atome] = []
 
         for i, j in paires:
             if indices_consommes[i] or indices_consommes[j]:
                 continue
 
-            p1, p2 = particules_eligibles[i], particules_eligibles[j]
+            p1, p2 = particules[i], particules[j]
 
             # Calcul propriétés fusion
             masse_totale = (p1.masse + p2.masse) * self.config.efficacite_fusion
@@ -720,8 +1422,7 @@ class Alchimiste:
     def _appliquer_resultats_fusion(
         self,
         etatmonde: "EtatMonde",
-        particules_originales: List["Particule"],
-        particules_eligibles: List["Particule"],
+        particules: List["Particule"],
         nouveaux_atomes: List["Atome"],
         indices_consommes: NDArray[np.bool_],
     ) -> None:
@@ -738,16 +1439,9 @@ class Alchimiste:
             f"({', '.join(f'{count} {type_}' for type_, count in compteurs.items())})"
         )
 
-        # Suppression des particules consommées
-        ids_consommes = {
-            particules_eligibles[i].id
-            for i, consomme in enumerate(indices_consommes)
-            if consomme
-        }
-
-        etatmonde.entites["particules"] = [
-            p for p in particules_originales if p.id not in ids_consommes
-        ]
+        # Suppression des particules consommées (retrait O(1) par échange)
+        for i in np.flatnonzero(indices_consommes):
+            etatmonde.supprimer_entite(particules[i])
 
         # Ajout des nouveaux atomes
         etatmonde.entites["atomes"].extend(nouveaux_atomes)
@@ -819,6 +1513,41 @@ class GestionnaireSauvegarde:
         self.format_timestamp = "%Y%m%d_%H%M%S"
         self.max_backups = 10
 
+        # Instantanés colonnaires incrémentaux, écrits en arrière-plan
+        self.instantanes = GestionnaireInstantanes(
+            self.repertoire, max_chaines=self.max_backups
+        )
+
+    def sauvegarder_instantane(
+        self,
+        etatmonde: "EtatMonde",
+        rappel: Optional[Callable[[bool, str], None]] = None,
+    ) -> bool:
+        """
+        Capture l'univers et l'écrit en arrière-plan sous forme d'instantané.
+
+        Retourne True si la capture a réussi ; le résultat de l'écriture est
+        transmis à `rappel(succes, message)` depuis le thread d'écriture.
+        """
+        if not etatmonde:
+            logger.error("Tentative de sauvegarde d'un univers None")
+            return False
+
+        if not hasattr(etatmonde, "temps") or not hasattr(etatmonde, "entites"):
+            logger.error("Structure EtatMonde invalide")
+            return False
+
+        try:
+            duree_capture = self.instantanes.sauvegarder(etatmonde, rappel)
+            logger.debug(
+                f"Univers capturé en {duree_capture * 1000:.1f} ms, "
+                f"écriture en arrière-plan"
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Erreur capture univers: {e}")
+            return False
+
     def sauvegarder_avec_backup(
         self, etatmonde: "EtatMonde", nom_fichier: str = "memoire.monde"
     ) -> bool:
@@ -916,11 +1645,25 @@ class Archiviste:
         self.gestionnaire = GestionnaireSauvegarde()
 
     def archiviste(
-        self, etatmonde: Optional["EtatMonde"] = None, instruction: str = "charger"
+        self,
+        etatmonde: Optional["EtatMonde"] = None,
+        instruction: str = "charger",
+        rappel: Optional[Callable[[bool, str], None]] = None,
     ) -> Union[Optional["EtatMonde"], bool, List[Dict[str, Any]]]:
-        """Interface principale de l'archiviste."""
+        """
+        Interface principale de l'archiviste.
+
+        "sauvegarder" capture l'univers et retourne sans attendre l'écriture,
+        signalée par `rappel` ; "attendre_sauvegardes" bloque jusqu'à ce que
+        les écritures en cours soient terminées ; "sauvegarder_pickle" conserve
+        l'ancienne sauvegarde complète et synchrone.
+        """
         try:
             if instruction == "sauvegarder":
+                return self.gestionnaire.sauvegarder_instantane(etatmonde, rappel)
+            elif instruction == "attendre_sauvegardes":
+                return self.gestionnaire.instantanes.attendre()
+            elif instruction == "sauvegarder_pickle":
                 return self.gestionnaire.sauvegarder_avec_backup(etatmonde)
             elif instruction == "charger":
                 return self._charger_avec_fallback()
@@ -936,6 +1679,15 @@ class Archiviste:
 
     def _charger_avec_fallback(self) -> Optional["EtatMonde"]:
         """Charge un univers avec système de fallback robuste."""
+        # Instantanés colonnaires (les chaînes rompues sont sautées)
+        try:
+            monde_charge = self.gestionnaire.instantanes.charger_dernier()
+            if monde_charge and self._valider_univers_charge(monde_charge):
+                return monde_charge
+        except Exception as e:
+            logger.warning(f"Échec chargement des instantanés: {e}")
+
+        # Anciennes sauvegardes pickle
         fichier_principal = "memoire.monde"
 
         # Tentative fichier principal
@@ -1021,6 +1773,9 @@ class Archiviste:
                 }
             )
 
+        # Instantanés colonnaires
+        sauvegardes.extend(self.gestionnaire.instantanes.lister())
+
         # Backups
         for backup_path in self.gestionnaire.repertoire.glob("univers_backup_*.monde"):
             stat = backup_path.stat()
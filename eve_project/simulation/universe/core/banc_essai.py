@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+# Fichier : banc_essai.py
+# Version 9.0 ("Banc d'Essai") - Exécution sans affichage, reproductible et mesurée.
+
+"""
+Banc d'essai sans interface pour le Projet Monde.
+Construit un univers à partir d'un preset du générateur, fixe toutes les
+graines aléatoires puis enchaîne N cycles d'agents dans l'ordre défini par
+ConfigurationSimulateur, sans Qt ni file d'attente. Les temps par agent et
+par cycle, le pic de mémoire résidente et les populations sont écrits en JSON
+pour comparer deux commits ou suivre les régressions en intégration continue.
+
+Exemples :
+    python banc_essai.py --preset bigbang_classique --cycles 50 --sortie ref.json
+    python banc_essai.py --entites 20000 --cycles 20 --comparer ref.json
+    python banc_essai.py --balayage 1000,10000,100000,1000000 --cycles 5
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+import numpy as np
+
+from etatmonde import EtatMonde, fixer_graine_identifiants
+from generateurmonde import (
+    ForgeCosmologique,
+    TemplatesUnivers,
+    TypeUnivers,
+    creer_univers_dense,
+)
+from gestionnaire_agents import ConfigurationSimulateur, GestionnaireAgents
+
+# Import conditionnel : pic RSS via resource (Unix), sinon via psutil
+try:
+    import resource
+
+    RESOURCE_DISPONIBLE = True
+except ImportError:
+    resource = None
+    RESOURCE_DISPONIBLE = False
+
+try:
+    import psutil
+
+    PSUTIL_DISPONIBLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_DISPONIBLE = False
+
+logger = logging.getLogger(__name__)
+
+VERSION_FORMAT = 1
+TAILLES_BALAYAGE_DEFAUT = (1000, 10000, 100000, 1000000)
+
+# ========================================================================
+# CONSTRUCTION REPRODUCTIBLE DE L'UNIVERS
+# ========================================================================
+
+
+def fixer_graines(graine: int) -> None:
+    """Fixe toutes les sources d'aléa de la simulation (random, NumPy, UUID)."""
+    random.seed(graine)
+    np.random.seed(graine)
+    fixer_graine_identifiants(graine)
+
+
+def _preset_forge(type_univers: TypeUnivers) -> Callable[[], EtatMonde]:
+    """Fabrique un preset à partir d'un template de la forge."""
+    return lambda: ForgeCosmologique().generer_univers(type_univers)
+
+
+PRESETS: Dict[str, Callable[[], EtatMonde]] = {
+    type_univers.value: _preset_forge(type_univers) for type_univers in TypeUnivers
+}
+PRESETS["dense"] = creer_univers_dense
+
+
+def construire_univers(
+    graine: int, preset: str = "bigbang_classique", entites: Optional[int] = None
+) -> EtatMonde:
+    """
+    Construit l'univers initial du banc d'essai.
+
+    Args:
+        graine: Graine commune à toutes les sources d'aléa
+        preset: Nom d'un preset (valeur de TypeUnivers ou "dense")
+        entites: Si fourni, nombre exact de particules sur la base du Big Bang
+            classique (sans le plafond de validation, pour les balayages)
+
+    Returns:
+        EtatMonde: Univers initial
+    """
+    fixer_graines(graine)
+
+    if entites is None:
+        if preset not in PRESETS:
+            raise ValueError(
+                f"Preset inconnu '{preset}' (disponibles : {', '.join(PRESETS)})"
+            )
+        return PRESETS[preset]()
+
+    params = TemplatesUnivers.obtenir_template(TypeUnivers.BIG_BANG_CLASSIQUE)
+    params.nombre_particules = int(entites)
+    params.seed_aleatoire = graine
+    forge = ForgeCosmologique(params)
+    return forge.generer_univers(
+        TypeUnivers.BIG_BANG_CLASSIQUE, appliquer_template=False
+    )
+
+
+# ========================================================================
+# MESURES
+# ========================================================================
+
+
+def mesurer_rss_max_mo() -> Optional[float]:
+    """Pic de mémoire résidente du processus, en Mo."""
+    if RESOURCE_DISPONIBLE:
+        rss_max = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux : kilo-octets, macOS : octets
+        diviseur = 1024**2 if sys.platform == "darwin" else 1024
+        return rss_max / diviseur
+
+    if PSUTIL_DISPONIBLE:
+        memoire = psutil.Process().memory_info()
+        # peak_wset n'existe que sous Windows ; à défaut, RSS courant
+        return getattr(memoire, "peak_wset", memoire.rss) / 1024**2
+
+    return None
+
+
+def compter_entites(etatmonde: EtatMonde) -> Dict[str, int]:
+    """Population de chaque catégorie d'entités."""
+    return {categorie: len(entites) for categorie, entites in etatmonde.entites.items()}
+
+
+def _statistiques_temps(temps_ms: List[float]) -> Dict[str, float]:
+    """Résumé d'une série de durées en millisecondes."""
+    if not temps_ms:
+        return {"total_ms": 0.0, "moyenne_ms": 0.0}
+
+    serie = np.asarray(temps_ms)
+    return {
+        "total_ms": float(serie.sum()),
+        "moyenne_ms": float(serie.mean()),
+        "mediane_ms": float(np.median(serie)),
+        "p95_ms": float(np.percentile(serie, 95)),
+        "min_ms": float(serie.min()),
+        "max_ms": float(serie.max()),
+    }
+
+
+def _revision_git() -> Optional[str]:
+    """Commit courant du dépôt, s'il est disponible."""
+    try:
+        resultat = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return resultat.stdout.strip() or None
+
+
+def decrire_environnement() -> Dict[str, Any]:
+    """Contexte d'exécution joint aux résultats pour comparer des commits."""
+    return {
+        "revision": _revision_git(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plateforme": platform.platform(),
+        "processeurs": psutil.cpu_count() if PSUTIL_DISPONIBLE else None,
+    }
+
+
+# ========================================================================
+# BANC D'ESSAI
+# ========================================================================
+
+
+class BancEssai:
+    """Enchaîne les cycles d'agents sans interface et mesure chaque agent."""
+
+    def __init__(self, config: Optional[ConfigurationSimulateur] = None):
+        """Charge les agents selon la configuration du simulateur."""
+        self.config = config or ConfigurationSimulateur()
+        self.gestionnaire_agents = GestionnaireAgents(self.config)
+
+        if not self.gestionnaire_agents.decouvrir_et_charger_agents():
+            raise RuntimeError("Chargement des agents impossible (MaitreTemps absent)")
+
+    def executer(self, etatmonde: EtatMonde, cycles: int) -> Dict[str, Any]:
+        """
+        Exécute les cycles et collecte les mesures.
+
+        Args:
+            etatmonde: Univers initial
+            cycles: Nombre de cycles à enchaîner
+
+        Returns:
+            Dict: Mesures par agent, par cycle et populations
+        """
+        gestionnaire = self.gestionnaire_agents
+        ordre = (
+            ["maitretemps"]
+            + self.config.ordre_modificateurs
+            + self.config.ordre_analyseurs
+        )
+        agents = [nom for nom in ordre if nom in gestionnaire.agents_charges]
+
+        temps_par_agent: Dict[str, List[float]] = {nom: [] for nom in agents}
+        echecs_par_agent: Dict[str, int] = {nom: 0 for nom in agents}
+        journal_cycles: List[Dict[str, Any]] = []
+        entites_initiales = compter_entites(etatmonde)
+        cycles_effectues = 0
+
+        try:
+            for cycle in range(cycles):
+                avant = {
+                    nom: (
+                        gestionnaire.metriques[nom].executions_totales,
+                        gestionnaire.metriques[nom].executions_reussies,
+                    )
+                    for nom in agents
+                }
+                temps_debut = time.perf_counter()
+
+                # Même enchaînement que Simulateur._executer_boucle (un cycle par tour)
+                gestionnaire.cycle_actuel = cycle
+                optimisations = gestionnaire.evaluer_charge(etatmonde)
+                etatmonde, succes = gestionnaire.executer_cycle(
+                    etatmonde, 0, optimisations
+                )
+                if not succes:
+                    logger.critical("Échec critique de MaitreTemps, arrêt du banc")
+                    break
+                duree_calcul = time.perf_counter() - temps_debut
+
+                for nom_agent in self.config.ordre_analyseurs:
+                    if nom_agent not in gestionnaire.agents_charges:
+                        continue
+                    kwargs = {}
+                    if nom_agent == "analystecosmique":
+                        kwargs["duree_cycle"] = duree_calcul
+                    resultat, succes = gestionnaire.executer_agent(
+                        nom_agent, etatmonde, **kwargs
+                    )
+                    if succes and isinstance(resultat, EtatMonde):
+                        etatmonde = resultat
+
+                duree_cycle = time.perf_counter() - temps_debut
+                cycles_effectues += 1
+
+                # Les métriques du gestionnaire donnent la durée de chaque appel
+                for nom in agents:
+                    metrique = gestionnaire.metriques[nom]
+                    executions, reussites = avant[nom]
+                    if metrique.executions_reussies > reussites:
+                        temps_par_agent[nom].append(metrique.derniere_execution * 1000)
+                    elif metrique.executions_totales > executions:
+                        echecs_par_agent[nom] += 1
+
+                journal_cycles.append(
+                    {
+                        "cycle": cycle,
+                        "duree_ms": duree_cycle * 1000,
+                        "entites": sum(compter_entites(etatmonde).values()),
+                    }
+                )
+        finally:
+            self.fermer()
+
+        durees = [entree["duree_ms"] for entree in journal_cycles]
+        return {
+            "cycles": cycles_effectues,
+            "entites_initiales": entites_initiales,
+            "entites_finales": compter_entites(etatmonde),
+            "temps_univers": etatmonde.temps,
+            "cycles_par_seconde": (
+                1000.0 * len(durees) / sum(durees) if sum(durees) > 0 else 0.0
+            ),
+            "duree_cycle": _statistiques_temps(durees),
+            "agents": {
+                nom: {
+                    "executions": len(temps_par_agent[nom]),
+                    "echecs": echecs_par_agent[nom],
+                    "etat": gestionnaire.metriques[nom].etat.value,
+                    **_statistiques_temps(temps_par_agent[nom]),
+                    "par_cycle_ms": temps_par_agent[nom],
+                }
+                for nom in agents
+            },
+            "journal_cycles": journal_cycles,
+            "rss_max_mo": mesurer_rss_max_mo(),
+        }
+
+    def fermer(self) -> None:
+        """Libère les pools de processus et de threads des agents."""
+        self.gestionnaire_agents.fermer()
+
+
+def executer_banc(
+    cycles: int,
+    graine: int = 42,
+    preset: str = "bigbang_classique",
+    entites: Optional[int] = None,
+    parallele: bool = False,
+    travailleurs: int = 4,
+) -> Dict[str, Any]:
+    """Construit l'univers, exécute le banc et assemble le rapport JSON."""
+    temps_debut = time.perf_counter()
+    etatmonde = construire_univers(graine, preset, entites)
+    duree_generation = time.perf_counter() - temps_debut
+
+    config = ConfigurationSimulateur(
+        execution_parallele=parallele, travailleurs_paralleles=travailleurs
+    )
+    banc = BancEssai(config)
+    mesures = banc.executer(etatmonde, cycles)
+
+    return {
+        "version_format": VERSION_FORMAT,
+        "mode": "simple",
+        "parametres": {
+            "cycles": cycles,
+            "graine": graine,
+            "preset": preset if entites is None else None,
+            "entites": entites,
+            "ordre_modificateurs": banc.config.ordre_modificateurs,
+            "ordre_analyseurs": banc.config.ordre_analyseurs,
+            "parallele": parallele,
+            "travailleurs": travailleurs if parallele else 1,
+        },
+        "environnement": decrire_environnement(),
+        "generation_ms": duree_generation * 1000,
+        **mesures,
+    }
+
+
+def executer_balayage(
+    tailles: List[int],
+    cycles: int,
+    graine: int = 42,
+    parallele: bool = False,
+    travailleurs: int = 4,
+) -> Dict[str, Any]:
+    """
+    Exécute le banc pour chaque taille d'univers dans un processus distinct,
+    afin que le pic RSS mesuré soit propre à chaque taille.
+    """
+    points = []
+    for taille in tailles:
+        logger.warning(f"Balayage : {taille} entités, {cycles} cycles")
+        with tempfile.TemporaryDirectory() as repertoire:
+            fichier = Path(repertoire) / "point.json"
+            commande = [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--entites",
+                str(taille),
+                "--cycles",
+                str(cycles),
+                "--graine",
+                str(graine),
+                "--sortie",
+                str(fichier),
+                "--travailleurs",
+                str(travailleurs),
+            ]
+            if parallele:
+                commande.append("--parallele")
+            processus = subprocess.run(
+                commande,
+                cwd=Path(__file__).resolve().parent,
+                stdout=subprocess.DEVNULL,
+            )
+
+            if processus.returncode != 0 or not fichier.exists():
+                logger.error(f"Point {taille} en échec (code {processus.returncode})")
+                points.append({"entites": taille, "erreur": processus.returncode})
+                continue
+
+            with open(fichier, "r", encoding="utf-8") as f:
+                resultat = json.load(f)
+
+        # Le journal détaillé n'est conservé que dans les exécutions simples
+        resultat.pop("journal_cycles", None)
+        for agent in resultat["agents"].values():
+            agent.pop("par_cycle_ms", None)
+        points.append(resultat)
+
+    return {
+        "version_format": VERSION_FORMAT,
+        "mode": "balayage",
+        "parametres": {
+            "tailles": tailles,
+            "cycles": cycles,
+            "graine": graine,
+            "parallele": parallele,
+        },
+        "environnement": decrire_environnement(),
+        "points": points,
+    }
+
+
+# ========================================================================
+# COMPARAISON ET AFFICHAGE
+# ========================================================================
+
+
+def comparer_resultats(
+    reference: Dict[str, Any], courant: Dict[str, Any]
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compare les temps moyens par agent de deux exécutions simples.
+
+    Returns:
+        Dict: Par agent, temps de référence, temps courant et rapport
+    """
+    comparaison = {}
+    for nom, mesures in courant["agents"].items():
+        mesures_ref = reference.get("agents", {}).get(nom)
+        if not mesures_ref or not mesures_ref.get("moyenne_ms"):
+            continue
+        comparaison[nom] = {
+            "reference_ms": mesures_ref["moyenne_ms"],
+            "courant_ms": mesures["moyenne_ms"],
+            "rapport": mesures["moyenne_ms"] / mesures_ref["moyenne_ms"],
+        }
+    return comparaison
+
+
+def afficher_resultats(resultat: Dict[str, Any]) -> None:
+    """Affiche un résumé lisible d'une exécution."""
+    if resultat["mode"] == "balayage":
+        print(f"{'Entités':>10} {'ms/cycle':>12} {'cycles/s':>10} {'RSS max (Mo)':>14}")
+        for point in resultat["points"]:
+            if "erreur" in point:
+                print(f"{point['entites']:>10} {'ÉCHEC':>12}")
+                continue
+            print(
+                f"{point['parametres']['entites']:>10} "
+                f"{point['duree_cycle']['moyenne_ms']:>12.2f} "
+                f"{point['cycles_par_seconde']:>10.2f} "
+                f"{point['rss_max_mo'] or 0:>14.1f}"
+            )
+        return
+
+    print(
+        f"Révision {resultat['environnement']['revision']} - "
+        f"{resultat['cycles']} cycles, "
+        f"{sum(resultat['entites_initiales'].values())} → "
+        f"{sum(resultat['entites_finales'].values())} entités"
+    )
+    print(f"{'Agent':<20} {'moy. ms':>10} {'p95 ms':>10} {'exéc.':>7} {'échecs':>7}")
+    for nom, mesures in resultat["agents"].items():
+        print(
+            f"{nom:<20} {mesures['moyenne_ms']:>10.3f} "
+            f"{mesures.get('p95_ms', 0.0):>10.3f} "
+            f"{mesures['executions']:>7} {mesures['echecs']:>7}"
+        )
+    print(
+        f"Cycle : {resultat['duree_cycle']['moyenne_ms']:.2f} ms en moyenne "
+        f"({resultat['cycles_par_seconde']:.2f} cycles/s), "
+        f"RSS max {resultat['rss_max_mo'] or 0:.1f} Mo"
+    )
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(
+        description="Banc d'essai sans interface du Projet Monde"
+    )
+    parser.add_argument(
+        "--preset",
+        default="bigbang_classique",
+        choices=sorted(PRESETS),
+        help="Univers initial (templates de la forge ou 'dense')",
+    )
+    parser.add_argument(
+        "--entites", type=int, help="Nombre exact de particules (remplace --preset)"
+    )
+    parser.add_argument("--cycles", type=int, default=20, help="Cycles à exécuter")
+    parser.add_argument("--graine", type=int, default=42, help="Graine aléatoire")
+    parser.add_argument("--sortie", help="Fichier JSON des résultats")
+    parser.add_argument("--comparer", help="Résultats JSON de référence")
+    parser.add_argument(
+        "--balayage",
+        nargs="?",
+        const=",".join(str(taille) for taille in TAILLES_BALAYAGE_DEFAUT),
+        help="Tailles séparées par des virgules (défaut : 1k → 1M)",
+    )
+    parser.add_argument(
+        "--parallele",
+        action="store_true",
+        help="Exécute en parallèle les modificateurs indépendants",
+    )
+    parser.add_argument(
+        "--travailleurs", type=int, default=4, help="Threads de l'ordonnanceur"
+    )
+    parser.add_argument("--verbeux", action="store_true", help="Journaux détaillés")
+    args = parser.parse_args(arguments)
+
+    # Les avertissements par entité noieraient les mesures
+    logging.basicConfig(
+        level=logging.INFO if args.verbeux else logging.ERROR,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if args.balayage:
+        tailles = [int(taille) for taille in args.balayage.split(",") if taille]
+        resultat = executer_balayage(
+            tailles, args.cycles, args.graine, args.parallele, args.travailleurs
+        )
+    else:
+        resultat = executer_banc(
+            args.cycles,
+            args.graine,
+            args.preset,
+            args.entites,
+            args.parallele,
+            args.travailleurs,
+        )
+
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            json.dump(resultat, f, indent=2, ensure_ascii=False)
+
+    afficher_resultats(resultat)
+
+    if args.comparer and resultat["mode"] == "simple":
+        with open(args.comparer, "r", encoding="utf-8") as f:
+            reference = json.load(f)
+        print(
+            f"\nComparaison avec la révision {reference['environnement']['revision']}:"
+        )
+        if reference["parametres"] != resultat["parametres"]:
+            print("⚠ Paramètres différents : comparaison indicative seulement")
+        for nom, ecart in comparer_resultats(reference, resultat).items():
+            print(
+                f"{nom:<20} {ecart['reference_ms']:>10.3f} → "
+                f"{ecart['courant_ms']:>10.3f} ms  (x{ecart['rapport']:.2f})"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,15 +9,37 @@ Version améliorée avec validation robuste, types précis et méthodes utilitai
 """
 
 import logging
+import random
+import threading
 import uuid
 from collections import defaultdict
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, ClassVar, Optional, Union, Tuple
+from typing import (
+    List,
+    Dict,
+    Any,
+    ClassVar,
+    Iterable,
+    Iterator,
+    Optional,
+    Union,
+    Tuple,
+)
 from enum import Enum
 
 import numpy as np
 from numpy.typing import NDArray
 
+# Import conditionnel : l'index spatial retombe sur NumPy sans scipy
+try:
+    from scipy.spatial import cKDTree
+
+    SCIPY_DISPONIBLE = True
+except ImportError:
+    cKDTree = None
+    SCIPY_DISPONIBLE = False
+
 # Utilisation du logger configuré dans lancement.py
 logger = logging.getLogger(__name__)
 
@@ -154,6 +176,53 @@ class ValidateurPhysique:
             return np.zeros(3, dtype=np.float64)
 
 
+# Générateur des identifiants : uuid4 par défaut, rejouable pour les bancs d'essai
+_graine_identifiants: Optional[int] = None
+_generateur_identifiants: Optional[random.Random] = None
+_flux_identifiants_local = threading.local()
+
+# Compaction et index spatial sont construits à la demande : deux agents
+# lisant la même catégorie en parallèle ne doivent pas les construire ensemble
+_verrou_colonnes = threading.RLock()
+
+
+def fixer_graine_identifiants(graine: Optional[int]) -> None:
+    """Rend les identifiants des entités reproductibles (None : retour à uuid4)."""
+    global _graine_identifiants, _generateur_identifiants
+    _graine_identifiants = graine
+    _generateur_identifiants = None if graine is None else random.Random(graine)
+
+
+@contextmanager
+def flux_identifiants(cle: str) -> Iterator[None]:
+    """
+    Tire les identifiants créés dans le bloc (et le thread courant) d'un flux
+    propre à `cle`, pour qu'ils ne dépendent pas de l'entrelacement des agents.
+    Sans graine fixée, les identifiants restent des uuid4.
+    """
+    if _graine_identifiants is None:
+        yield
+        return
+
+    precedent = getattr(_flux_identifiants_local, "generateur", None)
+    _flux_identifiants_local.generateur = random.Random(f"{_graine_identifiants}:{cle}")
+    try:
+        yield
+    finally:
+        _flux_identifiants_local.generateur = precedent
+
+
+def _nouvel_identifiant() -> uuid.UUID:
+    """Fournit l'identifiant d'une nouvelle entité."""
+    generateur = (
+        getattr(_flux_identifiants_local, "generateur", None)
+        or _generateur_identifiants
+    )
+    if generateur is None:
+        return uuid.uuid4()
+    return uuid.UUID(int=generateur.getrandbits(128), version=4)
+
+
 # ========================================================================
 # CLASSE DE BASE POUR TOUTES LES ENTITÉS
 # ========================================================================
@@ -169,7 +238,7 @@ class EntiteCosmique:
 
     masse: float
     position: Union[list, tuple, NDArray]
-    id: uuid.UUID = field(default_factory=uuid.uuid4, init=False, repr=False)
+    id: uuid.UUID = field(default_factory=_nouvel_identifiant, init=False, repr=False)
     categorie: ClassVar[str] = "inconnu"
 
     # Métadonnées de création et debug
@@ -190,6 +259,24 @@ class EntiteCosmique:
             f"Entité {self.__class__.__name__} créée avec masse={self.masse:.3f}"
         )
 
+    def __setattr__(self, nom: str, valeur: Any) -> None:
+        """Redirige position/vecteur/masse vers les colonnes de l'entité rangée."""
+        colonnes = self.__dict__.get("_colonnes")
+        if colonnes is not None and nom in ColonnesCategorie.ATTRIBUTS_COLONNES:
+            colonnes.ecrire(self, nom, valeur)
+        else:
+            object.__setattr__(self, nom, valeur)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Sérialise l'entité avec des tableaux autonomes, sans ses colonnes."""
+        etat = dict(self.__dict__)
+        if etat.pop("_colonnes", None) is not None:
+            etat.pop("_ligne", None)
+            etat["position"] = np.array(etat["position"])
+            if "vecteur" in etat:
+                etat["vecteur"] = np.array(etat["vecteur"])
+        return etat
+
     def distance_vers(self, autre: "EntiteCosmique") -> float:
         """Calcule la distance euclidienne vers une autre entité."""
         return float(np.linalg.norm(self.position - autre.position))
@@ -558,6 +645,460 @@ class TrouNoir(EntiteCosmique):
         return self.masse + self.masse_accretee
 
 
+# ========================================================================
+# STOCKAGE COLONNAIRE (STRUCTURE OF ARRAYS)
+# ========================================================================
+
+
+class ColonnesCategorie:
+    """
+    Stockage colonnaire (SoA) d'une catégorie d'entités.
+
+    Positions, vecteurs et masses sont rangés dans des tableaux contigus ; les
+    attributs `position` et `vecteur` des entités attachées sont des vues sur
+    leur ligne. Les lignes libérées rejoignent une liste libre, résorbée par
+    `compacter()` avant les calculs vectorisés. `version` n'augmente qu'aux
+    changements de structure (ajout de ligne, compaction) ; une écriture de
+    position marque seulement les positions comme modifiées. L'un et l'autre
+    invalident l'index spatial.
+    """
+
+    ATTRIBUTS_COLONNES: ClassVar[Tuple[str, ...]] = ("position", "vecteur", "masse")
+    CAPACITE_INITIALE: ClassVar[int] = 64
+
+    def __init__(self, categorie: str):
+        """Initialise des colonnes vides pour une catégorie."""
+        self.categorie = categorie
+        self.capacite = 0
+        self.n_lignes = 0  # Lignes utilisées (actives + libres)
+        self.n_actives = 0
+
+        self.positions = np.zeros((0, 3), dtype=np.float64)
+        self.vecteurs = np.zeros((0, 3), dtype=np.float64)
+        self.masses = np.zeros(0, dtype=np.float64)
+        self.mobiles = np.zeros(0, dtype=bool)
+        self.actives = np.zeros(0, dtype=bool)
+        self.identifiants = np.zeros(0, dtype="S16")  # uuid.bytes de chaque ligne
+
+        self.entites: List[Optional["EntiteCosmique"]] = []
+        self.lignes_par_id: Dict[uuid.UUID, int] = {}
+        self.lignes_libres: List[int] = []
+
+        self.version = 0  # Changements de structure (lignes allouées ou déplacées)
+        self.positions_modifiees = False
+        self.index_spatial: Optional["IndexSpatial"] = None
+
+    def __len__(self) -> int:
+        return self.n_actives
+
+    def attacher(self, entite: "EntiteCosmique") -> None:
+        """Range une entité dans une ligne et remplace ses attributs par des vues."""
+        etat = entite.__dict__
+        colonnes_actuelles = etat.get("_colonnes")
+        if colonnes_actuelles is self:
+            return
+        if colonnes_actuelles is not None:
+            colonnes_actuelles.detacher(entite)
+
+        ligne = self._allouer_ligne()
+        mobile = "vecteur" in etat
+
+        self.positions[ligne] = etat["position"]
+        self.vecteurs[ligne] = etat["vecteur"] if mobile else 0.0
+        self.masses[ligne] = etat["masse"]
+        self.mobiles[ligne] = mobile
+        self.actives[ligne] = True
+        self.identifiants[ligne] = entite.id.bytes
+        self.entites[ligne] = entite
+        self.lignes_par_id[entite.id] = ligne
+        self.n_actives += 1
+        self.version += 1
+
+        etat["_colonnes"] = self
+        etat["_ligne"] = ligne
+        self._lier_vues(entite, ligne)
+
+    def detacher(self, entite: "EntiteCosmique") -> None:
+        """Libère la ligne d'une entité, qui retrouve des tableaux autonomes."""
+        etat = entite.__dict__
+        if etat.get("_colonnes") is not self:
+            return
+
+        ligne = etat.pop("_ligne")
+        del etat["_colonnes"]
+        etat["position"] = self.positions[ligne].copy()
+        if self.mobiles[ligne]:
+            etat["vecteur"] = self.vecteurs[ligne].copy()
+
+        self.actives[ligne] = False
+        self.entites[ligne] = None
+        self.lignes_par_id.pop(entite.id, None)
+        # La ligne libre est résorbée par compacter(), qui change la version
+        self.lignes_libres.append(ligne)
+        self.n_actives -= 1
+
+    def ecrire(self, entite: "EntiteCosmique", nom: str, valeur: Any) -> None:
+        """Écrit un attribut colonnaire d'une entité attachée dans sa ligne."""
+        ligne = entite.__dict__["_ligne"]
+        if nom == "masse":
+            self.masses[ligne] = valeur
+            entite.__dict__["masse"] = valeur
+        elif nom == "position":
+            self.positions[ligne] = valeur
+            self.positions_modifiees = True
+        else:
+            self.vecteurs[ligne] = valeur
+            if not self.mobiles[ligne]:
+                self.mobiles[ligne] = True
+                entite.__dict__["vecteur"] = self.vecteurs[ligne]
+
+    def compacter(self) -> int:
+        """Comble les lignes libres avec les dernières lignes actives (O(trous))."""
+        if not self.lignes_libres:
+            return 0
+
+        n = self.n_actives
+        trous = np.flatnonzero(~self.actives[:n])
+        sources = np.flatnonzero(self.actives[n : self.n_lignes]) + n
+
+        for tableau in (
+            self.positions,
+            self.vecteurs,
+            self.masses,
+            self.mobiles,
+            self.identifiants,
+        ):
+            tableau[trous] = tableau[sources]
+        self.actives[:n] = True
+        self.actives[n : self.n_lignes] = False
+
+        for destination, source in zip(trous.tolist(), sources.tolist()):
+            entite = self.entites[source]
+            self.entites[destination] = entite
+            entite.__dict__["_ligne"] = destination
+            self.lignes_par_id[entite.id] = destination
+            self._lier_vues(entite, destination)
+
+        # La liste ligne → entité garde la longueur des colonnes (capacité)
+        del self.entites[n:]
+        self.entites.extend([None] * (self.capacite - n))
+        deplacees = len(trous)
+        self.n_lignes = n
+        self.lignes_libres.clear()
+        self.version += 1
+        return deplacees
+
+    def signaler_deplacements(self) -> None:
+        """À appeler après une écriture directe dans la colonne `positions`."""
+        self.positions_modifiees = True
+
+    def _allouer_ligne(self) -> int:
+        """Réutilise une ligne libre ou étend les colonnes."""
+        if self.lignes_libres:
+            return self.lignes_libres.pop()
+
+        if self.n_lignes == self.capacite:
+            self._agrandir()
+        ligne = self.n_lignes
+        self.n_lignes += 1
+        return ligne
+
+    def _agrandir(self) -> None:
+        """Double la capacité et relie les vues des entités aux nouveaux tableaux."""
+        capacite = max(self.CAPACITE_INITIALE, self.capacite * 2)
+        n = self.n_lignes
+
+        def _etendre(ancien: NDArray, forme: Tuple[int, ...]) -> NDArray:
+            nouveau = np.zeros(forme, dtype=ancien.dtype)
+            nouveau[:n] = ancien[:n]
+            return nouveau
+
+        self.positions = _etendre(self.positions, (capacite, 3))
+        self.vecteurs = _etendre(self.vecteurs, (capacite, 3))
+        self.masses = _etendre(self.masses, (capacite,))
+        self.mobiles = _etendre(self.mobiles, (capacite,))
+        self.actives = _etendre(self.actives, (capacite,))
+        self.identifiants = _etendre(self.identifiants, (capacite,))
+        self.entites.extend([None] * (capacite - self.capacite))
+        self.capacite = capacite
+
+        for ligne in np.flatnonzero(self.actives[:n]).tolist():
+            self._lier_vues(self.entites[ligne], ligne)
+
+    def _lier_vues(self, entite: "EntiteCosmique", ligne: int) -> None:
+        """Fait pointer position/vecteur de l'entité sur sa ligne."""
+        etat = entite.__dict__
+        etat["position"] = self.positions[ligne]
+        if self.mobiles[ligne]:
+            etat["vecteur"] = self.vecteurs[ligne]
+
+
+class ListeEntites(list):
+    """
+    Liste d'entités qui maintient les colonnes de sa catégorie à jour.
+
+    `retirer_par_echange` retire une entité en O(1) en la remplaçant par la
+    dernière ; l'ordre de la liste n'est alors pas conservé.
+    """
+
+    def __init__(self, colonnes: ColonnesCategorie, entites: Iterable = ()):
+        super().__init__()
+        self.colonnes: Optional[ColonnesCategorie] = colonnes
+        # id(entité) -> indice dans la liste, construit à la demande
+        self._indices: Optional[Dict[int, int]] = None
+        self.extend(entites)
+
+    def __reduce__(self):
+        # Sauvegardée comme une liste ordinaire : EtatMonde recrée les colonnes
+        return (list, (list(self),))
+
+    def _attacher(self, entites: Iterable) -> None:
+        if self.colonnes is not None:
+            for entite in entites:
+                self.colonnes.attacher(entite)
+
+    def _detacher(self, entites: Iterable) -> None:
+        if self.colonnes is not None:
+            for entite in entites:
+                self.colonnes.detacher(entite)
+
+    def _indexer(self, entites: List["EntiteCosmique"]) -> None:
+        if self._indices is not None:
+            debut = len(self)
+            for decalage, entite in enumerate(entites):
+                self._indices[id(entite)] = debut + decalage
+
+    def retirer_par_echange(self, entite: "EntiteCosmique") -> bool:
+        """Retire une entité en O(1) (échange avec la dernière) ; False si absente."""
+        rangee_dans = entite.__dict__.get("_colonnes")
+        if self.colonnes is not None and rangee_dans is not self.colonnes:
+            return False
+        if self._indices is None:
+            self._indices = {id(e): i for i, e in enumerate(self)}
+
+        index = self._indices.pop(id(entite), None)
+        if index is None:
+            return False
+        derniere = super().pop()
+        if derniere is not entite:
+            super().__setitem__(index, derniere)
+            self._indices[id(derniere)] = index
+        self._detacher((entite,))
+        return True
+
+    def append(self, entite: "EntiteCosmique") -> None:
+        self._attacher((entite,))
+        self._indexer([entite])
+        super().append(entite)
+
+    def extend(self, entites: Iterable) -> None:
+        entites = list(entites)
+        self._attacher(entites)
+        self._indexer(entites)
+        super().extend(entites)
+
+    def __iadd__(self, entites: Iterable) -> "ListeEntites":
+        self.extend(entites)
+        return self
+
+    def insert(self, index: int, entite: "EntiteCosmique") -> None:
+        self._attacher((entite,))
+        self._indices = None
+        super().insert(index, entite)
+
+    def remove(self, entite: "EntiteCosmique") -> None:
+        super().remove(entite)
+        self._indices = None
+        self._detacher((entite,))
+
+    def pop(self, index: int = -1) -> "EntiteCosmique":
+        entite = super().pop(index)
+        self._indices = None
+        self._detacher((entite,))
+        return entite
+
+    def clear(self) -> None:
+        self._detacher(self)
+        self._indices = None
+        super().clear()
+
+    def sort(self, *args, **kwargs) -> None:
+        self._indices = None
+        super().sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        self._indices = None
+        super().reverse()
+
+    def __delitem__(self, cle: Union[int, slice]) -> None:
+        retirees = self[cle] if isinstance(cle, slice) else [self[cle]]
+        super().__delitem__(cle)
+        self._indices = None
+        self._detacher(retirees)
+
+    def __setitem__(self, cle: Union[int, slice], valeur: Any) -> None:
+        anciennes = self[cle] if isinstance(cle, slice) else [self[cle]]
+        nouvelles = list(valeur) if isinstance(cle, slice) else [valeur]
+        ids_nouvelles = {id(e) for e in nouvelles}
+        self._detacher(e for e in anciennes if id(e) not in ids_nouvelles)
+        self._attacher(nouvelles)
+        self._indices = None
+        super().__setitem__(cle, nouvelles if isinstance(cle, slice) else valeur)
+
+
+class DictEntites(dict):
+    """Dictionnaire catégorie -> ListeEntites, avec des colonnes par catégorie."""
+
+    def __init__(self, entites: Optional[Dict[str, Iterable]] = None):
+        super().__init__()
+        self.colonnes: Dict[str, ColonnesCategorie] = {}
+        for categorie, liste in (entites or {}).items():
+            self[categorie] = liste
+
+    def __reduce__(self):
+        # Sauvegardé comme un dict de listes ordinaires
+        return (dict, ({cat: list(liste) for cat, liste in self.items()},))
+
+    def __setitem__(self, categorie: str, entites: Iterable) -> None:
+        """Remplace une catégorie en détachant les entités qui disparaissent."""
+        colonnes = self.colonnes.get(categorie)
+        if colonnes is None:
+            colonnes = self.colonnes[categorie] = ColonnesCategorie(categorie)
+
+        entites = list(entites)
+        ancienne = self.get(categorie)
+        if ancienne is not None:
+            ids_conserves = {id(e) for e in entites}
+            for entite in ancienne:
+                if id(entite) not in ids_conserves:
+                    colonnes.detacher(entite)
+            # Une ancienne référence à la liste ne touche plus les colonnes
+            ancienne.colonnes = None
+
+        super().__setitem__(categorie, ListeEntites(colonnes, entites))
+
+    def __delitem__(self, categorie: str) -> None:
+        self[categorie] = []
+        super().__delitem__(categorie)
+        del self.colonnes[categorie]
+
+    def update(self, *args, **kwargs) -> None:
+        for categorie, entites in dict(*args, **kwargs).items():
+            self[categorie] = entites
+
+    def setdefault(self, categorie: str, defaut: Optional[Iterable] = None):
+        if categorie not in self:
+            self[categorie] = defaut or []
+        return self[categorie]
+
+    def pop(self, categorie: str, *defaut):
+        if categorie not in self:
+            if defaut:
+                return defaut[0]
+            raise KeyError(categorie)
+        entites = list(self[categorie])
+        del self[categorie]
+        return entites
+
+
+# ========================================================================
+# INDEX SPATIAL PARTAGÉ
+# ========================================================================
+
+
+class IndexSpatial:
+    """
+    Index spatial figé d'une catégorie, partagé par les agents pendant un tick.
+
+    Construit sur les lignes compactées des colonnes : l'indice i renvoyé par
+    les requêtes désigne `entites[i]` et `positions[i]`. S'appuie sur un cKDTree
+    quand scipy est disponible, sinon sur des distances NumPy par blocs.
+    """
+
+    TAILLE_BLOC: ClassVar[int] = 1_000_000  # Distances calculées par bloc (repli)
+
+    def __init__(self, colonnes: ColonnesCategorie, temps: int):
+        """Fige les positions et les entités des lignes actives des colonnes."""
+        n = colonnes.n_lignes
+        self.categorie = colonnes.categorie
+        self.version = colonnes.version
+        self.temps = temps
+        self.positions: NDArray[np.float64] = colonnes.positions[:n].copy()
+        self.entites: List["EntiteCosmique"] = colonnes.entites[:n]
+        self.arbre = cKDTree(self.positions) if SCIPY_DISPONIBLE and n else None
+
+    def __len__(self) -> int:
+        return len(self.entites)
+
+    def dans_rayon(self, centre: NDArray, rayon: float) -> NDArray[np.intp]:
+        """Indices (triés) des entités à une distance <= rayon du centre."""
+        if not self.entites:
+            return np.zeros(0, dtype=np.intp)
+        if self.arbre is not None:
+            indices = self.arbre.query_ball_point(centre, r=rayon, return_sorted=True)
+            return np.asarray(indices, dtype=np.intp)
+
+        centre = np.asarray(centre, dtype=np.float64).reshape(1, 3)
+        return np.flatnonzero(self._distances_carrees(centre)[0] <= rayon**2)
+
+    def plus_proches(
+        self, centres: NDArray, k: int = 1
+    ) -> Tuple[NDArray[np.float64], NDArray[np.intp]]:
+        """
+        Distances et indices des k plus proches voisins de chaque centre.
+
+        Même convention que `cKDTree.query` : les centres sont un tableau (m, 3)
+        et les résultats ont la forme (m, k), ou (m,) si k == 1. k est borné par
+        la taille de l'index, qui ne doit pas être vide.
+        """
+        centres = np.atleast_2d(np.asarray(centres, dtype=np.float64))
+        k = min(k, len(self))
+        if self.arbre is not None:
+            distances, indices = self.arbre.query(centres, k=k)
+            return distances, np.asarray(indices, dtype=np.intp)
+
+        distances = np.empty((len(centres), k))
+        indices = np.empty((len(centres), k), dtype=np.intp)
+        pas = max(1, self.TAILLE_BLOC // len(self))
+        for debut in range(0, len(centres), pas):
+            carres = self._distances_carrees(centres[debut : debut + pas])
+            proches = np.argpartition(carres, k - 1, axis=1)[:, :k]
+            carres_proches = np.take_along_axis(carres, proches, axis=1)
+            ordre = np.argsort(carres_proches, axis=1)
+            indices[debut : debut + pas] = np.take_along_axis(proches, ordre, axis=1)
+            distances[debut : debut + pas] = np.sqrt(
+                np.take_along_axis(carres_proches, ordre, axis=1)
+            )
+
+        if k == 1:
+            return distances[:, 0], indices[:, 0]
+        return distances, indices
+
+    def paires(self, rayon: float) -> NDArray[np.intp]:
+        """Paires (i, j), i < j, d'entités distantes d'au plus rayon, en (m, 2)."""
+        n = len(self)
+        if n < 2:
+            return np.zeros((0, 2), dtype=np.intp)
+        if self.arbre is not None:
+            paires = self.arbre.query_pairs(r=rayon, output_type="ndarray")
+            return paires.astype(np.intp, copy=False)
+
+        morceaux = []
+        pas = max(1, self.TAILLE_BLOC // n)
+        for debut in range(0, n, pas):
+            carres = self._distances_carrees(self.positions[debut : debut + pas])
+            i, j = np.nonzero(carres <= rayon**2)
+            i += debut
+            garder = i < j
+            morceaux.append(np.stack([i[garder], j[garder]], axis=1))
+        return np.concatenate(morceaux).astype(np.intp, copy=False)
+
+    def _distances_carrees(self, centres: NDArray[np.float64]) -> NDArray[np.float64]:
+        """Distances au carré (m, n) entre un bloc de centres et l'index."""
+        ecarts = centres[:, None, :] - self.positions[None, :, :]
+        return np.einsum("ijk,ijk->ij", ecarts, ecarts)
+
+
 # ========================================================================
 # GESTIONNAIRE PRINCIPAL DE L'UNIVERS
 # ========================================================================
@@ -584,8 +1125,8 @@ class EtatMonde:
             "matiere_noire": ConstantesPhysiques.MATIERE_NOIRE,
         }
 
-        # Dictionnaire d'entités avec initialisation explicite
-        self.entites: Dict[str, List[EntiteCosmique]] = {}
+        # Dictionnaire d'entités adossé au stockage colonnaire par catégorie
+        self.entites: Dict[str, List[EntiteCosmique]] = DictEntites()
 
         # Initialisation de toutes les catégories
         categories_entites = [
@@ -614,6 +1155,52 @@ class EtatMonde:
 
         logger.info("Nouvel univers robuste initialisé.")
 
+    def __setstate__(self, etat: Dict[str, Any]) -> None:
+        """Restaure l'univers et reconstruit ses colonnes (anciennes sauvegardes)."""
+        self.__dict__.update(etat)
+        self.entites = DictEntites(self.entites)
+
+    def obtenir_colonnes(
+        self, categorie: str, compacter: bool = True
+    ) -> Optional[ColonnesCategorie]:
+        """
+        Retourne les colonnes d'une catégorie pour un calcul vectorisé.
+
+        Après compaction, les lignes [0, n_lignes) sont toutes actives et
+        `colonnes.entites[i]` est l'entité de la ligne i. La colonne `masses`
+        est en lecture seule : les masses s'écrivent via l'attribut `masse`.
+        """
+        colonnes = getattr(self.entites, "colonnes", {}).get(categorie)
+        if colonnes is not None and compacter:
+            with _verrou_colonnes:
+                colonnes.compacter()
+        return colonnes
+
+    def obtenir_index_spatial(self, categorie: str) -> Optional[IndexSpatial]:
+        """
+        Retourne l'index spatial partagé d'une catégorie.
+
+        L'index est reconstruit paresseusement : immédiatement après un ajout ou
+        un retrait, et au plus une fois par tick lorsque des positions ont été
+        écrites (l'index reste figé jusqu'à la fin du tick). Une catégorie
+        immobile garde son index d'un tick à l'autre.
+        """
+        colonnes = self.obtenir_colonnes(categorie)
+        if colonnes is None:
+            return None
+
+        with _verrou_colonnes:
+            index = colonnes.index_spatial
+            if (
+                index is None
+                or index.version != colonnes.version
+                or (index.temps != self.temps and colonnes.positions_modifiees)
+            ):
+                colonnes.positions_modifiees = False
+                index = colonnes.index_spatial = IndexSpatial(colonnes, self.temps)
+            index.temps = self.temps
+        return index
+
     def ajouter_entite(self, entite: EntiteCosmique) -> bool:
         """
         Ajoute une entité à l'univers avec validation complète.
@@ -661,9 +1248,18 @@ class EtatMonde:
         """
         categorie = entite.categorie
         entite_id = str(entite.id)
-
-        if categorie in self.entites and entite in self.entites[categorie]:
-            self.entites[categorie].remove(entite)
+        entites = self.entites.get(categorie)
+
+        if isinstance(entites, ListeEntites):
+            # Retrait O(1) par échange : l'ordre de la catégorie n'est pas conservé
+            supprimee = entites.retirer_par_echange(entite)
+        elif entites is not None and entite in entites:
+            entites.remove(entite)
+            supprimee = True
+        else:
+            supprimee = False
+
+        if supprimee:
             self._index_entites.pop(entite_id, None)
             logger.debug(f"Entité {type(entite).__name__} supprimée de '{categorie}'")
             return True
@@ -687,10 +1283,19 @@ class EtatMonde:
         Returns:
             List: Liste des entités du type demandé
         """
+        # Chaque classe concrète déclare sa catégorie : on ne parcourt que celles
+        # du type et de ses sous-classes, sauf catégorie inconnue
+        classes = [type_entite]
+        for classe in classes:
+            classes.extend(classe.__subclasses__())
+        categories = {getattr(classe, "categorie", None) for classe in classes}
+        if not categories.issubset(self.entites.keys()):
+            categories = self.entites.keys()
+
         entites_trouvees = []
-        for categorie_entites in self.entites.values():
+        for categorie in categories:
             entites_trouvees.extend(
-                [e for e in categorie_entites if isinstance(e, type_entite)]
+                [e for e in self.entites[categorie] if isinstance(e, type_entite)]
             )
         return entites_trouvees
 
@@ -715,7 +1320,12 @@ class EtatMonde:
         categories = categories_filtrees or self.entites.keys()
 
         for categorie in categories:
-            if categorie in self.entites:
+            index = self.obtenir_index_spatial(categorie)
+            if index is not None:
+                entites_proches.extend(
+                    index.entites[i] for i in index.dans_rayon(position_centre, rayon)
+                )
+            elif categorie in self.entites:
                 for entite in self.entites[categorie]:
                     distance = np.linalg.norm(entite.position - position_centre)
                     if distance <= rayon:
@@ -723,6 +1333,41 @@ class EtatMonde:
 
         return entites_proches
 
+    def obtenir_k_plus_proches(
+        self,
+        position_centre: NDArray,
+        k: int,
+        categories_filtrees: Optional[List[str]] = None,
+    ) -> List[EntiteCosmique]:
+        """
+        Trouve les k entités les plus proches d'une position.
+
+        Args:
+            position_centre: Position du centre de recherche
+            k: Nombre maximal d'entités retournées
+            categories_filtrees: Liste des catégories à inclure (toutes si None)
+
+        Returns:
+            List: Entités triées par distance croissante
+        """
+        candidats = []
+        categories = categories_filtrees or self.entites.keys()
+
+        for categorie in categories:
+            index = self.obtenir_index_spatial(categorie)
+            if not index or k <= 0:
+                continue
+            distances, indices = index.plus_proches(position_centre, k=k)
+            candidats.extend(
+                zip(
+                    np.ravel(distances).tolist(),
+                    (index.entites[i] for i in np.ravel(indices)),
+                )
+            )
+
+        candidats.sort(key=lambda candidat: candidat[0])
+        return [entite for _, entite in candidats[:k]]
+
     def nettoyer_index(self) -> int:
         """
         Nettoie l'index des entités en supprimant les références obsolètes.
@@ -758,11 +1403,12 @@ class EtatMonde:
         for categorie, entites_list in self.entites.items():
             stats[f"nombre_{categorie}"] = len(entites_list)
 
-        # Calculs physiques globaux
-        toutes_entites = [e for cat in self.entites.values() for e in cat]
-        if toutes_entites:
-            masses = np.array([e.masse for e in toutes_entites])
-            positions = np.array([e.position for e in toutes_entites])
+        # Calculs physiques globaux directement sur les colonnes
+        colonnes = [self.obtenir_colonnes(cat) for cat in self.entites]
+        colonnes = [c for c in colonnes if c is not None and c.n_lignes]
+        if colonnes:
+            masses = np.concatenate([c.masses[: c.n_lignes] for c in colonnes])
+            positions = np.concatenate([c.positions[: c.n_lignes] for c in colonnes])
 
             stats["masse_totale_univers"] = float(np.sum(masses))
             stats["centre_masse_univers"] = np.average(
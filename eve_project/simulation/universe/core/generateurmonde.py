@@ -16,6 +16,15 @@ from dataclasses import dataclass, field
 import numpy as np
 from numpy.typing import NDArray
 
+# Import conditionnel : la séparation des collisions retombe sur la double boucle
+try:
+    from scipy.spatial import cKDTree
+
+    SCIPY_DISPONIBLE = True
+except ImportError:
+    cKDTree = None
+    SCIPY_DISPONIBLE = False
+
 from etatmonde import EtatMonde, Particule, Atome, Etoile, Planete
 
 logger = logging.getLogger(__name__)
@@ -124,6 +133,30 @@ class ValidateurCosmologique:
 
         positions_corrigees = positions.copy()
 
+        # Recherche des paires proches par arbre : indispensable au-delà de
+        # quelques milliers d'entités (la double boucle est quadratique)
+        if SCIPY_DISPONIBLE and len(positions_corrigees) > 256:
+            paires = cKDTree(positions_corrigees).query_pairs(
+                distance_min, output_type="ndarray"
+            )
+            if len(paires) == 0:
+                return positions_corrigees
+
+            i, j = paires[:, 0], paires[:, 1]
+            direction = positions_corrigees[i] - positions_corrigees[j]
+            distance = np.linalg.norm(direction, axis=1)
+
+            confondues = distance == 0
+            if np.any(confondues):
+                direction[confondues] = np.random.randn(int(confondues.sum()), 3)
+
+            direction /= np.linalg.norm(direction, axis=1)[:, np.newaxis]
+            deplacement = direction * ((distance_min - distance) / 2)[:, np.newaxis]
+
+            np.add.at(positions_corrigees, i, deplacement)
+            np.subtract.at(positions_corrigees, j, deplacement)
+            return positions_corrigees
+
         # Vérification basique des collisions (algorithme simple)
         for i in range(len(positions_corrigees)):
             for j in range(i + 1, len(positions_corrigees)):
@@ -672,12 +705,16 @@ class ForgeCosmologique:
             "temps_generation": 0.0,
         }
 
-    def generer_univers(self, type_univers: TypeUnivers) -> EtatMonde:
+    def generer_univers(
+        self, type_univers: TypeUnivers, appliquer_template: bool = True
+    ) -> EtatMonde:
         """
         Génère un univers complet selon le type spécifié.
 
         Args:
             type_univers: Type d'univers à créer
+            appliquer_template: Remplace les paramètres de la forge par le
+                template du type (False : conserve les paramètres fournis)
 
         Returns:
             EtatMonde: Univers nouvellement créé
@@ -689,7 +726,8 @@ class ForgeCosmologique:
         logger.info(f"Forge cosmologique : génération '{type_univers.value}'")
 
         # Configuration des paramètres selon template
-        self.params = TemplatesUnivers.obtenir_template(type_univers)
+        if appliquer_template:
+            self.params = TemplatesUnivers.obtenir_template(type_univers)
 
         # Initialisation graine aléatoire si spécifiée
         if self.params.seed_aleatoire is not None:
@@ -0,0 +1,389 @@
+# Fichier : gestionnaire_agents.py
+# Version 9.0 ("Orchestrateur Robuste") - Chargement et exécution des agents sans Qt.
+
+"""
+Gestion des agents de la simulation, indépendante de l'interface.
+Regroupe la configuration du simulateur, les métriques par agent et
+l'enchaînement d'un cycle (MaitreTemps puis modificateurs), partagés par
+le Simulateur Qt et le banc d'essai sans affichage.
+"""
+
+import logging
+import time
+import importlib
+import inspect
+from typing import Dict, Any, List, Set, Tuple
+from dataclasses import dataclass, field
+from enum import Enum
+
+from etatmonde import EtatMonde, flux_identifiants
+from ordonnanceur import OrdonnanceurAgents
+
+logger = logging.getLogger(__name__)
+
+# ========================================================================
+# CONFIGURATION ET ÉNUMÉRATIONS
+# ========================================================================
+
+
+class EtatAgent(Enum):
+    """États possibles d'un agent."""
+
+    ACTIF = "actif"
+    DESACTIVE = "desactive"
+    EN_ERREUR = "en_erreur"
+    EN_RECOVERY = "en_recovery"
+
+
+@dataclass
+class ConfigurationSimulateur:
+    """Configuration centralisée du simulateur."""
+
+    # Gestion des erreurs
+    seuil_erreurs_max: int = 5
+    cycles_avant_recovery: int = 100
+    recovery_automatique: bool = True
+
+    # Performance
+    limite_entites_performance: int = 20000
+    frequence_nettoyage_cache: int = 1000
+    monitoring_performance: bool = True
+
+    # Modules d'agents
+    modules_agents: List[str] = field(
+        default_factory=lambda: [
+            "agents",
+            "agents_physiques",
+            "agents_complexes",
+            "agents_emergents",
+        ]
+    )
+
+    # Ordre d'exécution des agents
+    ordre_modificateurs: List[str] = field(
+        default_factory=lambda: [
+            "calculateurlois",  # Gravité et mouvement (base physique)
+            "alchimiste",  # Fusion particules → atomes
+            "astrophysicien",  # Formation d'étoiles
+            "chimiste",  # Évolution stellaire et supernovae
+            "planetologue",  # Formation de planètes
+            "biologiste",  # Émergence de la vie
+            "galacticien",  # Structures galactiques
+            "physicienexotique",  # Trous noirs et phénomènes extrêmes
+        ]
+    )
+
+    ordre_analyseurs: List[str] = field(
+        default_factory=lambda: ["evolutif", "analystecosmique"]
+    )
+
+    # Exécution parallèle des modificateurs indépendants (voir ordonnanceur.py)
+    execution_parallele: bool = False
+    travailleurs_paralleles: int = 4
+
+
+@dataclass
+class MetriqueAgent:
+    """Métriques de performance d'un agent."""
+
+    nom: str
+    etat: EtatAgent = EtatAgent.ACTIF
+    executions_totales: int = 0
+    executions_reussies: int = 0
+    erreurs_consecutives: int = 0
+    derniere_execution: float = 0.0
+    temps_execution_total: float = 0.0
+    derniere_erreur: str = ""
+    cycle_derniere_recovery: int = 0
+
+    def temps_execution_moyen(self) -> float:
+        """Calcule le temps d'exécution moyen."""
+        return (
+            self.temps_execution_total / self.executions_totales
+            if self.executions_totales > 0
+            else 0.0
+        )
+
+    def taux_reussite(self) -> float:
+        """Calcule le taux de réussite."""
+        return (
+            self.executions_reussies / self.executions_totales
+            if self.executions_totales > 0
+            else 0.0
+        )
+
+
+# ========================================================================
+# GESTIONNAIRE D'AGENTS ROBUSTE
+# ========================================================================
+
+
+class GestionnaireAgents:
+    """Gère le chargement, l'exécution et la récupération des agents."""
+
+    def __init__(self, config: ConfigurationSimulateur):
+        """
+        Initialise un gestionnaire sans agent chargé.
+
+        Args:
+            config: Configuration du simulateur (modules d'agents, exécution
+                parallèle, nombre de travailleurs de l'ordonnanceur)
+        """
+        self.config = config
+        self.agents_charges: Dict[str, Any] = {}
+        self.metriques: Dict[str, MetriqueAgent] = {}
+        self.agents_desactives: Set[str] = set()
+        self.cycle_actuel = 0
+        self.ordonnanceur = OrdonnanceurAgents(self, config.travailleurs_paralleles)
+
+    def decouvrir_et_charger_agents(self) -> bool:
+        """
+        Découvre et charge tous les agents des modules spécifiés.
+
+        Returns:
+            bool: True si au moins MaitreTemps est chargé
+        """
+        logger.info("Découverte et chargement des agents...")
+        agents_charges = {}
+
+        for nom_module in self.config.modules_agents:
+            try:
+                module = importlib.import_module(nom_module)
+
+                for nom, cls in inspect.getmembers(module, inspect.isclass):
+                    # Filtrer les classes du module actuel seulement
+                    if cls.__module__ == nom_module and not nom.startswith("_"):
+                        try:
+                            instance = cls()
+                            nom_lower = nom.lower()
+                            agents_charges[nom_lower] = instance
+
+                            # Initialiser les métriques
+                            self.metriques[nom_lower] = MetriqueAgent(nom=nom_lower)
+
+                            logger.info(
+                                f"-> Agent '{nom}' chargé depuis '{nom_module}.py'"
+                            )
+
+                        except Exception as e:
+                            logger.error(
+                                f"Impossible d'instancier l'agent '{nom}': {e}"
+                            )
+
+            except ImportError as e:
+                logger.warning(f"Module '{nom_module}.py' introuvable: {e}")
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement de '{nom_module}.py': {e}")
+
+        self.agents_charges = agents_charges
+
+        # Vérification critique de MaitreTemps
+        if "maitretemps" not in agents_charges:
+            logger.critical("ERREUR CRITIQUE : Agent 'MaitreTemps' introuvable")
+            logger.critical(f"Agents trouvés : {list(agents_charges.keys())}")
+            return False
+
+        logger.info(f"Chargement terminé : {len(agents_charges)} agents disponibles")
+        return True
+
+    def executer_agent(
+        self, nom_agent: str, etatmonde: EtatMonde, **kwargs
+    ) -> Tuple[EtatMonde, bool]:
+        """
+        Exécute un agent avec gestion d'erreurs et métriques.
+
+        Args:
+            nom_agent: Nom de l'agent à exécuter
+            etatmonde: État de l'univers
+            **kwargs: Arguments additionnels pour l'agent
+
+        Returns:
+            Tuple[EtatMonde, bool]: Nouvel état et succès de l'exécution
+        """
+        if nom_agent in self.agents_desactives:
+            return etatmonde, False
+
+        agent = self.agents_charges.get(nom_agent)
+        metrique = self.metriques.get(nom_agent)
+
+        if not agent or not metrique:
+            return etatmonde, False
+
+        # Vérification de récupération automatique
+        if (
+            metrique.etat == EtatAgent.EN_ERREUR
+            and self.config.recovery_automatique
+            and self.cycle_actuel - metrique.cycle_derniere_recovery
+            > self.config.cycles_avant_recovery
+        ):
+
+            logger.info(
+                f"Tentative de récupération automatique pour agent '{nom_agent}'"
+            )
+            metrique.etat = EtatAgent.EN_RECOVERY
+            metrique.erreurs_consecutives = 0
+
+        if metrique.etat == EtatAgent.DESACTIVE:
+            return etatmonde, False
+
+        # Exécution avec métriques
+        temps_debut = time.perf_counter()
+        metrique.executions_totales += 1
+
+        try:
+            # Obtenir la méthode correspondante
+            methode = getattr(agent, nom_agent)
+
+            # Flux d'identifiants propre à l'agent : mêmes UUID en série et
+            # en parallèle lorsque la graine est fixée
+            with flux_identifiants(f"{nom_agent}:{etatmonde.temps}"):
+                # Exécution selon le type d'agent
+                if nom_agent == "analystecosmique":
+                    duree_cycle = kwargs.get("duree_cycle", 0.0)
+                    # AnalysteCosmique ne modifie pas l'état : on retourne sa trame
+                    etatmonde_retour = methode(etatmonde, duree_cycle)
+                else:
+                    resultat = methode(etatmonde)
+                    etatmonde_retour = (
+                        resultat if isinstance(resultat, EtatMonde) else etatmonde
+                    )
+
+            # Succès de l'exécution
+            temps_execution = time.perf_counter() - temps_debut
+            metrique.executions_reussies += 1
+            metrique.erreurs_consecutives = 0
+            metrique.derniere_execution = temps_execution
+            metrique.temps_execution_total += temps_execution
+
+            if metrique.etat == EtatAgent.EN_RECOVERY:
+                logger.info(f"Agent '{nom_agent}' récupéré avec succès")
+                metrique.etat = EtatAgent.ACTIF
+
+            return etatmonde_retour, True
+
+        except Exception as e:
+            # Gestion d'erreur avec métriques
+            metrique.erreurs_consecutives += 1
+            metrique.derniere_erreur = str(e)
+
+            logger.error(
+                f"Erreur dans l'agent '{nom_agent}' (#{metrique.erreurs_consecutives}): {e}",
+                exc_info=True,
+            )
+
+            # Décision de désactivation
+            if metrique.erreurs_consecutives >= self.config.seuil_erreurs_max:
+                if self.config.recovery_automatique:
+                    metrique.etat = EtatAgent.EN_ERREUR
+                    metrique.cycle_derniere_recovery = self.cycle_actuel
+                    logger.warning(
+                        f"Agent '{nom_agent}' en erreur, récupération programmée dans "
+                        f"{self.config.cycles_avant_recovery} cycles"
+                    )
+                else:
+                    metrique.etat = EtatAgent.DESACTIVE
+                    self.agents_desactives.add(nom_agent)
+                    logger.warning(f"Agent '{nom_agent}' désactivé définitivement")
+
+            return etatmonde, False
+
+    def evaluer_charge(self, etatmonde: EtatMonde) -> Dict[str, Any]:
+        """Détermine les optimisations à appliquer selon la charge de l'univers."""
+        total_entites = sum(len(cat) for cat in etatmonde.entites.values())
+
+        optimisations = {
+            "skip_agents_lourds": False,
+            "frequence_reduite": 1,
+            "limite_calculs": False,
+        }
+
+        if total_entites > self.config.limite_entites_performance:
+            logger.info(f"Optimisation activée pour {total_entites} entités")
+            optimisations.update(
+                {
+                    "skip_agents_lourds": True,
+                    "frequence_reduite": 3,  # Exécuter 1 cycle sur 3 pour agents lourds
+                    "limite_calculs": True,
+                }
+            )
+
+        return optimisations
+
+    def executer_cycle(
+        self, etatmonde: EtatMonde, cycle_idx: int, optimisations: Dict[str, Any]
+    ) -> Tuple[EtatMonde, bool]:
+        """
+        Exécute un cycle de calcul : MaitreTemps puis les agents modificateurs.
+
+        Args:
+            etatmonde: État de l'univers
+            cycle_idx: Rang du cycle dans le tour courant
+            optimisations: Résultat de evaluer_charge pour ce tour
+
+        Returns:
+            Tuple[EtatMonde, bool]: Nouvel état et succès de MaitreTemps
+        """
+        # 1. Avancement temporel (toujours en premier)
+        nouvel_etat, succes = self.executer_agent("maitretemps", etatmonde)
+        if not succes:
+            return etatmonde, False
+        etatmonde = nouvel_etat
+
+        # 2. Agents modificateurs dans l'ordre d'émergence
+        modificateurs = []
+        for nom_agent in self.config.ordre_modificateurs:
+            if nom_agent not in self.agents_charges:
+                continue
+
+            # Optimisation : skip agents lourds selon charge
+            if optimisations["skip_agents_lourds"] and nom_agent in ["galacticien"]:
+                if cycle_idx % optimisations["frequence_reduite"] != 0:
+                    continue
+
+            modificateurs.append(nom_agent)
+
+        if self.config.execution_parallele:
+            return self.ordonnanceur.executer(etatmonde, modificateurs), True
+
+        for nom_agent in modificateurs:
+            nouvel_etat, succes = self.executer_agent(nom_agent, etatmonde)
+            if succes:
+                etatmonde = nouvel_etat
+
+        return etatmonde, True
+
+    def fermer(self) -> None:
+        """Libère les pools de processus des agents et le pool de l'ordonnanceur."""
+        for nom_agent, agent in self.agents_charges.items():
+            if hasattr(agent, "fermer_pool"):
+                try:
+                    agent.fermer_pool()
+                    logger.debug(f"Pool de {nom_agent} fermé")
+                except Exception as e:
+                    logger.warning(f"Erreur fermeture pool {nom_agent}: {e}")
+
+        self.ordonnanceur.fermer()
+
+    def obtenir_rapport_performance(self) -> Dict[str, Any]:
+        """Génère un rapport de performance des agents."""
+        rapport = {
+            "agents_actifs": len(
+                [m for m in self.metriques.values() if m.etat == EtatAgent.ACTIF]
+            ),
+            "agents_en_erreur": len(
+                [m for m in self.metriques.values() if m.etat == EtatAgent.EN_ERREUR]
+            ),
+            "agents_desactives": len(self.agents_desactives),
+            "metriques_detaillees": {},
+        }
+
+        for nom, metrique in self.metriques.items():
+            rapport["metriques_detaillees"][nom] = {
+                "etat": metrique.etat.value,
+                "executions": metrique.executions_totales,
+                "taux_reussite": metrique.taux_reussite(),
+                "temps_moyen_ms": metrique.temps_execution_moyen() * 1000,
+                "erreurs_consecutives": metrique.erreurs_consecutives,
+            }
+
+        return rapport
@@ -0,0 +1,1011 @@
+# Fichier : instantanes.py
+# Instantanés colonnaires compressés, incrémentaux et non bloquants de l'EtatMonde
+
+"""
+Sauvegarde de l'univers par instantanés colonnaires.
+
+Chaque catégorie d'entités est écrite en sections NumPy (identifiants,
+positions, vecteurs, masses, attributs homogènes) compressées individuellement
+(zstd, à défaut lz4, à défaut zlib) ; les attributs hétérogènes (dictionnaires,
+tableaux) forment une section sérialisée à part.
+
+La capture se fait entre deux cycles, dans le thread de simulation : les
+colonnes sont copiées en bloc, les valeurs immuables partagées et seuls les
+conteneurs mutables copiés. Le tri, la comparaison, la compression et
+l'écriture ont lieu dans un thread d'arrière-plan.
+
+Un instantané de base contient tout l'univers ; les instantanés incrémentaux
+suivants ne contiennent que les entités ajoutées ou modifiées depuis le
+précédent, et les identifiants retirés. Quand une nouvelle base est écrite,
+les chaînes plus anciennes sont consolidées en une seule base chacune, puis
+élaguées selon la politique de rétention.
+"""
+
+import copy
+import importlib
+import logging
+import os
+import pickle
+import queue
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+try:
+    import zstandard
+
+    ZSTD_DISPONIBLE = True
+except ImportError:
+    ZSTD_DISPONIBLE = False
+
+try:
+    import lz4.frame
+
+    LZ4_DISPONIBLE = True
+except ImportError:
+    LZ4_DISPONIBLE = False
+
+from etatmonde import DictEntites, EntiteCosmique, EtatMonde
+
+logger = logging.getLogger(__name__)
+
+# ========================================================================
+# FORMAT BINAIRE
+# ========================================================================
+
+MAGIC = b"EVIS"
+VERSION_FORMAT = 1
+TYPE_BASE = 0
+TYPE_INCREMENT = 1
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_LZ4 = 3
+
+# magic, version, type, codec, numéro, parent, base de la chaîne, temps, sections
+ENTETE = struct.Struct("<4sBBBxQQQqI")
+DTYPE_IDENTIFIANT = np.dtype("S16")
+
+MOTIF_FICHIER = "instantane_*.evis"
+RE_FICHIER = re.compile(r"instantane_(\d+)\.evis$")
+
+# Attributs rangés dans des colonnes dédiées ou propres au stockage colonnaire
+CHAMPS_COLONNES = frozenset({"id", "masse", "position", "vecteur"})
+CHAMPS_IGNORES = frozenset({"_colonnes", "_ligne"})
+TYPES_MUTABLES = (dict, list, set, np.ndarray)
+
+
+class ErreurInstantane(ValueError):
+    """Instantané illisible, incomplet ou incohérent."""
+
+
+class _Absent:
+    """Marque un attribut que l'entité ne possède pas."""
+
+    def __reduce__(self) -> str:
+        return "ABSENT"
+
+    def __repr__(self) -> str:
+        return "ABSENT"
+
+
+ABSENT = _Absent()
+
+
+def _codec_prefere() -> int:
+    if ZSTD_DISPONIBLE:
+        return CODEC_ZSTD
+    if LZ4_DISPONIBLE:
+        return CODEC_LZ4
+    return CODEC_ZLIB
+
+
+def _compresser(donnees: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(donnees)
+    if codec == CODEC_LZ4:
+        return lz4.frame.compress(donnees)
+    return zlib.compress(donnees, 6)
+
+
+def _decompresser(donnees: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if not ZSTD_DISPONIBLE:
+            raise ErreurInstantane("Instantané compressé en zstd : zstandard absent")
+        return zstandard.ZstdDecompressor().decompress(donnees)
+    if codec == CODEC_LZ4:
+        if not LZ4_DISPONIBLE:
+            raise ErreurInstantane("Instantané compressé en lz4 : lz4 absent")
+        return lz4.frame.decompress(donnees)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(donnees)
+    raise ErreurInstantane(f"Codec inconnu: {codec}")
+
+
+@dataclass
+class EnteteInstantane:
+    """En-tête d'un fichier d'instantané."""
+
+    type: int
+    codec: int
+    numero: int
+    numero_parent: int
+    numero_base: int
+    temps: int
+    nombre_sections: int
+
+    @property
+    def est_base(self) -> bool:
+        return self.type == TYPE_BASE
+
+
+def ecrire_instantane(
+    chemin: Path, entete: EnteteInstantane, sections: Dict[str, Any]
+) -> int:
+    """
+    Écrit un instantané de façon atomique et retourne sa taille en octets.
+
+    Une section est un tableau NumPy non objet (stocké brut) ou un objet
+    Python quelconque (sérialisé par pickle) ; des octets sont considérés
+    comme déjà sérialisés.
+    """
+    morceaux = [
+        ENTETE.pack(
+            MAGIC,
+            VERSION_FORMAT,
+            entete.type,
+            entete.codec,
+            entete.numero,
+            entete.numero_parent,
+            entete.numero_base,
+            entete.temps,
+            len(sections),
+        )
+    ]
+    for nom, valeur in sections.items():
+        if isinstance(valeur, np.ndarray) and valeur.dtype != object:
+            nature, dtype, forme = b"n", valeur.dtype.str, valeur.shape
+            brut = np.ascontiguousarray(valeur).tobytes()
+        else:
+            nature, dtype, forme = b"p", "", ()
+            brut = (
+                bytes(valeur)
+                if isinstance(valeur, (bytes, bytearray))
+                else pickle.dumps(valeur, protocol=pickle.HIGHEST_PROTOCOL)
+            )
+
+        compresse = _compresser(brut, entete.codec)
+        nom_octets = nom.encode("utf-8")
+        dtype_octets = dtype.encode("ascii")
+        morceaux.append(
+            struct.pack(
+                f"<H{len(nom_octets)}sc B{len(dtype_octets)}s B{len(forme)}Q Q",
+                len(nom_octets),
+                nom_octets,
+                nature,
+                len(dtype_octets),
+                dtype_octets,
+                len(forme),
+                *forme,
+                len(compresse),
+            )
+        )
+        morceaux.append(compresse)
+
+    temporaire = chemin.with_name(chemin.name + ".tmp")
+    with open(temporaire, "wb") as f:
+        for morceau in morceaux:
+            f.write(morceau)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+    return sum(len(m) for m in morceaux)
+
+
+def lire_entete(chemin: Path) -> EnteteInstantane:
+    """Lit uniquement l'en-tête d'un instantané."""
+    with open(chemin, "rb") as f:
+        donnees = f.read(ENTETE.size)
+    return _decoder_entete(donnees)
+
+
+def _decoder_entete(donnees: bytes) -> EnteteInstantane:
+    if len(donnees) < ENTETE.size:
+        raise ErreurInstantane("En-tête tronqué")
+    magic, version, type_, codec, numero, parent, base, temps, nombre = (
+        ENTETE.unpack_from(donnees)
+    )
+    if magic != MAGIC:
+        raise ErreurInstantane("Signature d'instantané invalide")
+    if version != VERSION_FORMAT:
+        raise ErreurInstantane(f"Version de format non supportée: {version}")
+    return EnteteInstantane(type_, codec, numero, parent, base, temps, nombre)
+
+
+def lire_instantane(chemin: Path) -> Tuple[EnteteInstantane, Dict[str, Any]]:
+    """Lit et décompresse toutes les sections d'un instantané."""
+    with open(chemin, "rb") as f:
+        donnees = f.read()
+
+    entete = _decoder_entete(donnees)
+    vue = memoryview(donnees)
+    decalage = ENTETE.size
+    sections: Dict[str, Any] = {}
+
+    try:
+        for _ in range(entete.nombre_sections):
+            (longueur,) = struct.unpack_from("<H", vue, decalage)
+            decalage += 2
+            nom = bytes(vue[decalage : decalage + longueur]).decode("utf-8")
+            decalage += longueur
+            nature = bytes(vue[decalage : decalage + 1])
+            (longueur,) = struct.unpack_from("<B", vue, decalage + 1)
+            decalage += 2
+            dtype = bytes(vue[decalage : decalage + longueur]).decode("ascii")
+            decalage += longueur
+            (dimensions,) = struct.unpack_from("<B", vue, decalage)
+            forme = struct.unpack_from(f"<{dimensions}Q", vue, decalage + 1)
+            decalage += 1 + 8 * dimensions
+            (taille,) = struct.unpack_from("<Q", vue, decalage)
+            decalage += 8
+
+            if decalage + taille > len(donnees):
+                raise ErreurInstantane(f"Section '{nom}' tronquée")
+            brut = _decompresser(vue[decalage : decalage + taille], entete.codec)
+            decalage += taille
+
+            if nature == b"n":
+                sections[nom] = np.frombuffer(brut, dtype=np.dtype(dtype)).reshape(
+                    forme
+                )
+            else:
+                sections[nom] = pickle.loads(brut)
+    except struct.error as e:
+        raise ErreurInstantane(f"Instantané tronqué: {e}") from e
+
+    return entete, sections
+
+
+# ========================================================================
+# TABLES COLONNAIRES
+# ========================================================================
+
+Colonne = Union[NDArray, List[Any]]
+
+
+def _extraire(colonne: Colonne, lignes: NDArray) -> Colonne:
+    if isinstance(colonne, np.ndarray):
+        return colonne[lignes]
+    return [colonne[i] for i in lignes.tolist()]
+
+
+def _en_liste(colonne: Colonne) -> List[Any]:
+    return colonne.tolist() if isinstance(colonne, np.ndarray) else list(colonne)
+
+
+def _concatener(a: Colonne, b: Colonne) -> Colonne:
+    if (
+        isinstance(a, np.ndarray)
+        and isinstance(b, np.ndarray)
+        and a.dtype.kind == b.dtype.kind
+        and a.shape[1:] == b.shape[1:]
+    ):
+        return np.concatenate([a, b])
+    return _en_liste(a) + _en_liste(b)
+
+
+def _affecter(colonne: Colonne, lignes: NDArray, valeurs: Colonne) -> Colonne:
+    if not len(lignes):
+        return colonne
+    if (
+        isinstance(colonne, np.ndarray)
+        and isinstance(valeurs, np.ndarray)
+        and colonne.dtype.kind == valeurs.dtype.kind
+        and colonne.shape[1:] == valeurs.shape[1:]
+    ):
+        colonne = colonne.astype(np.result_type(colonne, valeurs))
+        colonne[lignes] = valeurs
+        return colonne
+
+    colonne = _en_liste(colonne)
+    for ligne, valeur in zip(lignes.tolist(), _en_liste(valeurs)):
+        colonne[ligne] = valeur
+    return colonne
+
+
+def _egal(a: Any, b: Any) -> bool:
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (
+            isinstance(a, np.ndarray)
+            and isinstance(b, np.ndarray)
+            and np.array_equal(a, b)
+        )
+    try:
+        return type(a) is type(b) and bool(a == b)
+    except Exception:
+        return False
+
+
+def _differences(a: Colonne, b: Colonne) -> NDArray[np.bool_]:
+    """Masque des lignes dont la valeur diffère entre deux colonnes alignées."""
+    if (
+        isinstance(a, np.ndarray)
+        and isinstance(b, np.ndarray)
+        and a.dtype.kind == b.dtype.kind
+        and a.shape == b.shape
+    ):
+        differentes = a != b
+        if differentes.ndim > 1:
+            differentes = differentes.reshape(len(differentes), -1).any(axis=1)
+        return differentes
+    return np.fromiter(
+        (not _egal(x, y) for x, y in zip(_en_liste(a), _en_liste(b))),
+        dtype=bool,
+        count=len(a),
+    )
+
+
+def _normaliser(valeurs: List[Any]) -> Colonne:
+    """Convertit une liste homogène de scalaires en tableau NumPy."""
+    if not valeurs:
+        return valeurs
+    types = set(map(type, valeurs))
+    try:
+        if types == {bool}:
+            return np.array(valeurs, dtype=bool)
+        if types == {int}:
+            return np.array(valeurs, dtype=np.int64)
+        if types <= {float, np.float64}:
+            return np.array(valeurs, dtype=np.float64)
+        if types == {str}:
+            return np.array(valeurs, dtype=str)
+    except OverflowError:
+        pass
+    return valeurs
+
+
+@dataclass
+class TableCategorie:
+    """
+    Entités d'une catégorie en colonnes, triées par identifiant.
+
+    Les colonnes sont des tableaux NumPy ou des listes Python alignés sur
+    `identifiants` ; `ABSENT` marque un attribut que l'entité ne porte pas.
+    """
+
+    identifiants: NDArray = field(
+        default_factory=lambda: np.zeros(0, DTYPE_IDENTIFIANT)
+    )
+    colonnes: Dict[str, Colonne] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.identifiants)
+
+    def colonne(self, nom: str) -> Colonne:
+        """Colonne demandée, ou une colonne d'absents."""
+        if nom in self.colonnes:
+            return self.colonnes[nom]
+        return [ABSENT] * len(self)
+
+    def localiser(self, identifiants: NDArray) -> Tuple[NDArray, NDArray[np.bool_]]:
+        """Lignes des identifiants donnés et masque de ceux qui sont présents."""
+        lignes = np.searchsorted(self.identifiants, identifiants)
+        presents = np.zeros(len(identifiants), dtype=bool)
+        if len(self.identifiants):
+            lignes = np.minimum(lignes, len(self.identifiants) - 1)
+            presents = self.identifiants[lignes] == identifiants
+        return lignes, presents
+
+    def selectionner(self, lignes: NDArray) -> "TableCategorie":
+        """Sous-table des lignes données."""
+        return TableCategorie(
+            self.identifiants[lignes],
+            {nom: _extraire(c, lignes) for nom, c in self.colonnes.items()},
+        )
+
+    def trier(self) -> "TableCategorie":
+        """Table triée par identifiant, colonnes homogènes converties."""
+        ordre = np.argsort(self.identifiants, kind="stable")
+        return TableCategorie(
+            self.identifiants[ordre],
+            {
+                nom: _extraire(
+                    c if isinstance(c, np.ndarray) else _normaliser(c), ordre
+                )
+                for nom, c in self.colonnes.items()
+            },
+        )
+
+    def appliquer(self, delta: "TableCategorie", retires: NDArray) -> None:
+        """Retire puis ajoute ou remplace les entités d'un instantané incrémental."""
+        if len(retires):
+            garder = np.flatnonzero(
+                ~np.isin(self.identifiants, retires, assume_unique=True)
+            )
+            reduite = self.selectionner(garder)
+            self.identifiants, self.colonnes = reduite.identifiants, reduite.colonnes
+
+        if not len(delta):
+            return
+
+        lignes, presents = self.localiser(delta.identifiants)
+        remplaces = np.flatnonzero(presents)
+        nouveaux = np.flatnonzero(~presents)
+        colonnes = {}
+        for nom in set(self.colonnes) | set(delta.colonnes):
+            valeurs = delta.colonne(nom)
+            colonne = _affecter(
+                self.colonne(nom), lignes[remplaces], _extraire(valeurs, remplaces)
+            )
+            colonnes[nom] = _concatener(colonne, _extraire(valeurs, nouveaux))
+
+        complete = TableCategorie(
+            np.concatenate([self.identifiants, delta.identifiants[nouveaux]]),
+            colonnes,
+        ).trier()
+        self.identifiants, self.colonnes = complete.identifiants, complete.colonnes
+
+    def comparer(self, courante: "TableCategorie") -> Tuple[NDArray, NDArray[np.bool_]]:
+        """
+        Compare cette table (référence) à l'état courant : identifiants
+        retirés et masque des lignes courantes nouvelles ou modifiées.
+        """
+        retires = self.identifiants[
+            ~np.isin(self.identifiants, courante.identifiants, assume_unique=True)
+        ]
+        lignes, presents = self.localiser(courante.identifiants)
+        modifiees = ~presents
+        communes = np.flatnonzero(presents)
+        if not len(communes):
+            return retires, modifiees
+
+        for nom in set(self.colonnes) | set(courante.colonnes):
+            modifiees[communes] |= _differences(
+                _extraire(self.colonne(nom), lignes[communes]),
+                _extraire(courante.colonne(nom), communes),
+            )
+        return retires, modifiees
+
+
+# ========================================================================
+# CAPTURE (THREAD DE SIMULATION)
+# ========================================================================
+
+
+@dataclass
+class CaptureUnivers:
+    """Copie cohérente de l'univers, prise entre deux cycles."""
+
+    temps: int
+    etat_general: bytes  # Attributs de l'EtatMonde hors entités, sérialisés
+    index: List[str]
+    categories: Dict[str, TableCategorie]
+    duree_capture: float = 0.0
+
+
+def _figer(valeur: Any) -> Any:
+    if isinstance(valeur, np.ndarray):
+        return valeur.copy()
+    if isinstance(valeur, TYPES_MUTABLES):
+        return copy.deepcopy(valeur)
+    return valeur
+
+
+def _nom_classe(classe: type) -> str:
+    return f"{classe.__module__}.{classe.__qualname__}"
+
+
+def capturer_univers(etatmonde: EtatMonde) -> CaptureUnivers:
+    """
+    Capture l'univers sans le sérialiser. À appeler quand aucun agent ne le
+    modifie : le coût se limite à des copies de colonnes et de conteneurs.
+    """
+    debut = time.perf_counter()
+    categories: Dict[str, TableCategorie] = {}
+
+    for nom, entites in etatmonde.entites.items():
+        entites = list(entites)
+        dicts = [e.__dict__ for e in entites]
+        colonnes = (
+            etatmonde.obtenir_colonnes(nom, compacter=False)
+            if hasattr(etatmonde, "obtenir_colonnes")
+            else None
+        )
+
+        if colonnes is not None and all(d.get("_colonnes") is colonnes for d in dicts):
+            lignes = np.fromiter((d["_ligne"] for d in dicts), np.int64, len(dicts))
+            identifiants = colonnes.identifiants[lignes]
+            table = {
+                "masse": colonnes.masses[lignes],
+                "position": colonnes.positions[lignes],
+                "vecteur": colonnes.vecteurs[lignes],
+                "mobile": colonnes.mobiles[lignes],
+            }
+        else:
+            identifiants = np.array([e.id.bytes for e in entites], DTYPE_IDENTIFIANT)
+            mobiles = np.array(["vecteur" in d for d in dicts], dtype=bool)
+            table = {
+                "masse": np.array([d["masse"] for d in dicts], np.float64),
+                "position": np.array(
+                    [d["position"] for d in dicts], np.float64
+                ).reshape(-1, 3),
+                "vecteur": np.array(
+                    [
+                        d["vecteur"] if m else np.zeros(3)
+                        for d, m in zip(dicts, mobiles)
+                    ],
+                    np.float64,
+                ).reshape(-1, 3),
+                "mobile": mobiles,
+            }
+
+        noms_classes = {}
+        table["classe"] = [
+            noms_classes.get(t) or noms_classes.setdefault(t, _nom_classe(t))
+            for t in map(type, entites)
+        ]
+        table["ordre"] = np.arange(len(entites), dtype=np.int64)
+
+        champs = set().union(*dicts) - CHAMPS_COLONNES - CHAMPS_IGNORES
+        for champ in sorted(champs):
+            valeurs = [d.get(champ, ABSENT) for d in dicts]
+            if any(isinstance(v, TYPES_MUTABLES) for v in valeurs):
+                valeurs = [_figer(v) for v in valeurs]
+            table[champ] = valeurs
+
+        categories[nom] = TableCategorie(identifiants, table)
+
+    etat_general = pickle.dumps(
+        {
+            cle: valeur
+            for cle, valeur in vars(etatmonde).items()
+            if cle not in ("entites", "_index_entites")
+        },
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    return CaptureUnivers(
+        temps=etatmonde.temps,
+        etat_general=etat_general,
+        index=list(getattr(etatmonde, "_index_entites", {})),
+        categories=categories,
+        duree_capture=time.perf_counter() - debut,
+    )
+
+
+# ========================================================================
+# RECONSTRUCTION
+# ========================================================================
+
+
+def _resoudre_classe(nom: str) -> type:
+    module, _, qualname = nom.rpartition(".")
+    try:
+        classe = getattr(importlib.import_module(module), qualname)
+    except (ImportError, AttributeError) as e:
+        raise ErreurInstantane(f"Classe d'entité introuvable: {nom}") from e
+    if not (isinstance(classe, type) and issubclass(classe, EntiteCosmique)):
+        raise ErreurInstantane(f"Classe d'entité invalide: {nom}")
+    return classe
+
+
+def reconstruire_univers(
+    tables: Dict[str, TableCategorie],
+    etat_general: Dict[str, Any],
+    index: List[str],
+) -> EtatMonde:
+    """Recrée un EtatMonde à partir des tables d'une chaîne d'instantanés."""
+    monde = EtatMonde.__new__(EtatMonde)
+    monde.__dict__.update(etat_general)
+    monde._index_entites = {}
+    ids_indexes = set(index)
+    entites: Dict[str, List[EntiteCosmique]] = {}
+
+    for nom, table in tables.items():
+        table = table.selectionner(np.argsort(table.colonne("ordre"), kind="stable"))
+        classes = {
+            n: _resoudre_classe(n) for n in set(_en_liste(table.colonne("classe")))
+        }
+        masses = _en_liste(table.colonne("masse"))
+        positions = np.asarray(table.colonne("position"), dtype=np.float64)
+        vecteurs = np.asarray(table.colonne("vecteur"), dtype=np.float64)
+        mobiles = _en_liste(table.colonne("mobile"))
+        attributs = {
+            champ: _en_liste(colonne)
+            for champ, colonne in table.colonnes.items()
+            if champ
+            not in ("classe", "ordre", "masse", "position", "vecteur", "mobile")
+        }
+
+        liste = []
+        for i, (identifiant, nom_classe) in enumerate(
+            zip(table.identifiants.tolist(), _en_liste(table.colonne("classe")))
+        ):
+            classe = classes[nom_classe]
+            entite = classe.__new__(classe)
+            etat = entite.__dict__
+            etat["masse"] = masses[i]
+            etat["position"] = positions[i].copy()
+            if mobiles[i]:
+                etat["vecteur"] = vecteurs[i].copy()
+            etat["id"] = uuid.UUID(bytes=identifiant.ljust(16, b"\0"))
+            for champ, valeurs in attributs.items():
+                if valeurs[i] is not ABSENT:
+                    etat[champ] = valeurs[i]
+
+            liste.append(entite)
+            entite_id = str(etat["id"])
+            if entite_id in ids_indexes:
+                monde._index_entites[entite_id] = entite
+        entites[nom] = liste
+
+    monde.entites = DictEntites(entites)
+    return monde
+
+
+# ========================================================================
+# GESTIONNAIRE D'INSTANTANÉS
+# ========================================================================
+
+
+@dataclass
+class _Travail:
+    capture: Optional[CaptureUnivers]
+    rappel: Optional[Callable[[bool, str], None]] = None
+
+
+class GestionnaireInstantanes:
+    """
+    Écrit les instantanés dans un thread d'arrière-plan et les recharge.
+
+    Une chaîne commence par une base et compte au plus `longueur_chaine_max`
+    incréments ; `max_chaines` chaînes consolidées sont conservées.
+    """
+
+    def __init__(
+        self,
+        repertoire: Union[str, Path],
+        longueur_chaine_max: int = 20,
+        max_chaines: int = 10,
+    ):
+        self.repertoire = Path(repertoire)
+        self.repertoire.mkdir(exist_ok=True)
+        self.longueur_chaine_max = max(0, longueur_chaine_max)
+        self.max_chaines = max(1, max_chaines)
+        self.codec = _codec_prefere()
+
+        # État de la chaîne en cours, tenu par le thread d'écriture
+        self._reference: Optional[Dict[str, TableCategorie]] = None
+        self._dernier_numero = max(self._inventaire(), default=0)
+        self._numero_base = 0
+        self._longueur_chaine = 0
+
+        self._file: "queue.Queue[_Travail]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._verrou = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def sauvegarder(
+        self,
+        etatmonde: EtatMonde,
+        rappel: Optional[Callable[[bool, str], None]] = None,
+    ) -> float:
+        """
+        Capture l'univers et confie l'écriture au thread d'arrière-plan.
+
+        Retourne la durée de la capture, seul temps pendant lequel l'univers
+        doit rester immobile. `rappel(succes, message)` est appelé depuis le
+        thread d'écriture une fois l'instantané sur disque.
+        """
+        capture = capturer_univers(etatmonde)
+        self._demarrer_thread()
+        self._file.put(_Travail(capture, rappel))
+        return capture.duree_capture
+
+    def attendre(self, timeout: Optional[float] = None) -> bool:
+        """Attend que les instantanés en file soient écrits."""
+        if self._thread is None:
+            return True
+        evenement = threading.Event()
+        self._file.put(_Travail(None, lambda succes, message: evenement.set()))
+        return evenement.wait(timeout)
+
+    def _demarrer_thread(self) -> None:
+        with self._verrou:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._boucle_ecriture,
+                    name="EcrivainInstantanes",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _boucle_ecriture(self) -> None:
+        while True:
+            travail = self._file.get()
+            try:
+                if travail.capture is None:
+                    if travail.rappel:
+                        travail.rappel(True, "")
+                    continue
+
+                try:
+                    message = self._ecrire(travail.capture)
+                    succes = True
+                except Exception as e:
+                    # Chaîne interrompue : le prochain instantané sera une base
+                    self._reference = None
+                    message = f"Échec de l'écriture de l'instantané: {e}"
+                    succes = False
+                    logger.error(message)
+
+                if travail.rappel:
+                    try:
+                        travail.rappel(succes, message)
+                    except Exception as e:
+                        logger.warning(f"Erreur rappel de sauvegarde: {e}")
+            finally:
+                self._file.task_done()
+
+    def _ecrire(self, capture: CaptureUnivers) -> str:
+        """Trie, compare, compresse et écrit une capture (thread d'écriture)."""
+        debut = time.perf_counter()
+        tables = {nom: table.trier() for nom, table in capture.categories.items()}
+
+        base = (
+            self._reference is None or self._longueur_chaine >= self.longueur_chaine_max
+        )
+        numero = self._dernier_numero + 1
+        sections: Dict[str, Any] = {
+            "@etat": capture.etat_general,
+            "@index": capture.index,
+            "@categories": list(tables),
+        }
+
+        ecrites = retirees = 0
+        for nom, table in tables.items():
+            retires = np.zeros(0, DTYPE_IDENTIFIANT)
+            if not base:
+                reference = self._reference.get(nom, TableCategorie())
+                retires, modifiees = reference.comparer(table)
+                table = table.selectionner(np.flatnonzero(modifiees))
+                sections[f"{nom}/@retires"] = retires
+
+            sections[f"{nom}/@id"] = table.identifiants
+            for champ, colonne in table.colonnes.items():
+                sections[f"{nom}/{champ}"] = colonne
+            ecrites += len(table)
+            retirees += len(retires)
+
+        if not base:
+            # Catégories disparues depuis l'instantané précédent
+            for nom, reference in self._reference.items():
+                if nom not in tables:
+                    sections[f"{nom}/@retires"] = reference.identifiants
+
+        numero_base = numero if base else self._numero_base
+        entete = EnteteInstantane(
+            type=TYPE_BASE if base else TYPE_INCREMENT,
+            codec=self.codec,
+            numero=numero,
+            numero_parent=0 if base else self._dernier_numero,
+            numero_base=numero_base,
+            temps=capture.temps,
+            nombre_sections=len(sections),
+        )
+        taille = ecrire_instantane(self._chemin(numero), entete, sections)
+
+        self._reference = tables
+        self._dernier_numero = numero
+        self._numero_base = numero_base
+        self._longueur_chaine = 0 if base else self._longueur_chaine + 1
+
+        if base:
+            self._appliquer_retention()
+
+        message = (
+            f"Instantané {numero} ({'base' if base else 'incrémental'}, "
+            f"Temps: {capture.temps}) : {ecrites} entités écrites, "
+            f"{retirees} retirées, {taille / (1024 * 1024):.2f} Mo en "
+            f"{time.perf_counter() - debut:.2f}s "
+            f"(capture {capture.duree_capture * 1000:.0f} ms)"
+        )
+        logger.info(message)
+        return message
+
+    # ------------------------------------------------------------------
+    # Chaînes, consolidation et rétention
+    # ------------------------------------------------------------------
+
+    def _chemin(self, numero: int) -> Path:
+        return self.repertoire / f"instantane_{numero:08d}.evis"
+
+    def _inventaire(self) -> Dict[int, Path]:
+        inventaire = {}
+        for chemin in self.repertoire.glob(MOTIF_FICHIER):
+            correspondance = RE_FICHIER.search(chemin.name)
+            if correspondance:
+                inventaire[int(correspondance.group(1))] = chemin
+        return inventaire
+
+    def _entetes(self) -> Dict[int, Tuple[Path, EnteteInstantane]]:
+        entetes = {}
+        for numero, chemin in self._inventaire().items():
+            try:
+                entetes[numero] = (chemin, lire_entete(chemin))
+            except (OSError, ErreurInstantane) as e:
+                logger.warning(f"Instantané illisible ignoré {chemin.name}: {e}")
+        return entetes
+
+    def _chaine(
+        self, numero: int, entetes: Dict[int, Tuple[Path, EnteteInstantane]]
+    ) -> Optional[List[Path]]:
+        """Fichiers de la base jusqu'à l'instantané `numero`, ou None si rompue."""
+        chaine = []
+        while numero in entetes:
+            chemin, entete = entetes[numero]
+            chaine.append(chemin)
+            if entete.est_base:
+                return chaine[::-1]
+            numero = entete.numero_parent
+        return None
+
+    def _etat_chaine(
+        self, chaine: List[Path]
+    ) -> Tuple[EnteteInstantane, Dict[str, TableCategorie], Dict[str, Any]]:
+        """Rejoue une chaîne : tables finales et sections générales du dernier."""
+        tables: Dict[str, TableCategorie] = {}
+        for chemin in chaine:
+            entete, sections = lire_instantane(chemin)
+            noms = set(sections["@categories"])
+            for nom in noms | set(tables):
+                prefixe = f"{nom}/"
+                delta = TableCategorie(
+                    np.asarray(
+                        sections.get(f"{nom}/@id", np.zeros(0, DTYPE_IDENTIFIANT))
+                    ),
+                    {
+                        cle[len(prefixe) :]: valeur
+                        for cle, valeur in sections.items()
+                        if cle.startswith(prefixe)
+                        and not cle[len(prefixe) :].startswith("@")
+                    },
+                )
+                if entete.est_base:
+                    tables[nom] = delta
+                else:
+                    table = tables.setdefault(nom, TableCategorie())
+                    table.appliquer(
+                        delta,
+                        np.asarray(
+                            sections.get(
+                                f"{nom}/@retires", np.zeros(0, DTYPE_IDENTIFIANT)
+                            )
+                        ),
+                    )
+            for nom in set(tables) - noms:
+                del tables[nom]
+        return entete, tables, sections
+
+    def _appliquer_retention(self) -> None:
+        """Consolide les chaînes closes puis supprime les plus anciennes."""
+        entetes = self._entetes()
+        chaines: Dict[int, List[int]] = {}
+        for numero, (_, entete) in entetes.items():
+            chaines.setdefault(entete.numero_base, []).append(numero)
+
+        bases = sorted(chaines, reverse=True)
+        for rang, numero_base in enumerate(bases):
+            numeros = sorted(chaines[numero_base])
+            if rang >= self.max_chaines:
+                for numero in numeros:
+                    self._supprimer(entetes[numero][0])
+            elif numero_base != self._numero_base and len(numeros) > 1:
+                self._consolider(numeros, entetes)
+
+    def _consolider(
+        self, numeros: List[int], entetes: Dict[int, Tuple[Path, EnteteInstantane]]
+    ) -> None:
+        """Remplace une chaîne close par une base équivalente à son dernier état."""
+        dernier = numeros[-1]
+        chaine = self._chaine(dernier, entetes)
+        if chaine is None:
+            logger.warning(f"Chaîne d'instantanés rompue avant {dernier}, supprimée")
+            for numero in numeros:
+                self._supprimer(entetes[numero][0])
+            return
+
+        try:
+            entete, tables, generales = self._etat_chaine(chaine)
+            sections: Dict[str, Any] = {
+                "@etat": generales["@etat"],
+                "@index": generales["@index"],
+                "@categories": list(tables),
+            }
+            for nom, table in tables.items():
+                sections[f"{nom}/@id"] = table.identifiants
+                for champ, colonne in table.colonnes.items():
+                    sections[f"{nom}/{champ}"] = colonne
+
+            consolidee = EnteteInstantane(
+                type=TYPE_BASE,
+                codec=self.codec,
+                numero=dernier,
+                numero_parent=0,
+                numero_base=dernier,
+                temps=entete.temps,
+                nombre_sections=len(sections),
+            )
+            ecrire_instantane(self._chemin(dernier), consolidee, sections)
+        except Exception as e:
+            logger.warning(f"Consolidation de la chaîne {numeros[0]} échouée: {e}")
+            return
+
+        for numero in numeros[:-1]:
+            self._supprimer(entetes[numero][0])
+        logger.debug(f"Chaîne {numeros[0]}-{dernier} consolidée en une base")
+
+    def _supprimer(self, chemin: Path) -> None:
+        try:
+            chemin.unlink()
+        except OSError as e:
+            logger.warning(f"Erreur suppression instantané {chemin.name}: {e}")
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def charger_dernier(self) -> Optional[EtatMonde]:
+        """
+        Recharge l'instantané le plus récent dont la chaîne est complète et
+        lisible, en remontant vers les plus anciens si nécessaire.
+        """
+        entetes = self._entetes()
+        for numero in sorted(entetes, reverse=True):
+            chaine = self._chaine(numero, entetes)
+            if chaine is None:
+                logger.warning(f"Instantané {numero}: chaîne incomplète, ignoré")
+                continue
+            try:
+                _, tables, sections = self._etat_chaine(chaine)
+                monde = reconstruire_univers(
+                    tables, sections["@etat"], sections["@index"]
+                )
+                logger.info(
+                    f"Instantané {numero} rechargé ({len(chaine)} fichier(s) rejoué(s))"
+                )
+                return monde
+            except Exception as e:
+                logger.warning(f"Échec chargement instantané {numero}: {e}")
+        return None
+
+    def lister(self) -> List[Dict[str, Any]]:
+        """Métadonnées des instantanés présents."""
+        resultat = []
+        for numero, (chemin, entete) in sorted(self._entetes().items()):
+            stat = chemin.stat()
+            resultat.append(
+                {
+                    "nom": chemin.name,
+                    "type": (
+                        "instantane_base" if entete.est_base else "instantane_increment"
+                    ),
+                    "numero": numero,
+                    "temps_univers": entete.temps,
+                    "taille_mb": stat.st_size / (1024 * 1024),
+                    "date_modification": datetime.fromtimestamp(stat.st_mtime),
+                }
+            )
+        return resultat
@@ -9,18 +9,22 @@ Architecture MVC avec séparation des responsabilités et gestion d'erreurs robu
 
 import json
 import logging
-from typing import Optional, Dict, Any, Set, Tuple, Union
+import uuid
+from typing import Optional, Dict, Any, List, Set, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
 import numpy as np
 from numpy.typing import NDArray
 
-from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer
+from PyQt6 import sip
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QPointF, QRectF, QTimer
 from PyQt6.QtGui import (
     QBrush,
     QColor,
+    QImage,
     QPen,
+    QPolygonF,
     QPainter,
     QCursor,
     QWheelEvent,
@@ -38,6 +42,7 @@ from PyQt6.QtWidgets import (
     QGraphicsView,
     QGraphicsScene,
     QGraphicsEllipseItem,
+    QGraphicsItem,
     QSplitter,
     QPushButton,
     QComboBox,
@@ -47,6 +52,16 @@ from PyQt6.QtWidgets import (
     QGroupBox,
 )
 
+from trames import (
+    CategorieAffichage,
+    DecodeurTrames,
+    ErreurTrame,
+    ModificationsCategorie,
+    grouper_sprites,
+    identifiant_texte,
+    rasteriser_densite,
+)
+
 logger = logging.getLogger(__name__)
 
 # ========================================================================
@@ -174,6 +189,16 @@ class ConstantesInterface:
     # Performance
     MAX_ENTITES_DEBUG = 50000
     INTERVALLE_STATS_MS = 1000
+    FREQUENCE_RAFRAICHISSEMENT_DEFAUT = 60.0  # Hz, si l'écran ne la fournit pas
+
+    # Niveau de détail
+    MAX_ITEMS_INTERACTIFS = 1500  # Au-delà, tout est dessiné par les calques
+    TAILLE_PIXELS_INTERACTIF = 4.0  # Taille écran minimale d'un item interactif
+    SEUIL_SPRITES = 20000  # Entités visibles au-delà desquelles on agrège en tuiles
+    TAILLE_PIXELS_SPRITE_MIN = 1.0  # Sous cette taille médiane, tuiles de densité
+    TAILLE_TUILE_PIXELS = 3
+    PAS_TAILLE_SPRITE = 0.5
+    RAYON_CLIC_PIXELS = 6.0
 
     # Couleurs thème
     COULEUR_FOND = QColor(5, 5, 15)
@@ -222,10 +247,169 @@ class EntiteGraphique(QGraphicsEllipseItem):
         super().mousePressEvent(event)
 
 
+class CalqueCategorie(QGraphicsItem):
+    """
+    Rendu groupé d'une catégorie : un seul passage QPainter dessine toutes
+    les entités qui n'ont pas d'item interactif, en sprites regroupés par
+    couleur et taille, ou en tuiles de densité quand elles sont trop nombreuses
+    ou trop petites à l'écran.
+    """
+
+    def __init__(self, categorie: str, parent_fenetre: QObject):
+        super().__init__()
+        self.categorie = categorie
+        self.parent_fenetre = parent_fenetre
+        self.identifiants = np.zeros(0, "S16")
+        self.positions = np.zeros((0, 2), np.float64)
+        self.couleurs = np.zeros((0, 4), np.uint8)
+        self.tailles = np.zeros(0, np.float32)
+        self._rect = QRectF()
+        self.setZValue(-1)  # Sous les items interactifs
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption, True)
+
+    def definir_donnees(
+        self, donnees: CategorieAffichage, exclus: NDArray[np.bool_]
+    ) -> None:
+        """Copie l'état décodé de la catégorie, sans les entités `exclus`."""
+        garder = ~exclus
+        self.identifiants = donnees.identifiants[garder]
+        self.positions = donnees.positions[garder, :2].astype(np.float64)
+        self.couleurs = donnees.couleurs[garder]
+        self.tailles = donnees.tailles[garder]
+
+        self.prepareGeometryChange()
+        if len(self.positions):
+            marge = float(self.tailles.max())
+            minimum = self.positions.min(axis=0) - marge
+            maximum = self.positions.max(axis=0) + marge
+            self._rect = QRectF(
+                minimum[0], minimum[1], maximum[0] - minimum[0], maximum[1] - minimum[1]
+            )
+        else:
+            self._rect = QRectF()
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        """Enveloppe de toutes les entités dessinées par le calque."""
+        return self._rect
+
+    def paint(self, painter: QPainter, option: Any, widget: Any = None) -> None:
+        """Dessine la partie exposée du calque en un seul passage."""
+        if not len(self.positions):
+            return
+
+        zone = option.exposedRect
+        echelle = max(abs(painter.worldTransform().m11()), 1e-12)
+        marge = float(self.tailles.max())
+        visibles = np.flatnonzero(
+            (self.positions[:, 0] >= zone.left() - marge)
+            & (self.positions[:, 0] <= zone.right() + marge)
+            & (self.positions[:, 1] >= zone.top() - marge)
+            & (self.positions[:, 1] <= zone.bottom() + marge)
+        )
+        if not len(visibles):
+            return
+
+        taille_ecran = float(np.median(self.tailles[visibles])) * echelle
+        if (
+            len(visibles) > ConstantesInterface.SEUIL_SPRITES
+            or taille_ecran < ConstantesInterface.TAILLE_PIXELS_SPRITE_MIN
+        ):
+            self._peindre_densite(painter, zone, echelle, visibles)
+        else:
+            self._peindre_sprites(painter, echelle, visibles)
+
+    def _peindre_densite(
+        self, painter: QPainter, zone: QRectF, echelle: float, visibles: NDArray
+    ) -> None:
+        """Tuiles de densité rasterisées puis dessinées comme une seule image."""
+        taille_tuile = ConstantesInterface.TAILLE_TUILE_PIXELS / echelle
+        largeur = max(1, int(np.ceil(zone.width() / taille_tuile)))
+        hauteur = max(1, int(np.ceil(zone.height() / taille_tuile)))
+        tuiles = rasteriser_densite(
+            self.positions[visibles],
+            self.couleurs[visibles],
+            (zone.left(), zone.top()),
+            taille_tuile,
+            largeur,
+            hauteur,
+        )
+        image = QImage(
+            tuiles.data, largeur, hauteur, largeur * 4, QImage.Format.Format_RGBA8888
+        )
+        painter.drawImage(
+            QRectF(
+                zone.left(), zone.top(), largeur * taille_tuile, hauteur * taille_tuile
+            ),
+            image,
+        )
+
+    def _peindre_sprites(
+        self, painter: QPainter, echelle: float, visibles: NDArray
+    ) -> None:
+        """Points ronds regroupés par couleur et taille : un appel par groupe."""
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for couleur, taille, indices in grouper_sprites(
+            self.couleurs[visibles],
+            self.tailles[visibles],
+            ConstantesInterface.PAS_TAILLE_SPRITE,
+        ):
+            crayon = QPen(QColor(*couleur))
+            crayon.setWidthF(max(taille, 1.0 / echelle))
+            crayon.setCapStyle(Qt.PenCapStyle.RoundCap)
+            painter.setPen(crayon)
+            painter.drawPoints(_polygone(self.positions[visibles[indices]]))
+
+    def entite_proche(self, point: QPointF, echelle: float) -> Optional[str]:
+        """Identifiant de l'entité dessinée sous le point, s'il y en a une."""
+        if not len(self.positions):
+            return None
+
+        ecarts = self.positions - (point.x(), point.y())
+        distances = np.einsum("ij,ij->i", ecarts, ecarts)
+        ligne = int(np.argmin(distances))
+        rayon = max(
+            ConstantesInterface.RAYON_CLIC_PIXELS / max(echelle, 1e-12),
+            float(self.tailles[ligne]) / 2,
+        )
+        if distances[ligne] > rayon * rayon:
+            return None
+        return identifiant_texte(self.identifiants[ligne])
+
+    def mousePressEvent(self, event: Any) -> None:
+        """Sélectionne l'entité cliquée ; sinon laisse passer le clic."""
+        vues = self.scene().views() if self.scene() else []
+        echelle = abs(vues[0].transform().m11()) if vues else 1.0
+        entite_id = self.entite_proche(event.scenePos(), echelle)
+        if entite_id is None:
+            event.ignore()  # Laisse la vue démarrer le déplacement
+            return
+
+        try:
+            if hasattr(self.parent_fenetre, "selectionner_entite"):
+                self.parent_fenetre.selectionner_entite(entite_id)
+        except Exception as e:
+            logger.error(f"Erreur lors de la sélection d'entité {entite_id}: {e}")
+        event.accept()
+
+
+def _polygone(points: NDArray[np.float64]) -> QPolygonF:
+    """Construit un QPolygonF en copiant directement le tableau (n, 2)."""
+    polygone = QPolygonF()
+    polygone.fill(QPointF(), len(points))
+    tampon = polygone.data()
+    if tampon is None:
+        tampon = sip.voidptr(0)
+    tampon.setsize(len(points) * 2 * 8)
+    np.frombuffer(tampon, np.float64).reshape(-1, 2)[:] = points
+    return polygone
+
+
 class VueInteractive(QGraphicsView):
     """Vue personnalisée avec navigation optimisée et gestion d'erreurs."""
 
     clicVide = pyqtSignal()
+    vueModifiee = pyqtSignal()  # Zoom, défilement ou redimensionnement
 
     """TODO: Add docstring."""
     def __init__(
@@ -257,15 +441,36 @@ class VueInteractive(QGraphicsView):
                 self.scale(zoom_facteur, zoom_facteur)
             else:
                 self.scale(1.0 / zoom_facteur, 1.0 / zoom_facteur)
+            self.vueModifiee.emit()
 
         except Exception as e:
             logger.error(f"Erreur lors du zoom: {e}")
 
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        """Signale le défilement pour recalculer le niveau de détail."""
+        super().scrollContentsBy(dx, dy)
+        self.vueModifiee.emit()
+
+    def resizeEvent(self, event: Any) -> None:
+        """Signale le redimensionnement pour recalculer le niveau de détail."""
+        super().resizeEvent(event)
+        self.vueModifiee.emit()
+
+    def _entite_sous_curseur(self, event: QMouseEvent) -> bool:
+        """Vrai si le clic touche un item interactif ou une entité d'un calque."""
+        point = self.mapToScene(event.pos())
+        echelle = abs(self.transform().m11())
+        for item in self.items(event.pos()):
+            if not isinstance(item, CalqueCategorie):
+                return True
+            if item.entite_proche(point, echelle) is not None:
+                return True
+        return False
+
     def mousePressEvent(self, event: QMouseEvent) -> None:
         """Gère les clics avec détection de clic dans le vide."""
         try:
-            item = self.itemAt(event.pos())
-            if item is None:
+            if not self._entite_sous_curseur(event):
                 self.clicVide.emit()
                 if hasattr(self.parent_fenetre, "deselectionner_entite"):
                     self.parent_fenetre.deselectionner_entite()
@@ -416,10 +621,32 @@ class GestionnaireScene:
         self.vue = vue
         self.gestionnaire_rendu = GestionnaireRendu()
         self.items_graphiques: Dict[str, EntiteGraphique] = {}
+        self.identifiants_texte: Dict[bytes, str] = {}  # uuid.bytes -> id texte
+        self.cache_pinceaux: Dict[Tuple[int, ...], QBrush] = {}
         self.premiere_mise_a_jour = True
         self.derniere_position_centre: Optional[NDArray] = None
         self.derniere_taille_univers = 0.0
 
+        # Niveau de détail : calques groupés par catégorie, items interactifs
+        # réservés aux entités visibles et assez grandes à l'écran
+        self.calques: Dict[str, CalqueCategorie] = {}
+        self.decodeur: Optional[DecodeurTrames] = None
+        self.modifications_en_attente: Dict[str, ModificationsCategorie] = {}
+        self.vue_modifiee = False
+        self.id_selection: Optional[bytes] = None
+        self.vue.vueModifiee.connect(self.signaler_vue_modifiee)
+
+        # Rafraîchissement cadencé sur l'écran, indépendant de la simulation
+        ecran = self.vue.screen()
+        frequence = (
+            ecran.refreshRate()
+            if ecran and ecran.refreshRate() > 0
+            else ConstantesInterface.FREQUENCE_RAFRAICHISSEMENT_DEFAUT
+        )
+        self.timer_rafraichissement = QTimer()
+        self.timer_rafraichissement.timeout.connect(self._rafraichir)
+        self.timer_rafraichissement.start(max(1, int(1000 / frequence)))
+
     def mettre_a_jour_scene(self, donnees_entites: Dict[str, Any]) -> None:
         """Met à jour la scène graphique de manière optimisée."""
         try:
@@ -442,6 +669,210 @@ class GestionnaireScene:
         except Exception as e:
             logger.error(f"Erreur critique mise à jour scène: {e}")
 
+    def appliquer_modifications(
+        self,
+        decodeur: DecodeurTrames,
+        modifications: Dict[str, ModificationsCategorie],
+    ) -> None:
+        """
+        Enregistre les entités touchées par les trames appliquées ; la scène
+        n'est redessinée qu'au prochain rafraîchissement de l'écran.
+        """
+        self.decodeur = decodeur
+        for nom_categorie, modifs in modifications.items():
+            if nom_categorie in self.modifications_en_attente:
+                self.modifications_en_attente[nom_categorie].fusionner(modifs)
+            else:
+                self.modifications_en_attente[nom_categorie] = modifs
+
+    def signaler_vue_modifiee(self) -> None:
+        """La zone visible a changé : le niveau de détail est à recalculer."""
+        self.vue_modifiee = True
+
+    def definir_selection(self, entite_id: Optional[str]) -> None:
+        """Garde l'entité sélectionnée en item interactif, quel que soit le zoom."""
+        try:
+            identifiant = uuid.UUID(entite_id).bytes if entite_id else None
+        except ValueError:
+            identifiant = None
+        if identifiant != self.id_selection:
+            self.id_selection = identifiant
+            self.vue_modifiee = True
+
+    def _rafraichir(self) -> None:
+        """Reporte sur la scène les trames reçues depuis le dernier affichage."""
+        if self.decodeur is None or not (
+            self.modifications_en_attente or self.vue_modifiee
+        ):
+            return
+
+        try:
+            modifications = self.modifications_en_attente
+            self.modifications_en_attente = {}
+            self.vue_modifiee = False
+
+            zone = self.vue.mapToScene(self.vue.viewport().rect()).boundingRect()
+            echelle = abs(self.vue.transform().m11())
+            interactifs = self._choisir_interactifs(zone, echelle)
+
+            for nom_categorie in set(self.calques) | set(self.decodeur.categories):
+                categorie = self.decodeur.categories.get(
+                    nom_categorie, CategorieAffichage()
+                )
+                self._synchroniser_items(
+                    nom_categorie,
+                    categorie,
+                    interactifs.get(nom_categorie, np.zeros(len(categorie), bool)),
+                    modifications.get(nom_categorie),
+                )
+
+            # Viewport calculé sur l'état complet du décodeur
+            if modifications:
+                positions = [
+                    c.positions for c in self.decodeur.categories.values() if len(c)
+                ]
+                if positions:
+                    self._gerer_viewport(np.concatenate(positions).astype(np.float64))
+
+        except Exception as e:
+            logger.error(f"Erreur critique application des trames: {e}")
+
+    def _choisir_interactifs(
+        self, zone: QRectF, echelle: float
+    ) -> Dict[str, NDArray[np.bool_]]:
+        """
+        Masques, par catégorie, des entités à matérialiser en items : visibles
+        et assez grandes à l'écran, dans la limite de MAX_ITEMS_INTERACTIFS.
+        """
+        masques: Dict[str, NDArray[np.bool_]] = {}
+        total = 0
+        for nom_categorie, categorie in self.decodeur.categories.items():
+            positions = categorie.positions
+            masques[nom_categorie] = (
+                (positions[:, 0] >= zone.left())
+                & (positions[:, 0] <= zone.right())
+                & (positions[:, 1] >= zone.top())
+                & (positions[:, 1] <= zone.bottom())
+                & (
+                    categorie.tailles * echelle
+                    >= ConstantesInterface.TAILLE_PIXELS_INTERACTIF
+                )
+            )
+            total += int(np.count_nonzero(masques[nom_categorie]))
+
+        if total > ConstantesInterface.MAX_ITEMS_INTERACTIFS:
+            masques = {nom: np.zeros_like(masque) for nom, masque in masques.items()}
+
+        if self.id_selection is not None:
+            identifiant = np.array([self.id_selection], dtype="S16")
+            for nom_categorie, categorie in self.decodeur.categories.items():
+                lignes, presents = categorie.localiser(identifiant)
+                if presents[0]:
+                    masques[nom_categorie][lignes[0]] = True
+                    break
+
+        return masques
+
+    def _synchroniser_items(
+        self,
+        nom_categorie: str,
+        categorie: CategorieAffichage,
+        interactifs: NDArray[np.bool_],
+        modifs: Optional[ModificationsCategorie],
+    ) -> None:
+        """Met à jour le calque d'une catégorie et ses items interactifs."""
+        identifiants = categorie.identifiants[interactifs]
+        lignes = np.flatnonzero(interactifs)
+
+        # Items qui ne sont plus interactifs (sortis de la vue ou retirés)
+        existants = [
+            identifiant
+            for identifiant, entite_id in self.identifiants_texte.items()
+            if self.items_graphiques[entite_id].categorie == nom_categorie
+        ]
+        sortants: List[bytes] = []
+        if existants:
+            existants = np.array(existants, dtype="S16")
+            sortants = existants[
+                ~np.isin(existants, identifiants, assume_unique=True)
+            ].tolist()
+        for identifiant in sortants:
+            item = self.items_graphiques.pop(self.identifiants_texte.pop(identifiant))
+            self.scene.removeItem(item)
+
+        # Seuls les nouveaux items et les entités modifiées sont restylés
+        nouveaux = np.array(
+            [
+                identifiant not in self.identifiants_texte
+                for identifiant in identifiants.tolist()
+            ],
+            dtype=bool,
+        )
+        a_styler = nouveaux
+        if modifs is not None and len(modifs.modifies):
+            a_styler = nouveaux | np.isin(identifiants, modifs.modifies)
+
+        for identifiant, position, couleur, taille in zip(
+            identifiants[a_styler].tolist(),
+            categorie.positions[lignes[a_styler]].tolist(),
+            categorie.couleurs[lignes[a_styler]].tolist(),
+            categorie.tailles[lignes[a_styler]].tolist(),
+        ):
+            entite_id = self.identifiants_texte.get(identifiant)
+            if entite_id is None:
+                item = self._creer_item(identifiant, nom_categorie)
+            else:
+                item = self.items_graphiques[entite_id]
+
+            item.setPos(position[0], position[1])
+            item.setBrush(self._obtenir_pinceau(tuple(couleur)))
+            item.setRect(-taille / 2, -taille / 2, taille, taille)
+
+        # Le calque dessine tout le reste en un passage
+        if (
+            modifs is not None
+            or sortants
+            or np.any(nouveaux)
+            or nom_categorie not in self.calques
+        ):
+            calque = self.calques.get(nom_categorie)
+            if calque is None:
+                calque = self.calques[nom_categorie] = CalqueCategorie(
+                    nom_categorie, self.vue.parent_fenetre
+                )
+                self.scene.addItem(calque)
+            calque.definir_donnees(categorie, interactifs)
+
+    def _creer_item(self, identifiant: bytes, categorie: str) -> EntiteGraphique:
+        """Crée l'item graphique d'une entité reçue pour la première fois."""
+        entite_id = identifiant_texte(identifiant)
+        self.identifiants_texte[identifiant] = entite_id
+
+        item = EntiteGraphique(entite_id, self.vue.parent_fenetre, categorie)
+        config = next(
+            (
+                ConfigurationRendu.CONFIGURATIONS[cat]
+                for cat in CategorieEntite
+                if cat.value == categorie
+            ),
+            None,
+        )
+        if identifiant == self.id_selection:
+            item.setPen(QPen(ConstantesInterface.COULEUR_SELECTION, 2))
+        elif config and config.contour_couleur and config.contour_epaisseur > 0:
+            item.setPen(QPen(config.contour_couleur, config.contour_epaisseur))
+
+        self.items_graphiques[entite_id] = item
+        self.scene.addItem(item)
+        return item
+
+    def _obtenir_pinceau(self, couleur: Tuple[int, ...]) -> QBrush:
+        """Pinceau mis en cache par couleur RGBA."""
+        pinceau = self.cache_pinceaux.get(couleur)
+        if pinceau is None:
+            pinceau = self.cache_pinceaux[couleur] = QBrush(QColor(*couleur))
+        return pinceau
+
     def _collecter_donnees_valides(
         self, donnees_entites: Dict[str, Any]
     ) -> Optional[Tuple[Set[str], List[List[float]]]]:
@@ -575,7 +1006,7 @@ class GestionnaireScene:
 
     def _gerer_viewport(self, toutes_positions: List[List[float]]) -> None:
         """Gère le viewport avec recentrage intelligent."""
-        if not toutes_positions or len(self.items_graphiques) == 0:
+        if len(toutes_positions) == 0:
             return
 
         try:
@@ -787,14 +1218,13 @@ class FenetrePrincipale(QMainWindow):
     reprise_demandee = pyqtSignal()
     vitesse_changee = pyqtSignal(str)
     sauvegarde_demandee = pyqtSignal()
+    entite_suivie = pyqtSignal(str)  # Fiche complète demandée au simulateur
+    image_cle_demandee = pyqtSignal()  # Flux de trames à resynchroniser
 
     def __init__(self):
         super().__init__()
-        self._initialiser_fenetre()
-        self._creer_composants()
-        self._connecter_signaux()
 
-        # Gestionnaires spécialisés
+        # Gestionnaires spécialisés (la scène est créée par _creer_composants)
         self.gestionnaire_scene: Optional[GestionnaireScene] = None
         self.gestionnaire_affichage = GestionnaireAffichage()
 
@@ -802,6 +1232,14 @@ class FenetrePrincipale(QMainWindow):
         self.donnees_actuelles: Dict[str, Any] = {}
         self.id_selection_actuelle: Optional[str] = None
 
+        # Flux de trames binaires reçues du simulateur
+        self.decodeur = DecodeurTrames()
+        self.id_suivi_demande: Optional[str] = None
+
+        self._initialiser_fenetre()
+        self._creer_composants()
+        self._connecter_signaux()
+
         # Timer pour performance
         self.timer_stats = QTimer()
         self.timer_stats.timeout.connect(self._mettre_a_jour_performance)
@@ -970,8 +1408,12 @@ class FenetrePrincipale(QMainWindow):
     # MÉTHODES PUBLIQUES PRINCIPALES
     # ========================================================================
 
-    def mise_a_jour(self, etat_json: str) -> None:
+    def mise_a_jour(self, etat_json: Union[str, bytes]) -> None:
         """Point d'entrée principal pour mise à jour de l'interface."""
+        if isinstance(etat_json, (bytes, bytearray)):
+            self.appliquer_trames([etat_json])
+            return
+
         try:
             # Validation des données
             donnees_valides = ValidateurDonnees.valider_json_simulation(etat_json)
@@ -997,6 +1439,47 @@ class FenetrePrincipale(QMainWindow):
                 False, f"Erreur mise à jour: {str(e)[:50]}..."
             )
 
+    def appliquer_trames(self, trames: List[bytes]) -> None:
+        """
+        Applique des trames binaires dans l'ordre puis rafraîchit l'affichage
+        une seule fois, en ne touchant que les entités modifiées.
+        """
+        try:
+            modifications: Dict[str, ModificationsCategorie] = {}
+            for trame in trames:
+                try:
+                    modifs = self.decodeur.appliquer(trame)
+                except ErreurTrame as e:
+                    logger.error(f"Trame illisible ignorée: {e}")
+                    self.decodeur.image_cle_requise = True
+                    continue
+
+                for nom, modif in (modifs or {}).items():
+                    if nom in modifications:
+                        modifications[nom].fusionner(modif)
+                    else:
+                        modifications[nom] = modif
+
+            if self.decodeur.image_cle_requise:
+                self.image_cle_demandee.emit()
+
+            if self.decodeur.numero is None:
+                return  # Aucune image clé reçue pour l'instant
+
+            self.donnees_actuelles = self.decodeur.donnees_tableau_de_bord()
+            self._mettre_a_jour_dashboard(self.donnees_actuelles)
+
+            if self.gestionnaire_scene and modifications:
+                self.gestionnaire_scene.appliquer_modifications(
+                    self.decodeur, modifications
+                )
+
+            if self.id_selection_actuelle:
+                self.selectionner_entite(self.id_selection_actuelle)
+
+        except Exception as e:
+            logger.error(f"Erreur application des trames: {e}")
+
     def selectionner_entite(self, entite_id: str) -> None:
         """Sélectionne une entité et affiche ses détails."""
         try:
@@ -1008,6 +1491,8 @@ class FenetrePrincipale(QMainWindow):
 
             if entite_trouvee:
                 self._afficher_details_entite(entite_trouvee, entite_id)
+                if self.gestionnaire_scene:
+                    self.gestionnaire_scene.definir_selection(entite_id)
                 self._mettre_en_evidence_entite(entite_id)
                 self.id_selection_actuelle = entite_id
             else:
@@ -1028,6 +1513,12 @@ class FenetrePrincipale(QMainWindow):
 
             self.id_selection_actuelle = None
             self.group_selection.setVisible(False)
+            if self.gestionnaire_scene:
+                self.gestionnaire_scene.definir_selection(None)
+
+            if self.id_suivi_demande:
+                self.id_suivi_demande = None
+                self.entite_suivie.emit("")
 
         except Exception as e:
             logger.error(f"Erreur désélection: {e}")
@@ -1063,12 +1554,46 @@ class FenetrePrincipale(QMainWindow):
 
     def _rechercher_entite_par_id(self, entite_id: str) -> Optional[Dict[str, Any]]:
         """Recherche une entité par ID dans toutes les catégories."""
+        if "entites" not in self.donnees_actuelles:
+            return self._rechercher_entite_dans_trames(entite_id)
+
         for entites_categorie in self.donnees_actuelles.get("entites", {}).values():
             for entite_data in entites_categorie:
                 if entite_data.get("id") == entite_id:
                     return entite_data
         return None
 
+    def _rechercher_entite_dans_trames(
+        self, entite_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fiche de l'entité dans le flux binaire. La fiche complète n'arrive
+        qu'avec la trame suivant la demande de suivi : d'ici là, seules la
+        catégorie et la position connues du décodeur sont affichées.
+        """
+        fiche = self.decodeur.fiche
+        if fiche and fiche.get("id") == entite_id:
+            return fiche
+
+        if entite_id != self.id_suivi_demande:
+            self.id_suivi_demande = entite_id
+            self.entite_suivie.emit(entite_id)
+
+        try:
+            identifiant = np.array([uuid.UUID(entite_id).bytes], dtype="S16")
+        except ValueError:
+            return None
+
+        for nom_categorie, categorie in self.decodeur.categories.items():
+            lignes, presents = categorie.localiser(identifiant)
+            if presents[0]:
+                return {
+                    "id": entite_id,
+                    "categorie": nom_categorie,
+                    "position": categorie.positions[lignes[0]].tolist(),
+                }
+        return None
+
     def _afficher_details_entite(
         self, entite_data: Dict[str, Any], entite_id: str
     ) -> None:
@@ -1177,6 +1702,8 @@ class FenetrePrincipale(QMainWindow):
         try:
             logger.info("Fermeture de l'interface principale")
             self.timer_stats.stop()
+            if self.gestionnaire_scene:
+                self.gestionnaire_scene.timer_rafraichissement.stop()
             super().closeEvent(event)
         except Exception as e:
             logger.error(f"Erreur lors de la fermeture: {e}")
@@ -15,7 +15,7 @@ import argparse
 import json
 import traceback
 from typing import Optional, Dict, Any, List, Tuple, Union
-from queue import Queue
+from queue import Empty, Queue
 from multiprocessing import freeze_support
 from pathlib import Path
 from dataclasses import dataclass, field
@@ -537,6 +537,12 @@ class FactoryComposants:
                         config_sim.limite_entites_performance = 10000
                         self.logger.info("Mémoire limitée: réduction limite entités")
 
+            # Modificateurs indépendants en parallèle sur les machines multi-cœurs
+            nombre_coeurs = os.cpu_count() or 1
+            if nombre_coeurs > 1:
+                config_sim.execution_parallele = True
+                config_sim.travailleurs_paralleles = min(4, nombre_coeurs)
+
             return Simulateur(etatmonde, file_etats, config_sim)
 
         except ImportError as e:
@@ -764,6 +770,10 @@ class Application(QObject):
             self.fenetre.vitesse_changee.connect(self._on_vitesse_changee)
             self.fenetre.sauvegarde_demandee.connect(self._on_sauvegarde_demandee)
 
+            # Flux de trames : suivi de sélection et reprise sur image clé
+            self.fenetre.entite_suivie.connect(self.simulateur.suivre_entite)
+            self.fenetre.image_cle_demandee.connect(self.simulateur.demander_image_cle)
+
             # Signal de sauvegarde
             self.simulateur.sauvegardeEffectuee.connect(
                 self.fenetre.afficher_notification_sauvegarde
@@ -867,19 +877,21 @@ class Application(QObject):
             return
 
         try:
-            # Consommation optimisée de la queue
-            if not self.file_etats.empty():
-                etat_json = self.file_etats.get_nowait()
-                self.fenetre.mise_a_jour(etat_json)  # Nouvelle API
-
-                # Vider queue si accumulation
-                compteur = 0
-                while not self.file_etats.empty() and compteur < 5:
-                    try:
-                        self.file_etats.get_nowait()
-                        compteur += 1
-                    except:
-                        break
+            # Consommation de tout ce qui est en attente, dans l'ordre : les
+            # trames delta doivent toutes être appliquées, l'affichage est
+            # rafraîchi une seule fois
+            en_attente = []
+            while len(en_attente) < self.config.taille_queue:
+                try:
+                    en_attente.append(self.file_etats.get_nowait())
+                except Empty:
+                    break
+
+            trames = [e for e in en_attente if isinstance(e, (bytes, bytearray))]
+            if trames:
+                self.fenetre.appliquer_trames(trames)
+            elif en_attente:
+                self.fenetre.mise_a_jour(en_attente[-1])  # Ancien format JSON
 
         except Exception as e:
             self.logger.debug(f"Erreur mineure mise à jour interface: {e}")
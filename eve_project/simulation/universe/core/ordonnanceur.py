@@ -0,0 +1,317 @@
+# Fichier : ordonnanceur.py
+# Version 9.0 ("Orchestrateur Robuste") - Exécution parallèle des agents sans conflit.
+
+"""
+Ordonnanceur parallèle des agents modificateurs d'un cycle.
+Chaque agent déclare les catégories d'entités qu'il lit (CATEGORIES_LUES) et
+modifie (CATEGORIES_ECRITES) ; la ressource "aleatoire" désigne les
+générateurs globaux random et np.random, dont l'ordre de tirage doit être
+conservé. Deux agents sont en conflit si l'un modifie ce que l'autre lit ou
+modifie : à chaque cycle, le graphe des conflits, orienté selon l'ordre série,
+est découpé en vagues d'agents indépendants exécutées dans un pool de threads.
+
+Les ajouts et retraits d'entités restent confinés aux catégories déclarées
+par chaque agent et sont donc appliqués sur place sans course. Le journal des
+paliers, seule structure partagée entre catégories, est tamponné par agent et
+fusionné dans l'ordre série à la barrière de fin de cycle : pour une graine
+fixée, le résultat est identique à l'exécution série.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from etatmonde import EtatMonde
+
+logger = logging.getLogger(__name__)
+
+RESSOURCE_ALEATOIRE = "aleatoire"
+TOUTES_RESSOURCES = "*"
+
+# ========================================================================
+# DÉCLARATIONS ET GRAPHE DE DÉPENDANCES
+# ========================================================================
+
+
+@dataclass(frozen=True)
+class DeclarationAgent:
+    """Ressources lues et modifiées par un agent au cours d'un cycle."""
+
+    lectures: FrozenSet[str]
+    ecritures: FrozenSet[str]
+
+    @classmethod
+    def depuis_agent(cls, agent: object) -> "DeclarationAgent":
+        """Lit la déclaration d'un agent ; sans déclaration, il touche à tout."""
+        lectures = getattr(agent, "CATEGORIES_LUES", None)
+        ecritures = getattr(agent, "CATEGORIES_ECRITES", None)
+        if lectures is None or ecritures is None:
+            return cls(frozenset({TOUTES_RESSOURCES}), frozenset({TOUTES_RESSOURCES}))
+        return cls(frozenset(lectures), frozenset(ecritures))
+
+    def est_en_conflit(self, autre: "DeclarationAgent") -> bool:
+        """Vrai si les deux agents ne peuvent pas s'exécuter simultanément."""
+        if TOUTES_RESSOURCES in self.ecritures | autre.ecritures:
+            return True
+        if TOUTES_RESSOURCES in self.lectures and autre.ecritures:
+            return True
+        if TOUTES_RESSOURCES in autre.lectures and self.ecritures:
+            return True
+        return bool(
+            self.ecritures & (autre.lectures | autre.ecritures)
+            or autre.ecritures & self.lectures
+        )
+
+
+def planifier_vagues(
+    noms_agents: List[str], declarations: Dict[str, DeclarationAgent]
+) -> List[List[str]]:
+    """
+    Découpe une séquence d'agents en vagues exécutables en parallèle.
+
+    Un agent est placé une vague après le plus tardif des agents qui le
+    précèdent dans l'ordre série et avec lesquels il est en conflit : deux
+    agents d'une même vague sont donc toujours indépendants.
+
+    Args:
+        noms_agents: Agents du cycle dans l'ordre série
+        declarations: Déclaration de chaque agent
+
+    Returns:
+        Liste de vagues, chacune dans l'ordre série
+    """
+    niveaux: Dict[str, int] = {}
+    for rang, nom in enumerate(noms_agents):
+        niveaux[nom] = max(
+            (
+                niveaux[precedent] + 1
+                for precedent in noms_agents[:rang]
+                if declarations[precedent].est_en_conflit(declarations[nom])
+            ),
+            default=0,
+        )
+
+    vagues: List[List[str]] = [[] for _ in range(max(niveaux.values(), default=-1) + 1)]
+    for nom in noms_agents:
+        vagues[niveaux[nom]].append(nom)
+    return vagues
+
+
+# ========================================================================
+# JOURNAL DES PALIERS TAMPONNÉ
+# ========================================================================
+
+
+class JournalTamponne(list):
+    """
+    Remplace etatmonde.paliers pendant un cycle parallèle : chaque agent écrit
+    dans son propre tampon et relit le journal commun suivi de ses ajouts.
+
+    Toutes les lectures (itération, len, in, indexation, count, index, copie,
+    comparaison) portent sur cette vue ; les paliers des autres agents du
+    cycle n'apparaissent qu'après fusionner(). Seuls les ajouts (append,
+    extend, +=) sont pris en charge pendant le cycle.
+    """
+
+    def __init__(self, paliers: List[str]):
+        """Part du journal existant, partagé en lecture par tous les agents."""
+        super().__init__(paliers)
+        self._tampons: Dict[str, List[str]] = {}
+        self._local = threading.local()
+
+    def definir_agent(self, nom_agent: Optional[str]) -> None:
+        """Associe le thread courant au tampon d'un agent."""
+        self._local.agent = nom_agent
+        if nom_agent is not None:
+            self._tampons.setdefault(nom_agent, [])
+
+    def _tampon(self) -> Optional[List[str]]:
+        """Tampon de l'agent du thread courant, s'il y en a un."""
+        nom_agent = getattr(self._local, "agent", None)
+        return self._tampons.get(nom_agent) if nom_agent is not None else None
+
+    def _vue(self) -> List[str]:
+        """Journal vu par l'agent courant : paliers communs puis ses ajouts."""
+        return list(super().__iter__()) + list(self._tampon() or ())
+
+    def append(self, palier: str) -> None:
+        """Ajoute un palier au tampon de l'agent courant."""
+        tampon = self._tampon()
+        if tampon is None:
+            super().append(palier)
+        else:
+            tampon.append(palier)
+
+    def extend(self, paliers) -> None:
+        """Ajoute plusieurs paliers au tampon de l'agent courant."""
+        for palier in paliers:
+            self.append(palier)
+
+    def __iadd__(self, paliers):
+        """journal += paliers passe aussi par le tampon de l'agent courant."""
+        self.extend(paliers)
+        return self
+
+    def __iter__(self) -> Iterator[str]:
+        """Parcourt le journal commun puis les ajouts de l'agent courant."""
+        yield from super().__iter__()
+        yield from self._tampon() or ()
+
+    def __reversed__(self) -> Iterator[str]:
+        """Parcourt la vue de l'agent courant à rebours."""
+        return reversed(self._vue())
+
+    def __len__(self) -> int:
+        """Longueur de la vue de l'agent courant."""
+        return super().__len__() + len(self._tampon() or ())
+
+    def __contains__(self, palier) -> bool:
+        """Vrai si le palier est dans le journal commun ou le tampon courant."""
+        return super().__contains__(palier) or palier in (self._tampon() or ())
+
+    def __getitem__(self, indice):
+        """Indexation et découpage sur la vue de l'agent courant."""
+        return self._vue()[indice]
+
+    def __eq__(self, autre) -> bool:
+        """Compare la vue de l'agent courant."""
+        return self._vue() == autre
+
+    def __ne__(self, autre) -> bool:
+        """Négation de __eq__."""
+        return not self == autre
+
+    def __repr__(self) -> str:
+        """Représentation de la vue de l'agent courant."""
+        return repr(self._vue())
+
+    def count(self, palier) -> int:
+        """Occurrences du palier dans la vue de l'agent courant."""
+        return self._vue().count(palier)
+
+    def index(self, palier, *bornes) -> int:
+        """Position du palier dans la vue de l'agent courant."""
+        return self._vue().index(palier, *bornes)
+
+    def copy(self) -> List[str]:
+        """Copie (liste simple) de la vue de l'agent courant."""
+        return self._vue()
+
+    def fusionner(self, ordre: List[str]) -> List[str]:
+        """Journal final : paliers communs puis tampons dans l'ordre série."""
+        paliers = list(super().__iter__())
+        for nom_agent in ordre:
+            paliers.extend(self._tampons.get(nom_agent, ()))
+        return paliers
+
+
+# ========================================================================
+# ORDONNANCEUR
+# ========================================================================
+
+
+class OrdonnanceurAgents:
+    """Exécute les agents d'un cycle par vagues d'agents indépendants."""
+
+    def __init__(self, gestionnaire, nombre_travailleurs: int = 4):
+        """
+        Args:
+            gestionnaire: GestionnaireAgents qui exécute et mesure chaque agent
+            nombre_travailleurs: Taille du pool de threads
+        """
+        self.gestionnaire = gestionnaire
+        self.nombre_travailleurs = max(1, nombre_travailleurs)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._plans: Dict[Tuple[str, ...], List[List[str]]] = {}
+
+    def planifier(self, noms_agents: List[str]) -> List[List[str]]:
+        """Vagues du cycle, mémorisées par séquence d'agents."""
+        cle = tuple(noms_agents)
+        if cle not in self._plans:
+            declarations = {
+                nom: DeclarationAgent.depuis_agent(
+                    self.gestionnaire.agents_charges[nom]
+                )
+                for nom in noms_agents
+            }
+            self._plans[cle] = planifier_vagues(noms_agents, declarations)
+            logger.info(
+                "Plan parallèle : "
+                + " | ".join(", ".join(vague) for vague in self._plans[cle])
+            )
+        return self._plans[cle]
+
+    def executer(self, etatmonde: EtatMonde, noms_agents: List[str]) -> EtatMonde:
+        """
+        Exécute les agents donnés (dans l'ordre série) et retourne l'état final.
+
+        Les vagues d'un seul agent s'exécutent dans le thread appelant, comme
+        en série ; les autres sont réparties sur le pool puis attendues.
+        """
+        vagues = self.planifier(noms_agents)
+        if all(len(vague) == 1 for vague in vagues):
+            for nom_agent in noms_agents:
+                etatmonde = self._executer_un(etatmonde, nom_agent)
+            return etatmonde
+
+        journal = JournalTamponne(etatmonde.paliers)
+        paliers_origine = etatmonde.paliers
+        etatmonde.paliers = journal
+        try:
+            for vague in vagues:
+                if len(vague) == 1:
+                    journal.definir_agent(vague[0])
+                    etatmonde = self._executer_un(etatmonde, vague[0])
+                    journal.definir_agent(None)
+                    continue
+
+                pool = self._obtenir_pool()
+                futurs = [
+                    pool.submit(self._executer_dans_vague, etatmonde, nom, journal)
+                    for nom in vague
+                ]
+                # Barrière : toute la vague est terminée avant la suivante
+                for nom_agent, futur in zip(vague, futurs):
+                    resultat = futur.result()
+                    if resultat is not etatmonde:
+                        logger.warning(
+                            f"Agent '{nom_agent}' a remplacé l'univers pendant une "
+                            "vague parallèle : remplacement ignoré"
+                        )
+        finally:
+            paliers_origine[:] = journal.fusionner(noms_agents)
+            etatmonde.paliers = paliers_origine
+
+        return etatmonde
+
+    def _executer_un(self, etatmonde: EtatMonde, nom_agent: str) -> EtatMonde:
+        """Exécute un agent seul, en adoptant l'état retourné comme en série."""
+        nouvel_etat, succes = self.gestionnaire.executer_agent(nom_agent, etatmonde)
+        return nouvel_etat if succes else etatmonde
+
+    def _executer_dans_vague(
+        self, etatmonde: EtatMonde, nom_agent: str, journal: JournalTamponne
+    ) -> EtatMonde:
+        """Exécute un agent dans un thread du pool."""
+        journal.definir_agent(nom_agent)
+        try:
+            resultat, _ = self.gestionnaire.executer_agent(nom_agent, etatmonde)
+            return resultat
+        finally:
+            journal.definir_agent(None)
+
+    def _obtenir_pool(self) -> ThreadPoolExecutor:
+        """Crée le pool de threads à la première vague parallèle."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.nombre_travailleurs, thread_name_prefix="agent"
+            )
+        return self._pool
+
+    def fermer(self) -> None:
+        """Arrête le pool de threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -12,296 +12,24 @@ et système de récupération automatique des agents.
 import logging
 import time
 import json
-import importlib
-import inspect
 import threading
 from queue import Queue, Full, Empty
-from typing import Dict, Any, List, Optional, Set, Tuple
-from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
 from collections import defaultdict
-from enum import Enum
 
 from PyQt6.QtCore import QObject, pyqtSignal, QMutex, QMutexLocker, pyqtSlot
 
 from etatmonde import EtatMonde
 
-logger = logging.getLogger(__name__)
-
-# ========================================================================
-# CONFIGURATION ET ÉNUMÉRATIONS
-# ========================================================================
-
-
-class EtatAgent(Enum):
-    """États possibles d'un agent."""
-
-    ACTIF = "actif"
-    DESACTIVE = "desactive"
-    EN_ERREUR = "en_erreur"
-    EN_RECOVERY = "en_recovery"
-
-
-@dataclass
-class ConfigurationSimulateur:
-    """Configuration centralisée du simulateur."""
-
-    # Gestion des erreurs
-    seuil_erreurs_max: int = 5
-    cycles_avant_recovery: int = 100
-    recovery_automatique: bool = True
-
-    # Performance
-    limite_entites_performance: int = 20000
-    frequence_nettoyage_cache: int = 1000
-    monitoring_performance: bool = True
-
-    # Modules d'agents
-    modules_agents: List[str] = field(
-        default_factory=lambda: [
-            "agents",
-            "agents_physiques",
-            "agents_complexes",
-            "agents_emergents",
-        ]
-    )
-
-    # Ordre d'exécution des agents
-    ordre_modificateurs: List[str] = field(
-        default_factory=lambda: [
-            "calculateurlois",  # Gravité et mouvement (base physique)
-            "alchimiste",  # Fusion particules → atomes
-            "astrophysicien",  # Formation d'étoiles
-            "chimiste",  # Évolution stellaire et supernovae
-            "planetologue",  # Formation de planètes
-            "biologiste",  # Émergence de la vie
-            "galacticien",  # Structures galactiques
-            "physicienexotique",  # Trous noirs et phénomènes extrêmes
-        ]
-    )
-
-    ordre_analyseurs: List[str] = field(
-        default_factory=lambda: ["evolutif", "analystecosmique"]
-    )
-
-
-@dataclass
-class MetriqueAgent:
-    """Métriques de performance d'un agent."""
-
-    nom: str
-    etat: EtatAgent = EtatAgent.ACTIF
-    executions_totales: int = 0
-    executions_reussies: int = 0
-    erreurs_consecutives: int = 0
-    derniere_execution: float = 0.0
-    temps_execution_total: float = 0.0
-    derniere_erreur: str = ""
-    cycle_derniere_recovery: int = 0
-
-    def temps_execution_moyen(self) -> float:
-        """Calcule le temps d'exécution moyen."""
-        return (
-            self.temps_execution_total / self.executions_totales
-            if self.executions_totales > 0
-            else 0.0
-        )
-
-    def taux_reussite(self) -> float:
-        """Calcule le taux de réussite."""
-        return (
-            self.executions_reussies / self.executions_totales
-            if self.executions_totales > 0
-            else 0.0
-        )
-
-
-# ========================================================================
-# GESTIONNAIRE D'AGENTS ROBUSTE
-# ========================================================================
-
-
-class GestionnaireAgents:
-    """Gère le chargement, l'exécution et la récupération des agents."""
-
-    def __init__(self, config: ConfigurationSimulateur):
-        """TODO: Add docstring."""
-        self.config = config
-        self.agents_charges: Dict[str, Any] = {}
-        self.metriques: Dict[str, MetriqueAgent] = {}
-        self.agents_desactives: Set[str] = set()
-        self.cycle_actuel = 0
-
-    def decouvrir_et_charger_agents(self) -> bool:
-        """
-        Découvre et charge tous les agents des modules spécifiés.
-
-        Returns:
-            bool: True si au moins MaitreTemps est chargé
-        """
-        logger.info("Découverte et chargement des agents...")
-        agents_charges = {}
-
-        for nom_module in self.config.modules_agents:
-            try:
-                module = importlib.import_module(nom_module)
-
-                for nom, cls in inspect.getmembers(module, inspect.isclass):
-                    # Filtrer les classes du module actuel seulement
-                    if cls.__module__ == nom_module and not nom.startswith("_"):
-                        try:
-                            instance = cls()
-                            nom_lower = nom.lower()
-                            agents_charges[nom_lower] = instance
-
-                            # Initialiser les métriques
-                            self.metriques[nom_lower] = MetriqueAgent(nom=nom_lower)
-
-                            logger.info(
-                                f"-> Agent '{nom}' chargé depuis '{nom_module}.py'"
-                            )
-
-                        except Exception as e:
-                            logger.error(
-                                f"Impossible d'instancier l'agent '{nom}': {e}"
-                            )
+# Réexportés pour les modules qui importent la configuration depuis le simulateur
+from gestionnaire_agents import (
+    EtatAgent,
+    ConfigurationSimulateur,
+    MetriqueAgent,
+    GestionnaireAgents,
+)
 
-            except ImportError as e:
-                logger.warning(f"Module '{nom_module}.py' introuvable: {e}")
-            except Exception as e:
-                logger.error(f"Erreur lors du chargement de '{nom_module}.py': {e}")
-
-        self.agents_charges = agents_charges
-
-        # Vérification critique de MaitreTemps
-        if "maitretemps" not in agents_charges:
-            logger.critical("ERREUR CRITIQUE : Agent 'MaitreTemps' introuvable")
-            logger.critical(f"Agents trouvés : {list(agents_charges.keys())}")
-            return False
-
-        logger.info(f"Chargement terminé : {len(agents_charges)} agents disponibles")
-        return True
-
-    def executer_agent(
-        self, nom_agent: str, etatmonde: EtatMonde, **kwargs
-    ) -> Tuple[EtatMonde, bool]:
-        """
-        Exécute un agent avec gestion d'erreurs et métriques.
-
-        Args:
-            nom_agent: Nom de l'agent à exécuter
-            etatmonde: État de l'univers
-            **kwargs: Arguments additionnels pour l'agent
-
-        Returns:
-            Tuple[EtatMonde, bool]: Nouvel état et succès de l'exécution
-        """
-        if nom_agent in self.agents_desactives:
-            return etatmonde, False
-
-        agent = self.agents_charges.get(nom_agent)
-        metrique = self.metriques.get(nom_agent)
-
-        if not agent or not metrique:
-            return etatmonde, False
-
-        # Vérification de récupération automatique
-        if (
-            metrique.etat == EtatAgent.EN_ERREUR
-            and self.config.recovery_automatique
-            and self.cycle_actuel - metrique.cycle_derniere_recovery
-            > self.config.cycles_avant_recovery
-        ):
-
-            logger.info(
-                f"Tentative de récupération automatique pour agent '{nom_agent}'"
-            )
-            metrique.etat = EtatAgent.EN_RECOVERY
-            metrique.erreurs_consecutives = 0
-
-        if metrique.etat == EtatAgent.DESACTIVE:
-            return etatmonde, False
-
-        # Exécution avec métriques
-        temps_debut = time.time()
-        metrique.executions_totales += 1
-
-        try:
-            # Obtenir la méthode correspondante
-            methode = getattr(agent, nom_agent)
-
-            # Exécution selon le type d'agent
-            if nom_agent == "analystecosmique":
-                duree_cycle = kwargs.get("duree_cycle", 0.0)
-                resultat = methode(etatmonde, duree_cycle)
-                etatmonde_retour = etatmonde  # AnalysteCosmique ne modifie pas l'état
-            else:
-                resultat = methode(etatmonde)
-                etatmonde_retour = (
-                    resultat if isinstance(resultat, EtatMonde) else etatmonde
-                )
-
-            # Succès de l'exécution
-            temps_execution = time.time() - temps_debut
-            metrique.executions_reussies += 1
-            metrique.erreurs_consecutives = 0
-            metrique.derniere_execution = temps_execution
-            metrique.temps_execution_total += temps_execution
-
-            if metrique.etat == EtatAgent.EN_RECOVERY:
-                logger.info(f"Agent '{nom_agent}' récupéré avec succès")
-                metrique.etat = EtatAgent.ACTIF
-
-            return etatmonde_retour, True
-
-        except Exception as e:
-            # Gestion d'erreur avec métriques
-            metrique.erreurs_consecutives += 1
-            metrique.derniere_erreur = str(e)
-
-            logger.error(
-                f"Erreur dans l'agent '{nom_agent}' (#{metrique.erreurs_consecutives}): {e}",
-                exc_info=True,
-            )
-
-            # Décision de désactivation
-            if metrique.erreurs_consecutives >= self.config.seuil_erreurs_max:
-                if self.config.recovery_automatique:
-                    metrique.etat = EtatAgent.EN_ERREUR
-                    metrique.cycle_derniere_recovery = self.cycle_actuel
-                    logger.warning(
-                        f"Agent '{nom_agent}' en erreur, récupération programmée dans "
-                        f"{self.config.cycles_avant_recovery} cycles"
-                    )
-                else:
-                    metrique.etat = EtatAgent.DESACTIVE
-                    self.agents_desactives.add(nom_agent)
-                    logger.warning(f"Agent '{nom_agent}' désactivé définitivement")
-
-            return etatmonde, False
-
-    def obtenir_rapport_performance(self) -> Dict[str, Any]:
-        """Génère un rapport de performance des agents."""
-        rapport = {
-            "agents_actifs": len(
-                [m for m in self.metriques.values() if m.etat == EtatAgent.ACTIF]
-            ),
-            "agents_en_erreur": len(
-                [m for m in self.metriques.values() if m.etat == EtatAgent.EN_ERREUR]
-            ),
-            "agents_desactives": len(self.agents_desactives),
-            "metriques_detaillees": {},
-        }
-
-        for nom, metrique in self.metriques.items():
-            rapport["metriques_detaillees"][nom] = {
-                "etat": metrique.etat.value,
-                "executions": metrique.executions_totales,
-                "taux_reussite": metrique.taux_reussite(),
-                "temps_moyen_ms": metrique.temps_execution_moyen() * 1000,
-                "erreurs_consecutives": metrique.erreurs_consecutives,
-            }
-
-        return rapport
+logger = logging.getLogger(__name__)
 
 
 # ========================================================================
@@ -346,6 +74,11 @@ class Simulateur(QObject):
         self._cycle_actuel = 0
         self._arret_demande = threading.Event()
 
+        # Sauvegarde : capture entre deux cycles, écriture en arrière-plan
+        self._sauvegarde_demandee = threading.Event()
+        self._boucle_inactive = threading.Event()
+        self._boucle_inactive.set()
+
         # Métriques de performance
         self.metriques_simulation = {
             "cycles_total": 0,
@@ -385,25 +118,7 @@ class Simulateur(QObject):
 
     def _optimiser_selon_charge(self) -> Dict[str, Any]:
         """Optimise les paramètres selon la charge actuelle."""
-        total_entites = sum(len(cat) for cat in self.etatmonde.entites.values())
-
-        optimisations = {
-            "skip_agents_lourds": False,
-            "frequence_reduite": 1,
-            "limite_calculs": False,
-        }
-
-        if total_entites > self.config.limite_entites_performance:
-            logger.info(f"Optimisation activée pour {total_entites} entités")
-            optimisations.update(
-                {
-                    "skip_agents_lourds": True,
-                    "frequence_reduite": 3,  # Exécuter 1 cycle sur 3 pour agents lourds
-                    "limite_calculs": True,
-                }
-            )
-
-        return optimisations
+        return self.gestionnaire_agents.evaluer_charge(self.etatmonde)
 
     @pyqtSlot()
     def lancerboucle(self):
@@ -416,13 +131,26 @@ class Simulateur(QObject):
             return
 
         logger.info("Démarrage de la boucle de simulation robuste")
+        self._boucle_inactive.clear()
+        try:
+            self._executer_boucle()
+        finally:
+            # Une demande arrivée pendant l'arrêt est servie avant de rendre la main
+            if self._sauvegarde_demandee.is_set():
+                self._effectuer_sauvegarde()
+            self._boucle_inactive.set()
 
+    def _executer_boucle(self) -> None:
+        """Enchaîne les tours de simulation jusqu'à l'arrêt."""
         while self._en_marche and not self._arret_demande.is_set():
             # Vérification état et récupération des paramètres thread-safe
             with QMutexLocker(self._mutex):
                 en_pause = self._en_pause
                 cycles_a_calculer = self._multiplicateur_cycle
 
+            if self._sauvegarde_demandee.is_set():
+                self._effectuer_sauvegarde()
+
             if en_pause:
                 time.sleep(0.1)
                 continue
@@ -433,11 +161,10 @@ class Simulateur(QObject):
             # Mise à jour du cycle pour recovery
             self.gestionnaire_agents.cycle_actuel = self._cycle_actuel
 
-            # Exécution des cycles de calcul
+            # Exécution des cycles de calcul (MaitreTemps puis modificateurs)
             for cycle_idx in range(cycles_a_calculer):
-                # 1. Avancement temporel (toujours en premier)
-                nouvel_etat, succes = self.gestionnaire_agents.executer_agent(
-                    "maitretemps", self.etatmonde
+                nouvel_etat, succes = self.gestionnaire_agents.executer_cycle(
+                    self.etatmonde, cycle_idx, optimisations
                 )
                 if succes:
                     self.etatmonde = nouvel_etat
@@ -447,24 +174,6 @@ class Simulateur(QObject):
                     self._en_marche = False
                     break
 
-                # 2. Agents modificateurs dans l'ordre d'émergence
-                for nom_agent in self.config.ordre_modificateurs:
-                    if nom_agent not in self.gestionnaire_agents.agents_charges:
-                        continue
-
-                    # Optimisation : skip agents lourds selon charge
-                    if optimisations["skip_agents_lourds"] and nom_agent in [
-                        "galacticien"
-                    ]:
-                        if cycle_idx % optimisations["frequence_reduite"] != 0:
-                            continue
-
-                    nouvel_etat, succes = self.gestionnaire_agents.executer_agent(
-                        nom_agent, self.etatmonde
-                    )
-                    if succes:
-                        self.etatmonde = nouvel_etat
-
             duree_calcul_total = time.time() - temps_debut_tour
 
             # 3. Exécution des agents d'analyse
@@ -487,19 +196,25 @@ class Simulateur(QObject):
                 # Gestion spéciale pour AnalysteCosmique
                 if succes and nom_agent == "analystecosmique":
                     try:
-                        # resultat contient les données JSON pour l'interface
-                        json_data = json.dumps(resultat)
+                        # resultat est une trame binaire (ou un dict JSON hérité)
+                        donnees = (
+                            resultat
+                            if isinstance(resultat, (bytes, bytearray))
+                            else json.dumps(resultat)
+                        )
 
                         # Gestion optimisée de la queue
                         try:
-                            self.file_etats.put_nowait(json_data)
+                            self.file_etats.put_nowait(donnees)
                         except Full:
-                            # Queue pleine : retirer ancien état et ajouter nouveau
+                            # Queue pleine : retirer ancien état et ajouter nouveau ;
+                            # la trame perdue impose une image clé au prochain envoi
                             try:
                                 self.file_etats.get_nowait()
-                                self.file_etats.put_nowait(json_data)
+                                self.file_etats.put_nowait(donnees)
                             except Empty:
                                 pass  # Queue vidée entre temps
+                            self.demander_image_cle()
 
                     except (TypeError, ValueError) as e:
                         logger.error(f"Erreur sérialisation JSON AnalysteCosmique: {e}")
@@ -545,14 +260,22 @@ class Simulateur(QObject):
 
         self._arret_demande.set()
 
-        # Nettoyage des pools de processus
-        for nom_agent, agent in self.gestionnaire_agents.agents_charges.items():
-            if hasattr(agent, "fermer_pool"):
-                try:
-                    agent.fermer_pool()
-                    logger.debug(f"Pool de {nom_agent} fermé")
-                except Exception as e:
-                    logger.warning(f"Erreur fermeture pool {nom_agent}: {e}")
+        # Nettoyage des pools de processus et de threads
+        self.gestionnaire_agents.fermer()
+
+    @pyqtSlot()
+    def demander_image_cle(self):
+        """La prochaine trame envoyée à l'interface sera une image clé."""
+        analyste = self.gestionnaire_agents.agents_charges.get("analystecosmique")
+        if hasattr(analyste, "encodeur"):
+            analyste.encodeur.forcer_image_cle()
+
+    @pyqtSlot(str)
+    def suivre_entite(self, entite_id: str):
+        """Joint aux trames la fiche complète de l'entité sélectionnée."""
+        analyste = self.gestionnaire_agents.agents_charges.get("analystecosmique")
+        if hasattr(analyste, "encodeur"):
+            analyste.encodeur.suivre_entite(entite_id)
 
     @pyqtSlot()
     def mettre_en_pause(self):
@@ -592,50 +315,62 @@ class Simulateur(QObject):
 
     @pyqtSlot()
     def sauvegarder_maintenant(self):
-        """Sauvegarde manuelle avec pause temporaire et feedback détaillé."""
+        """
+        Sauvegarde manuelle sans interrompre la simulation : l'univers est
+        capturé par la boucle entre deux tours puis écrit en arrière-plan.
+        Une fois la boucle arrêtée (fermeture), la capture est faite ici et
+        l'écriture attendue.
+        """
         logger.info("Sauvegarde manuelle demandée...")
 
-        # Pause temporaire thread-safe
-        with QMutexLocker(self._mutex):
-            en_pause_avant = self._en_pause
-            self._en_pause = True
+        if not self._arret_demande.is_set() and not self._boucle_inactive.is_set():
+            self._sauvegarde_demandee.set()
+            return
+
+        if not self._boucle_inactive.wait(timeout=5.0):
+            logger.warning("Boucle de simulation toujours active, sauvegarde risquée")
+        self._effectuer_sauvegarde(attendre=True)
 
-        # Attente stabilisation
-        time.sleep(0.2)
+    def _effectuer_sauvegarde(self, attendre: bool = False) -> None:
+        """Capture l'univers pour l'Archiviste, hors de tout calcul d'agent."""
+        self._sauvegarde_demandee.clear()
 
         try:
             archiviste = self.gestionnaire_agents.agents_charges.get("archiviste")
-            if archiviste:
-                # Tentative de sauvegarde avec métriques
-                temps_debut = time.time()
-                succes = archiviste.archiviste(self.etatmonde, "sauvegarder")
-                duree_sauvegarde = time.time() - temps_debut
+            if not archiviste:
+                message = "Agent Archiviste non disponible"
+                logger.error(message)
+                self.sauvegardeEffectuee.emit(False, message)
+                return
 
-                if succes:
-                    message = (
-                        f"Univers sauvegardé avec succès au Temps: {self.etatmonde.temps} "
-                        f"({duree_sauvegarde:.2f}s, {len(self.etatmonde._index_entites)} entités)"
-                    )
-                    logger.info(message)
-                else:
-                    message = "Échec de la sauvegarde (vérifiez l'espace disque)"
-                    logger.error(message)
+            temps_debut = time.time()
+            succes = archiviste.archiviste(
+                self.etatmonde, "sauvegarder", rappel=self._sauvegarde_terminee
+            )
+            duree_capture = time.time() - temps_debut
 
-                self.sauvegardeEffectuee.emit(succes, message)
-            else:
-                message = "Agent Archiviste non disponible"
+            if not succes:
+                message = "Échec de la capture de l'univers"
                 logger.error(message)
                 self.sauvegardeEffectuee.emit(False, message)
+                return
+
+            logger.debug(f"Univers capturé en {duree_capture:.3f}s")
+            if attendre:
+                archiviste.archiviste(instruction="attendre_sauvegardes")
 
         except Exception as e:
             message = f"Erreur inattendue lors de la sauvegarde : {e}"
             logger.error(message)
             self.sauvegardeEffectuee.emit(False, message)
 
-        finally:
-            # Restauration de l'état de pause
-            with QMutexLocker(self._mutex):
-                self._en_pause = en_pause_avant
+    def _sauvegarde_terminee(self, succes: bool, message: str) -> None:
+        """Rappel du thread d'écriture : relaie le résultat à l'interface."""
+        if succes:
+            message = f"Univers sauvegardé avec succès - {message}"
+        else:
+            message = message or "Échec de la sauvegarde (vérifiez l'espace disque)"
+        self.sauvegardeEffectuee.emit(succes, message)
 
     @pyqtSlot()
     def obtenir_etat_simulation(self) -> Dict[str, Any]:
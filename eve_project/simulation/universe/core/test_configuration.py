@@ -171,6 +171,828 @@ def tester_cycle_simulation() -> bool:
         return False
 
 
+def tester_noyau_forces_direct(
+    tailles: Tuple[int, ...] = (1000, 4000, 16000), graine: int = 42
+) -> Dict[str, Any]:
+    """Compare le noyau direct tuilé aux calculs parallèles (éphémère et persistant)."""
+    print("\n=== BANC D'ESSAI DU NOYAU DIRECT TUILÉ ===")
+
+    import numpy as np
+    from agents_physiques import (
+        CalculateurForcesGravitationnelles,
+        ConfigurationPhysique,
+        _PoolForcesPartage,
+    )
+
+    generateur = np.random.default_rng(graine)
+    config = ConfigurationPhysique()
+    calculateur = CalculateurForcesGravitationnelles(config)
+    pool_persistant = _PoolForcesPartage(config.max_processus)
+    resultats: Dict[str, Any] = {"succes": True, "mesures": []}
+
+    for n in tailles:
+        positions = generateur.normal(0.0, 50.0, (n, 3))
+        masses = generateur.uniform(0.1, 5.0, n)
+
+        debut = time.perf_counter()
+        forces_tuilees = calculateur._calculer_forces_sequentiel(positions, masses, 1.0)
+        temps_tuile = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        forces_paralleles = calculateur._calculer_forces_parallele(
+            positions, masses, 1.0
+        )
+        temps_parallele = time.perf_counter() - debut
+
+        # Pool persistant mesuré à chaud (processus et tampons déjà en place)
+        pool_persistant.calculer_forces(positions, masses, 1.0)
+        debut = time.perf_counter()
+        forces_persistantes = pool_persistant.calculer_forces(positions, masses, 1.0)
+        temps_persistant = time.perf_counter() - debut
+
+        echelle = max(float(np.max(np.abs(forces_tuilees))), 1e-30)
+        ecart = (
+            max(
+                float(np.max(np.abs(forces_tuilees - forces_paralleles))),
+                float(np.max(np.abs(forces_tuilees - forces_persistantes))),
+            )
+            / echelle
+        )
+        mesure = {
+            "n": n,
+            "temps_tuile_s": round(temps_tuile, 4),
+            "temps_parallele_s": round(temps_parallele, 4),
+            "temps_pool_persistant_s": round(temps_persistant, 4),
+            "acceleration": round(temps_parallele / max(temps_tuile, 1e-9), 2),
+            "ecart_relatif_max": ecart,
+        }
+        resultats["mesures"].append(mesure)
+
+        if ecart > 1e-9:
+            resultats["succes"] = False
+
+        print(
+            f"{'✓' if ecart <= 1e-9 else '✗'} N={n:<7} tuilé {temps_tuile:7.3f}s | "
+            f"parallèle {temps_parallele:7.3f}s (x{mesure['acceleration']:<6}) | "
+            f"pool persistant {temps_persistant:7.3f}s | écart relatif max {ecart:.1e}"
+        )
+
+    pool_persistant.fermer()
+    return resultats
+
+
+def tester_solveurs_gravitation(
+    tailles: Tuple[int, ...] = (1000, 4000, 16000),
+    thetas: Tuple[float, ...] = (0.3, 0.5, 0.8),
+    graine: int = 42,
+) -> Dict[str, Any]:
+    """Compare Barnes-Hut au calcul direct : précision et débit."""
+    print("\n=== BANC D'ESSAI DES SOLVEURS GRAVITATIONNELS ===")
+
+    import numpy as np
+    from agents_physiques import (
+        CalculateurForcesGravitationnelles,
+        ConfigurationPhysique,
+    )
+
+    generateur = np.random.default_rng(graine)
+    config = ConfigurationPhysique()
+    calculateur = CalculateurForcesGravitationnelles(config)
+    resultats: Dict[str, Any] = {"succes": True, "mesures": []}
+
+    for n in tailles:
+        # Amas dense au sein d'un halo diffus pour solliciter l'octree
+        positions = generateur.normal(0.0, 50.0, (n, 3))
+        positions[: n // 3] *= 0.1
+        masses = generateur.uniform(0.1, 5.0, n)
+
+        debut = time.perf_counter()
+        forces_directes = calculateur._calculer_forces_sequentiel(
+            positions, masses, 1.0
+        )
+        temps_direct = time.perf_counter() - debut
+        normes = np.maximum(np.linalg.norm(forces_directes, axis=1), 1e-30)
+
+        for theta in thetas:
+            config.theta_barnes_hut = theta
+            debut = time.perf_counter()
+            forces_bh = calculateur._calculer_forces_barnes_hut(positions, masses, 1.0)
+            temps_bh = time.perf_counter() - debut
+
+            erreurs = np.linalg.norm(forces_bh - forces_directes, axis=1) / normes
+            mesure = {
+                "n": n,
+                "theta": theta,
+                "temps_direct_s": round(temps_direct, 4),
+                "temps_barnes_hut_s": round(temps_bh, 4),
+                "acceleration": round(temps_direct / max(temps_bh, 1e-9), 2),
+                "erreur_mediane": float(np.median(erreurs)),
+                "erreur_p99": float(np.quantile(erreurs, 0.99)),
+            }
+            resultats["mesures"].append(mesure)
+
+            if not np.all(np.isfinite(forces_bh)) or mesure["erreur_p99"] > 0.1:
+                resultats["succes"] = False
+
+            print(
+                f"{'✓' if mesure['erreur_p99'] <= 0.1 else '✗'} N={n:<7} θ={theta:<4} "
+                f"direct {temps_direct:7.3f}s | Barnes-Hut {temps_bh:7.3f}s "
+                f"(x{mesure['acceleration']:<6}) | erreur médiane "
+                f"{mesure['erreur_mediane']:.1e}, p99 {mesure['erreur_p99']:.1e}"
+            )
+
+    return resultats
+
+
+def tester_flux_trames(
+    tailles: Tuple[int, ...] = (5000, 20000), graine: int = 42
+) -> Dict[str, Any]:
+    """Compare le flux de trames binaires à l'ancienne sérialisation JSON."""
+    print("\n=== BANC D'ESSAI DU FLUX DE TRAMES ===")
+
+    import numpy as np
+    from etatmonde import EtatMonde, Particule
+    from trames import DecodeurTrames, EncodeurTrames
+
+    generateur = np.random.default_rng(graine)
+    resultats: Dict[str, Any] = {"succes": True, "mesures": []}
+
+    for n in tailles:
+        etatmonde = EtatMonde()
+        etatmonde.entites["particules"] = [
+            Particule(
+                masse=float(generateur.uniform(0.1, 5.0)),
+                position=generateur.normal(0.0, 50.0, 3),
+                vecteur=generateur.normal(0.0, 1.0, 3),
+            )
+            for _ in range(n)
+        ]
+        encodeur = EncodeurTrames()
+        decodeur = DecodeurTrames()
+
+        debut = time.perf_counter()
+        image_cle = encodeur.encoder(etatmonde, (0.0, 0.0, 0.0), 100.0)
+        temps_image_cle = time.perf_counter() - debut
+
+        # Seule une particule sur vingt bouge entre deux trames
+        for particule in etatmonde.entites["particules"][::20]:
+            particule.position = particule.position + 1.0
+        debut = time.perf_counter()
+        delta = encodeur.encoder(etatmonde, (0.0, 0.0, 0.0), 100.0)
+        temps_delta = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        decodeur.appliquer(image_cle)
+        decodeur.appliquer(delta)
+        temps_decodage = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        texte_json = json.dumps(
+            [
+                {
+                    "id": str(p.id),
+                    "position": p.position.tolist(),
+                    "masse": p.masse,
+                }
+                for p in etatmonde.entites["particules"]
+            ]
+        )
+        temps_json = time.perf_counter() - debut
+
+        coherent = np.array_equal(
+            decodeur.categories["particules"].positions,
+            encodeur._envoye["particules"].positions,
+        )
+        mesure = {
+            "n": n,
+            "temps_image_cle_s": round(temps_image_cle, 4),
+            "temps_delta_s": round(temps_delta, 4),
+            "temps_decodage_s": round(temps_decodage, 4),
+            "temps_json_s": round(temps_json, 4),
+            "octets_image_cle": len(image_cle),
+            "octets_delta": len(delta),
+            "octets_json": len(texte_json),
+        }
+        resultats["mesures"].append(mesure)
+
+        if not coherent:
+            resultats["succes"] = False
+
+        print(
+            f"{'✓' if coherent else '✗'} N={n:<7} image clé {temps_image_cle:6.3f}s "
+            f"({len(image_cle) / 1e6:.2f} Mo) | delta {temps_delta:6.3f}s "
+            f"({len(delta) / 1e6:.2f} Mo) | décodage {temps_decodage:6.3f}s | "
+            f"JSON {temps_json:6.3f}s ({len(texte_json) / 1e6:.2f} Mo)"
+        )
+
+    return resultats
+
+
+_APPLICATION_QT: Any = None
+
+
+def _application_qt() -> Any:
+    """Application Qt hors écran (QT_QPA_PLATFORM=offscreen), partagée par les tests d'interface."""
+    import os
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    global _APPLICATION_QT
+    if QApplication.instance() is None:
+        # Gardée en vie pour toute la session
+        _APPLICATION_QT = QApplication(sys.argv[:1])
+    return QApplication.instance()
+
+
+def _entites_affichees(gestionnaire_scene: Any) -> Dict[bytes, Tuple[float, float]]:
+    """Position affichée de chaque entité, qu'elle soit dessinée par un calque ou par un item."""
+    affichees: Dict[bytes, Tuple[float, float]] = {}
+    for calque in gestionnaire_scene.calques.values():
+        for identifiant, position in zip(
+            calque.identifiants.tolist(), calque.positions.tolist()
+        ):
+            affichees[identifiant] = (position[0], position[1])
+    for identifiant, entite_id in gestionnaire_scene.identifiants_texte.items():
+        position = gestionnaire_scene.items_graphiques[entite_id].pos()
+        affichees[identifiant] = (position.x(), position.y())
+    return affichees
+
+
+def tester_fenetre_trames(n: int = 3000, graine: int = 42) -> Dict[str, Any]:
+    """Pousse une image clé puis un delta dans FenetrePrincipale, hors écran."""
+    print("\n=== FENÊTRE PRINCIPALE (HORS ÉCRAN) ===")
+
+    import numpy as np
+    from etatmonde import EtatMonde, Particule
+    from trames import EncodeurTrames
+
+    generateur = np.random.default_rng(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    try:
+        _application_qt()
+        from interface import FenetrePrincipale
+
+        etatmonde = EtatMonde()
+        for _ in range(n):
+            etatmonde.ajouter_entite(
+                Particule(
+                    masse=float(generateur.uniform(0.1, 5.0)),
+                    position=generateur.normal(0.0, 50.0, 3),
+                    vecteur=generateur.normal(0.0, 1.0, 3),
+                )
+            )
+        encodeur = EncodeurTrames()
+        fenetre = FenetrePrincipale()
+        images_cles_demandees: List[bool] = []
+        fenetre.image_cle_demandee.connect(lambda: images_cles_demandees.append(True))
+
+        if fenetre.gestionnaire_scene is None:
+            resultats["erreurs"].append(
+                "gestionnaire_scene remis à None après création"
+            )
+        else:
+            # Image clé, puis delta : une particule sur vingt bouge, une sur cent disparaît
+            trames = [encodeur.encoder(etatmonde, (0.0, 0.0, 0.0), 100.0)]
+            particules = etatmonde.entites["particules"]
+            for particule in particules[::20]:
+                particule.position = particule.position + 1.0
+            for particule in particules[::100]:
+                etatmonde.supprimer_entite(particule)
+            trames.append(encodeur.encoder(etatmonde, (0.0, 0.0, 0.0), 100.0))
+
+            for trame in trames:
+                fenetre.appliquer_trames([trame])
+                fenetre.gestionnaire_scene._rafraichir()  # Tick du timer d'affichage
+
+            envoye = encodeur._envoye["particules"]
+            attendues = dict(
+                zip(envoye.identifiants.tolist(), envoye.positions[:, :2].tolist())
+            )
+            affichees = _entites_affichees(fenetre.gestionnaire_scene)
+            if affichees.keys() != attendues.keys():
+                resultats["erreurs"].append(
+                    f"{len(affichees)} entités affichées pour {len(attendues)} envoyées"
+                )
+            elif any(
+                not np.allclose(affichees[identifiant], position)
+                for identifiant, position in attendues.items()
+            ):
+                resultats["erreurs"].append("Positions affichées différentes du flux")
+            if images_cles_demandees:
+                resultats["erreurs"].append("Image clé redemandée pendant le delta")
+        fenetre.close()
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    resultats["succes"] = not resultats["erreurs"]
+    for erreur in resultats["erreurs"]:
+        print(f"✗ {erreur}")
+    if resultats["succes"]:
+        print("✓ Image clé et delta affichés à l'identique du flux")
+    return resultats
+
+
+def tester_rendu_niveaux_detail(graine: int = 42) -> Dict[str, Any]:
+    """
+    Vérifie hors écran le niveau de détail de GestionnaireScene : tuiles de
+    densité et groupes de sprites contre un calcul entité par entité, puis
+    répartition calques / items interactifs et chemin de rendu selon le zoom.
+    """
+    print("\n=== RENDU À NIVEAUX DE DÉTAIL (HORS ÉCRAN) ===")
+
+    import math
+    import numpy as np
+    from etatmonde import EtatMonde, Etoile, Particule
+    from trames import (
+        DecodeurTrames,
+        EncodeurTrames,
+        grouper_sprites,
+        rasteriser_densite,
+    )
+
+    generateur = np.random.default_rng(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": [], "chemins": {}}
+
+    try:
+        _application_qt()
+        from PyQt6.QtCore import QObject
+        from PyQt6.QtGui import QImage, QPainter
+        from PyQt6.QtWidgets import QGraphicsScene
+        from interface import ConstantesInterface, GestionnaireScene, VueInteractive
+
+        # 1. Tuiles de densité : moyenne des couleurs et opacité par tuile
+        positions = generateur.normal(0.0, 20.0, (5000, 2))
+        couleurs = generateur.integers(0, 256, (5000, 4), dtype=np.uint8)
+        origine, taille_tuile, largeur, hauteur = (-40.0, -30.0), 2.5, 32, 24
+        tuiles = rasteriser_densite(
+            positions, couleurs, origine, taille_tuile, largeur, hauteur
+        )
+        sommes = np.zeros((hauteur, largeur, 4))
+        comptes = np.zeros((hauteur, largeur), dtype=np.int64)
+        for (x, y), couleur in zip(positions.tolist(), couleurs.tolist()):
+            colonne = math.floor((x - origine[0]) / taille_tuile)
+            ligne = math.floor((y - origine[1]) / taille_tuile)
+            if 0 <= colonne < largeur and 0 <= ligne < hauteur:
+                sommes[ligne, colonne] += couleur
+                comptes[ligne, colonne] += 1
+        attendu = np.zeros((hauteur, largeur, 4), dtype=np.uint8)
+        for ligne, colonne in zip(*np.nonzero(comptes)):
+            compte = comptes[ligne, colonne]
+            moyenne = (sommes[ligne, colonne] / compte).astype(np.uint8)
+            opacite = 0.35 + 0.65 * min(math.log1p(compte) / math.log1p(64), 1.0)
+            attendu[ligne, colonne] = (*moyenne[:3], int(moyenne[3] * opacite))
+        if np.abs(tuiles.astype(np.int64) - attendu).max() > 1:
+            resultats["erreurs"].append(
+                "Tuiles de densité différentes du calcul direct"
+            )
+
+        # 2. Groupes de sprites : partition par (couleur, taille arrondie)
+        palette = np.array([(255, 0, 0, 255), (0, 255, 0, 128), (9, 9, 9, 9)])
+        couleurs = palette[generateur.integers(0, 3, 4000)].astype(np.uint8)
+        tailles = generateur.uniform(1.0, 6.0, 4000).astype(np.float32)
+        pas = ConstantesInterface.PAS_TAILLE_SPRITE
+        groupes = grouper_sprites(couleurs, tailles, pas)
+        indices = np.concatenate([groupe[2] for groupe in groupes])
+        cles = [(couleur, taille) for couleur, taille, _ in groupes]
+        if sorted(indices.tolist()) != list(range(4000)) or len(set(cles)) != len(cles):
+            resultats["erreurs"].append("Groupes de sprites qui ne partitionnent pas")
+        for couleur, taille, membres in groupes:
+            if np.any(couleurs[membres] != couleur) or np.any(
+                np.round(tailles[membres] / pas) * pas != taille
+            ):
+                resultats["erreurs"].append(f"Groupe {couleur}/{taille} hétérogène")
+                break
+
+        # 3. Scène complète à trois niveaux de zoom
+        etatmonde = EtatMonde()
+        for _ in range(12000):
+            etatmonde.ajouter_entite(
+                Particule(
+                    masse=float(generateur.uniform(0.1, 5.0)),
+                    position=generateur.normal(0.0, 50.0, 3),
+                    vecteur=np.zeros(3),
+                )
+            )
+        for _ in range(300):
+            etatmonde.ajouter_entite(
+                Etoile(
+                    masse=float(10 ** generateur.uniform(0.0, 6.0)),
+                    position=generateur.normal(0.0, 50.0, 3),
+                    vecteur=np.zeros(3),
+                    type="etoile_jeune",
+                    temperature=float(generateur.uniform(3000.0, 20000.0)),
+                    luminosite=1.0,
+                )
+            )
+        decodeur = DecodeurTrames()
+        modifications = decodeur.appliquer(
+            EncodeurTrames().encoder(etatmonde, (0.0, 0.0, 0.0), 150.0)
+        )
+
+        scene = QGraphicsScene()
+        vue = VueInteractive(scene, QObject())
+        vue.resize(800, 600)
+        gestionnaire = GestionnaireScene(scene, vue)
+        gestionnaire.timer_rafraichissement.stop()  # Ticks déclenchés à la main
+        gestionnaire.appliquer_modifications(decodeur, modifications)
+        gestionnaire._rafraichir()
+
+        # Chemins de rendu empruntés par les calques (densité ou sprites)
+        chemins: List[str] = []
+
+        def tracer(calque: Any, chemin: str) -> None:
+            methode = getattr(calque, chemin)
+
+            def methode_tracee(*args: Any) -> None:
+                chemins.append(chemin)
+                methode(*args)
+
+            setattr(calque, chemin, methode_tracee)
+
+        for calque in gestionnaire.calques.values():
+            tracer(calque, "_peindre_densite")
+            tracer(calque, "_peindre_sprites")
+
+        tous = {
+            identifiant
+            for categorie in decodeur.categories.values()
+            for identifiant in categorie.identifiants.tolist()
+        }
+        for zoom, chemin_attendu in (
+            (0.3, "_peindre_densite"),
+            (3.0, "_peindre_sprites"),
+            (40.0, None),
+        ):
+            vue.resetTransform()
+            vue.scale(zoom, zoom)
+            vue.centerOn(0.0, 0.0)
+            gestionnaire.signaler_vue_modifiee()
+            gestionnaire._rafraichir()
+
+            # Items interactifs attendus : visibles et assez grands à l'écran
+            zone = vue.mapToScene(vue.viewport().rect()).boundingRect()
+            interactifs_attendus = set()
+            for categorie in decodeur.categories.values():
+                for identifiant, (x, y, _), taille in zip(
+                    categorie.identifiants.tolist(),
+                    categorie.positions.tolist(),
+                    categorie.tailles.tolist(),
+                ):
+                    if (
+                        zone.left() <= x <= zone.right()
+                        and zone.top() <= y <= zone.bottom()
+                        and taille * zoom
+                        >= ConstantesInterface.TAILLE_PIXELS_INTERACTIF
+                    ):
+                        interactifs_attendus.add(identifiant)
+            if len(interactifs_attendus) > ConstantesInterface.MAX_ITEMS_INTERACTIFS:
+                interactifs_attendus = set()
+            interactifs = set(gestionnaire.identifiants_texte)
+            dans_calques = [
+                identifiant
+                for calque in gestionnaire.calques.values()
+                for identifiant in calque.identifiants.tolist()
+            ]
+            if interactifs != interactifs_attendus:
+                resultats["erreurs"].append(
+                    f"Zoom {zoom}: {len(interactifs)} items interactifs "
+                    f"pour {len(interactifs_attendus)} attendus"
+                )
+            if (
+                len(dans_calques) + len(interactifs) != len(tous)
+                or set(dans_calques) | interactifs != tous
+            ):
+                resultats["erreurs"].append(
+                    f"Zoom {zoom}: calques et items ne couvrent pas chaque entité une fois"
+                )
+
+            # Rendu hors écran : le calque des particules choisit son chemin
+            chemins.clear()
+            image = QImage(vue.viewport().size(), QImage.Format.Format_ARGB32)
+            image.fill(0)
+            peintre = QPainter(image)
+            vue.render(peintre)
+            peintre.end()
+            resultats["chemins"][zoom] = sorted(set(chemins))
+            if chemin_attendu is not None and chemin_attendu not in chemins:
+                resultats["erreurs"].append(
+                    f"Zoom {zoom}: {chemin_attendu} attendu, chemins {sorted(set(chemins))}"
+                )
+            if chemin_attendu is None and not interactifs:
+                resultats["erreurs"].append(f"Zoom {zoom}: aucun item interactif")
+            print(
+                f"  zoom {zoom:<5} | {len(interactifs):>5} items | "
+                f"{len(dans_calques):>6} dans les calques | "
+                f"{', '.join(sorted(set(chemins))) or 'aucun calque peint'}"
+            )
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    resultats["succes"] = not resultats["erreurs"]
+    for erreur in resultats["erreurs"]:
+        print(f"✗ {erreur}")
+    if resultats["succes"]:
+        print("✓ Densité, sprites et items interactifs cohérents à chaque zoom")
+    return resultats
+
+
+def tester_stockage_colonnaire(graine: int = 42) -> Dict[str, Any]:
+    """Vérifie le stockage colonnaire après retrait, compaction puis ajout."""
+    print("\n=== STOCKAGE COLONNAIRE ===")
+
+    import numpy as np
+    from etatmonde import EtatMonde, Particule
+
+    generateur = np.random.default_rng(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    def nouvelle_particule() -> Particule:
+        return Particule(
+            masse=float(generateur.uniform(0.1, 5.0)),
+            position=generateur.normal(0.0, 50.0, 3),
+            vecteur=generateur.normal(0.0, 1.0, 3),
+        )
+
+    try:
+        etatmonde = EtatMonde()
+        particules = [nouvelle_particule() for _ in range(10)]
+        for particule in particules:
+            etatmonde.ajouter_entite(particule)
+        etatmonde.supprimer_entite(particules[0])
+        etatmonde.supprimer_entite(particules[5])
+
+        # Compaction, puis allocation de lignes au-delà de l'ancienne fin
+        colonnes = etatmonde.obtenir_colonnes("particules")
+        if len(colonnes.entites) != colonnes.capacite:
+            resultats["erreurs"].append(
+                f"{len(colonnes.entites)} entrées entite pour une capacité "
+                f"de {colonnes.capacite}"
+            )
+        for _ in range(5):
+            etatmonde.ajouter_entite(nouvelle_particule())
+
+        colonnes = etatmonde.obtenir_colonnes("particules")
+        restantes = etatmonde.entites["particules"]
+        if len(restantes) != 13 or colonnes.n_lignes != 13:
+            resultats["erreurs"].append(
+                f"{len(restantes)} particules, {colonnes.n_lignes} lignes (13 attendues)"
+            )
+        for ligne, entite in enumerate(colonnes.entites[: colonnes.n_lignes]):
+            if not np.array_equal(colonnes.positions[ligne], entite.position):
+                resultats["erreurs"].append(f"Ligne {ligne} désynchronisée")
+                break
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    resultats["succes"] = not resultats["erreurs"]
+    for erreur in resultats["erreurs"]:
+        print(f"✗ {erreur}")
+    if resultats["succes"]:
+        print("✓ Retrait → compaction → ajout cohérent")
+    return resultats
+
+
+def tester_index_spatial(n: int = 2000, graine: int = 42) -> Dict[str, Any]:
+    """
+    Compare les requêtes de l'index spatial partagé à la force brute, avec
+    cKDTree puis avec le repli NumPy par blocs, et vérifie son invalidation.
+    """
+    print("\n=== INDEX SPATIAL PARTAGÉ ===")
+
+    import numpy as np
+    import etatmonde as module_etatmonde
+    from etatmonde import EtatMonde, Etoile, Particule
+
+    generateur = np.random.default_rng(graine)
+    resultats: Dict[str, Any] = {"succes": True, "erreurs": []}
+
+    def verifier_requetes(etat: EtatMonde, mode: str) -> None:
+        index = etat.obtenir_index_spatial("particules")
+        positions = index.positions
+        centres = generateur.normal(0.0, 50.0, (40, 3))
+        carres = ((centres[:, None, :] - positions[None, :, :]) ** 2).sum(axis=2)
+
+        for centre, ligne in zip(centres[:10], carres):
+            attendus = np.flatnonzero(ligne <= 15.0**2)
+            if not np.array_equal(index.dans_rayon(centre, 15.0), attendus):
+                resultats["erreurs"].append(f"{mode} : dans_rayon incorrect")
+                break
+
+        distances, indices = index.plus_proches(centres, k=1)
+        if not np.array_equal(indices, carres.argmin(axis=1)) or not np.allclose(
+            distances, np.sqrt(carres.min(axis=1))
+        ):
+            resultats["erreurs"].append(f"{mode} : plus_proches (k=1) incorrect")
+        distances, indices = index.plus_proches(centres, k=7)
+        if not np.array_equal(
+            indices, np.argsort(carres, axis=1)[:, :7]
+        ) or not np.allclose(distances, np.sqrt(np.sort(carres, axis=1)[:, :7])):
+            resultats["erreurs"].append(f"{mode} : plus_proches (k=7) incorrect")
+
+        ecarts = positions[:, None, :] - positions[None, :, :]
+        i, j = np.nonzero(np.einsum("ijk,ijk->ij", ecarts, ecarts) <= 4.0**2)
+        attendues = {(a, b) for a, b in zip(i.tolist(), j.tolist()) if a < b}
+        paires = index.paires(4.0)
+        if paires.shape[1:] != (2,) or set(map(tuple, paires.tolist())) != attendues:
+            resultats["erreurs"].append(f"{mode} : paires incorrectes")
+
+        # k plus proches toutes catégories confondues
+        centre = centres[0]
+        entites = etat.entites["particules"] + etat.entites["etoiles"]
+        attendues = sorted(
+            entites, key=lambda e: float(np.sum((e.position - centre) ** 2))
+        )[:12]
+        obtenues = etat.obtenir_k_plus_proches(centre, 12, ["particules", "etoiles"])
+        if [id(e) for e in obtenues] != [id(e) for e in attendues]:
+            resultats["erreurs"].append(f"{mode} : obtenir_k_plus_proches incorrect")
+
+    try:
+        etat = EtatMonde()
+        particules = [
+            Particule(
+                masse=1.0,
+                position=generateur.normal(0.0, 50.0, 3),
+                vecteur=np.zeros(3),
+            )
+            for _ in range(n)
+        ]
+        for entite in particules + [
+            Etoile(
+                masse=10.0,
+                position=generateur.normal(0.0, 50.0, 3),
+                vecteur=np.zeros(3),
+                type="etoile_jeune",
+                temperature=5800.0,
+                luminosite=1.0,
+            )
+            for _ in range(50)
+        ]:
+            etat.ajouter_entite(entite)
+        for particule in particules[::7]:
+            etat.supprimer_entite(particule)
+
+        if module_etatmonde.SCIPY_DISPONIBLE:
+            verifier_requetes(etat, "cKDTree")
+        scipy_disponible = module_etatmonde.SCIPY_DISPONIBLE
+        taille_bloc = module_etatmonde.IndexSpatial.TAILLE_BLOC
+        try:
+            # Repli NumPy, sur plusieurs blocs de distances
+            module_etatmonde.SCIPY_DISPONIBLE = False
+            module_etatmonde.IndexSpatial.TAILLE_BLOC = 50_000
+            for colonnes in etat.entites.colonnes.values():
+                colonnes.index_spatial = None
+            verifier_requetes(etat, "NumPy")
+        finally:
+            module_etatmonde.SCIPY_DISPONIBLE = scipy_disponible
+            module_etatmonde.IndexSpatial.TAILLE_BLOC = taille_bloc
+
+        # Invalidation : écritures de position figées jusqu'au tick suivant
+        index = etat.obtenir_index_spatial("particules")
+        index_etoiles = etat.obtenir_index_spatial("etoiles")
+        vivante = etat.entites["particules"][0]
+        vivante.position = vivante.position + 1.0
+        if etat.obtenir_index_spatial("particules") is not index:
+            resultats["erreurs"].append("Index reconstruit dans le même tick")
+        etat.temps += 1
+        index = etat.obtenir_index_spatial("particules")
+        rang = next(i for i, e in enumerate(index.entites) if e is vivante)
+        if not np.array_equal(index.positions[rang], vivante.position):
+            resultats["erreurs"].append("Positions écrites absentes au tick suivant")
+        if etat.obtenir_index_spatial("etoiles") is not index_etoiles:
+            resultats["erreurs"].append("Index d'une catégorie immobile reconstruit")
+        etat.supprimer_entite(vivante)
+        if any(e is vivante for e in etat.obtenir_index_spatial("particules").entites):
+            resultats["erreurs"].append("Entité retirée encore présente dans l'index")
+    except Exception as e:
+        resultats["erreurs"].append(f"{type(e).__name__}: {e}")
+
+    resultats["succes"] = not resultats["erreurs"]
+    for erreur in resultats["erreurs"]:
+        print(f"✗ {erreur}")
+    if resultats["succes"]:
+        print("✓ Requêtes identiques à la force brute (cKDTree et repli NumPy)")
+    return resultats
+
+
+def tester_instantanes(
+    tailles: Tuple[int, ...] = (5000, 20000), graine: int = 42
+) -> Dict[str, Any]:
+    """Compare les instantanés colonnaires à la sauvegarde pickle complète."""
+    print("\n=== BANC D'ESSAI DES INSTANTANÉS ===")
+
+    import pickle
+    import tempfile
+
+    import numpy as np
+    from etatmonde import EtatMonde, Particule
+    from instantanes import GestionnaireInstantanes
+
+    generateur = np.random.default_rng(graine)
+    resultats: Dict[str, Any] = {"succes": True, "mesures": []}
+
+    for n in tailles:
+        etatmonde = EtatMonde()
+        etatmonde.entites["particules"] = [
+            Particule(
+                masse=float(generateur.uniform(0.1, 5.0)),
+                position=generateur.normal(0.0, 50.0, 3),
+                vecteur=generateur.normal(0.0, 1.0, 3),
+            )
+            for _ in range(n)
+        ]
+
+        debut = time.perf_counter()
+        taille_pickle = len(pickle.dumps(etatmonde, protocol=pickle.HIGHEST_PROTOCOL))
+        temps_pickle = time.perf_counter() - debut
+
+        with tempfile.TemporaryDirectory() as repertoire:
+            gestionnaire = GestionnaireInstantanes(repertoire)
+
+            debut = time.perf_counter()
+            capture_base = gestionnaire.sauvegarder(etatmonde)
+            gestionnaire.attendre()
+            temps_base = time.perf_counter() - debut
+
+            # Seule une particule sur vingt bouge avant l'instantané incrémental
+            for particule in etatmonde.entites["particules"][::20]:
+                particule.position = particule.position + 1.0
+            debut = time.perf_counter()
+            capture_increment = gestionnaire.sauvegarder(etatmonde)
+            gestionnaire.attendre()
+            temps_increment = time.perf_counter() - debut
+
+            tailles_fichiers = sorted(
+                f.stat().st_size for f in Path(repertoire).glob("*.evis")
+            )
+            recharge = gestionnaire.charger_dernier()
+
+        coherent = recharge is not None and np.array_equal(
+            np.array([p.position for p in recharge.entites["particules"]]),
+            np.array([p.position for p in etatmonde.entites["particules"]]),
+        )
+        mesure = {
+            "n": n,
+            "temps_pickle_s": round(temps_pickle, 4),
+            "capture_base_s": round(capture_base, 4),
+            "capture_increment_s": round(capture_increment, 4),
+            "temps_base_total_s": round(temps_base, 4),
+            "temps_increment_total_s": round(temps_increment, 4),
+            "octets_pickle": taille_pickle,
+            "octets_increment": tailles_fichiers[0],
+            "octets_base": tailles_fichiers[-1],
+        }
+        resultats["mesures"].append(mesure)
+
+        if not coherent:
+            resultats["succes"] = False
+
+        print(
+            f"{'✓' if coherent else '✗'} N={n:<7} pickle {temps_pickle:6.3f}s "
+            f"({taille_pickle / 1e6:.2f} Mo) | capture base {capture_base:6.3f}s "
+            f"({mesure['octets_base'] / 1e6:.2f} Mo) | capture incrément "
+            f"{capture_increment:6.3f}s ({mesure['octets_increment'] / 1e6:.2f} Mo)"
+        )
+
+    return resultats
+
+
+def tester_banc_essai(cycles: int = 3, graine: int = 42) -> Dict[str, Any]:
+    """Vérifie que deux exécutions sans interface de même graine coïncident."""
+    print("\n=== BANC D'ESSAI SANS INTERFACE ===")
+
+    from banc_essai import executer_banc
+
+    premier = executer_banc(cycles, graine, preset="univers_vide")
+    second = executer_banc(cycles, graine, preset="univers_vide")
+    parallele = executer_banc(cycles, graine, preset="univers_vide", parallele=True)
+
+    # Populations cycle par cycle et population finale de chaque exécution
+    traces = [
+        ([e["entites"] for e in r["journal_cycles"]], r["entites_finales"])
+        for r in (premier, second, parallele)
+    ]
+    reproductible = traces[0] == traces[1]
+    identique_parallele = traces[0] == traces[2]
+    resultats = {
+        "succes": reproductible and identique_parallele and premier["cycles"] == cycles,
+        "cycles_par_seconde": round(premier["cycles_par_seconde"], 2),
+        "rss_max_mo": premier["rss_max_mo"],
+    }
+
+    for nom, mesures in premier["agents"].items():
+        print(f"  {nom:<20} {mesures['moyenne_ms']:8.3f} ms/cycle")
+    print(
+        f"{'✓' if resultats['succes'] else '✗'} {premier['cycles']} cycles, "
+        f"{resultats['cycles_par_seconde']} cycles/s, "
+        f"{'reproductible' if reproductible else 'NON reproductible'}, "
+        f"parallèle {'identique' if identique_parallele else 'DIVERGENT'}"
+    )
+
+    return resultats
+
+
 def optimiser_configuration() -> Dict[str, Any]:
     """Génère une configuration optimisée selon les ressources système."""
     print("\n=== OPTIMISATION DE LA CONFIGURATION ===")
@@ -234,6 +1056,25 @@ def main():
     # Test de simulation
     simulation_ok = tester_cycle_simulation()
 
+    # Bancs d'essai des solveurs gravitationnels
+    noyau_direct = tester_noyau_forces_direct()
+    solveurs = tester_solveurs_gravitation()
+
+    # Banc d'essai du flux simulateur → interface
+    flux_trames = tester_flux_trames()
+    fenetre_trames = tester_fenetre_trames()
+    rendu_niveaux_detail = tester_rendu_niveaux_detail()
+
+    # Stockage colonnaire des entités
+    stockage_colonnaire = tester_stockage_colonnaire()
+    index_spatial = tester_index_spatial()
+
+    # Banc d'essai des sauvegardes
+    instantanes = tester_instantanes()
+
+    # Banc d'essai sans interface
+    banc_essai = tester_banc_essai()
+
     # Optimisation de configuration
     config_optimisee = optimiser_configuration()
 
@@ -243,6 +1084,21 @@ def main():
     print(f"✓ Imports: {'OK' if imports_ok else 'ERREURS'}")
     print(f"✓ Création univers: {'OK' if creation_ok else 'ERREUR'}")
     print(f"✓ Cycle simulation: {'OK' if simulation_ok else 'ERREUR'}")
+    print(f"✓ Noyau direct: {'OK' if noyau_direct['succes'] else 'ÉCART'}")
+    print(f"✓ Solveurs gravitation: {'OK' if solveurs['succes'] else 'IMPRÉCIS'}")
+    print(f"✓ Flux de trames: {'OK' if flux_trames['succes'] else 'INCOHÉRENT'}")
+    print(f"✓ Fenêtre principale: {'OK' if fenetre_trames['succes'] else 'INCOHÉRENT'}")
+    print(
+        f"✓ Niveaux de détail: "
+        f"{'OK' if rendu_niveaux_detail['succes'] else 'INCOHÉRENT'}"
+    )
+    print(
+        f"✓ Stockage colonnaire: "
+        f"{'OK' if stockage_colonnaire['succes'] else 'INCOHÉRENT'}"
+    )
+    print(f"✓ Index spatial: {'OK' if index_spatial['succes'] else 'INCOHÉRENT'}")
+    print(f"✓ Instantanés: {'OK' if instantanes['succes'] else 'INCOHÉRENT'}")
+    print(f"✓ Banc d'essai: {'OK' if banc_essai['succes'] else 'NON REPRODUCTIBLE'}")
 
     # Sauvegarde de la configuration optimisée
     if imports_ok and creation_ok and simulation_ok:
@@ -0,0 +1,802 @@
+# Fichier : trames.py
+# Flux binaire de trames delta entre AnalysteCosmique et l'interface
+
+"""
+Format de trames binaires pour transférer l'état affichable de l'univers.
+
+Chaque trame porte, par catégorie, des tampons NumPy (identifiants, positions,
+couleurs RGBA, tailles) limités aux entités ajoutées ou modifiées depuis la
+trame précédente, ainsi que la liste des identifiants retirés. Une image clé
+complète est émise périodiquement ou à la demande. Le décodeur refuse un delta
+dont la base ne correspond pas à son état et réclame alors une image clé : les
+trames perdues par la file d'attente ne corrompent jamais l'affichage.
+
+Ce module ne dépend ni de Qt ni du moteur physique : l'encodeur tourne dans le
+thread de simulation, le décodeur dans celui de l'interface.
+"""
+
+import logging
+import struct
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+# ========================================================================
+# FORMAT BINAIRE
+# ========================================================================
+
+MAGIC = b"EVTR"
+VERSION_FORMAT = 1
+TYPE_IMAGE_CLE = 0
+TYPE_DELTA = 1
+
+# magic, version, type, nombre de catégories, numéro, numéro de base, temps
+ENTETE = struct.Struct("<4sBBHQQq")
+DTYPE_IDENTIFIANT = np.dtype("S16")
+
+
+def identifiant_texte(identifiant: bytes) -> str:
+    """Convertit un identifiant binaire (uuid.bytes) en UUID textuel."""
+    # Les tableaux "S16" suppriment les octets nuls finaux à la lecture
+    return str(uuid.UUID(bytes=identifiant.ljust(16, b"\0")))
+
+
+class ErreurTrame(ValueError):
+    """Trame binaire illisible ou d'une version non supportée."""
+
+
+class _Ecrivain:
+    """Accumulateur de sections binaires (petit-boutiste)."""
+
+    def __init__(self):
+        self.morceaux: List[bytes] = []
+
+    def entier(self, valeur: int) -> None:
+        self.morceaux.append(struct.pack("<I", valeur))
+
+    def reel(self, valeur: float) -> None:
+        self.morceaux.append(struct.pack("<d", valeur))
+
+    def texte(self, valeur: str) -> None:
+        donnees = valeur.encode("utf-8")
+        self.entier(len(donnees))
+        self.morceaux.append(donnees)
+
+    def tableau(self, valeur: NDArray, dtype: np.dtype) -> None:
+        self.morceaux.append(np.ascontiguousarray(valeur, dtype=dtype).tobytes())
+
+    def octets(self) -> bytes:
+        return b"".join(self.morceaux)
+
+
+class _Lecteur:
+    """Lecture séquentielle d'une trame, sans copie pour les tableaux."""
+
+    def __init__(self, donnees: bytes, decalage: int = 0):
+        self.donnees = memoryview(donnees)
+        self.decalage = decalage
+
+    def _avancer(self, taille: int) -> memoryview:
+        fin = self.decalage + taille
+        if fin > len(self.donnees):
+            raise ErreurTrame("Trame tronquée")
+        morceau = self.donnees[self.decalage : fin]
+        self.decalage = fin
+        return morceau
+
+    def entier(self) -> int:
+        return struct.unpack("<I", self._avancer(4))[0]
+
+    def reel(self) -> float:
+        return struct.unpack("<d", self._avancer(8))[0]
+
+    def texte(self) -> str:
+        return bytes(self._avancer(self.entier())).decode("utf-8")
+
+    def tableau(self, dtype: np.dtype, forme: Tuple[int, ...]) -> NDArray:
+        dtype = np.dtype(dtype)
+        nombre = int(np.prod(forme))
+        morceau = self._avancer(nombre * dtype.itemsize)
+        return np.frombuffer(morceau, dtype=dtype, count=nombre).reshape(forme)
+
+
+# ========================================================================
+# CONTENU D'UNE TRAME
+# ========================================================================
+
+
+@dataclass
+class DeltaCategorie:
+    """Modifications d'une catégorie : retraits puis ajouts/mises à jour."""
+
+    retires: NDArray = field(default_factory=lambda: np.zeros(0, DTYPE_IDENTIFIANT))
+    identifiants: NDArray = field(
+        default_factory=lambda: np.zeros(0, DTYPE_IDENTIFIANT)
+    )
+    positions: NDArray[np.float32] = field(
+        default_factory=lambda: np.zeros((0, 3), np.float32)
+    )
+    couleurs: NDArray[np.uint8] = field(
+        default_factory=lambda: np.zeros((0, 4), np.uint8)
+    )
+    tailles: NDArray[np.float32] = field(
+        default_factory=lambda: np.zeros(0, np.float32)
+    )
+    nombre_total: int = 0  # Entités présentes après application
+
+
+@dataclass
+class Trame:
+    """Trame décodée (ou à encoder) du flux simulation -> interface."""
+
+    numero: int
+    numero_base: int
+    temps: int
+    image_cle: bool
+    statistiques: Dict[str, float] = field(default_factory=dict)
+    paliers_total: int = 0
+    paliers_nouveaux: List[str] = field(default_factory=list)
+    centre_de_masse: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    rayon_univers: float = 0.0
+    fiche: Optional[Dict[str, Any]] = None  # Entité suivie par l'interface
+    categories: Dict[str, DeltaCategorie] = field(default_factory=dict)
+
+    def en_octets(self) -> bytes:
+        """Sérialise la trame dans le format binaire."""
+        ecrivain = _Ecrivain()
+        ecrivain.morceaux.append(
+            ENTETE.pack(
+                MAGIC,
+                VERSION_FORMAT,
+                TYPE_IMAGE_CLE if self.image_cle else TYPE_DELTA,
+                len(self.categories),
+                self.numero,
+                self.numero_base,
+                self.temps,
+            )
+        )
+
+        ecrivain.entier(len(self.statistiques))
+        for cle, valeur in self.statistiques.items():
+            ecrivain.texte(cle)
+            ecrivain.reel(float(valeur))
+
+        ecrivain.entier(self.paliers_total)
+        ecrivain.entier(len(self.paliers_nouveaux))
+        for palier in self.paliers_nouveaux:
+            ecrivain.texte(palier)
+
+        for composante in self.centre_de_masse:
+            ecrivain.reel(composante)
+        ecrivain.reel(self.rayon_univers)
+
+        _ecrire_fiche(ecrivain, self.fiche)
+
+        for nom, delta in self.categories.items():
+            ecrivain.texte(nom)
+            ecrivain.entier(delta.nombre_total)
+            ecrivain.entier(len(delta.retires))
+            ecrivain.entier(len(delta.identifiants))
+            ecrivain.tableau(delta.retires, DTYPE_IDENTIFIANT)
+            ecrivain.tableau(delta.identifiants, DTYPE_IDENTIFIANT)
+            ecrivain.tableau(delta.positions, np.float32)
+            ecrivain.tableau(delta.couleurs, np.uint8)
+            ecrivain.tableau(delta.tailles, np.float32)
+
+        return ecrivain.octets()
+
+    @classmethod
+    def depuis_octets(cls, donnees: bytes) -> "Trame":
+        """Relit une trame ; les tableaux sont des vues sur `donnees`."""
+        if len(donnees) < ENTETE.size:
+            raise ErreurTrame("Trame trop courte")
+        magic, version, type_trame, nb_categories, numero, base, temps = (
+            ENTETE.unpack_from(donnees)
+        )
+        if magic != MAGIC or version != VERSION_FORMAT:
+            raise ErreurTrame(f"Format de trame inconnu: {magic!r} v{version}")
+
+        lecteur = _Lecteur(donnees, ENTETE.size)
+        trame = cls(
+            numero=numero,
+            numero_base=base,
+            temps=temps,
+            image_cle=type_trame == TYPE_IMAGE_CLE,
+        )
+
+        for _ in range(lecteur.entier()):
+            cle = lecteur.texte()
+            trame.statistiques[cle] = lecteur.reel()
+
+        trame.paliers_total = lecteur.entier()
+        trame.paliers_nouveaux = [lecteur.texte() for _ in range(lecteur.entier())]
+
+        trame.centre_de_masse = (lecteur.reel(), lecteur.reel(), lecteur.reel())
+        trame.rayon_univers = lecteur.reel()
+
+        trame.fiche = _lire_fiche(lecteur)
+
+        for _ in range(nb_categories):
+            nom = lecteur.texte()
+            nombre_total = lecteur.entier()
+            nb_retires = lecteur.entier()
+            nb_maj = lecteur.entier()
+            trame.categories[nom] = DeltaCategorie(
+                retires=lecteur.tableau(DTYPE_IDENTIFIANT, (nb_retires,)),
+                identifiants=lecteur.tableau(DTYPE_IDENTIFIANT, (nb_maj,)),
+                positions=lecteur.tableau(np.float32, (nb_maj, 3)),
+                couleurs=lecteur.tableau(np.uint8, (nb_maj, 4)),
+                tailles=lecteur.tableau(np.float32, (nb_maj,)),
+                nombre_total=nombre_total,
+            )
+
+        return trame
+
+
+def _ecrire_fiche(ecrivain: _Ecrivain, fiche: Optional[Dict[str, Any]]) -> None:
+    """Écrit une fiche d'entité à plat : (clé, type, valeur) par champ."""
+    champs: List[Tuple[str, str, Any]] = []
+
+    def _aplatir(prefixe: str, valeur: Any) -> None:
+        if isinstance(valeur, dict):
+            for cle, sous_valeur in valeur.items():
+                _aplatir(f"{prefixe}/{cle}", sous_valeur)
+        elif isinstance(valeur, (bool, int, np.integer)):
+            champs.append((prefixe, "i", int(valeur)))
+        elif isinstance(valeur, (float, np.floating)):
+            champs.append((prefixe, "f", float(valeur)))
+        elif isinstance(valeur, (list, tuple, np.ndarray)):
+            champs.append((prefixe, "v", np.asarray(valeur, dtype=np.float64)))
+        else:
+            champs.append((prefixe, "s", str(valeur)))
+
+    for cle, valeur in (fiche or {}).items():
+        _aplatir(cle, valeur)
+
+    ecrivain.entier(len(champs))
+    for cle, type_champ, valeur in champs:
+        ecrivain.texte(cle)
+        ecrivain.morceaux.append(type_champ.encode("ascii"))
+        if type_champ == "i":
+            ecrivain.morceaux.append(struct.pack("<q", valeur))
+        elif type_champ == "f":
+            ecrivain.reel(valeur)
+        elif type_champ == "v":
+            ecrivain.entier(len(valeur))
+            ecrivain.tableau(valeur, np.float64)
+        else:
+            ecrivain.texte(valeur)
+
+
+def _lire_fiche(lecteur: _Lecteur) -> Optional[Dict[str, Any]]:
+    """Relit une fiche et reconstruit les dictionnaires imbriqués."""
+    nb_champs = lecteur.entier()
+    if not nb_champs:
+        return None
+
+    fiche: Dict[str, Any] = {}
+    for _ in range(nb_champs):
+        chemin = lecteur.texte().split("/")
+        type_champ = bytes(lecteur._avancer(1)).decode("ascii")
+        if type_champ == "i":
+            valeur: Any = struct.unpack("<q", lecteur._avancer(8))[0]
+        elif type_champ == "f":
+            valeur = lecteur.reel()
+        elif type_champ == "v":
+            valeur = lecteur.tableau(np.float64, (lecteur.entier(),)).tolist()
+        else:
+            valeur = lecteur.texte()
+
+        conteneur = fiche
+        for cle in chemin[:-1]:
+            conteneur = conteneur.setdefault(cle, {})
+        conteneur[chemin[-1]] = valeur
+
+    return fiche
+
+
+# ========================================================================
+# ÉTAT AFFICHABLE D'UNE CATÉGORIE
+# ========================================================================
+
+
+class CategorieAffichage:
+    """
+    État affichable d'une catégorie, trié par identifiant.
+
+    Tenu à l'identique des deux côtés du flux : l'encodeur y conserve ce qu'il
+    a envoyé, le décodeur ce qu'il a reçu, et tous deux le font évoluer par
+    `appliquer`.
+    """
+
+    def __init__(self):
+        self.identifiants = np.zeros(0, DTYPE_IDENTIFIANT)
+        self.positions = np.zeros((0, 3), np.float32)
+        self.couleurs = np.zeros((0, 4), np.uint8)
+        self.tailles = np.zeros(0, np.float32)
+
+    def __len__(self) -> int:
+        return len(self.identifiants)
+
+    def localiser(self, identifiants: NDArray) -> Tuple[NDArray, NDArray[np.bool_]]:
+        """Lignes des identifiants donnés et masque de ceux qui sont présents."""
+        lignes = np.searchsorted(self.identifiants, identifiants)
+        presents = np.zeros(len(identifiants), dtype=bool)
+        if len(self.identifiants):
+            lignes = np.minimum(lignes, len(self.identifiants) - 1)
+            presents = self.identifiants[lignes] == identifiants
+        return lignes, presents
+
+    def appliquer(self, delta: DeltaCategorie) -> None:
+        """Retire puis ajoute/met à jour les entités du delta."""
+        if len(delta.retires):
+            garder = ~np.isin(self.identifiants, delta.retires, assume_unique=True)
+            self._filtrer(garder)
+
+        if not len(delta.identifiants):
+            return
+
+        lignes, presents = self.localiser(delta.identifiants)
+        lignes_maj = lignes[presents]
+        self.positions[lignes_maj] = delta.positions[presents]
+        self.couleurs[lignes_maj] = delta.couleurs[presents]
+        self.tailles[lignes_maj] = delta.tailles[presents]
+
+        nouveaux = ~presents
+        if np.any(nouveaux):
+            self.identifiants = np.concatenate(
+                [self.identifiants, delta.identifiants[nouveaux]]
+            )
+            self.positions = np.concatenate([self.positions, delta.positions[nouveaux]])
+            self.couleurs = np.concatenate([self.couleurs, delta.couleurs[nouveaux]])
+            self.tailles = np.concatenate([self.tailles, delta.tailles[nouveaux]])
+            self._filtrer(np.argsort(self.identifiants, kind="stable"))
+
+    def _filtrer(self, selection: NDArray) -> None:
+        self.identifiants = self.identifiants[selection]
+        self.positions = self.positions[selection]
+        self.couleurs = self.couleurs[selection]
+        self.tailles = self.tailles[selection]
+
+
+# ========================================================================
+# STYLE DES ENTITÉS (MIROIR SANS QT DE ConfigurationRendu)
+# ========================================================================
+
+
+@dataclass(frozen=True)
+class StyleCategorie:
+    """Couleur de base et bornes de taille d'une catégorie."""
+
+    couleur: Tuple[int, int, int, int]
+    taille_base: float
+    taille_min: float
+    taille_max: float
+    utilise_masse: bool = False
+    utilise_temperature: bool = False
+
+
+class StyleTrames:
+    """Calcule couleurs et tailles d'affichage, vectorisées par catégorie."""
+
+    STYLES: ClassVar[Dict[str, StyleCategorie]] = {
+        "particules": StyleCategorie((200, 200, 200, 180), 2.0, 1.0, 3.0),
+        "atomes": StyleCategorie((0, 255, 255, 255), 3.0, 2.0, 5.0),
+        "etoiles": StyleCategorie(
+            (255, 255, 0, 255),
+            8.0,
+            4.0,
+            15.0,
+            utilise_masse=True,
+            utilise_temperature=True,
+        ),
+        "planetes": StyleCategorie((255, 165, 0, 255), 5.0, 3.0, 8.0),
+        "cellules_simples": StyleCategorie((0, 255, 0, 255), 2.5, 1.5, 4.0),
+        "organismes_complexes": StyleCategorie((0, 128, 0, 255), 4.0, 2.5, 6.0),
+        "civilisations": StyleCategorie((255, 215, 0, 255), 8.0, 5.0, 12.0),
+        "galaxies": StyleCategorie((128, 0, 128, 255), 20.0, 15.0, 30.0),
+        "trous_noirs": StyleCategorie((0, 0, 0, 255), 10.0, 6.0, 15.0),
+    }
+    STYLE_INCONNU: ClassVar[StyleCategorie] = StyleCategorie(
+        (255, 0, 255, 255), 4.0, 4.0, 4.0
+    )
+
+    # Corps noir : seuils de température décroissants -> couleur
+    SEUILS_TEMPERATURE: ClassVar[Tuple[float, ...]] = (15000, 10000, 7000, 5000, 3500)
+    COULEURS_TEMPERATURE: ClassVar[NDArray[np.uint8]] = np.array(
+        [
+            (162, 200, 255, 255),
+            (255, 255, 255, 255),
+            (255, 244, 232, 255),
+            (255, 232, 197, 255),
+            (255, 197, 117, 255),
+            (255, 157, 69, 255),
+        ],
+        dtype=np.uint8,
+    )
+
+    COULEURS_PLANETES: ClassVar[Dict[str, Tuple[int, int, int, int]]] = {
+        "tellurique": (165, 42, 42, 255),
+        "gazeuse": (173, 216, 230, 255),
+        "riche_carbone": (169, 169, 169, 255),
+        "riche_oxygene": (240, 128, 128, 255),
+        "composite": (255, 165, 0, 255),
+    }
+
+    def calculer(
+        self, categorie: str, entites: List[Any], masses: NDArray[np.float64]
+    ) -> Tuple[NDArray[np.uint8], NDArray[np.float32]]:
+        """Retourne les couleurs RGBA (n, 4) et les tailles (n,) d'une catégorie."""
+        style = self.STYLES.get(categorie, self.STYLE_INCONNU)
+        n = len(entites)
+
+        tailles = np.full(n, style.taille_base)
+        if style.utilise_masse:
+            tailles += np.log10(np.maximum(masses, 0.1)) / 2
+        tailles = np.clip(tailles, style.taille_min, style.taille_max)
+
+        couleurs = np.empty((n, 4), dtype=np.uint8)
+        couleurs[:] = style.couleur
+        if style.utilise_temperature and n:
+            temperatures = np.array(
+                [getattr(e, "temperature", 0.0) for e in entites], dtype=np.float64
+            )
+            classes = np.searchsorted(
+                -np.array(self.SEUILS_TEMPERATURE), -temperatures, side="right"
+            )
+            couleurs[:] = self.COULEURS_TEMPERATURE[classes]
+        elif categorie == "planetes" and n:
+            couleurs[:] = [
+                self.COULEURS_PLANETES.get(getattr(e, "type", ""), style.couleur)
+                for e in entites
+            ]
+
+        return couleurs, tailles.astype(np.float32)
+
+
+# ========================================================================
+# ENCODEUR (THREAD DE SIMULATION)
+# ========================================================================
+
+
+class EncodeurTrames:
+    """
+    Produit les trames binaires à partir des colonnes de l'EtatMonde.
+
+    `forcer_image_cle` et `suivre_entite` peuvent être appelés depuis le
+    thread de l'interface : ils ne font qu'affecter un attribut.
+    """
+
+    def __init__(
+        self, intervalle_image_cle: int = 100, tolerance_position: float = 1e-3
+    ):
+        """Initialise un flux vide : la première trame sera une image clé."""
+        self.intervalle_image_cle = max(1, intervalle_image_cle)
+        self.tolerance_position = tolerance_position
+        self.style = StyleTrames()
+
+        self.numero = 0
+        self._envoye: Dict[str, CategorieAffichage] = {}
+        self._paliers_envoyes = 0
+        self._image_cle_demandee = True
+        self._depuis_image_cle = 0
+        self.id_suivi: Optional[str] = None
+
+    def forcer_image_cle(self) -> None:
+        """La prochaine trame sera une image clé complète."""
+        self._image_cle_demandee = True
+
+    def suivre_entite(self, entite_id: Optional[str]) -> None:
+        """Joint la fiche complète de cette entité aux trames suivantes."""
+        self.id_suivi = entite_id or None
+
+    def encoder(
+        self,
+        etatmonde: Any,
+        centre_de_masse: Tuple[float, float, float],
+        rayon_univers: float,
+    ) -> bytes:
+        """Encode l'état courant en une trame (image clé ou delta)."""
+        image_cle = (
+            self._image_cle_demandee
+            or self._depuis_image_cle >= self.intervalle_image_cle
+        )
+        self.numero += 1
+        trame = Trame(
+            numero=self.numero,
+            numero_base=0 if image_cle else self.numero - 1,
+            temps=etatmonde.temps,
+            image_cle=image_cle,
+            statistiques={
+                cle: float(valeur)
+                for cle, valeur in etatmonde.statistiques.items()
+                if isinstance(valeur, (int, float, np.number))
+            },
+            centre_de_masse=tuple(float(c) for c in centre_de_masse),
+            rayon_univers=float(rayon_univers),
+            fiche=self._fiche_suivie(etatmonde),
+        )
+
+        paliers = etatmonde.paliers
+        debut = 0 if image_cle else min(self._paliers_envoyes, len(paliers))
+        trame.paliers_total = len(paliers)
+        trame.paliers_nouveaux = list(paliers[debut:])
+        self._paliers_envoyes = len(paliers)
+
+        if image_cle:
+            self._envoye = {}
+        for categorie in list(etatmonde.entites.keys()) + [
+            c for c in self._envoye if c not in etatmonde.entites
+        ]:
+            delta = self._delta_categorie(etatmonde, categorie, image_cle)
+            if image_cle or len(delta.retires) or len(delta.identifiants):
+                trame.categories[categorie] = delta
+
+        self._image_cle_demandee = False
+        self._depuis_image_cle = 0 if image_cle else self._depuis_image_cle + 1
+        return trame.en_octets()
+
+    def _delta_categorie(
+        self, etatmonde: Any, categorie: str, image_cle: bool
+    ) -> DeltaCategorie:
+        """Compare l'état courant d'une catégorie à ce qui a été envoyé."""
+        envoye = self._envoye.setdefault(categorie, CategorieAffichage())
+        colonnes = (
+            etatmonde.obtenir_colonnes(categorie)
+            if categorie in etatmonde.entites
+            else None
+        )
+
+        if colonnes is None:
+            delta = DeltaCategorie(retires=envoye.identifiants.copy())
+            envoye.appliquer(delta)
+            return delta
+
+        n = colonnes.n_lignes
+        ordre = np.argsort(colonnes.identifiants[:n], kind="stable")
+        identifiants = colonnes.identifiants[:n][ordre]
+        positions = colonnes.positions[:n][ordre].astype(np.float32)
+        couleurs, tailles = self.style.calculer(
+            categorie, colonnes.entites[:n], colonnes.masses[:n]
+        )
+        couleurs, tailles = couleurs[ordre], tailles[ordre]
+
+        if image_cle:
+            a_envoyer = np.ones(n, dtype=bool)
+            retires = np.zeros(0, DTYPE_IDENTIFIANT)
+        else:
+            retires = envoye.identifiants[
+                ~np.isin(envoye.identifiants, identifiants, assume_unique=True)
+            ]
+            lignes, presents = envoye.localiser(identifiants)
+            a_envoyer = ~presents
+            anciennes = lignes[presents]
+            a_envoyer[presents] = (
+                (
+                    np.abs(envoye.positions[anciennes] - positions[presents]).max(
+                        axis=1, initial=0.0
+                    )
+                    > self.tolerance_position
+                )
+                | np.any(envoye.couleurs[anciennes] != couleurs[presents], axis=1)
+                | (envoye.tailles[anciennes] != tailles[presents])
+            )
+
+        delta = DeltaCategorie(
+            retires=retires,
+            identifiants=identifiants[a_envoyer],
+            positions=positions[a_envoyer],
+            couleurs=couleurs[a_envoyer],
+            tailles=tailles[a_envoyer],
+            nombre_total=n,
+        )
+        envoye.appliquer(delta)
+        return delta
+
+    def _fiche_suivie(self, etatmonde: Any) -> Optional[Dict[str, Any]]:
+        """Attributs publics de l'entité suivie, si elle existe encore."""
+        if not self.id_suivi:
+            return None
+        try:
+            identifiant = uuid.UUID(self.id_suivi)
+        except ValueError:
+            return None
+
+        for categorie in etatmonde.entites:
+            colonnes = etatmonde.obtenir_colonnes(categorie, compacter=False)
+            ligne = colonnes.lignes_par_id.get(identifiant) if colonnes else None
+            if ligne is not None:
+                entite = colonnes.entites[ligne]
+                fiche = {
+                    k: v for k, v in entite.__dict__.items() if not k.startswith("_")
+                }
+                fiche["id"] = str(entite.id)
+                fiche["categorie"] = entite.categorie
+                return fiche
+        return None
+
+
+# ========================================================================
+# DÉCODEUR (THREAD DE L'INTERFACE)
+# ========================================================================
+
+
+@dataclass
+class ModificationsCategorie:
+    """Identifiants touchés dans une catégorie par les trames appliquées."""
+
+    modifies: NDArray = field(default_factory=lambda: np.zeros(0, DTYPE_IDENTIFIANT))
+    retires: NDArray = field(default_factory=lambda: np.zeros(0, DTYPE_IDENTIFIANT))
+
+    def fusionner(self, autre: "ModificationsCategorie") -> None:
+        """Cumule des modifications ultérieures."""
+        self.retires = np.union1d(
+            self.retires[~np.isin(self.retires, autre.modifies)], autre.retires
+        )
+        self.modifies = np.union1d(
+            self.modifies[~np.isin(self.modifies, autre.retires)], autre.modifies
+        )
+
+
+class DecodeurTrames:
+    """Reconstruit l'état affichable à partir du flux de trames."""
+
+    def __init__(self):
+        """Initialise un décodeur en attente d'image clé."""
+        self.numero: Optional[int] = None
+        self.image_cle_requise = False
+        self.categories: Dict[str, CategorieAffichage] = {}
+
+        self.temps = 0
+        self.statistiques: Dict[str, float] = {}
+        self.paliers: List[str] = []
+        self.centre_de_masse: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self.rayon_univers = 0.0
+        self.fiche: Optional[Dict[str, Any]] = None
+
+    def appliquer(self, donnees: bytes) -> Optional[Dict[str, ModificationsCategorie]]:
+        """
+        Applique une trame et retourne les identifiants touchés par catégorie.
+
+        Retourne None (et lève `image_cle_requise`) pour un delta qui ne fait
+        pas suite au dernier numéro appliqué ; il est alors ignoré.
+        """
+        trame = Trame.depuis_octets(donnees)
+
+        if not trame.image_cle and trame.numero_base != self.numero:
+            if not self.image_cle_requise:
+                logger.debug(
+                    f"Trame {trame.numero} ignorée (base {trame.numero_base}, "
+                    f"état {self.numero}) : image clé requise"
+                )
+            self.image_cle_requise = True
+            return None
+
+        modifications: Dict[str, ModificationsCategorie] = {}
+        if trame.image_cle:
+            self.image_cle_requise = False
+            self.paliers = []
+            for nom, ancienne in self.categories.items():
+                if nom not in trame.categories and len(ancienne):
+                    modifications[nom] = ModificationsCategorie(
+                        retires=ancienne.identifiants
+                    )
+            anciennes = self.categories
+            self.categories = {}
+
+        for nom, delta in trame.categories.items():
+            categorie = self.categories.setdefault(nom, CategorieAffichage())
+            retires = delta.retires
+            if trame.image_cle and nom in anciennes:
+                retires = anciennes[nom].identifiants[
+                    ~np.isin(
+                        anciennes[nom].identifiants,
+                        delta.identifiants,
+                        assume_unique=True,
+                    )
+                ]
+            categorie.appliquer(delta)
+            modifications[nom] = ModificationsCategorie(
+                modifies=delta.identifiants.copy(), retires=retires.copy()
+            )
+
+        self.numero = trame.numero
+        self.temps = trame.temps
+        self.statistiques = trame.statistiques
+        self.paliers = self.paliers[: trame.paliers_total - len(trame.paliers_nouveaux)]
+        self.paliers.extend(trame.paliers_nouveaux)
+        self.centre_de_masse = trame.centre_de_masse
+        self.rayon_univers = trame.rayon_univers
+        self.fiche = trame.fiche
+        return modifications
+
+    def donnees_tableau_de_bord(self) -> Dict[str, Any]:
+        """Données générales au format attendu par le tableau de bord."""
+        return {
+            "temps": self.temps,
+            "statistiques": self.statistiques,
+            "paliers": self.paliers,
+            "visualisation": {
+                "centredemasse": list(self.centre_de_masse),
+                "rayonunivers": self.rayon_univers,
+            },
+        }
+
+
+# ========================================================================
+# NIVEAU DE DÉTAIL (AGRÉGATION SANS QT POUR LE RENDU)
+# ========================================================================
+
+
+def rasteriser_densite(
+    positions: NDArray,
+    couleurs: NDArray[np.uint8],
+    origine: Tuple[float, float],
+    taille_tuile: float,
+    largeur: int,
+    hauteur: int,
+    saturation: int = 64,
+) -> NDArray[np.uint8]:
+    """
+    Agrège des entités en tuiles de densité, rendues comme une image RGBA
+    (hauteur, largeur, 4) : couleur moyenne des entités de la tuile, opacité
+    croissant avec le logarithme de leur nombre jusqu'à `saturation`.
+    """
+    image = np.zeros((hauteur * largeur, 4), dtype=np.uint8)
+    if not len(positions) or largeur <= 0 or hauteur <= 0:
+        return image.reshape(hauteur, largeur, 4)
+
+    colonnes = np.floor((positions[:, 0] - origine[0]) / taille_tuile)
+    lignes = np.floor((positions[:, 1] - origine[1]) / taille_tuile)
+    dedans = (colonnes >= 0) & (colonnes < largeur) & (lignes >= 0) & (lignes < hauteur)
+    cellules = lignes[dedans].astype(np.int64) * largeur + colonnes[dedans].astype(
+        np.int64
+    )
+
+    comptes = np.bincount(cellules, minlength=hauteur * largeur)
+    occupees = comptes > 0
+    for canal in range(4):
+        sommes = np.bincount(
+            cellules, weights=couleurs[dedans, canal], minlength=hauteur * largeur
+        )
+        image[occupees, canal] = sommes[occupees] / comptes[occupees]
+
+    densite = np.minimum(np.log1p(comptes[occupees]) / np.log1p(saturation), 1.0)
+    image[occupees, 3] = image[occupees, 3] * (0.35 + 0.65 * densite)
+    return image.reshape(hauteur, largeur, 4)
+
+
+def grouper_sprites(
+    couleurs: NDArray[np.uint8], tailles: NDArray[np.float32], pas_taille: float
+) -> List[Tuple[Tuple[int, int, int, int], float, NDArray[np.intp]]]:
+    """
+    Regroupe des entités par couleur et taille arrondie à `pas_taille`, pour
+    les dessiner en un seul appel par groupe.
+    """
+    if not len(couleurs):
+        return []
+
+    paliers = np.round(tailles / pas_taille).astype(np.int64)
+    cles = (
+        np.ascontiguousarray(couleurs).view(np.uint32).ravel().astype(np.int64) << 20
+    ) | np.clip(paliers, 0, (1 << 20) - 1)
+    uniques, inverse = np.unique(cles, return_inverse=True)
+    ordre = np.argsort(inverse, kind="stable")
+    bornes = np.cumsum(np.bincount(inverse, minlength=len(uniques)))[:-1]
+
+    groupes = []
+    for indices in np.split(ordre, bornes):
+        premier = indices[0]
+        groupes.append(
+            (
+                tuple(int(c) for c in couleurs[premier]),
+                float(paliers[premier] * pas_taille),
+                indices,
+            )
+        )
+    return groupes
@@ -0,0 +1,62 @@
+# eve_project/tests/cognitive/brain/test_cerveau_corpus_tfidf.py
+
+import math
+import time
+from collections import Counter
+
+import pytest
+from eve_project.cognitive.brain import cerveau
+
+
+def _modele(corpus):
+    """CorpusTfidfModel chargé avec les DF d'un corpus (liste d'ensembles de termes), sans KB."""
+    modele = cerveau.CorpusTfidfModel(refresh_seconds=3600)
+    modele._document_frequencies = dict(
+        Counter(terme for termes in corpus for terme in termes)
+    )
+    modele._documents_count = len(corpus)
+    modele._available = True
+    modele._last_refresh_mono = time.monotonic()
+    return modele
+
+
+def _tfidf_attendu(corpus, comptes):
+    """TF-IDF lissé de scikit-learn, le document faisant partie du corpus ajusté."""
+    documents = corpus + [set(comptes)]
+    total = sum(comptes.values())
+    scores = {}
+    for terme, compte in comptes.items():
+        df = sum(terme in termes for termes in documents)
+        idf = math.log((1 + len(documents)) / (1 + df)) + 1.0
+        scores[terme] = compte / total * idf
+    norme = math.sqrt(sum(s * s for s in scores.values()))
+    return sorted(
+        ((t, round(s / norme, 4)) for t, s in scores.items()),
+        key=lambda item: (-item[1], item[0]),
+    )
+
+
+@pytest.mark.parametrize(
+    "corpus",
+    [
+        [],
+        [{"chat"}, {"chien", "tapis"}, {"chat", "tapis"}],
+        [{"chat", "chien"}] * 5 + [{"jardin"}],
+    ],
+)
+def test_idf_lisse_document_compte_dans_le_corpus(corpus):
+    """Termes absents des DF (df = 0) et corpus vide suivent le même idf lissé que scikit-learn."""
+    comptes = Counter({"chat": 3, "tapis": 1, "inconnu": 2, "rare": 1})
+    modele = _modele(corpus)
+
+    assert modele.is_ready()
+    assert modele.top_terms(comptes, top_n=10, min_score=0.0) == _tfidf_attendu(
+        corpus, comptes
+    )
+
+
+def test_corpus_vide_equivaut_au_tf_seul():
+    """Sans document dans le corpus, l'idf vaut 1 : classement par fréquence du terme."""
+    comptes = Counter({"chat": 3, "tapis": 1, "inconnu": 2})
+    classement = _modele([]).top_terms(comptes, top_n=3, min_score=0.0)
+    assert [terme for terme, _ in classement] == ["chat", "inconnu", "tapis"]
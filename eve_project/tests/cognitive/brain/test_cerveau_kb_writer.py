@@ -0,0 +1,170 @@
+# eve_project/tests/cognitive/brain/test_cerveau_kb_writer.py
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+from eve_project.cognitive.brain import cerveau
+
+
+def _jeton(lemme):
+    return {
+        "text": lemme,
+        "lemma": lemme,
+        "pos": "NOUN",
+        "is_stop": False,
+        "is_punct": False,
+        "is_alpha": True,
+        "is_significant": True,
+    }
+
+
+def _analyse(lemmes, entite, meta):
+    return {
+        "file_size": 10,
+        "encoding": "utf-8",
+        "linguistic_features": {
+            "tokens": [_jeton(lemme) for lemme in lemmes],
+            "entities": [
+                {
+                    "text": entite,
+                    "label": "LOC",
+                    "start_char": 0,
+                    "end_char": len(entite),
+                }
+            ],
+        },
+        "extracted_metadata": {"titre": meta},
+    }
+
+
+@pytest.fixture(params=["rows", "packed"])
+def kb_writer(tmp_path, request):
+    db_path = tmp_path / "kb.sqlite"
+    schema_path = Path(cerveau.__file__).with_name("cerveau_kb_schema.sql")
+    cerveau.KnowledgeBase.initialize_schema_if_needed(db_path, schema_path, 10)
+    conn = sqlite3.connect(db_path)
+    cerveau.KnowledgeBase.ensure_token_storage_tables(conn)
+    cerveau.KnowledgeBase.ensure_corpus_tfidf_tables(conn)
+    conn.close()
+    kb = cerveau.KnowledgeBase({}, {"token_storage": request.param})
+    writer = cerveau.KnowledgeBaseWriter(db_path, kb)
+    writer.start()
+    yield db_path, kb, writer
+    writer.stop()
+
+
+def _etat_kb(db_path):
+    """Contenu des tables touchées par une analyse, DF du corpus comprises (hors version des DF, qui invalide les caches)."""
+    conn = sqlite3.connect(db_path)
+    tables = (
+        ("files",)
+        + cerveau.KnowledgeBase.FILE_ANALYSIS_TABLES
+        + ("corpus_document_frequencies",)
+    )
+    etat = {
+        table: sorted(map(tuple, conn.execute(f"SELECT * FROM {table}")))
+        for table in tables
+    }
+    etat["corpus_stats"] = sorted(
+        map(
+            tuple,
+            conn.execute("SELECT * FROM corpus_stats WHERE key != 'tfidf_df_version'"),
+        )
+    )
+    conn.close()
+    return etat
+
+
+def _processeur(kb, writer):
+    return cerveau.FileProcessor(
+        Path("/kb/note.txt"), {}, [], kb, None, kb_writer=writer
+    )
+
+
+def test_echec_pipeline_retablit_analyse_anterieure(kb_writer):
+    """Une ré-analyse commitée puis abandonnée laisse la KB exactement dans son état antérieur."""
+    db_path, kb, writer = kb_writer
+    writer.submit_file_analysis(
+        "/kb/note.txt", "cs1", _analyse(["chat", "tapis"], "Paris", "v1")
+    ).result(timeout=10)
+    writer.submit_file_analysis(
+        "/kb/autre.txt", "cs2", _analyse(["chat"], "Lyon", "a")
+    ).result(timeout=10)
+    etat_initial = _etat_kb(db_path)
+
+    processeur = _processeur(kb, writer)
+    assert processeur.record_file_analysis(
+        "/kb/note.txt", "cs3", _analyse(["chien", "jardin"], "Rome", "v2")
+    )
+    assert _etat_kb(db_path) != etat_initial
+    processeur.restore_writer_records()
+
+    assert _etat_kb(db_path) == etat_initial
+    assert processeur.kb_writer_records == []
+
+
+def test_echec_pipeline_nouveau_fichier(kb_writer):
+    """Un fichier inconnu de la KB avant l'échec en est retiré, DF du corpus comprises."""
+    db_path, kb, writer = kb_writer
+    writer.submit_file_analysis(
+        "/kb/autre.txt", "cs2", _analyse(["chat"], "Lyon", "a")
+    ).result(timeout=10)
+    etat_initial = _etat_kb(db_path)
+
+    processeur = _processeur(kb, writer)
+    assert processeur.record_file_analysis(
+        "/kb/note.txt", "cs1", _analyse(["chat", "tapis"], "Paris", "v1")
+    )
+    assert processeur.record_file_analysis(
+        "/kb/note.txt", "cs1", _analyse(["chat", "tapis", "sol"], "Paris", "v1")
+    )
+    processeur.restore_writer_records()
+
+    assert _etat_kb(db_path) == etat_initial
+
+
+class _LinkerFactice:
+    def __init__(self):
+        self.retires = []
+        self.retire = threading.Event()
+
+    def remove_document_embedding(self, file_id):
+        self.retires.append(file_id)
+        self.retire.set()
+        return True
+
+
+def test_suppression_fichier_sans_attente_ecrivain(kb_writer, tmp_path, monkeypatch):
+    """_handle_deleted_file rend la main sans attendre l'écrivain ; l'embedding est retiré après COMMIT."""
+    db_path, kb, writer = kb_writer
+    file_id = writer.submit_file_analysis(
+        "/kb/note.txt", "cs1", _analyse(["chat"], "Paris", "v1")
+    ).result(timeout=10)
+    monkeypatch.setattr(cerveau, "KB_DB_PATH", db_path)
+    monkeypatch.setattr(cerveau, "IMPROVEMENTS_DIR", tmp_path / "ameliorations")
+
+    service = cerveau.CerveauService.__new__(cerveau.CerveauService)
+    service.logger = logging.getLogger("test")
+    service.config = {"knowledge_base": {"use_sqlite_db": True}}
+    service.kb_instance, service.kb_writer = kb, writer
+    service.knowledge_linker_instance = _LinkerFactice()
+    for nom in ("file_manifest", "processed_files_cache", "file_quarantine"):
+        setattr(service, nom, {})
+        setattr(service, f"{nom}_lock", threading.Lock())
+    service.stats, service.stats_lock = {}, threading.Lock()
+
+    # L'écrivain est occupé : la suppression ne doit pas bloquer l'appelant (watchdog)
+    liberer = threading.Event()
+    writer.submit("bloquant", lambda conn: liberer.wait(10))
+    service._handle_deleted_file(Path("/kb/note.txt"))
+    assert service.knowledge_linker_instance.retires == []
+
+    liberer.set()
+    assert service.knowledge_linker_instance.retire.wait(10)
+    assert service.knowledge_linker_instance.retires == [file_id]
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM files").fetchone() == (0,)
+    conn.close()
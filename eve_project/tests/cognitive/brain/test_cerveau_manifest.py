@@ -0,0 +1,119 @@
+# eve_project/tests/cognitive/brain/test_cerveau_manifest.py
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+from eve_project.cognitive.brain import cerveau
+
+
+def _kb_anterieure(db_path, fichier):
+    """KB créée avant le manifeste : checksum sha256 sans préfixe, inode et mtime_ns absents."""
+    schema_path = Path(cerveau.__file__).with_name("cerveau_kb_schema.sql")
+    cerveau.KnowledgeBase.initialize_schema_if_needed(db_path, schema_path, 10)
+    conn = sqlite3.connect(db_path)
+    cerveau.KnowledgeBase.ensure_manifest_columns(conn)
+    conn.execute(
+        "INSERT INTO files (filepath, checksum, last_processed_utc, size_bytes) VALUES (?, ?, '2024-01-01T00:00:00', ?)",
+        (
+            str(fichier.resolve()),
+            hashlib.sha256(fichier.read_bytes()).hexdigest(),
+            fichier.stat().st_size,
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _service(db_path, monkeypatch):
+    """CerveauService réduit à ce qu'utilisent _load_file_manifest et _is_file_processable."""
+    monkeypatch.setattr(cerveau, "KB_DB_PATH", db_path)
+    service = cerveau.CerveauService.__new__(cerveau.CerveauService)
+    service.config = cerveau.DEFAULT_CONFIG
+    service.logger = logging.getLogger("test_cerveau_manifest")
+    service.file_quarantine = {}
+    service.processed_files_cache = {}
+    service.processed_files_cache_lock = threading.Lock()
+    service.file_stat_manifest = {}
+    service.file_stat_manifest_lock = threading.Lock()
+    service.file_manifest = {}
+    service.file_manifest_loaded = False
+    service.file_manifest_lock = threading.Lock()
+    service.kb_instance = cerveau.KnowledgeBase({}, {})
+    service.kb_writer = cerveau.KnowledgeBaseWriter(db_path, service.kb_instance)
+    service.kb_writer.start()
+    service._load_file_manifest(cerveau.DEFAULT_CONFIG["knowledge_base"], True)
+    return service
+
+
+def _stat_en_base(db_path, fichier):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT inode, mtime_ns, checksum FROM files WHERE filepath = ?",
+        (str(fichier.resolve()),),
+    ).fetchone()
+    conn.close()
+    return row
+
+
+def test_algorithme_par_defaut_sha256():
+    """sha256 reste le défaut tant que les checksums en base ne sont pas migrés."""
+    assert cerveau.DEFAULT_CONFIG["knowledge_base"]["checksum_algorithm"] == "sha256"
+    assert cerveau.configure_checksum_algorithm() == "sha256"
+    assert cerveau.checksum_algorithm_of("ab12") == "sha256"
+    assert cerveau.checksum_algorithm_of("xxh3_128:ab12") == "xxh3_128"
+    assert cerveau.checksum_algorithm_of("blake3:ab12") == "blake3"
+
+
+@pytest.mark.parametrize("algorithme", ["sha256", "auto"])
+def test_kb_anterieure_non_reanalysee(tmp_path, monkeypatch, algorithme):
+    """Après mise à jour, un fichier inchangé n'est pas ré-analysé et son stat est renseigné en base."""
+    fichier = tmp_path / "note.txt"
+    fichier.write_text("Le chat dort sur le tapis.", encoding="utf-8")
+    db_path = tmp_path / "kb.sqlite"
+    _kb_anterieure(db_path, fichier)
+    monkeypatch.setattr(cerveau, "CHECKSUM_ALGORITHM", "sha256")
+    cerveau.configure_checksum_algorithm(
+        algorithme
+    )  # "auto" : xxh3_128 ou blake3 s'ils sont installés
+
+    service = _service(db_path, monkeypatch)
+    try:
+        assert service._is_file_processable(fichier) is False
+    finally:
+        service.kb_writer.stop()  # Vide la file : la mise à jour du stat est écrite
+    inode, mtime_ns, checksum = _stat_en_base(db_path, fichier)
+    st = fichier.stat()
+    assert (inode, mtime_ns) == (st.st_ino, st.st_mtime_ns)
+    assert checksum == hashlib.sha256(fichier.read_bytes()).hexdigest()
+
+    # Démarrage suivant : le stat du manifeste suffit, aucun hachage
+    service = _service(db_path, monkeypatch)
+    monkeypatch.setattr(
+        cerveau, "calculate_checksum", lambda *a, **k: pytest.fail("fichier re-haché")
+    )
+    try:
+        assert service._is_file_processable(fichier) is False
+    finally:
+        service.kb_writer.stop()
+
+
+def test_kb_anterieure_fichier_modifie(tmp_path, monkeypatch):
+    """Un contenu réellement modifié reste détecté avec l'algorithme du checksum stocké."""
+    fichier = tmp_path / "note.txt"
+    fichier.write_text("Le chat dort sur le tapis.", encoding="utf-8")
+    db_path = tmp_path / "kb.sqlite"
+    _kb_anterieure(db_path, fichier)
+    fichier.write_text("Le chien dort sur le tapis.", encoding="utf-8")
+    monkeypatch.setattr(cerveau, "CHECKSUM_ALGORITHM", "sha256")
+    cerveau.configure_checksum_algorithm("auto")
+
+    service = _service(db_path, monkeypatch)
+    try:
+        assert service._is_file_processable(fichier) is True
+    finally:
+        service.kb_writer.stop()
+    assert _stat_en_base(db_path, fichier)[:2] == (None, None)
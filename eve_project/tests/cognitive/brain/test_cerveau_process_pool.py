@@ -0,0 +1,122 @@
+# eve_project/tests/cognitive/brain/test_cerveau_process_pool.py
+
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+from eve_project.cognitive.brain import cerveau
+
+
+def _jetons(n):
+    return [
+        {
+            "text": f"Mot{i % 40}",
+            "lemma": f"mot{i % 40}",
+            "pos": ("NOUN", "VERB", "PUNCT")[i % 3],
+            "is_stop": i % 5 == 0,
+            "is_punct": i % 3 == 2,
+            "is_alpha": i % 3 != 2,
+            "is_significant": i % 3 == 0 and i % 5 != 0,
+        }
+        for i in range(n)
+    ]
+
+
+class _EtapeFactice:
+    """Étape CPU-bound factice : produit des tokens spaCy et NLTK."""
+
+    def process(self, processor, db_conn):
+        processor.file_content = "contenu"
+        processor.processed_data["linguistic_features"] = {
+            "tokens": _jetons(3000),
+            "tokens_nltk": _jetons(10),
+            "entities": [],
+        }
+        return True
+
+
+@pytest.fixture
+def globales_processus(monkeypatch):
+    """Restaure les globales que l'initialiseur du processus enfant réaffecte."""
+    for nom in (
+        "APP_CONFIG",
+        "KB_DB_PATH",
+        "CHECKSUM_ALGORITHM",
+        "alma_core",
+        "ALMA_CORE_AVAILABLE",
+    ):
+        monkeypatch.setattr(cerveau, nom, getattr(cerveau, nom))
+    monkeypatch.setattr(cerveau, "_NLP_PROCESS_STATE", {})
+
+
+def test_resultat_processus_tokens_compactes(globales_processus):
+    """Le résultat renvoyé au parent porte des colonnes compactes, décodées à l'identique par document_tokens."""
+    cerveau._NLP_PROCESS_STATE.update(
+        {
+            "config": {},
+            "kb": cerveau.KnowledgeBase({}, {}),
+            "steps": {"ComprehensionStep": _EtapeFactice()},
+            "logger": logging.getLogger("test"),
+        }
+    )
+    resultat = cerveau._nlp_process_run("/kb/note.txt", "cs1", ["ComprehensionStep"])
+
+    assert resultat["success"]
+    features = resultat["processed_data"]["linguistic_features"]
+    assert "tokens" not in features and "tokens_nltk" not in features
+    assert "initial_checksum" not in resultat["processed_data"]
+
+    taille_compacte = len(pickle.dumps(resultat))
+    taille_dicts = len(pickle.dumps(_jetons(3000)))
+    assert taille_compacte * 3 < taille_dicts
+
+    recu = pickle.loads(pickle.dumps(resultat))["processed_data"]["linguistic_features"]
+    assert cerveau.document_tokens(recu) == _jetons(3000)
+    assert recu["tokens_nltk"] == _jetons(10)
+    assert "packed_tokens" not in recu
+
+
+def test_initialiseur_processus_globales(globales_processus, tmp_path):
+    """L'initialiseur réapplique configuration, chemin de KB et checksum, sans algorithmes Core."""
+    config = {"service_params": {"executor_mode": "process"}}
+    kb_path = tmp_path / "kb.sqlite"
+    cerveau._nlp_process_initializer(config, kb_path, "xxh3_128")
+
+    assert cerveau.APP_CONFIG is config
+    assert cerveau.KB_DB_PATH == kb_path
+    assert cerveau.CHECKSUM_ALGORITHM == (
+        "xxh3_128" if cerveau.XXHASH_AVAILABLE else "sha256"
+    )
+    assert cerveau.alma_core is None and not cerveau.ALMA_CORE_AVAILABLE
+    assert set(cerveau._NLP_PROCESS_STATE["steps"]) == set(cerveau.CPU_BOUND_STEP_NAMES)
+
+
+def _etat_enfant():
+    return (
+        cerveau.KB_DB_PATH,
+        cerveau.CHECKSUM_ALGORITHM,
+        cerveau.alma_core,
+        sorted(cerveau._NLP_PROCESS_STATE.get("steps", {})),
+    )
+
+
+def test_initialiseur_processus_spawn(tmp_path):
+    """Un enfant 'spawn' (module ré-importé) reçoit ses globales de l'initialiseur du pool."""
+    kb_path = tmp_path / "kb.sqlite"
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=cerveau._nlp_process_initializer,
+        initargs=({}, kb_path, "sha256"),
+    ) as pool:
+        kb_enfant, checksum_enfant, core_enfant, etapes = pool.submit(
+            _etat_enfant
+        ).result(timeout=120)
+
+    assert kb_enfant == Path(kb_path)
+    assert checksum_enfant == "sha256"
+    assert core_enfant is None
+    assert etapes == sorted(cerveau.CPU_BOUND_STEP_NAMES)
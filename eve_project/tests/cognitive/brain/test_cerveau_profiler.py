@@ -0,0 +1,55 @@
+# eve_project/tests/cognitive/brain/test_cerveau_profiler.py
+
+import cProfile
+import threading
+
+from eve_project.cognitive.brain import cerveau
+
+
+def _profiler():
+    return cerveau.PipelineProfiler(cprofile_sample_rate=1.0, cprofile_keep_slowest=3)
+
+
+def test_un_seul_profil_actif():
+    """Tant qu'un fichier est profilé, aucun autre worker n'obtient de profil."""
+    profiler = _profiler()
+    assert profiler.should_profile() is True
+    assert profiler.should_profile() is False
+    profiler.release_profile()
+    assert profiler.should_profile() is True
+    profiler.release_profile()
+
+
+def test_profils_concurrents():
+    """Des workers concurrents ne lancent jamais deux cProfile à la fois."""
+    profiler = _profiler()
+    actifs, maximum, profils = [0], [0], []
+    verrou = threading.Lock()
+    depart = threading.Barrier(8)
+
+    def worker():
+        depart.wait()
+        for _ in range(20):
+            if not profiler.should_profile():
+                continue
+            profil = cProfile.Profile()
+            profil.enable()
+            with verrou:
+                actifs[0] += 1
+                maximum[0] = max(maximum[0], actifs[0])
+            sum(range(1000))
+            with verrou:
+                actifs[0] -= 1
+            profil.disable()
+            profiler.release_profile()
+            profiler.offer_profile(0.001, "note.txt", profil)
+            profils.append(profil)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert maximum[0] == 1
+    assert profils
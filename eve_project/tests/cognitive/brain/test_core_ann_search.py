@@ -0,0 +1,68 @@
+# eve_project/tests/cognitive/brain/test_core_ann_search.py
+
+import threading
+
+import numpy as np
+import pytest
+from eve_project.cognitive.brain.Core import core
+
+pytestmark = pytest.mark.skipif(not core.FAISS_AVAILABLE, reason="faiss non installé")
+
+
+def _linker(n=400, dim=16, graine=0):
+    """KnowledgeLinker réduit à son index : plat (référence) + 'ANN' figé sur le même instantané."""
+    vecteurs = np.random.default_rng(graine).normal(size=(n, dim)).astype(np.float32)
+    vecteurs /= np.linalg.norm(vecteurs, axis=1, keepdims=True)
+    ids = np.arange(1, n + 1, dtype=np.int64)
+    linker = core.KnowledgeLinker.__new__(core.KnowledgeLinker)
+    linker.faiss_lock = threading.RLock()
+    linker.faiss_embedding_dim = dim
+    linker.faiss_index = linker._create_empty_faiss_index()
+    linker.faiss_index.add_with_ids(vecteurs, ids)
+    linker.faiss_ann_index = linker._create_empty_faiss_index()
+    linker.faiss_ann_index.add_with_ids(vecteurs, ids)
+    linker.faiss_ann_stale_ids = set()
+    linker.faiss_ann_delta_vectors = {}
+    return linker, vecteurs, ids
+
+
+def test_recherche_ann_sur_echantillonne_les_documents_stale():
+    """Même si les premiers voisins ANN sont tous 'stale', k documents valides sont renvoyés."""
+    linker, vecteurs, ids = _linker()
+    requete = vecteurs[:1]
+    k = 5
+    ordre = ids[np.argsort(-(vecteurs @ requete[0]))]
+    # Les 60 plus proches voisins ont été modifiés depuis la construction de l'index ANN
+    linker.faiss_ann_stale_ids = set(ordre[:60].tolist())
+    nouveau = vecteurs[200] * -1.0
+    linker.faiss_ann_delta_vectors = {int(ordre[0]): nouveau}
+
+    scores, trouves = linker._search_top_k(requete, k)
+
+    valides = [fid for fid in ordre.tolist() if fid not in linker.faiss_ann_stale_ids]
+    scores_exacts = {int(fid): float(s) for fid, s in zip(ids, vecteurs @ requete[0])}
+    scores_exacts[int(ordre[0])] = float(nouveau @ requete[0])
+    attendus = sorted(valides + [int(ordre[0])], key=lambda f: -scores_exacts[f])[:k]
+    assert trouves[0].tolist() == attendus
+    assert np.allclose(scores[0], [scores_exacts[f] for f in attendus], atol=1e-5)
+
+
+def test_recherche_ann_index_epuise():
+    """Quand presque tout l'index est 'stale', la recherche s'arrête à l'index entier."""
+    linker, vecteurs, ids = _linker(n=30)
+    linker.faiss_ann_stale_ids = set(ids[:28].tolist())
+
+    scores, trouves = linker._search_top_k(vecteurs[:1], 5)
+
+    assert sorted(trouves[0][:2].tolist()) == ids[28:].tolist()
+    assert trouves[0][2:].tolist() == [-1, -1, -1]
+    assert np.all(np.isneginf(scores[0][2:]))
+
+
+def test_construction_ann_desactivee_en_benchmark():
+    """faiss_ann_background_build=False (mode benchmark) : aucune construction en tâche de fond."""
+    linker, _, _ = _linker()
+    linker.faiss_ann_background_build = False
+    linker.faiss_ann_build_thread = None
+    linker._maybe_schedule_ann_rebuild()
+    assert linker.faiss_ann_build_thread is None